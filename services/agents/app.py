@@ -1,13 +1,65 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import BackgroundTasks, Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, StreamingResponse
+from langchain_core.messages import HumanMessage
+from pydantic import BaseModel, Field
+from contextlib import asynccontextmanager
+from dataclasses import asdict
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Awaitable, Callable, Dict, Any, List, Optional
 import os
 import asyncio
+import hmac
+import json
+import math
 import time
+import uuid
 
-app = FastAPI(title="GalaxyCo.ai Agents Service", version="0.1.0")
+from core.approvals import get_approval_inbox
+from core.batching import batching_summary
+from core.blob_store import BlobTooLarge, get_blob_store
+from core.cascade import get_cascade_stats, is_complete, tiers_for
+from core.chunking import map_reduce, plan_chunks
+from core.intake_classifier import get_intake_log, get_intake_stats
+from core.llm import PROVIDERS, estimate_cost, get_chat_model
+from core.orchestrator import bulk_update_approval_status, close_workflow, execute_workflow
+from core.profiling import ProfileInProgress, dump_tasks, get_loop_monitor, loop_monitor_enabled, profile_for
+from core.prompts import PromptNotFound, cached_tokens, get_prompt_store, get_template, system_message
+from core.quotas import QuotaExceeded, get_quotas
+from core.semantic_cache import get_semantic_cache, namespace as cache_namespace, semantic_cache_enabled, text_agreement
+from core.uploads import UploadNotFound, get_upload_index, max_upload_bytes, read_chunks, resolve_inputs
+from core.warmup import Warmup
+from core.workflow_index import get_workflow_index
+from specialists import compose_campaign, get_enrichment_store, get_specialist_registry, get_template_store
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Service lifecycle: validate quota config, warm the worker in the
+    background (GET /ready reports when done), release local stores on shutdown
+    """
+    get_quotas()
+    app.state.warmup = Warmup()
+    app.state.warmup.start()
+    if loop_monitor_enabled():
+        get_loop_monitor().start()
+    yield
+    await app.state.warmup.stop()
+    await get_loop_monitor().stop()
+    await close_workflow()
+    await get_approval_inbox().close()
+    await get_workflow_index().close()
+    await get_quotas().close()
+    await get_prompt_store().close()
+    await get_intake_log().close()
+    await get_upload_index().close()
+    await get_enrichment_store().close()
+    await get_template_store().close()
+    get_specialist_registry().shutdown()
+
+
+app = FastAPI(title="GalaxyCo.ai Agents Service", version="0.1.0", lifespan=lifespan)
 
 # Enable CORS for development
 app.add_middleware(
@@ -19,8 +71,44 @@ app.add_middleware(
 )
 
 
+@app.exception_handler(QuotaExceeded)
+async def quota_exceeded_handler(request: Request, exc: QuotaExceeded):
+    """Workspace is over its fairness limits - tell the caller when to retry"""
+    retry_after = max(1, math.ceil(exc.retry_after))
+    return JSONResponse(
+        status_code=429,
+        content={
+            "detail": str(exc),
+            "workspace_id": exc.workspace_id,
+            "limit": exc.limit,
+            "retry_after": retry_after,
+        },
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+def require_admin(request: Request) -> None:
+    """
+    Admin endpoints need `Authorization: Bearer $ADMIN_TOKEN`.
+    Without ADMIN_TOKEN configured they do not exist (404).
+    """
+    token = os.getenv("ADMIN_TOKEN")
+    if not token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    
+    scheme, _, supplied = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(supplied.encode(), token.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
 class ExecuteAgentRequest(BaseModel):
-    """Request to execute an agent"""
+    """
+    Request to execute an agent.
+    inputs: values inline, or {"$blob": blob_id} for text uploaded with POST /blobs
+    config: provider ("openai" | "anthropic"), model, temperature, and either
+    promptId (+ optional promptVersion) of a stored prompt or an inline systemPrompt;
+    semanticCache: false skips the semantic cache (core/semantic_cache.py)
+    """
     agent_id: str
     workspace_id: str
     user_id: str
@@ -39,12 +127,35 @@ class ExecuteAgentResponse(BaseModel):
     metrics: Dict[str, Any]
 
 
+class BulkApprovalRequest(BaseModel):
+    """Approve or reject many paused workflows in one call"""
+    workspace_id: str
+    workflow_ids: List[str] = Field(min_length=1, max_length=500)
+    approved: bool
+
+
+class SavePromptRequest(BaseModel):
+    """Store a system prompt; an existing prompt_id gets a new version"""
+    workspace_id: str
+    system_prompt: str = Field(min_length=1)
+    prompt_id: Optional[str] = None
+
+
+class SubmitWorkflowRequest(BaseModel):
+    """Start an orchestrator workflow"""
+    workspace_id: str
+    user_id: str
+    message: str
+    workflow_id: Optional[str] = None
+
+
 @app.get("/")
 def root():
     return {
         "message": "GalaxyCo.ai Agents Service v2.0",
         "docs": "/docs",
         "health": "/health",
+        "ready": "/ready",
     }
 
 
@@ -60,6 +171,18 @@ def health():
     }
 
 
+@app.get("/ready")
+def ready(request: Request):
+    """
+    Readiness: 200 once warmup has finished (providers, clients, stores,
+    workflow graph), 503 while warming or after a failed phase
+    """
+    warmup = getattr(request.app.state, "warmup", None)
+    if warmup is None:
+        return JSONResponse(status_code=503, content={"status": "pending", "phases": {}})
+    return JSONResponse(status_code=200 if warmup.ready else 503, content=warmup.report())
+
+
 @app.post("/execute", response_model=ExecuteAgentResponse)
 async def execute_agent(request: ExecuteAgentRequest):
     """
@@ -67,46 +190,170 @@ async def execute_agent(request: ExecuteAgentRequest):
     
     MVP Implementation: Simple LangChain call without full orchestration.
     Future: Will use full LangGraph orchestrator from core/orchestrator.py
+    
+    Long transcripts and email threads are map-reduced over chunks (see
+    core/chunking.py); config.chunking: false forces a single call.
     """
     start_time = time.time()
+    call, prompt_info = await prepare_execution(request)
     
+    # Per-workspace concurrency slot (raises QuotaExceeded -> 429)
+    quotas = get_quotas()
+    lease_id = await quotas.acquire(request.workspace_id)
+    try:
+        return await run_agent(request, call, prompt_info, start_time)
+    finally:
+        await quotas.release(lease_id)
+
+
+@app.post("/execute/stream")
+async def execute_agent_stream(request: ExecuteAgentRequest):
+    """
+    /execute as NDJSON: a "partial" event per analysed chunk of a long input
+    as soon as it is ready, then a "result" event carrying the
+    ExecuteAgentResponse (or an "error" event when a quota runs out midway)
+    """
+    start_time = time.time()
+    call, prompt_info = await prepare_execution(request)
+    quotas = get_quotas()
+    lease_id = await quotas.acquire(request.workspace_id)
+    events: asyncio.Queue = asyncio.Queue()
+    
+    async def run():
+        try:
+            response = await run_agent(request, call, prompt_info, start_time, on_partial=events.put)
+            await events.put({"event": "result", **response.model_dump()})
+        except QuotaExceeded as e:
+            await events.put({
+                "event": "error",
+                "status_code": 429,
+                "detail": str(e),
+                "limit": e.limit,
+                "retry_after": max(1, math.ceil(e.retry_after)),
+            })
+        finally:
+            await quotas.release(lease_id)
+    
+    async def stream():
+        task = asyncio.create_task(run(), name="execute-stream")
+        try:
+            while True:
+                event = await events.get()
+                yield json.dumps(event) + "\n"
+                if event["event"] != "partial":
+                    break
+        finally:
+            # Client disconnected: stop the remaining model calls
+            task.cancel()
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+async def prepare_execution(request: ExecuteAgentRequest) -> tuple["AgentCall", Dict[str, Any]]:
+    """Validate the provider and resolve the system prompt before taking a quota slot"""
+    config = request.config or {}
+    provider = config.get("provider", "openai")
+    if provider not in PROVIDERS:
+        raise HTTPException(status_code=400, detail=f"Unknown provider: {provider}")
+    
+    # Resolve the system prompt up front so an unknown promptId is a 404
+    try:
+        system_prompt, prompt_info = await resolve_system_prompt(request.agent_type, request.workspace_id, config)
+    except PromptNotFound:
+        raise HTTPException(status_code=404, detail=f"Prompt not found: {config.get('promptId')}")
+    
+    # Uploaded inputs replace their {"$blob": ...} references from here on
+    try:
+        request.inputs = await resolve_inputs(request.workspace_id, request.inputs)
+    except UploadNotFound as e:
+        raise HTTPException(status_code=404, detail=f"Blob not found: {e.args[0]}")
+    return AgentCall(request.workspace_id, provider, system_prompt, config), prompt_info
+
+
+async def run_agent(
+    request: ExecuteAgentRequest,
+    call: "AgentCall",
+    prompt_info: Dict[str, Any],
+    start_time: float,
+    on_partial: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+) -> ExecuteAgentResponse:
+    """Run the model call(s) for an execution; failures become success=False responses"""
     try:
-        # Import here to avoid circular dependencies
-        from langchain_openai import ChatOpenAI
-        from langchain_core.messages import SystemMessage, HumanMessage
-        
         # Check API key
-        if not os.getenv("OPENAI_API_KEY"):
+        if not os.getenv(PROVIDERS[call.provider][1]):
             raise HTTPException(
                 status_code=500,
-                detail="OpenAI API key not configured"
+                detail=f"{call.provider} API key not configured"
             )
         
-        # Initialize model
-        model = ChatOpenAI(
-            model=request.config.get("model", "gpt-4o-mini") if request.config else "gpt-4o-mini",
-            temperature=request.config.get("temperature", 0.7) if request.config else 0.7,
-        )
-        
-        # Build system prompt based on agent type
-        system_prompt = get_system_prompt(request.agent_type, request.config)
-        
-        # Build user message from inputs
-        user_message = format_inputs_for_agent(request.inputs, request.agent_type)
-        
-        # Execute
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=user_message),
-        ]
-        
-        response = await model.ainvoke(messages)
+        if request.agent_type == "email" and isinstance(request.inputs.get("recipients"), list):
+            # Campaign send: one cached template per campaign/segment, filled per recipient
+            campaign = await compose_campaign(
+                request.workspace_id,
+                request.inputs,
+                provider=call.provider,
+                model=call.model,
+                default_campaign=request.agent_id,
+            )
+            summary = campaign["summary"]
+            return ExecuteAgentResponse(
+                execution_id=f"exec_{int(time.time() * 1000)}",
+                agent_id=request.agent_id,
+                success=True,
+                outputs=campaign,
+                metrics={
+                    "duration_ms": int((time.time() - start_time) * 1000),
+                    "model": call.model,
+                    "llm_calls": summary["llm_calls"],
+                    "template_cached": summary["template_cached"],
+                    "tokens_used": summary["tokens_used"],
+                    "cost_usd": summary["cost_usd"],
+                    "prompt": prompt_info,
+                },
+            )
+
+        chunks = plan_chunks(request.agent_type, request.inputs) if (request.config or {}).get("chunking", True) else None
+        if chunks is None:
+            user_message = get_template(request.agent_type).render_user(request.inputs)
+            # Paraphrases of an earlier request with the same prompt, models and temperature reuse its outputs
+            cache, scope, hit = None, None, None
+            if semantic_cache_enabled() and (request.config or {}).get("semanticCache", True):
+                cache = get_semantic_cache()
+                scope = cache_namespace(request.agent_type, call.system.content, call.tiers, call.temperature)
+                hit = cache.lookup(request.workspace_id, scope, request.agent_type, user_message)
+            if hit is not None and not hit.audit:
+                return ExecuteAgentResponse(
+                    execution_id=f"exec_{int(time.time() * 1000)}",
+                    agent_id=request.agent_id,
+                    success=True,
+                    outputs=hit.value,
+                    metrics={
+                        "duration_ms": int((time.time() - start_time) * 1000),
+                        "model": "semantic-cache",
+                        "llm_calls": 0,
+                        "tokens_used": 0,
+                        "cost_usd": 0.0,
+                        "semantic_cache": {"hit": True, "similarity": hit.similarity},
+                        "prompt": prompt_info,
+                    },
+                )
+            content = await call.invoke(user_message)
+        else:
+            async for event in map_reduce(request.agent_type, request.inputs, chunks, call.invoke):
+                if event["event"] == "partial" and on_partial is not None:
+                    await on_partial(event)
+            content = event["content"]
         
         # Calculate metrics
         duration_ms = int((time.time() - start_time) * 1000)
         
         # Parse response based on agent type
-        outputs = parse_agent_output(response.content, request.agent_type)
+        outputs = parse_agent_output(content, request.agent_type)
+        if chunks is None and cache is not None:
+            if hit is not None:
+                cache.record_audit(request.agent_type, text_agreement(hit.value, outputs))
+            else:
+                cache.put(request.workspace_id, scope, user_message, outputs)
         
         return ExecuteAgentResponse(
             execution_id=f"exec_{int(time.time() * 1000)}",
@@ -115,12 +362,20 @@ async def execute_agent(request: ExecuteAgentRequest):
             outputs=outputs,
             metrics={
                 "duration_ms": duration_ms,
-                "model": model.model_name,
-                "tokens_used": response.response_metadata.get("token_usage", {}).get("total_tokens", 0),
-                "cost_usd": estimate_cost(response.response_metadata.get("token_usage", {}), model.model_name),
+                "model": call.model,
+                "escalations": call.escalations,
+                "llm_calls": call.calls,
+                "chunks": len(chunks) if chunks else 0,
+                "tokens_used": call.tokens_used,
+                "cached_tokens": call.cached,
+                "cost_usd": round(call.cost_usd, 6),
+                "prompt": prompt_info,
             },
         )
         
+    except QuotaExceeded:
+        raise
+        
     except Exception as e:
         duration_ms = int((time.time() - start_time) * 1000)
         
@@ -137,77 +392,339 @@ async def execute_agent(request: ExecuteAgentRequest):
         )
 
 
-def get_system_prompt(agent_type: str, config: Optional[Dict[str, Any]] = None) -> str:
-    """Get system prompt based on agent type"""
-    
-    # Use custom prompt if provided
-    if config and "systemPrompt" in config:
-        return config["systemPrompt"]
+class AgentCall:
+    """
+    Model calls for one execution: cascade tiers, quota checks and usage
+    totals across every call it makes (one, or the map and reduce calls of
+    a chunked input)
+    """
     
-    # Default prompts by agent type
-    prompts = {
-        "scope": """You are a Scope Agent that analyzes emails and extracts action items.
-        
-Analyze the provided email and identify:
-        1. Key action items that need to be completed
-        2. Priority level (high, medium, low)
-        3. Overall sentiment of the email
-        
-Provide a concise summary and list of actionable items.""",
-        
-        "email": """You are an Email Composer Agent that drafts professional email responses.
-        
-Based on the provided context and requirements, compose a clear, professional email response.
-Match the tone to the situation and ensure all key points are addressed.""",
+    def __init__(self, workspace_id: str, provider: str, system_prompt: str, config: Dict[str, Any]):
+        self.workspace_id = workspace_id
+        self.provider = provider
+        # Stable system prefix first (provider prompt caching), request data after
+        self.system = system_message(system_prompt, provider)
+        self.temperature = config.get("temperature", 0.7)
         
-        "call": """You are a Call Summary Agent that analyzes sales call transcripts.
+        # A pinned config.model (or config.cascade: false) runs as-is; otherwise
+        # the cheap tier answers unless its output is empty or truncated
+        self.cascade_name: Optional[str] = f"execute:{provider}"
+        if "model" in config or config.get("cascade") is False:
+            self.tiers = ((provider, config.get("model", DEFAULT_MODELS[provider])),)
+            self.cascade_name = None
+        else:
+            self.tiers = tiers_for(self.cascade_name, (provider, DEFAULT_MODELS[provider]))
         
-Review the call transcript and identify:
-        1. Key discussion points
-        2. Customer needs and pain points
-        3. Next steps and action items
-        4. Deal stage and qualification level""",
-        
-        "custom": """You are a helpful AI assistant.
+        self.model = self.tiers[0][1]
+        self.calls = 0
+        self.escalations = 0
+        self.tokens_used = 0
+        self.cached = 0
+        self.cost_usd = 0.0
+    
+    async def invoke(self, user_message: str) -> str:
+        """One answer to `user_message`, escalating through the tiers"""
+        messages = [self.system, HumanMessage(content=user_message)]
+        quotas = get_quotas()
+        for index, (_, model_name) in enumerate(self.tiers):
+            # Initialize model (honours OPENAI_BASE_URL / ANTHROPIC_BASE_URL, see core/llm.py)
+            model = get_chat_model(self.provider, model_name, temperature=self.temperature)
+            
+            # Token and cost budgets are checked right before dispatch
+            await quotas.check(self.workspace_id)
+            
+            call_start = time.perf_counter()
+            response = await model.ainvoke(messages)
+            call_ms = (time.perf_counter() - call_start) * 1000
+            
+            usage = response.usage_metadata or {}
+            call_cost = estimate_cost(usage, model_name)
+            await quotas.record_usage(self.workspace_id, usage.get("total_tokens", 0), call_cost)
+            self.tokens_used += usage.get("total_tokens", 0)
+            self.cached += cached_tokens(response)
+            self.cost_usd += call_cost
+            
+            accepted = is_complete(response)
+            final = index == len(self.tiers) - 1
+            if self.cascade_name:
+                get_cascade_stats().record(self.cascade_name, model_name, accepted, final, call_ms, call_cost)
+            if accepted or final:
+                break
         
-Analyze the provided input and generate a helpful, accurate response.""",
+        # The model of the last call is the one that produced the final answer
+        self.model = model_name
+        self.calls += 1
+        self.escalations += index
+        return response.content
+
+
+@app.post("/blobs", status_code=201)
+async def upload_blob(request: Request, workspace_id: str):
+    """
+    Upload a large input once, as the raw request body (streamed, any
+    content type) or as the `file` field of a multipart/form-data body.
+    Reference it from /execute inputs as {"$blob": blob_id}; the same bytes
+    always get the same blob_id (their SHA-256).
+    """
+    limit = max_upload_bytes()
+    if int(request.headers.get("content-length") or 0) > limit:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {limit} bytes")
+    
+    content_type = request.headers.get("content-type", "")
+    try:
+        if content_type.startswith("multipart/form-data"):
+            # Needs python-multipart; the file part is spooled to disk, not parsed into memory
+            async with request.form() as form:
+                file = form.get("file")
+                if not hasattr(file, "read"):
+                    raise HTTPException(status_code=400, detail="Multipart upload needs a 'file' field")
+                blob_id, size = await get_blob_store().put_stream(read_chunks(file), limit)
+                media_type, filename = file.content_type or "application/octet-stream", file.filename
+        else:
+            blob_id, size = await get_blob_store().put_stream(request.stream(), limit)
+            media_type, filename = content_type or "application/octet-stream", None
+    except BlobTooLarge:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {limit} bytes")
+    
+    upload = await get_upload_index().add(workspace_id, blob_id, size, media_type, filename)
+    return asdict(upload)
+
+
+@app.get("/blobs/{blob_id}")
+async def get_blob_info(blob_id: str, workspace_id: str):
+    """Upload metadata; lets a client skip re-uploading bytes it already sent"""
+    try:
+        return asdict(await get_upload_index().get(workspace_id, blob_id))
+    except UploadNotFound:
+        raise HTTPException(status_code=404, detail=f"Blob not found: {blob_id}")
+
+
+@app.post("/prompts", status_code=201)
+async def save_prompt(request: SavePromptRequest):
+    """
+    Store a system prompt for /execute (config.promptId). Saving an existing
+    prompt_id creates a new version; executions use the latest unless
+    config.promptVersion pins one.
+    """
+    try:
+        prompt = await get_prompt_store().save(request.workspace_id, request.system_prompt, request.prompt_id)
+    except PromptNotFound:
+        raise HTTPException(status_code=404, detail=f"Prompt not found: {request.prompt_id}")
+    
+    return {"prompt_id": prompt.prompt_id, "version": prompt.version}
+
+
+@app.get("/prompts/{prompt_id}")
+async def get_prompt(prompt_id: str, workspace_id: str, version: Optional[int] = None):
+    """A stored prompt (latest version unless `version` is given)"""
+    try:
+        prompt = await get_prompt_store().get(prompt_id, workspace_id, version)
+    except PromptNotFound:
+        raise HTTPException(status_code=404, detail=f"Prompt not found: {prompt_id}")
+    
+    return {
+        "prompt_id": prompt.prompt_id,
+        "version": prompt.version,
+        "system_prompt": prompt.system_prompt,
+        "created_at": datetime.utcfromtimestamp(prompt.created_at).isoformat() + "Z",
+    }
+
+
+@app.get("/approvals")
+async def list_approvals(
+    workspace_id: str,
+    status: str = "pending",
+    limit: int = 50,
+    before: Optional[float] = None,
+):
+    """
+    Approval inbox for a workspace, newest first.
+    Page by passing the previous response's `next_before`.
+    """
+    limit = max(1, min(limit, 200))
+    entries = await get_approval_inbox().list_entries(workspace_id, status, limit, before)
+    
+    return {
+        "workspace_id": workspace_id,
+        "status": status,
+        "approvals": entries,
+        "next_before": entries[-1]["requested_at"] if len(entries) == limit else None,
     }
+
+
+@app.post("/approvals/bulk")
+async def bulk_approve(request: BulkApprovalRequest):
+    """Approve or reject many paused workflows; each resumes from its checkpoint"""
+    results = await bulk_update_approval_status(
+        request.workflow_ids,
+        request.approved,
+        request.workspace_id,
+    )
     
-    return prompts.get(agent_type, prompts["custom"])
+    return {
+        "workspace_id": request.workspace_id,
+        "approved": request.approved,
+        "results": {
+            workflow_id: summarize_approval_result(result)
+            for workflow_id, result in results.items()
+        },
+    }
 
 
-def format_inputs_for_agent(inputs: Dict[str, Any], agent_type: str) -> str:
-    """Format inputs into a user message"""
+def summarize_approval_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact, JSON-safe view of an update_approval_status result"""
+    if result.get("error"):
+        return {
+            "success": False,
+            "error": result["error"],
+            "retry_after": result.get("retry_after"),
+        }
     
-    if agent_type == "scope" and "email_content" in inputs:
-        return f"""Email to analyze:
-        
-Subject: {inputs.get('subject', 'No subject')}
+    return {
+        "success": True,
+        "status": result.get("status") or result.get("current_step"),
+        "final_summary": result.get("final_summary"),
+        "total_cost": result.get("metrics", {}).get("total_cost"),
+    }
 
-{inputs['email_content']}
 
-Please provide your analysis."""
+@app.post("/workflows", status_code=202)
+async def submit_workflow(request: SubmitWorkflowRequest, background_tasks: BackgroundTasks):
+    """
+    Start a workflow in the background.
+    Track progress with GET /workflows; paused workflows appear in /approvals.
+    """
+    workflow_id = request.workflow_id or f"wf_{request.workspace_id}_{uuid.uuid4().hex[:12]}"
     
-    if agent_type == "email" and "context" in inputs:
-        return f"""Context: {inputs['context']}
-        
-Requirements: {inputs.get('requirements', 'Draft a professional response')}
+    background_tasks.add_task(
+        execute_workflow,
+        workspace_id=request.workspace_id,
+        user_id=request.user_id,
+        user_message=request.message,
+        workflow_id=workflow_id,
+    )
+    
+    return {"workflow_id": workflow_id, "status": "accepted"}
 
-Please compose the email."""
+
+@app.get("/workflows")
+async def list_workflows(
+    workspace_id: str,
+    status: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+):
+    """
+    Workflows for a workspace, most recently updated first.
+    Served from the workflow index only - checkpoint blobs are never read.
+    """
+    limit = max(1, min(limit, 200))
+    
+    try:
+        rows, next_cursor = await get_workflow_index().list_workflows(
+            workspace_id,
+            status=status,
+            since=since.timestamp() if since else None,
+            until=until.timestamp() if until else None,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    for row in rows:
+        for field in ("created_at", "updated_at"):
+            row[field] = datetime.utcfromtimestamp(row[field]).isoformat() + "Z"
     
-    if agent_type == "call" and "transcript" in inputs:
-        return f"""Call Transcript:
+    return {
+        "workspace_id": workspace_id,
+        "workflows": rows,
+        "next_cursor": next_cursor,
+    }
+
+
+@app.post("/admin/profile", dependencies=[Depends(require_admin)])
+async def admin_profile(seconds: float = 10.0, interval_ms: float = 5.0):
+    """
+    Sample this worker's event-loop thread for `seconds` (max 120) while it
+    keeps serving traffic. Folded stacks are written under PROFILE_DIR.
+    """
+    try:
+        return await profile_for(seconds, interval_s=max(1.0, interval_ms) / 1000)
+    except ProfileInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@app.get("/admin/tasks", dependencies=[Depends(require_admin)])
+async def admin_tasks():
+    """Every pending asyncio task on this worker with its await stack"""
+    tasks = dump_tasks()
+    return {"pid": os.getpid(), "count": len(tasks), "tasks": tasks}
+
+
+@app.get("/admin/loop-lag", dependencies=[Depends(require_admin)])
+async def admin_loop_lag():
+    """Event-loop lag histogram and recent blocking-callback stacks"""
+    return {"pid": os.getpid(), **get_loop_monitor().summary()}
+
+
+@app.get("/admin/cascade", dependencies=[Depends(require_admin)])
+async def admin_cascade():
+    """Per-tier model cascade outcomes, latency and cost on this worker"""
+    return {"pid": os.getpid(), **get_cascade_stats().summary()}
+
+
+@app.get("/admin/batching", dependencies=[Depends(require_admin)])
+async def admin_batching():
+    """Critic micro-batching: batch-size histogram, queue wait and call time"""
+    return {"pid": os.getpid(), **batching_summary()}
 
-{inputs['transcript']}
 
-Please analyze this call and provide a summary."""
+@app.get("/admin/specialists", dependencies=[Depends(require_admin)])
+async def admin_specialists():
+    """Specialist registry: per-specialist calls, failures, timeouts, queue wait, latency, throughput"""
+    return {"pid": os.getpid(), **get_specialist_registry().summary()}
+
+
+@app.get("/admin/semantic-cache", dependencies=[Depends(require_admin)])
+async def admin_semantic_cache():
+    """Semantic cache hit rate, hit similarity and audit agreement per agent type on this worker"""
+    return {"pid": os.getpid(), **get_semantic_cache().summary()}
+
+
+@app.get("/admin/intake", dependencies=[Depends(require_admin)])
+async def admin_intake():
+    """Local intake classifier skip rate and disagreement with the LLM on this worker"""
+    return {"pid": os.getpid(), **get_intake_stats().summary()}
+
+
+# Model when cascading is off; also the cheap tier in core/cascade.py
+DEFAULT_MODELS = {
+    "openai": "gpt-4o-mini",
+    "anthropic": "claude-3-5-haiku-20241022",
+}
+
+
+async def resolve_system_prompt(
+    agent_type: str,
+    workspace_id: str,
+    config: Dict[str, Any],
+) -> tuple[str, Dict[str, Any]]:
+    """
+    System prompt for an execution: a stored prompt (config.promptId), an
+    inline config.systemPrompt, or the built-in one for the agent type.
+    Returns (prompt, description for metrics).
+    """
+    if config.get("promptId"):
+        prompt = await get_prompt_store().get(config["promptId"], workspace_id, config.get("promptVersion"))
+        return prompt.system_prompt, {"source": "stored", "prompt_id": prompt.prompt_id, "version": prompt.version}
     
-    # Generic format for other types
-    formatted = "Input data:\n\n"
-    for key, value in inputs.items():
-        formatted += f"{key}: {value}\n"
+    if "systemPrompt" in config:
+        return config["systemPrompt"], {"source": "inline"}
     
-    return formatted
+    return get_template(agent_type).system, {"source": "builtin", "agent_type": get_template(agent_type).agent_type}
 
 
 def parse_agent_output(content: str, agent_type: str) -> Dict[str, Any]:
@@ -221,24 +738,3 @@ def parse_agent_output(content: str, agent_type: str) -> Dict[str, Any]:
         "agent_type": agent_type,
         "timestamp": datetime.utcnow().isoformat() + "Z",
     }
-
-
-def estimate_cost(token_usage: Dict[str, int], model: str) -> float:
-    """Estimate cost based on token usage"""
-    
-    # Cost per 1M tokens (approximate as of 2024)
-    costs = {
-        "gpt-4o": {"input": 2.50, "output": 10.00},
-        "gpt-4o-mini": {"input": 0.15, "output": 0.60},
-        "gpt-4-turbo": {"input": 10.00, "output": 30.00},
-    }
-    
-    model_costs = costs.get(model, costs["gpt-4o-mini"])
-    
-    input_tokens = token_usage.get("prompt_tokens", 0)
-    output_tokens = token_usage.get("completion_tokens", 0)
-    
-    input_cost = (input_tokens / 1_000_000) * model_costs["input"]
-    output_cost = (output_tokens / 1_000_000) * model_costs["output"]
-    
-    return round(input_cost + output_cost, 6)
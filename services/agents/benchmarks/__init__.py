@@ -0,0 +1,11 @@
+"""
+GalaxyCo.ai Agent Benchmarks
+=============================
+
+Offline benchmarks for the agents service. Every benchmark runs against a
+fake chat model, so no API keys are needed and results are reproducible.
+
+Run from services/agents, e.g.:
+    python -m benchmarks.bench_orchestrator -n 500 -c 32 --save
+    python -m benchmarks.bench_approval_resume -n 200
+"""
@@ -0,0 +1,85 @@
+"""
+Approval resume latency
+========================
+
+Pauses N workflows at the human_approval interrupt, then measures:
+- per-workflow resume latency through update_approval_status()
+- wall time to decide a batch through bulk_update_approval_status()
+
+All stores live in a temporary directory and the fake chat model answers
+instantly, so the numbers are pure orchestration + checkpoint overhead.
+
+Usage:
+    python -m benchmarks.bench_approval_resume -n 200 --bulk-concurrency 8
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from core import orchestrator
+from core.llm import set_chat_model_factory
+
+from .fake_llm import fake_model_factory
+from .harness import latency_stats
+from .stores import temporary_stores
+
+
+async def pause_workflows(prefix: str, count: int) -> list[str]:
+    workflow_ids = [f"{prefix}_{i}" for i in range(count)]
+    for workflow_id in workflow_ids:
+        await orchestrator.execute_workflow(
+            workspace_id="ws_bench",
+            user_id="user_bench",
+            user_message="Send the follow-up sequence to every open lead",
+            workflow_id=workflow_id,
+        )
+    return workflow_ids
+
+
+async def run(count: int, bulk_concurrency: int) -> dict:
+    async with temporary_stores():
+        set_chat_model_factory(fake_model_factory(requires_approval=True))
+
+        try:
+            # Single decisions
+            workflow_ids = await pause_workflows("wf_single", count)
+            single_ms = []
+            for workflow_id in workflow_ids:
+                start = time.perf_counter()
+                result = await orchestrator.update_approval_status(workflow_id, True, "ws_bench")
+                single_ms.append((time.perf_counter() - start) * 1000)
+                assert not result.get("error"), result
+
+            # One bulk call
+            workflow_ids = await pause_workflows("wf_bulk", count)
+            start = time.perf_counter()
+            results = await orchestrator.bulk_update_approval_status(
+                workflow_ids, True, "ws_bench", max_concurrency=bulk_concurrency
+            )
+            bulk_s = time.perf_counter() - start
+            failures = sum(1 for result in results.values() if result.get("error"))
+        finally:
+            set_chat_model_factory(None)
+
+    return {
+        "benchmark": "approval_resume",
+        "workflows": count,
+        "single_resume": latency_stats(single_ms),
+        "bulk_resume": {
+            "concurrency": bulk_concurrency,
+            "wall_ms": round(bulk_s * 1000, 3),
+            "workflows_per_s": round(count / bulk_s, 2),
+            "failures": failures,
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Approval resume latency benchmark")
+    parser.add_argument("-n", "--workflows", type=int, default=100)
+    parser.add_argument("--bulk-concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.workflows, args.bulk_concurrency)), indent=2))
@@ -0,0 +1,165 @@
+"""
+Long-input chunking
+====================
+
+Sends synthetic sales-call transcripts of 1-3 hours (~150 spoken words a
+minute, timestamped speaker turns) through the `call` agent's /execute
+code path, once as a single call (config.chunking: false) and once map-reduced
+(core/chunking.py), and reports per transcript length and mode:
+
+- latency_ms: end-to-end /execute latency
+- first_partial_ms: when the first partial result was ready, i.e. the
+  first chunk analysis POST /execute/stream sends (for a single call, the
+  final result)
+- llm_calls, chunks, tokens_used, success / error
+
+The fake provider makes input size matter: every 1k input tokens adds
+`--input-s-per-1k` seconds of prefill on top of the fixed per-call
+`--latency` (output generation), and prompts above `--context-window`
+tokens fail like a provider's context-length error. `count_tokens` lists
+the local token counter's time on each transcript.
+
+    python -m benchmarks.bench_chunking
+    python -m benchmarks.bench_chunking --minutes 60 120 180 --context-window 32000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+import app as app_module
+from core.chunking import count_tokens
+from core.llm import set_chat_model_factory
+
+from .fake_llm import fake_model_factory
+from .stores import temporary_stores
+
+SPEAKERS = ["Alex (GalaxyCo)", "Dana Smith (ACME)", "Priya Patel (ACME)", "Tom Baker (ACME IT)"]
+PHRASES = [
+    "we are currently running our outbound on spreadsheets and it does not scale",
+    "the main pain point is that reps spend hours enriching contacts by hand",
+    "can you walk me through how the approval step works for outgoing email",
+    "our security team will need the SOC 2 report before procurement signs off",
+    "pricing would have to fit inside the budget we set for the second quarter",
+    "let me share my screen and show you the lead qualification dashboard",
+    "we tried another vendor last year but the integration with our CRM broke",
+    "the pilot would cover two regional teams, roughly forty sellers in total",
+    "I will send over the technical questionnaire after this call",
+    "what does onboarding look like and who owns it on your side",
+    "that makes sense, and the follow-up sequences can be paused per contact",
+    "our renewal with the current provider comes up at the end of September",
+]
+
+
+def synthetic_transcript(minutes: int, seed: int = 0, words_per_minute: int = 150) -> str:
+    """A timestamped multi-speaker sales call of roughly `minutes` length"""
+    rng = random.Random(seed)
+    lines, seconds, words = [], 0, 0
+    while words < minutes * words_per_minute:
+        sentences = [rng.choice(PHRASES).capitalize() + rng.choice([".", "?", "."]) for _ in range(rng.randint(1, 5))]
+        turn = " ".join(sentences)
+        turn_words = len(turn.split())
+        stamp = f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+        lines.append(f"[{stamp}] {rng.choice(SPEAKERS)}: {turn}")
+        words += turn_words
+        seconds += turn_words * 60 // words_per_minute + 1
+    return "\n".join(lines) + "\n"
+
+
+def _body(transcript: str, chunking: bool) -> dict:
+    return {
+        "agent_id": "agent_bench",
+        "workspace_id": "ws_bench",
+        "user_id": "user_bench",
+        "agent_type": "call",
+        "inputs": {"transcript": transcript},
+        "config": {"chunking": chunking},
+    }
+
+
+async def run_case(transcript: str, chunking: bool) -> dict:
+    # Called in-process: httpx's ASGI transport buffers streamed bodies, so
+    # the first partial is timed at the callback /execute/stream queues from
+    request = app_module.ExecuteAgentRequest(**_body(transcript, chunking))
+    partials: list[float] = []
+
+    async def on_partial(event: dict) -> None:
+        partials.append(time.perf_counter())
+
+    start = time.perf_counter()
+    call, prompt_info = await app_module.prepare_execution(request)
+    response = (await app_module.run_agent(request, call, prompt_info, time.time(), on_partial=on_partial)).model_dump()
+    end = time.perf_counter()
+
+    metrics = response["metrics"]
+    return {
+        "success": response["success"],
+        "error": response["error"],
+        "latency_ms": round((end - start) * 1000, 1),
+        "first_partial_ms": round(((partials[0] if partials else end) - start) * 1000, 1),
+        "llm_calls": metrics.get("llm_calls"),
+        "chunks": metrics.get("chunks"),
+        "tokens_used": metrics.get("tokens_used"),
+    }
+
+
+async def run(
+    minutes: list[int] = (60, 120, 180),
+    latency: float = 1.5,
+    input_s_per_1k: float = 0.1,
+    context_window: int | None = None,
+) -> dict:
+    results = {}
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    async with temporary_stores():
+        set_chat_model_factory(fake_model_factory(
+            latency_s=latency,
+            input_s_per_1k=input_s_per_1k,
+            context_window=context_window,
+        ))
+        try:
+            for length in minutes:
+                transcript = synthetic_transcript(length, seed=length)
+                start = time.perf_counter()
+                tokens = count_tokens(transcript)
+                count_ms = (time.perf_counter() - start) * 1000
+                results[f"{length}min"] = {
+                    "transcript": {"bytes": len(transcript.encode()), "tokens": tokens, "count_tokens_ms": round(count_ms, 2)},
+                    "single": await run_case(transcript, chunking=False),
+                    "chunked": await run_case(transcript, chunking=True),
+                }
+        finally:
+            set_chat_model_factory(None)
+
+    return {
+        "config": {
+            "latency_s": latency,
+            "input_s_per_1k": input_s_per_1k,
+            "context_window": context_window,
+            "chunk_threshold_tokens": int(os.getenv("CHUNK_THRESHOLD_TOKENS", "12000")),
+            "chunk_tokens": int(os.getenv("CHUNK_TOKENS", "4000")),
+            "chunk_concurrency": int(os.getenv("CHUNK_CONCURRENCY", "4")),
+        },
+        "results": results,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Long-transcript chunking benchmark")
+    parser.add_argument("--minutes", type=int, nargs="+", default=[60, 120, 180], help="transcript lengths")
+    parser.add_argument("--latency", type=float, default=1.5, help="fixed seconds per model call (output)")
+    parser.add_argument("--input-s-per-1k", type=float, default=0.1, help="prefill seconds per 1k input tokens")
+    parser.add_argument("--context-window", type=int, help="fail prompts above this many tokens")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.minutes, args.latency, args.input_s_per_1k, args.context_window))
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""
+Cold start
+===========
+
+What a freshly scheduled container pays before and during its first
+requests. Every run starts a new interpreter under `python -X importtime`
+and measures:
+
+- import_app_ms: `import app` (FastAPI, LangGraph, the orchestrator)
+- startup_ms: the lifespan hook until uvicorn accepts traffic
+- warmup_ms: background warmup until /ready passes (core/warmup.py)
+- ready_ms: import + startup + warmup
+- first_model_ms: constructing the real OpenAI and Anthropic clients
+- first/second_execute_ms: POST /execute (fake model) on a cold and a warm worker
+- first/second_workflow_ms: a full orchestrator workflow, cold and warm
+
+plus an import audit: self time summed per top-level package and the
+slowest modules by cumulative time, parsed from the importtime output.
+
+    python -m benchmarks.bench_cold_start --runs 5
+    python -m benchmarks.bench_cold_start --runs 5 --max-ready-ms 4000 --max-first-execute-ms 100
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from .harness import compare, load_result, print_comparison, save_result
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PHASES = [
+    "import_app_ms",
+    "startup_ms",
+    "warmup_ms",
+    "ready_ms",
+    "first_model_ms",
+    "first_execute_ms",
+    "second_execute_ms",
+    "first_workflow_ms",
+    "second_workflow_ms",
+]
+
+EXECUTE_BODY = {
+    "agent_id": "agent_cold",
+    "workspace_id": "ws_cold",
+    "user_id": "user_cold",
+    "agent_type": "scope",
+    "inputs": {"subject": "Hello", "email_content": "Can we meet next week?"},
+}
+
+
+# ============================================================================
+# PROBE (runs inside the fresh interpreter)
+# ============================================================================
+
+def _ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+async def _probe_requests(service) -> dict:
+    import httpx
+
+    from core import orchestrator
+    from core.llm import get_chat_model, set_chat_model_factory
+
+    from .fake_llm import fake_model_factory
+    from .stores import temporary_stores
+
+    phases = {}
+    async with temporary_stores():
+        start = time.perf_counter()
+        async with service.app.router.lifespan_context(service.app):
+            phases["startup_ms"] = _ms(start)
+
+            start = time.perf_counter()
+            assert await service.app.state.warmup.wait(), service.app.state.warmup.report()
+            phases["warmup_ms"] = _ms(start)
+
+            start = time.perf_counter()
+            get_chat_model("openai", "gpt-4o-mini")
+            get_chat_model("anthropic", "claude-3-5-sonnet-20241022")
+            phases["first_model_ms"] = _ms(start)
+
+            set_chat_model_factory(fake_model_factory())
+            transport = httpx.ASGITransport(app=service.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://probe") as client:
+                for phase in ("first_execute_ms", "second_execute_ms"):
+                    start = time.perf_counter()
+                    response = await client.post("/execute", json=EXECUTE_BODY)
+                    phases[phase] = _ms(start)
+                    assert response.status_code == 200, response.text
+
+            with open(os.devnull, "w") as devnull:
+                for index, phase in enumerate(("first_workflow_ms", "second_workflow_ms")):
+                    sys.stdout, stdout = devnull, sys.stdout
+                    try:
+                        start = time.perf_counter()
+                        result = await orchestrator.execute_workflow(
+                            "ws_cold", "user_cold", "Qualify John Doe from ACME Corp", workflow_id=f"wf_cold_{index}",
+                        )
+                        phases[phase] = _ms(start)
+                    finally:
+                        sys.stdout = stdout
+                    assert not result.get("error"), result.get("error")
+            set_chat_model_factory(None)
+    return phases
+
+
+def probe() -> None:
+    """Measure one cold start in this (fresh) process; prints JSON on stdout"""
+    start = time.perf_counter()
+    import app as service
+    import_app_ms = _ms(start)
+
+    phases = {"import_app_ms": import_app_ms, **asyncio.run(_probe_requests(service))}
+    phases["ready_ms"] = round(phases["import_app_ms"] + phases["startup_ms"] + phases["warmup_ms"], 2)
+    print(json.dumps(phases))
+
+
+# ============================================================================
+# IMPORT AUDIT
+# ============================================================================
+
+def parse_importtime(output: str) -> list[dict]:
+    """Rows of `python -X importtime` output: module, self_ms, cumulative_ms, depth"""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        module = name.rstrip()
+        depth = (len(module) - len(module.lstrip())) // 2
+        rows.append({
+            "module": module.strip(),
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+            "depth": depth,
+        })
+    return rows
+
+
+def import_audit(rows: list[dict], top: int = 15) -> dict:
+    packages = defaultdict(float)
+    for row in rows:
+        packages[row["module"].split(".")[0]] += row["self_ms"]
+    slowest = sorted(rows, key=lambda row: row["cumulative_ms"], reverse=True)[:top]
+    return {
+        "total_ms": round(sum(row["self_ms"] for row in rows), 1),
+        "modules": len(rows),
+        "packages": {
+            name: round(ms, 1)
+            for name, ms in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        },
+        "slowest": {row["module"]: round(row["cumulative_ms"], 1) for row in slowest},
+    }
+
+
+# ============================================================================
+# DRIVER
+# ============================================================================
+
+def run_once() -> tuple[dict, list[dict]]:
+    env = {
+        **os.environ,
+        "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "sk-cold-start"),
+        "ANTHROPIC_API_KEY": os.getenv("ANTHROPIC_API_KEY", "sk-ant-cold-start"),
+    }
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "benchmarks.bench_cold_start", "--probe"],
+        cwd=SERVICE_DIR, env=env, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Cold start probe failed:\n{completed.stderr[-4000:]}")
+    return json.loads(completed.stdout.strip().splitlines()[-1]), parse_importtime(completed.stderr)
+
+
+def run(runs: int = 5, top: int = 15) -> dict:
+    samples = defaultdict(list)
+    audit_rows = []
+    for _ in range(runs):
+        phases, audit_rows = run_once()
+        for phase, value in phases.items():
+            samples[phase].append(value)
+
+    return {
+        "config": {"runs": runs, "python": sys.version.split()[0]},
+        "phases": {phase: round(statistics.median(samples[phase]), 1) for phase in PHASES},
+        "imports": import_audit(audit_rows, top),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Cold start and import audit")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="packages/modules listed in the import audit")
+    parser.add_argument("--max-ready-ms", type=float, help="fail if import + startup + warmup exceeds this (median)")
+    parser.add_argument("--max-first-execute-ms", type=float, help="fail if the first /execute exceeds this (median)")
+    parser.add_argument("--save", action="store_true", help="store the result under benchmarks/results/")
+    parser.add_argument("--compare", help="git revision or result file to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    parser.add_argument("--probe", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.probe:
+        probe()
+        return 0
+
+    result = run(args.runs, args.top)
+    print(json.dumps(result, indent=2))
+
+    if args.save:
+        print(f"Saved to {save_result('cold_start', result)}", file=sys.stderr)
+
+    failed = False
+    if args.compare:
+        rows = compare(load_result(args.compare, "cold_start"), result, args.threshold)
+        rows = [row for row in rows if row["metric"].startswith("phases.")]
+        print_comparison(rows)
+        failed = any(row["regression"] for row in rows)
+
+    targets = {"ready_ms": args.max_ready_ms, "first_execute_ms": args.max_first_execute_ms}
+    for phase, limit in targets.items():
+        if limit is not None and result["phases"][phase] > limit:
+            print(f"FAIL: {phase} {result['phases'][phase]}ms > target {limit}ms", file=sys.stderr)
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Campaign email composition
+===========================
+
+Composes one email per recipient for a synthetic campaign through /execute's
+`email` agent code path, three ways:
+
+    per_recipient   one /execute email call per recipient (the path without
+                    `recipients`), --concurrency calls at a time
+    campaign_cold   one /execute call with `recipients`: template generated,
+                    filled locally, high-value recipients personalized
+    campaign_warm   the same send again, template from the cache
+
+and reports elapsed_s, llm_calls and tokens_used for each.
+
+    python -m benchmarks.bench_email_campaign
+    python -m benchmarks.bench_email_campaign --recipients 2000 --high-value-rate 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+import app as app_module
+from core.llm import set_chat_model_factory
+
+from .fake_llm import fake_model_factory
+from .stores import temporary_stores
+
+FIRST_NAMES = ["Jane", "Bob", "Priya", "Tom", "Dana", "Alex", "Maria", "Wei", "Omar", "Sara"]
+BRIEF = "Invite operations leaders to a 20-minute demo of automated lead qualification"
+
+
+def synthetic_recipients(count: int, high_value_rate: float, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "name": f"{rng.choice(FIRST_NAMES)} Smith",
+            "email": f"contact{i}@company{i % 300}.com",
+            "company": f"Company {i % 300}",
+            "title": "Head of Operations",
+            "value": 50000 if rng.random() < high_value_rate else 2000,
+        }
+        for i in range(count)
+    ]
+
+
+async def execute(inputs: dict) -> dict:
+    request = app_module.ExecuteAgentRequest(
+        agent_id="agent_campaign", workspace_id="ws_bench", user_id="user_bench", agent_type="email", inputs=inputs
+    )
+    call, prompt_info = await app_module.prepare_execution(request)
+    response = (await app_module.run_agent(request, call, prompt_info, time.time())).model_dump()
+    if not response["success"]:
+        raise RuntimeError(response["error"])
+    return response["metrics"]
+
+
+async def per_recipient(recipients: list[dict], concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(recipient: dict) -> dict:
+        async with semaphore:
+            return await execute({"context": f"{BRIEF}. Recipient: {json.dumps(recipient)}"})
+
+    start = time.perf_counter()
+    metrics = await asyncio.gather(*(one(r) for r in recipients))
+    return {
+        "elapsed_s": round(time.perf_counter() - start, 2),
+        "llm_calls": sum(m["llm_calls"] for m in metrics),
+        "tokens_used": sum(m["tokens_used"] for m in metrics),
+    }
+
+
+async def campaign(recipients: list[dict]) -> dict:
+    start = time.perf_counter()
+    metrics = await execute({"campaign": "demo_invite", "segment": "ops", "brief": BRIEF, "sender_name": "Alex", "recipients": recipients})
+    return {
+        "elapsed_s": round(time.perf_counter() - start, 2),
+        "llm_calls": metrics["llm_calls"],
+        "tokens_used": metrics["tokens_used"],
+        "template_cached": metrics["template_cached"],
+    }
+
+
+async def run(count: int, high_value_rate: float, latency_s: float, concurrency: int) -> dict:
+    recipients = synthetic_recipients(count, high_value_rate)
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    async with temporary_stores():
+        set_chat_model_factory(fake_model_factory(latency_s=latency_s))
+        try:
+            results = {
+                "per_recipient": await per_recipient(recipients, concurrency),
+                "campaign_cold": await campaign(recipients),
+                "campaign_warm": await campaign(recipients),
+            }
+        finally:
+            set_chat_model_factory(None)
+    return {
+        "recipients": count,
+        "high_value": sum(r["value"] >= 10000 for r in recipients),
+        "latency_s": latency_s,
+        "results": results,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Campaign email composition benchmark")
+    parser.add_argument("--recipients", type=int, default=500)
+    parser.add_argument("--high-value-rate", type=float, default=0.02)
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds per model call")
+    parser.add_argument("--concurrency", type=int, default=8, help="per_recipient calls in flight")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.recipients, args.high_value_rate, args.latency, args.concurrency)), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
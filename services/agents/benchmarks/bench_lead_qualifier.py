@@ -0,0 +1,130 @@
+"""
+Lead qualification pre-filter
+==============================
+
+Qualifies a synthetic batch of leads (specialists/lead_qualifier.py) against
+the fake provider twice:
+
+    llm_only    every lead goes to the model (thresholds nothing passes)
+    prefilter   the vectorized rule score decides clear leads; only the
+                ambiguous ones go to the model
+
+and reports per mode: elapsed_s, llm_calls, sent_to_llm, the fraction of
+model calls avoided and cost. `scoring` times the vectorized scoring pass on
+its own over the batch.
+
+The synthetic batch is ~45% clearly strong or weak leads with full data,
+~35% borderline and ~20% with too little data to judge.
+
+    python -m benchmarks.bench_lead_qualifier
+    python -m benchmarks.bench_lead_qualifier --leads 20000 --latency 0.5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+from core.llm import set_chat_model_factory
+from specialists.base import SpecialistContext
+from specialists.lead_qualifier import LeadQualifier, score_leads
+
+from .fake_llm import fake_model_factory
+from .stores import temporary_stores
+
+TITLES = {
+    "strong": ["CEO", "Founder", "VP of Sales", "Chief Revenue Officer", "Head of Growth"],
+    "weak": ["Student", "Intern", "Freelancer", "Assistant"],
+    "borderline": ["Marketing Manager", "Sales Lead", "Director of Ops", "Account Executive"],
+}
+
+
+def synthetic_leads(count: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    leads = []
+    for i in range(count):
+        kind = rng.choices(["strong", "weak", "borderline", "sparse"], weights=[25, 20, 35, 20])[0]
+        if kind == "sparse":
+            leads.append({"id": i, "name": f"Lead {i}", "company": f"Company {i % 500}"})
+            continue
+        strong = kind == "strong"
+        lead = {
+            "id": i,
+            "title": rng.choice(TITLES[kind]),
+            "email": f"lead{i}@{'gmail.com' if kind == 'weak' else f'company{i % 500}.com'}",
+            "employees": rng.choice([2000, 8000]) if strong else rng.choice([5, 30, 150, 400]),
+        }
+        if kind != "weak":
+            lead["budget"] = f"${rng.choice([200, 500]) if strong else rng.choice([5, 20, 50])}k"
+            lead["engagement"] = rng.randint(6, 15) if strong else rng.randint(0, 5)
+        if strong:
+            lead["phone"] = "555-0100"
+        leads.append(lead)
+    return leads
+
+
+async def qualify(leads: list[dict], thresholds: dict | None) -> dict:
+    if thresholds:
+        os.environ["LEAD_THRESHOLDS"] = json.dumps({"bench": thresholds})
+    else:
+        os.environ.pop("LEAD_THRESHOLDS", None)
+    context = SpecialistContext(
+        workspace_id="bench", workflow_id="bench", task_type="lead_qualification", message="Qualify", params={"leads": leads}
+    )
+    start = time.perf_counter()
+    summary = (await LeadQualifier().run(context))["summary"]
+    elapsed = time.perf_counter() - start
+    calls = summary["llm_calls"] + summary["llm_calls_avoided"]
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "llm_calls": summary["llm_calls"],
+        "sent_to_llm": summary["sent_to_llm"],
+        "llm_calls_avoided_fraction": round(summary["llm_calls_avoided"] / calls, 3) if calls else 0.0,
+        "qualified": summary["qualified"],
+        "cost_usd": summary["cost_usd"],
+    }
+
+
+async def run(count: int, latency_s: float) -> dict:
+    leads = synthetic_leads(count)
+    start = time.perf_counter()
+    score_leads(leads)
+    scoring_ms = (time.perf_counter() - start) * 1000
+
+    set_chat_model_factory(fake_model_factory(latency_s=latency_s))
+    previous = os.environ.get("LEAD_THRESHOLDS")
+    try:
+        async with temporary_stores():
+            # min_signals above the signal count: the rules never decide
+            llm_only = await qualify(leads, {"qualify_at": 1e9, "reject_below": -1, "min_signals": 99})
+            prefiltered = await qualify(leads, None)
+    finally:
+        set_chat_model_factory(None)
+        if previous is None:
+            os.environ.pop("LEAD_THRESHOLDS", None)
+        else:
+            os.environ["LEAD_THRESHOLDS"] = previous
+    return {
+        "leads": count,
+        "latency_s": latency_s,
+        "scoring": {"ms": round(scoring_ms, 1), "leads_per_s": round(count / (scoring_ms / 1000))},
+        "llm_only": llm_only,
+        "prefilter": prefiltered,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Lead qualification pre-filter benchmark")
+    parser.add_argument("--leads", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per model call")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.leads, args.latency)), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Worker memory under concurrent workflows
+=========================================
+
+Runs N workflows concurrently in one process against the fake chat model
+with padded (large) responses, and reports worker RSS before, at peak and
+after. Run once with the state bounds from core/state_bounds.py and once with
+`--unbounded` (every bound set to 0) to compare.
+
+RSS is read from /proc/self/status (Linux); elsewhere only the peak from
+getrusage() is reported.
+
+Usage:
+    python -m benchmarks.bench_memory -n 1000 --padding-kb 32
+    python -m benchmarks.bench_memory -n 1000 --padding-kb 32 --unbounded
+"""
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import json
+import os
+import time
+
+from core import orchestrator, state_bounds
+from core.llm import set_chat_model_factory
+
+from .fake_llm import fake_model_factory
+from .harness import peak_rss_mb, rss_mb
+from .stores import temporary_stores
+
+
+async def sample_rss(samples: list[float], interval_s: float) -> None:
+    while True:
+        value = rss_mb()
+        if value is not None:
+            samples.append(value)
+        await asyncio.sleep(interval_s)
+
+
+async def run(count: int, padding_kb: int, latency_s: float, unbounded: bool) -> dict:
+    if unbounded:
+        state_bounds.OUTCOME_INLINE_BYTES = 0
+        state_bounds.MESSAGE_INLINE_CHARS = 0
+        state_bounds.MAX_MESSAGES = 0
+        state_bounds.MAX_OUTCOMES = 0
+
+    async with temporary_stores():
+        set_chat_model_factory(fake_model_factory(latency_s=latency_s, padding_bytes=padding_kb * 1024))
+        # Compile the graph and open the stores before taking the baseline
+        await orchestrator.get_workflow()
+        gc.collect()
+        baseline = rss_mb()
+
+        samples: list[float] = []
+        sampler = asyncio.create_task(sample_rss(samples, 0.05))
+        start = time.perf_counter()
+        try:
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                results = await asyncio.gather(*(
+                    orchestrator.execute_workflow(
+                        workspace_id="ws_bench",
+                        user_id="user_bench",
+                        user_message="Qualify every lead from the ACME import",
+                        workflow_id=f"wf_mem_{i}",
+                    )
+                    for i in range(count)
+                ))
+        finally:
+            wall_s = time.perf_counter() - start
+            sampler.cancel()
+            set_chat_model_factory(None)
+
+        failures = sum(1 for result in results if result.get("error"))
+        # Final states are kept alive on purpose: API handlers hold them too
+        state_bytes = sum(len(json.dumps(result, default=str)) for result in results)
+        del results
+        gc.collect()
+        after = rss_mb()
+
+    return {
+        "benchmark": "memory",
+        "mode": "unbounded" if unbounded else "bounded",
+        "workflows": count,
+        "padding_kb": padding_kb,
+        "wall_s": round(wall_s, 2),
+        "failures": failures,
+        "final_state_mb": round(state_bytes / (1024 * 1024), 2),
+        "rss_baseline_mb": baseline and round(baseline, 1),
+        "rss_peak_sampled_mb": round(max(samples), 1) if samples else None,
+        "rss_after_mb": after and round(after, 1),
+        "rss_peak_process_mb": round(peak_rss_mb(), 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Worker RSS under concurrent workflows")
+    parser.add_argument("-n", "--workflows", type=int, default=1000)
+    parser.add_argument("--padding-kb", type=int, default=32, help="filler added to each model response")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake model latency in seconds")
+    parser.add_argument("--unbounded", action="store_true", help="disable every state bound")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.workflows, args.padding_kb, args.latency, args.unbounded)), indent=2))
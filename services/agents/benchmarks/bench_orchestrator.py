@@ -0,0 +1,286 @@
+"""
+Orchestrator overhead
+======================
+
+Runs N complete workflows at a fixed concurrency against the fake chat model
+and reports where the time goes that is *not* the model:
+
+- per node: wall time, simulated model time, and the difference (framework
+  overhead: prompt building, parsing, quota checks, state updates)
+- checkpoint writes/reads (AsyncSqliteSaver.aput / aput_writes / aget_tuple)
+- per workflow: end-to-end latency and overhead (latency minus model time)
+- throughput and worker RSS
+
+Model latency comes from a fake_llm.latency_sampler() spec, so the same run
+can measure pure overhead (`--latency 0`) or realistic overlap
+(`--latency lognormal:0.8,0.4`). All stores live in a temp directory.
+
+`--max-block-ms X` runs the event-loop watchdog (core/profiling.py) during
+the measured phase and exits 1 if any callback held the loop longer than X
+ms, printing the offending stacks:
+
+    python -m benchmarks.bench_orchestrator -n 200 -c 16 --max-block-ms 50
+
+`--provider-concurrency N` caps the fake provider at N calls in flight (a
+rate-limited provider); `--critic-batching` turns on critic micro-batching
+(core/batching.py) and adds its batch-size and wait histograms:
+
+    python -m benchmarks.bench_orchestrator -n 200 -c 32 --latency 0.2 --provider-concurrency 8
+    python -m benchmarks.bench_orchestrator -n 200 -c 32 --latency 0.2 --provider-concurrency 8 --critic-batching
+
+Results can be saved per commit and compared against an earlier run:
+
+    python -m benchmarks.bench_orchestrator -n 500 -c 32 --save
+    python -m benchmarks.bench_orchestrator -n 500 -c 32 --compare <sha or path>
+"""
+
+import argparse
+import asyncio
+import contextlib
+import functools
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from core import batching, orchestrator
+from core.llm import set_chat_model_factory
+from core.profiling import LoopLagMonitor
+
+from .fake_llm import fake_model_factory, model_time
+from .harness import compare, latency_stats, load_result, peak_rss_mb, print_comparison, rss_mb, save_result
+from .stores import temporary_stores
+
+NODES = [
+    "paa_intake_node",
+    "human_approval_node",
+    "planner_node",
+    "router_node",
+    "specialist_node",
+    "critic_node",
+    "paa_summarize_node",
+]
+
+CHECKPOINT_METHODS = ["aput", "aput_writes", "aget_tuple"]
+
+
+class Timings:
+    """Raw samples (ms) collected during a run"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.node_wall = defaultdict(list)
+        self.node_model = defaultdict(list)
+        self.checkpoint = defaultdict(list)
+
+    def node_report(self) -> dict:
+        report = {}
+        for name, wall in self.node_wall.items():
+            model = self.node_model[name]
+            report[name] = {
+                "wall": latency_stats(wall),
+                "model": latency_stats(model),
+                "overhead": latency_stats([w - m for w, m in zip(wall, model)]),
+            }
+        return report
+
+    def checkpoint_report(self) -> dict:
+        return {name: latency_stats(samples) for name, samples in self.checkpoint.items()}
+
+
+@contextlib.contextmanager
+def instrument(timings: Timings):
+    """Time every node and checkpoint call; restores the originals on exit"""
+    originals = {name: getattr(orchestrator, name) for name in NODES}
+    saver_originals = {name: getattr(AsyncSqliteSaver, name) for name in CHECKPOINT_METHODS}
+
+    def timed_node(name, node):
+        @functools.wraps(node)
+        async def run(state):
+            outer = model_time.get()
+            token = model_time.set([0.0])
+            start = time.perf_counter()
+            try:
+                return await node(state)
+            finally:
+                wall_ms = (time.perf_counter() - start) * 1000
+                model_s = model_time.get()[0]
+                model_time.reset(token)
+                if outer is not None:
+                    outer[0] += model_s
+                timings.node_wall[name].append(wall_ms)
+                timings.node_model[name].append(model_s * 1000)
+        return run
+
+    def timed_method(name, method):
+        @functools.wraps(method)
+        async def run(self, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await method(self, *args, **kwargs)
+            finally:
+                timings.checkpoint[name].append((time.perf_counter() - start) * 1000)
+        return run
+
+    for name, node in originals.items():
+        setattr(orchestrator, name, timed_node(name.removesuffix("_node"), node))
+    for name, method in saver_originals.items():
+        setattr(AsyncSqliteSaver, name, timed_method(name, method))
+    try:
+        yield timings
+    finally:
+        for name, node in originals.items():
+            setattr(orchestrator, name, node)
+        for name, method in saver_originals.items():
+            setattr(AsyncSqliteSaver, name, method)
+
+
+async def run_workflow(workflow_id: str, semaphore: asyncio.Semaphore) -> tuple[float, float, bool]:
+    """Returns (latency_ms, model_ms, ok)"""
+    async with semaphore:
+        model_time.set([0.0])
+        start = time.perf_counter()
+        result = await orchestrator.execute_workflow(
+            workspace_id="ws_bench",
+            user_id="user_bench",
+            user_message="Qualify John Doe from ACME Corp and draft a follow-up",
+            workflow_id=workflow_id,
+        )
+        latency_ms = (time.perf_counter() - start) * 1000
+        return latency_ms, model_time.get()[0] * 1000, not result.get("error")
+
+
+async def sample_rss(samples: list[float], interval_s: float = 0.05) -> None:
+    while True:
+        value = rss_mb()
+        if value is not None:
+            samples.append(value)
+        await asyncio.sleep(interval_s)
+
+
+async def run(
+    count: int,
+    concurrency: int,
+    latency: str = "0",
+    warmup: int = 5,
+    seed: int | None = 42,
+    max_block_ms: float | None = None,
+    provider_concurrency: int | None = None,
+    critic_batching: bool = False,
+) -> dict:
+    # Heartbeat well below the budget so stalls are caught while they happen
+    loop_monitor = LoopLagMonitor(
+        interval_s=min(0.01, max_block_ms / 4000) if max_block_ms else 0.01,
+        block_threshold_s=max_block_ms / 1000 if max_block_ms else None,
+    )
+    previous_batching = os.environ.get("CRITIC_BATCHING")
+    os.environ["CRITIC_BATCHING"] = "true" if critic_batching else "false"
+    batching._critic_batcher = None
+    async with temporary_stores():
+        set_chat_model_factory(fake_model_factory(latency=latency, seed=seed, max_concurrency=provider_concurrency))
+        timings = Timings()
+        try:
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), instrument(timings):
+                # Warm up: compile the graph, open stores, fill caches
+                semaphore = asyncio.Semaphore(concurrency)
+                await asyncio.gather(*(run_workflow(f"wf_warmup_{i}", semaphore) for i in range(warmup)))
+                timings.reset()
+
+                baseline_rss = rss_mb()
+                samples: list[float] = []
+                sampler = asyncio.create_task(sample_rss(samples))
+                loop_monitor.start()
+                start = time.perf_counter()
+                results = await asyncio.gather(*(run_workflow(f"wf_bench_{i}", semaphore) for i in range(count)))
+                wall_s = time.perf_counter() - start
+                await loop_monitor.stop()
+                sampler.cancel()
+        finally:
+            set_chat_model_factory(None)
+            if previous_batching is None:
+                os.environ.pop("CRITIC_BATCHING", None)
+            else:
+                os.environ["CRITIC_BATCHING"] = previous_batching
+    critic_batches = batching._critic_batcher.summary() if batching._critic_batcher is not None else None
+    batching._critic_batcher = None
+
+    latencies = [latency_ms for latency_ms, _, _ in results]
+    overheads = [latency_ms - model_ms for latency_ms, model_ms, _ in results]
+
+    return {
+        "config": {
+            "workflows": count,
+            "concurrency": concurrency,
+            "latency": latency,
+            "serializer": orchestrator.CHECKPOINT_SERIALIZER,
+            "provider_concurrency": provider_concurrency,
+            "critic_batching": critic_batching,
+        },
+        "throughput": {
+            "wall_s": round(wall_s, 3),
+            "workflows_per_s": round(count / wall_s, 2),
+            "failures": sum(1 for _, _, ok in results if not ok),
+        },
+        "workflow_latency": latency_stats(latencies),
+        "workflow_overhead": latency_stats(overheads),
+        "nodes": timings.node_report(),
+        "checkpoint": timings.checkpoint_report(),
+        "event_loop": loop_monitor.summary(),
+        "critic_batching": critic_batches,
+        "memory": {
+            "rss_baseline_mb": baseline_rss and round(baseline_rss, 1),
+            "rss_peak_sampled_mb": round(max(samples), 1) if samples else None,
+            "rss_peak_process_mb": round(peak_rss_mb(), 1),
+        },
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Orchestrator overhead benchmark")
+    parser.add_argument("-n", "--workflows", type=int, default=200)
+    parser.add_argument("-c", "--concurrency", type=int, default=16)
+    parser.add_argument("--latency", default="0", help="fake model latency spec, e.g. 0.05 or lognormal:0.8,0.4")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--save", action="store_true", help="store the result under benchmarks/results/")
+    parser.add_argument("--compare", help="git revision or result file to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    parser.add_argument("--max-block-ms", type=float, help="fail if any callback blocks the event loop longer")
+    parser.add_argument("--provider-concurrency", type=int, help="fake provider calls in flight (rate limit)")
+    parser.add_argument("--critic-batching", action="store_true", help="micro-batch critic calls")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.workflows, args.concurrency, args.latency, args.warmup,
+                             max_block_ms=args.max_block_ms,
+                             provider_concurrency=args.provider_concurrency,
+                             critic_batching=args.critic_batching))
+    print(json.dumps(result, indent=2))
+
+    if args.max_block_ms and result["event_loop"]["stall_count"]:
+        print(f"FAIL: event loop blocked longer than {args.max_block_ms}ms "
+              f"{result['event_loop']['stall_count']} time(s)", file=sys.stderr)
+        for stall in result["event_loop"]["stalls"]:
+            print(f"\n--- blocked >{stall['blocked_ms']}ms (lag {stall['lag_ms']}ms)", file=sys.stderr)
+            print("\n".join(stall["stack"]), file=sys.stderr)
+        return 1
+
+    if args.save:
+        print(f"Saved to {save_result('orchestrator', result)}", file=sys.stderr)
+
+    if args.compare:
+        baseline = load_result(args.compare, "orchestrator")
+        if baseline["result"]["config"] != result["config"]:
+            print(f"Warning: baseline config differs: {baseline['result']['config']}", file=sys.stderr)
+        rows = compare(baseline, result, args.threshold)
+        print_comparison(rows)
+        if any(row["regression"] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
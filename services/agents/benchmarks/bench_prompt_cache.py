@@ -0,0 +1,159 @@
+"""
+Prompt caching
+===============
+
+Runs the same workflow N times in a row, once against a fake provider
+without prompt caching and once with it (fake_llm `prompt_cache=True`), and
+reports for each mode:
+
+- first_token: latency of each workflow's first model call (PAA intake),
+  i.e. how long until the workflow produces any model output
+- calls: model call latency per node
+- cost: mean usage-priced cost per workflow (core.llm.estimate_cost), for
+  the first (cold cache) workflow and the warm ones
+- cached_share: cached / total input tokens
+
+The simulated provider only caches what the orchestrator marks as a stable
+prefix (Anthropic needs `cache_control`), so a regression in how nodes build
+their messages shows up as a cached_share of 0. `prefix_tokens` lists the
+approximate size of each node's system prompt: real providers ignore
+prefixes below 1024 tokens, which `--min-prefix-tokens 1024` reproduces.
+
+    python -m benchmarks.bench_prompt_cache -n 20 --latency 0.2
+    python -m benchmarks.bench_prompt_cache -n 20 --latency 0.2 --min-prefix-tokens 1024
+"""
+
+import argparse
+import asyncio
+import contextlib
+import functools
+import json
+import os
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+from core import orchestrator
+from core.llm import set_chat_model_factory
+
+from .fake_llm import fake_model_factory
+from .harness import compare, latency_stats, load_result, print_comparison, save_result
+from .stores import temporary_stores
+
+
+@contextlib.contextmanager
+def time_model_calls(samples: dict[str, list[float]]):
+    """Record the latency of every node model call, keyed by node"""
+    original = orchestrator._invoke_model
+
+    @functools.wraps(original)
+    async def timed(state, node, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await original(state, node, *args, **kwargs)
+        finally:
+            samples[node].append((time.perf_counter() - start) * 1000)
+
+    orchestrator._invoke_model = timed
+    try:
+        yield samples
+    finally:
+        orchestrator._invoke_model = original
+
+
+async def run_mode(count: int, latency: str, prompt_cache: bool, prompt_tokens: int, min_prefix_tokens: int) -> dict:
+    samples: dict[str, list[float]] = defaultdict(list)
+    costs, input_tokens, cached = [], 0, 0
+    async with temporary_stores():
+        set_chat_model_factory(fake_model_factory(
+            latency=latency,
+            prompt_tokens=prompt_tokens,
+            prompt_cache=prompt_cache,
+            cache_min_tokens=min_prefix_tokens,
+        ))
+        try:
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), time_model_calls(samples):
+                for index in range(count):
+                    result = await orchestrator.execute_workflow(
+                        workspace_id="ws_bench",
+                        user_id="user_bench",
+                        user_message="Qualify John Doe from ACME Corp and draft a follow-up",
+                        workflow_id=f"wf_cache_{index}",
+                    )
+                    if result.get("error"):
+                        raise RuntimeError(result["error"])
+                    metrics = result["metrics"]
+                    costs.append(metrics["usage_cost"])
+                    input_tokens += metrics["input_tokens"]
+                    cached += metrics["cached_tokens"]
+        finally:
+            set_chat_model_factory(None)
+
+    return {
+        "first_token": latency_stats(samples["paa_intake"]),
+        "calls": {node: latency_stats(values) for node, values in samples.items()},
+        "cost": {
+            "first_workflow_usd": costs[0],
+            "warm_workflow_usd": round(statistics.mean(costs[1:] or costs), 6),
+        },
+        "cached_share": round(cached / input_tokens, 3) if input_tokens else 0.0,
+    }
+
+
+def _saving_pct(before: float, after: float) -> float:
+    return round((before - after) / before * 100, 1) if before else 0.0
+
+
+async def run(count: int = 20, latency: str = "0.2", prompt_tokens: int = 400, min_prefix_tokens: int = 0) -> dict:
+    uncached = await run_mode(count, latency, False, prompt_tokens, min_prefix_tokens)
+    cached = await run_mode(count, latency, True, prompt_tokens, min_prefix_tokens)
+    return {
+        "config": {
+            "workflows": count,
+            "latency": latency,
+            "prompt_tokens": prompt_tokens,
+            "min_prefix_tokens": min_prefix_tokens,
+        },
+        "prefix_tokens": {node: len(prompt) // 4 for node, prompt in orchestrator.NODE_PROMPTS.items()},
+        "uncached": uncached,
+        "cached": cached,
+        "saving_pct": {
+            "first_token_p50": _saving_pct(uncached["first_token"]["p50_ms"], cached["first_token"]["p50_ms"]),
+            "warm_workflow_cost": _saving_pct(
+                uncached["cost"]["warm_workflow_usd"], cached["cost"]["warm_workflow_usd"],
+            ),
+        },
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Provider prompt caching benchmark")
+    parser.add_argument("-n", "--workflows", type=int, default=20)
+    parser.add_argument("--latency", default="0.2", help="fake model latency spec for an uncached call")
+    parser.add_argument("--prompt-tokens", type=int, default=400, help="input tokens reported per call")
+    parser.add_argument("--min-prefix-tokens", type=int, default=0,
+                        help="shortest prefix the simulated provider caches (real providers: 1024)")
+    parser.add_argument("--save", action="store_true", help="store the result under benchmarks/results/")
+    parser.add_argument("--compare", help="git revision or result file to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.workflows, args.latency, args.prompt_tokens, args.min_prefix_tokens))
+    print(json.dumps(result, indent=2))
+
+    if args.save:
+        print(f"Saved to {save_result('prompt_cache', result)}", file=sys.stderr)
+
+    if args.compare:
+        rows = compare(load_result(args.compare, "prompt_cache"), result, args.threshold)
+        # Latency and cost with caching; lower is better for both
+        rows = [row for row in rows if row["metric"].startswith(("cached.first_token.", "cached.cost."))]
+        print_comparison(rows)
+        if any(row["regression"] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""
+Semantic cache
+===============
+
+Replays synthetic intake-style requests, paraphrased several ways, through
+core.semantic_cache at a range of thresholds and reports, per threshold:
+
+    hit_rate      repeats (paraphrases of an already-seen request) answered
+                  from that request's cached answer
+    wrong_hits    hits whose cached request was about someone else. With
+                  --collide several people share a first name and company,
+                  and "qualify John from ACME" is ambiguous
+    lookup_us     mean lookup time (embedding + matrix search)
+
+then runs /execute on the same paraphrases with and without the cache
+(fake model with --latency per call) and reports llm_calls and elapsed_s.
+
+    python -m benchmarks.bench_semantic_cache
+    python -m benchmarks.bench_semantic_cache --subjects 200 --thresholds 0.6,0.7,0.8,0.9
+    python -m benchmarks.bench_semantic_cache --collide
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+import app as app_module
+from core.llm import set_chat_model_factory
+from core.semantic_cache import SemanticCache
+
+from .fake_llm import fake_model_factory
+from .stores import temporary_stores
+
+FIRST_NAMES = [
+    "John", "Jane", "Priya", "Tom", "Dana", "Alex", "Maria", "Wei", "Omar", "Sara",
+    "Lena", "Raj", "Chen", "Ines", "Kofi", "Mila", "Ivan", "Noor", "Paul", "Yuki",
+]
+LAST_NAMES = ["Doe", "Smith", "Patel", "Nguyen", "Garcia", "Kim", "Brown", "Lee"]
+COMPANIES = [
+    "ACME", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Wonka",
+    "Soylent", "Cyberdyne", "Tyrell", "Vandelay", "Massive", "Gringotts", "Oscorp",
+]
+PARAPHRASES = [
+    "qualify {first} from {company}",
+    "please qualify {first} {last} ({company} Corp)",
+    "can you qualify {first} {last} at {company}",
+    "qualify lead {first} {last} from {company}",
+]
+
+
+def synthetic_subjects(count: int, collide: bool = False, seed: int = 0) -> list[dict]:
+    """
+    Distinct people. Unless `collide`, no two share a first name and company,
+    so "qualify John from ACME" names exactly one of them
+    """
+    rng = random.Random(seed)
+    subjects: dict[tuple, tuple] = {}
+    for _ in range(count * 20):
+        first, last, company = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), rng.choice(COMPANIES)
+        subjects.setdefault((first, last, company) if collide else (first, company), (first, last, company))
+    return [{"first": f, "last": l, "company": c} for f, l, c in list(subjects.values())[:count]]
+
+
+def requests_for(subjects: list[dict], seed: int = 0) -> list[tuple[int, str]]:
+    """(subject index, text): every subject's paraphrases, shuffled"""
+    items = [(i, template.format(**subject)) for i, subject in enumerate(subjects) for template in PARAPHRASES]
+    random.Random(seed).shuffle(items)
+    return items
+
+
+def replay(requests: list[tuple[int, str]], threshold: float) -> dict:
+    cache = SemanticCache(thresholds={"intake": threshold}, audit_rate=0)
+    seen: set[int] = set()
+    repeats = correct = wrong = 0
+    elapsed = 0.0
+    for subject, text in requests:
+        start = time.perf_counter()
+        hit = cache.lookup("ws_bench", "intake", "intake", text)
+        elapsed += time.perf_counter() - start
+        repeats += subject in seen
+        if hit is None:
+            cache.put("ws_bench", "intake", text, {"subject": subject})
+        elif hit.value["subject"] == subject:
+            correct += 1
+        else:
+            wrong += 1
+        seen.add(subject)
+    return {
+        "hit_rate": round(correct / repeats, 3) if repeats else 0.0,
+        "wrong_hits": wrong,
+        "lookup_us": round(elapsed / len(requests) * 1e6, 1),
+    }
+
+
+async def execute_all(requests: list[tuple[int, str]], enabled: bool) -> dict:
+    os.environ["SEMANTIC_CACHE"] = "true" if enabled else "false"
+    calls = 0
+    start = time.perf_counter()
+    for _, text in requests:
+        request = app_module.ExecuteAgentRequest(
+            agent_id="agent_bench", workspace_id="ws_bench", user_id="user_bench",
+            agent_type="scope", inputs={"email_content": text},
+        )
+        call, prompt_info = await app_module.prepare_execution(request)
+        response = await app_module.run_agent(request, call, prompt_info, time.time())
+        calls += response.metrics["llm_calls"]
+    return {"elapsed_s": round(time.perf_counter() - start, 2), "llm_calls": calls}
+
+
+async def run(count: int, collide: bool, thresholds: list[float], latency_s: float) -> dict:
+    subjects = synthetic_subjects(count, collide)
+    requests = requests_for(subjects)
+    replays = {str(threshold): replay(requests, threshold) for threshold in thresholds}
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    previous = os.environ.get("SEMANTIC_CACHE")
+    async with temporary_stores():
+        set_chat_model_factory(fake_model_factory(latency_s=latency_s))
+        try:
+            execute = {
+                "uncached": await execute_all(requests, enabled=False),
+                "semantic_cache": await execute_all(requests, enabled=True),
+            }
+        finally:
+            set_chat_model_factory(None)
+            if previous is None:
+                os.environ.pop("SEMANTIC_CACHE", None)
+            else:
+                os.environ["SEMANTIC_CACHE"] = previous
+    return {"subjects": len(subjects), "collide": collide, "requests": len(requests), "latency_s": latency_s, "replay": replays, "execute": execute}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Semantic cache benchmark")
+    parser.add_argument("--subjects", type=int, default=100, help="distinct people, each asked about 4 ways")
+    parser.add_argument("--collide", action="store_true", help="people may share a first name and company")
+    parser.add_argument("--thresholds", default="0.6,0.7,0.8,0.9")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per /execute model call")
+    args = parser.parse_args()
+
+    thresholds = [float(t) for t in args.thresholds.split(",")]
+    print(json.dumps(asyncio.run(run(args.subjects, args.collide, thresholds, args.latency)), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+Checkpoint serialization cost
+==============================
+
+Encodes and decodes a realistic AgentState (messages, enums, datetimes and N
+specialist outcomes) with each checkpoint serializer and reports the payload
+size plus mean encode/decode time:
+
+- default        LangGraph JsonPlusSerializer
+- compact        CompactSerializer, compression disabled
+- compact+zstd   CompactSerializer, every payload compressed (needs zstandard)
+
+Usage:
+    python -m benchmarks.bench_serialization --outcomes 50 --rounds 500
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from core.orchestrator import ApprovalStatus, TaskType
+from core.serialization import CompactSerializer, zstandard
+
+
+def sample_state(outcome_count: int) -> dict:
+    started = datetime(2025, 1, 1, 12, 0, 0)
+    return {
+        "workspace_id": "ws_bench",
+        "user_id": "user_bench",
+        "workflow_id": "wf_bench",
+        "messages": [
+            HumanMessage(content="Qualify every lead from the ACME import and draft follow-ups"),
+            AIMessage(content='PAA Analysis: {"task_type": "lead_qualification", "complexity": "medium"}'),
+            AIMessage(content="Plan: " + json.dumps([{"id": f"subtask_{i}"} for i in range(5)])),
+        ],
+        "current_step": "critic",
+        "task_type": TaskType.LEAD_QUALIFICATION,
+        "subtasks": [{"id": f"subtask_{i}", "description": "Score lead", "depends_on": []} for i in range(5)],
+        "outcomes": [
+            {
+                "agent_id": f"agent_{i}",
+                "agent_type": "lead_qualifier",
+                "result": {
+                    "score": i % 100,
+                    "reasoning": "Budget confirmed, decision maker engaged, timeline this quarter. " * 4,
+                    "signals": ["budget", "authority", "need", "timeline"],
+                },
+                "timestamp": started + timedelta(seconds=i),
+                "cost": 0.01,
+                "latency_ms": 850,
+            }
+            for i in range(outcome_count)
+        ],
+        "final_summary": None,
+        "approval_status": ApprovalStatus.NOT_REQUIRED,
+        "approval_message": None,
+        "metrics": {"total_cost": 0.5, "total_latency_ms": 42000, "success_count": outcome_count,
+                    "failure_count": 0, "approval_requests": 0},
+        "error": None,
+    }
+
+
+def measure(serde, state: dict, rounds: int) -> dict:
+    typed = serde.dumps_typed(state)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        serde.dumps_typed(state)
+    encode_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        serde.loads_typed(typed)
+    decode_s = time.perf_counter() - start
+
+    return {
+        "type": typed[0],
+        "bytes": len(typed[1]),
+        "encode_us": round(encode_s / rounds * 1e6, 2),
+        "decode_us": round(decode_s / rounds * 1e6, 2),
+    }
+
+
+def run(outcome_count: int, rounds: int) -> dict:
+    enums = [TaskType, ApprovalStatus]
+    serializers = {
+        "default": JsonPlusSerializer(),
+        "compact": CompactSerializer(enums=enums, compress_threshold=None),
+    }
+    if zstandard is not None:
+        serializers["compact+zstd"] = CompactSerializer(enums=enums, compress_threshold=1)
+
+    state = sample_state(outcome_count)
+    return {
+        "outcomes": outcome_count,
+        "rounds": rounds,
+        "results": {name: measure(serde, state, rounds) for name, serde in serializers.items()},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--outcomes", type=int, default=50, help="specialist outcomes in the state")
+    parser.add_argument("--rounds", type=int, default=500, help="encode/decode iterations per serializer")
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.outcomes, args.rounds), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+"""
+Deterministic fake chat model
+==============================
+
+Answers every orchestrator node with a canned response chosen from the
+node's system prompt, so workflows run end-to-end without provider calls.
+Latency is either fixed or drawn from a distribution (see `latency_sampler`).
+
+With `prompt_cache=True` the models also simulate provider prompt caching:
+the first call with a given system prompt writes it to a cache shared by the
+factory's models, later calls report it as `cache_read` input tokens and
+return faster. Anthropic models only cache system prompts marked with
+`cache_control` (as real Anthropic does); OpenAI models cache automatically.
+
+`max_concurrency` simulates a provider rate limit: at most that many calls
+are in flight across the factory's models, the rest queue (and the queueing
+counts as model time).
+
+With `input_s_per_1k` or `context_window` set, input tokens are counted
+from the messages (core.chunking.count_tokens) instead of the fixed
+`prompt_tokens`: every 1k of them adds `input_s_per_1k` seconds (prefill),
+and a prompt over `context_window` fails like a provider's context-length
+error.
+
+Batched domain-enrichment calls (specialists/data_enricher.py) get a made-up
+company for every listed domain except those starting with "unknown";
+batched lead-qualification calls qualify every lead and email
+personalization calls rewrite every draft (unless a canned response matches
+their prompt).
+
+Usage:
+    from core.llm import set_chat_model_factory
+    from benchmarks.fake_llm import fake_model_factory
+
+    set_chat_model_factory(fake_model_factory(requires_approval=True))
+"""
+
+import asyncio
+import json
+import math
+import random
+import re
+import time
+from contextvars import ContextVar
+from typing import Any, Callable
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from core.chunking import count_tokens
+
+
+# Set to a one-element list by a caller that wants simulated model time
+# (seconds) accumulated for the calls made in its context
+model_time: ContextVar[list[float] | None] = ContextVar("fake_model_time", default=None)
+
+
+def latency_sampler(spec: str | float, seed: int | None = None) -> Callable[[], float]:
+    """
+    Latency distribution from a spec, in seconds:
+
+        0.05                     constant
+        uniform:0.02,0.08        uniform between bounds
+        lognormal:0.05,0.5       lognormal with median 0.05 and sigma 0.5
+        exponential:0.05         exponential with mean 0.05
+    """
+    rng = random.Random(seed)
+    if isinstance(spec, (int, float)):
+        value = float(spec)
+        return lambda: value
+
+    kind, _, params = spec.partition(":")
+    if not params:
+        value = float(kind)
+        return lambda: value
+    args = [float(p) for p in params.split(",")]
+    if kind == "uniform":
+        low, high = args
+        return lambda: rng.uniform(low, high)
+    if kind == "lognormal":
+        median, sigma = args
+        mu = math.log(median)
+        return lambda: rng.lognormvariate(mu, sigma)
+    if kind == "exponential":
+        (mean,) = args
+        return lambda: rng.expovariate(1.0 / mean)
+    raise ValueError(f"Unknown latency distribution: {spec!r}")
+
+
+def canned_responses(
+    task_type: str = "lead_qualification",
+    requires_approval: bool = False,
+    padding_bytes: int = 0,
+) -> dict[str, str]:
+    """
+    System-prompt keyword -> response content for each workflow node.
+    `padding_bytes` adds a filler field to every JSON response to simulate
+    large model outputs.
+    """
+    padding = "x" * padding_bytes
+    return {
+        "campaign email template writer": json.dumps({
+            "subject": "A faster pipeline for {{company}}",
+            "body": "Hi {{first_name}},\n\nTeams like {{company}} use GalaxyCo to qualify leads automatically.\n\nBest,\n{{sender_name}}",
+        }),
+        "intake analyzer": json.dumps({
+            "task_type": task_type,
+            "requires_approval": requires_approval,
+            "approval_reason": "Sends external email" if requires_approval else None,
+            "extracted_params": {"lead": "John Doe", "company": "ACME Corp", "context": padding},
+            "priority": "medium",
+        }),
+        "parameter extractor": json.dumps({
+            "extracted_params": {"lead": "John Doe", "company": "ACME Corp"},
+        }),
+        "task planner": json.dumps({
+            "subtasks": [{
+                "id": "subtask_1",
+                "description": "Qualify the lead",
+                "specialist": "lead_qualifier",
+                "depends_on": [],
+            }],
+            "execution_order": ["subtask_1"],
+            "notes": padding,
+        }),
+        "quality critic": json.dumps({
+            "passed": True,
+            "quality_score": 90,
+            "issues": [],
+            "recommendation": "approve",
+            "notes": padding,
+        }),
+        "summarizer": "Qualified John Doe from ACME Corp as a warm lead. Next step: book a demo.",
+    }
+
+
+class PromptCache:
+    """Prefixes the simulated provider has cached, shared by a factory's models"""
+
+    def __init__(self):
+        self.prefixes: set[tuple[str, str]] = set()
+
+
+class ConcurrencyLimit:
+    """Provider-side cap on calls in flight, shared by a factory's models"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._semaphore: asyncio.Semaphore | None = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.limit)
+        return self._semaphore
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model that returns canned responses after a fixed or sampled delay"""
+
+    responses: dict[str, str]
+    default_response: str = "{}"
+    latency_s: float = 0.0
+    latency_fn: Callable[[], float] | None = None
+    prompt_tokens: int = 400
+    completion_tokens: int = 120
+    model_name: str = "fake-model"
+    provider: str = "openai"
+    # Cached prefixes shared by the factory's models; None disables caching
+    prompt_cache: PromptCache | None = None
+    # Fraction of the call latency a fully cached prompt saves
+    cache_speedup: float = 0.8
+    # Providers ignore shorter prefixes (1024 tokens for OpenAI and Sonnet)
+    cache_min_tokens: int = 0
+    concurrency: ConcurrencyLimit | None = None
+    # Prefill time per 1k counted input tokens, and the context limit
+    input_s_per_1k: float = 0.0
+    context_window: int | None = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _pick_response(self, messages: list[BaseMessage]) -> str:
+        system = next((m.content for m in messages if isinstance(m, SystemMessage)), "")
+        system = system if isinstance(system, str) else json.dumps(system)
+        matched = next((r for keyword, r in self.responses.items() if keyword in system), None)
+        response = self.default_response if matched is None else matched
+        if "extracted_params" in system:
+            # Intake and parameter extraction: a file named in the request is its source
+            human = next((m.content for m in reversed(messages) if isinstance(m, HumanMessage)), "")
+            named = re.search(r"[\w.-]+\.(?:csv|jsonl)\b", human if isinstance(human, str) else "")
+            try:
+                answer = json.loads(response)
+            except json.JSONDecodeError:
+                return response
+            if named and isinstance(answer.get("extracted_params"), dict):
+                answer["extracted_params"]["source"] = named.group()
+                return json.dumps(answer)
+            return response
+        if '"verdicts"' in system:
+            # Batched critic: the critic's canned verdict for every "### Item <id>"
+            human = next((m.content for m in reversed(messages) if isinstance(m, HumanMessage)), "")
+            ids = re.findall(r"^### Item (\S+)$", human, re.M)
+            try:
+                verdict = json.loads(response)
+            except json.JSONDecodeError:
+                return response
+            return json.dumps({"verdicts": [{"id": item_id, **verdict} for item_id in ids]})
+        if '"companies"' in system and matched is None:
+            # Domain enrichment: a made-up company per listed domain, none for "unknown-*" domains
+            human = next((m.content for m in reversed(messages) if isinstance(m, HumanMessage)), "")
+            domains = [line.strip() for line in human.splitlines()[1:] if line.strip()]
+            return json.dumps({"companies": [
+                {
+                    "domain": domain,
+                    "company": domain.split(".")[0].title(),
+                    "industry": "Software",
+                    "employee_range": "51-200",
+                    "country": "US",
+                }
+                for domain in domains if not domain.startswith("unknown")
+            ]})
+        if '"leads"' in system and matched is None:
+            # Lead qualification: every "### Lead <id>" qualified
+            human = next((m.content for m in reversed(messages) if isinstance(m, HumanMessage)), "")
+            ids = re.findall(r"^### Lead (\S+)$", human, re.M)
+            return json.dumps({"leads": [
+                {"id": lead_id, "qualified": True, "score": 75, "reason": "Fits the ideal customer profile"} for lead_id in ids
+            ]})
+        if '"emails"' in system and matched is None:
+            # Email personalization: a rewritten draft per "### Recipient <id>"
+            human = next((m.content for m in reversed(messages) if isinstance(m, HumanMessage)), "")
+            ids = re.findall(r"^### Recipient (\S+)$", human, re.M)
+            return json.dumps({"emails": [
+                {"id": recipient_id, "subject": "Personal note for {{first_name}}", "body": "Hi {{first_name}}, a note just for {{company}}."}
+                for recipient_id in ids
+            ]})
+        return response
+
+    def _cache_lookup(self, messages: list[BaseMessage]) -> tuple[int, int]:
+        """(cache_read, cache_creation) input tokens for this call"""
+        system = next((m for m in messages if isinstance(m, SystemMessage)), None)
+        if self.prompt_cache is None or system is None:
+            return 0, 0
+        if isinstance(system.content, str):
+            if self.provider == "anthropic":
+                return 0, 0
+            text = system.content
+        else:
+            blocks = [block for block in system.content if isinstance(block, dict)]
+            if self.provider == "anthropic" and not any("cache_control" in block for block in blocks):
+                return 0, 0
+            text = "".join(block.get("text", "") for block in blocks)
+        # ~4 characters per token, never more than the whole prompt
+        tokens = min(len(text) // 4, self.prompt_tokens)
+        if tokens < self.cache_min_tokens:
+            return 0, 0
+        key = (self.model_name, text)
+        if key in self.prompt_cache.prefixes:
+            return tokens, 0
+        self.prompt_cache.prefixes.add(key)
+        return 0, tokens if self.provider == "anthropic" else 0
+
+    def _input_tokens(self, messages: list[BaseMessage]) -> int:
+        if not self.input_s_per_1k and self.context_window is None:
+            return self.prompt_tokens
+        tokens = sum(count_tokens(m.content if isinstance(m.content, str) else json.dumps(m.content)) for m in messages)
+        if self.context_window is not None and tokens > self.context_window:
+            raise ValueError(f"context_length_exceeded: {tokens} tokens, limit {self.context_window}")
+        return tokens
+
+    def _result(self, messages: list[BaseMessage], cache_read: int = 0, cache_creation: int = 0) -> ChatResult:
+        input_tokens = self._input_tokens(messages)
+        usage = {
+            "input_tokens": input_tokens,
+            "output_tokens": self.completion_tokens,
+            "total_tokens": input_tokens + self.completion_tokens,
+        }
+        if cache_read or cache_creation:
+            usage["input_token_details"] = {"cache_read": cache_read, "cache_creation": cache_creation}
+        message = AIMessage(
+            content=self._pick_response(messages),
+            usage_metadata=usage,
+            response_metadata={
+                "model_name": self.model_name,
+                "token_usage": {
+                    "prompt_tokens": input_tokens,
+                    "completion_tokens": self.completion_tokens,
+                    "total_tokens": input_tokens + self.completion_tokens,
+                },
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: list[BaseMessage], stop: Any = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        return self._result(messages, *self._cache_lookup(messages))
+
+    async def _agenerate(self, messages: list[BaseMessage], stop: Any = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        cache_read, cache_creation = self._cache_lookup(messages)
+        delay = self.latency_fn() if self.latency_fn else self.latency_s
+        delay *= 1 - self.cache_speedup * cache_read / self.prompt_tokens
+        if self.input_s_per_1k:
+            delay += self._input_tokens(messages) / 1000 * self.input_s_per_1k
+        start = time.perf_counter()
+        if self.concurrency is not None:
+            async with self.concurrency.semaphore:
+                await asyncio.sleep(delay)
+        elif delay:
+            await asyncio.sleep(delay)
+        elapsed = model_time.get()
+        if elapsed is not None:
+            elapsed[0] += time.perf_counter() - start
+        return self._result(messages, cache_read, cache_creation)
+
+
+def fake_model_factory(
+    latency_s: float = 0.0,
+    latency: str | None = None,
+    prompt_tokens: int = 400,
+    completion_tokens: int = 120,
+    seed: int | None = None,
+    prompt_cache: bool = False,
+    cache_speedup: float = 0.8,
+    cache_min_tokens: int = 0,
+    model_responses: dict[str, dict[str, str]] | None = None,
+    max_concurrency: int | None = None,
+    input_s_per_1k: float = 0.0,
+    context_window: int | None = None,
+    **response_options: Any,
+):
+    """
+    Factory for core.llm.set_chat_model_factory.
+    `latency` takes a latency_sampler() spec and overrides `latency_s`.
+    `prompt_cache` simulates provider prompt caching across all models the
+    factory builds. `model_responses` overrides canned responses per model
+    name, e.g. {"gpt-4o-mini": {"task planner": "not json"}} to make the
+    cheap cascade tier fail. `max_concurrency` caps calls in flight.
+    `input_s_per_1k` and `context_window` make input size matter.
+    """
+    responses = canned_responses(**response_options)
+    latency_fn = latency_sampler(latency, seed) if latency is not None else None
+    cache = PromptCache() if prompt_cache else None
+    concurrency = ConcurrencyLimit(max_concurrency) if max_concurrency else None
+
+    def factory(provider: str, model: str, temperature: float) -> FakeChatModel:
+        return FakeChatModel(
+            responses={**responses, **(model_responses or {}).get(model, {})},
+            latency_s=latency_s,
+            latency_fn=latency_fn,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            model_name=model,
+            provider=provider,
+            prompt_cache=cache,
+            cache_speedup=cache_speedup,
+            cache_min_tokens=cache_min_tokens,
+            concurrency=concurrency,
+            input_s_per_1k=input_s_per_1k,
+            context_window=context_window,
+        )
+
+    return factory
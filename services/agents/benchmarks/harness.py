@@ -0,0 +1,157 @@
+"""
+Benchmark harness helpers
+==========================
+
+Shared pieces for the benchmark scripts: latency statistics, process memory,
+and storing results per commit so runs can be compared for regressions.
+
+Results are written to benchmarks/results/<name>-<git sha>.json (ignored by
+git). `compare()` walks two result documents and flags every numeric metric
+that moved in the wrong direction by more than a threshold.
+"""
+
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+# Metric name suffixes where a higher value is better; everything else
+# (latencies, bytes, MB, overhead) regresses when it grows
+HIGHER_IS_BETTER = ("per_s", "_rps", "throughput")
+
+# Not compared: run configuration, sample counts, single-sample extremes and
+# simulated model time (an input of the run, not a result)
+SKIPPED = ("config.", ".count", ".max_ms", ".failures")
+SKIPPED_SEGMENTS = (".model.",)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def latency_stats(samples_ms: list[float]) -> dict:
+    if not samples_ms:
+        return {"count": 0}
+    return {
+        "count": len(samples_ms),
+        "mean_ms": round(statistics.mean(samples_ms), 3),
+        "p50_ms": round(percentile(samples_ms, 50), 3),
+        "p95_ms": round(percentile(samples_ms, 95), 3),
+        "p99_ms": round(percentile(samples_ms, 99), 3),
+        "max_ms": round(max(samples_ms), 3),
+    }
+
+
+def rss_mb() -> float | None:
+    """Current resident set size in MB, or None if /proc is unavailable"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def git_revision() -> str:
+    """Short commit hash of the working tree, suffixed with -dirty when modified"""
+    try:
+        sha = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{sha}-dirty" if dirty else sha
+
+
+def save_result(name: str, result: dict, directory: str = RESULTS_DIR) -> str:
+    """Write a result document tagged with the git revision; returns its path"""
+    revision = git_revision()
+    document = {
+        "benchmark": name,
+        "revision": revision,
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": sys.version.split()[0],
+        "result": result,
+    }
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{name}-{revision}.json")
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+    return path
+
+
+def load_result(path_or_revision: str, name: str, directory: str = RESULTS_DIR) -> dict:
+    """Load a saved result by file path or by git revision"""
+    path = path_or_revision
+    if not os.path.exists(path):
+        path = os.path.join(directory, f"{name}-{path_or_revision}.json")
+    with open(path) as f:
+        return json.load(f)
+
+
+def _numeric_leaves(value: Any, prefix: str = "") -> dict[str, float]:
+    leaves = {}
+    if isinstance(value, dict):
+        for key, item in value.items():
+            leaves.update(_numeric_leaves(item, f"{prefix}.{key}" if prefix else str(key)))
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        leaves[prefix] = float(value)
+    return leaves
+
+
+def compare(baseline: dict, current: dict, threshold_pct: float = 10.0) -> list[dict]:
+    """
+    Per-metric change between two result documents (or bare results).
+    A metric regresses when it moves the wrong way by more than threshold_pct.
+    Configuration, counts and max values (see SKIPPED) are not compared.
+    """
+    base = _numeric_leaves(baseline.get("result", baseline))
+    head = _numeric_leaves(current.get("result", current))
+
+    rows = []
+    for metric in sorted(base.keys() & head.keys()):
+        if metric.startswith(SKIPPED) or metric.endswith(SKIPPED):
+            continue
+        if any(segment in metric for segment in SKIPPED_SEGMENTS):
+            continue
+        before, after = base[metric], head[metric]
+        change_pct = ((after - before) / before * 100) if before else (0.0 if after == before else float("inf"))
+        higher_is_better = metric.endswith(HIGHER_IS_BETTER)
+        worse = -change_pct if higher_is_better else change_pct
+        rows.append({
+            "metric": metric,
+            "baseline": before,
+            "current": after,
+            "change_pct": round(change_pct, 2),
+            "regression": worse > threshold_pct,
+        })
+    return rows
+
+
+def print_comparison(rows: list[dict]) -> None:
+    width = max((len(row["metric"]) for row in rows), default=10)
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['metric']:<{width}}  {row['baseline']:>12.3f} -> {row['current']:>12.3f}"
+              f"  ({row['change_pct']:+.1f}%){flag}")
@@ -0,0 +1,46 @@
+"""
+Temporary local stores for benchmarks
+======================================
+
+Points the checkpoint DB, approval inbox, workflow index, quotas, blob store,
+prompt store, intake log, upload index, enrichment cache and email template
+cache at a throwaway directory so benchmark runs never touch ./data. No
+intake classifier is loaded, so every workflow calls the intake model.
+"""
+
+import tempfile
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from core import approvals, blob_store, intake_classifier, orchestrator, prompts, quotas, semantic_cache, uploads, workflow_index
+from specialists import data_enricher, email_composer
+
+
+@asynccontextmanager
+async def temporary_stores(quotas_enabled: bool = False) -> AsyncIterator[str]:
+    """Yield a temp directory holding every local store; closes them on exit"""
+    with tempfile.TemporaryDirectory() as tmp:
+        orchestrator.CHECKPOINT_DB_PATH = f"{tmp}/checkpoints.db"
+        approvals._inbox = approvals.ApprovalInbox(f"{tmp}/workflows.db")
+        workflow_index._index = workflow_index.WorkflowIndex(f"{tmp}/workflows.db")
+        quotas._quotas = quotas.WorkspaceQuotas(f"{tmp}/quotas.db", enabled=quotas_enabled)
+        blob_store._store = blob_store.BlobStore(f"{tmp}/blobs")
+        prompts._store = prompts.PromptStore(f"{tmp}/prompts.db")
+        intake_classifier._log = intake_classifier.IntakeLog(f"{tmp}/intake_log.db")
+        intake_classifier._classifier, intake_classifier._classifier_loaded = None, True
+        uploads._index, uploads._text_cache = uploads.UploadIndex(f"{tmp}/uploads.db"), None
+        data_enricher._store = data_enricher.EnrichmentStore(f"{tmp}/enrichment.db")
+        email_composer._store = email_composer.TemplateStore(f"{tmp}/email_templates.db")
+        semantic_cache._cache = None
+        try:
+            yield tmp
+        finally:
+            await orchestrator.close_workflow()
+            await approvals.get_approval_inbox().close()
+            await workflow_index.get_workflow_index().close()
+            await quotas.get_quotas().close()
+            await prompts.get_prompt_store().close()
+            await intake_classifier.get_intake_log().close()
+            await uploads.get_upload_index().close()
+            await data_enricher.get_enrichment_store().close()
+            await email_composer.get_template_store().close()
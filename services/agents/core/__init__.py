@@ -9,20 +9,66 @@ from .orchestrator import (
     execute_workflow,
     resume_workflow,
     update_approval_status,
+    bulk_update_approval_status,
     AgentState,
     TaskType,
     ApprovalStatus,
     Outcome,
     Metrics
 )
+from .approvals import (
+    ApprovalInbox,
+    get_approval_inbox
+)
+from .llm import (
+    get_chat_model,
+    set_chat_model_factory
+)
+from .workflow_index import (
+    WorkflowIndex,
+    get_workflow_index
+)
+from .serialization import CompactSerializer
+from .blob_store import (
+    BlobNotFound,
+    BlobStore,
+    get_blob_store
+)
+from .state_bounds import (
+    load_result,
+    load_message_content
+)
+from .quotas import (
+    QuotaExceeded,
+    QuotaLimits,
+    WorkspaceQuotas,
+    get_quotas
+)
 
 __all__ = [
     "execute_workflow",
     "resume_workflow",
     "update_approval_status",
+    "bulk_update_approval_status",
     "AgentState",
     "TaskType",
     "ApprovalStatus",
     "Outcome",
-    "Metrics"
+    "Metrics",
+    "ApprovalInbox",
+    "get_approval_inbox",
+    "get_chat_model",
+    "set_chat_model_factory",
+    "QuotaExceeded",
+    "QuotaLimits",
+    "WorkspaceQuotas",
+    "get_quotas",
+    "WorkflowIndex",
+    "get_workflow_index",
+    "CompactSerializer",
+    "BlobNotFound",
+    "BlobStore",
+    "get_blob_store",
+    "load_result",
+    "load_message_content"
 ]
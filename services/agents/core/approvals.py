@@ -0,0 +1,175 @@
+"""
+GalaxyCo.ai - Human Approval Inbox
+===================================
+
+Index of workflows paused at the `human_approval` interrupt, queryable by
+workspace without touching LangGraph checkpoints.
+
+Lifecycle of an entry:
+    pending  → approved | rejected
+    approved | rejected → failed   (resume raised after the decision was
+                                    checkpointed; recover with resume_workflow)
+
+`claim()` moves an entry out of `pending` atomically, so two reviewers (or two
+workers) deciding the same workflow at once can never both resume it.
+"""
+
+import asyncio
+import os
+import time
+
+import aiosqlite
+
+from . import sqlite
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS approval_inbox (
+    workflow_id TEXT PRIMARY KEY,
+    workspace_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    reason TEXT,
+    status TEXT NOT NULL,
+    requested_at REAL NOT NULL,
+    decided_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_approval_inbox_workspace
+    ON approval_inbox (workspace_id, status, requested_at);
+"""
+
+_COLUMNS = ("workflow_id", "workspace_id", "user_id", "reason", "status", "requested_at", "decided_at")
+
+
+class ApprovalInbox:
+    """SQLite-backed inbox of pending approval requests"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._conn: aiosqlite.Connection | None = None
+        self._connect_lock = asyncio.Lock()
+
+    async def _connection(self) -> aiosqlite.Connection:
+        if self._conn is None:
+            # Concurrent first callers must share one connection
+            async with self._connect_lock:
+                if self._conn is None:
+                    self._conn = await sqlite.connect(self.db_path, _SCHEMA)
+        return self._conn
+
+    async def open(self) -> None:
+        """Open the database ahead of the first request (worker warmup)"""
+        await self._connection()
+
+    async def add(
+        self,
+        workflow_id: str,
+        workspace_id: str,
+        user_id: str,
+        reason: str | None,
+    ) -> None:
+        """Record that a workflow is waiting for a decision"""
+        conn = await self._connection()
+        await conn.execute(
+            """
+            INSERT INTO approval_inbox
+                (workflow_id, workspace_id, user_id, reason, status, requested_at, decided_at)
+            VALUES (?, ?, ?, ?, 'pending', ?, NULL)
+            ON CONFLICT (workflow_id) DO UPDATE SET
+                reason = excluded.reason,
+                status = 'pending',
+                requested_at = excluded.requested_at,
+                decided_at = NULL
+            """,
+            (workflow_id, workspace_id, user_id, reason, time.time()),
+        )
+
+    async def get(self, workflow_id: str) -> dict | None:
+        """Fetch a single inbox entry"""
+        conn = await self._connection()
+        async with conn.execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM approval_inbox WHERE workflow_id = ?",
+            (workflow_id,),
+        ) as cursor:
+            row = await cursor.fetchone()
+        return dict(zip(_COLUMNS, row)) if row else None
+
+    async def list_entries(
+        self,
+        workspace_id: str,
+        status: str = "pending",
+        limit: int = 50,
+        before: float | None = None,
+    ) -> list[dict]:
+        """
+        Entries for a workspace in the given status, newest first.
+        Pass the last entry's `requested_at` as `before` to page.
+        """
+        conn = await self._connection()
+        async with conn.execute(
+            f"""
+            SELECT {', '.join(_COLUMNS)} FROM approval_inbox
+            WHERE workspace_id = ? AND status = ? AND requested_at < ?
+            ORDER BY requested_at DESC
+            LIMIT ?
+            """,
+            (workspace_id, status, before if before is not None else float("inf"), limit),
+        ) as cursor:
+            rows = await cursor.fetchall()
+        return [dict(zip(_COLUMNS, row)) for row in rows]
+
+    async def list_pending(
+        self,
+        workspace_id: str,
+        limit: int = 50,
+        before: float | None = None,
+    ) -> list[dict]:
+        """Pending requests for a workspace, newest first"""
+        return await self.list_entries(workspace_id, "pending", limit, before)
+
+    async def claim(self, workflow_id: str, workspace_id: str, status: str) -> bool:
+        """
+        Record a decision if the workflow is still pending in this workspace.
+        Returns False when it was already decided or does not exist.
+        """
+        conn = await self._connection()
+        cursor = await conn.execute(
+            """
+            UPDATE approval_inbox SET status = ?, decided_at = ?
+            WHERE workflow_id = ? AND workspace_id = ? AND status = 'pending'
+            """,
+            (status, time.time(), workflow_id, workspace_id),
+        )
+        claimed = cursor.rowcount == 1
+        await cursor.close()
+        return claimed
+
+    async def release(self, workflow_id: str) -> None:
+        """Put a claimed entry back to pending (resume failed before running)"""
+        conn = await self._connection()
+        await conn.execute(
+            "UPDATE approval_inbox SET status = 'pending', decided_at = NULL WHERE workflow_id = ?",
+            (workflow_id,),
+        )
+
+    async def mark_failed(self, workflow_id: str) -> None:
+        """Flag a decided workflow whose resume did not finish"""
+        conn = await self._connection()
+        await conn.execute(
+            "UPDATE approval_inbox SET status = 'failed' WHERE workflow_id = ?",
+            (workflow_id,),
+        )
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+
+_inbox: ApprovalInbox | None = None
+
+
+def get_approval_inbox() -> ApprovalInbox:
+    """Process-wide approval inbox configured from the environment"""
+    global _inbox
+    if _inbox is None:
+        _inbox = ApprovalInbox(os.getenv("WORKFLOW_DB_PATH", "./data/workflows.db"))
+    return _inbox
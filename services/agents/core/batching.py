@@ -0,0 +1,133 @@
+"""
+GalaxyCo.ai - Micro-batching
+=============================
+
+Under load many workflows reach the critic within a few hundred
+milliseconds of each other, each sending one small prompt. `MicroBatcher`
+collects such requests per key and hands them to a batch function once
+`max_items` are waiting or the first one has waited `max_wait_s`, then
+resolves every caller's future with its own result. One provider call
+replaces up to `max_items`, which is what matters under provider rate
+limits, at the cost of at most `max_wait_s` extra latency per request.
+
+Batch sizes, queue waits and batch call times are recorded per batcher and
+served at GET /admin/batching. The critic batcher (CRITIC_BATCHING=true) is
+built in core/orchestrator.py.
+"""
+
+import asyncio
+import os
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from .profiling import LagHistogram
+
+BatchFunction = Callable[[Hashable, list[Any]], Awaitable[list[Any]]]
+
+
+class MicroBatcher:
+    """Collects concurrent requests per key and runs each group as one batch"""
+
+    def __init__(self, run_batch: BatchFunction, max_items: int = 8, max_wait_s: float = 0.05):
+        self.run_batch = run_batch
+        self.max_items = max(1, max_items)
+        self.max_wait_s = max_wait_s
+        self._pending: dict[Hashable, list[tuple[Any, asyncio.Future, float]]] = {}
+        self._timers: dict[Hashable, asyncio.TimerHandle] = {}
+        self._running: set[asyncio.Task] = set()
+        self.batch_sizes: Counter = Counter()
+        self.wait = LagHistogram()
+        self.call = LagHistogram()
+
+    async def submit(self, key: Hashable, item: Any) -> Any:
+        """Queue `item` under `key` and wait for its result from the batch"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(key, [])
+        pending.append((item, future, time.perf_counter()))
+        if len(pending) >= self.max_items:
+            self._flush(key)
+        elif len(pending) == 1:
+            self._timers[key] = loop.call_later(self.max_wait_s, self._flush, key)
+        return await future
+
+    def _flush(self, key: Hashable) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(key, None)
+        if batch:
+            task = asyncio.create_task(self._run(key, batch), name="micro-batch")
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, key: Hashable, batch: list[tuple[Any, asyncio.Future, float]]) -> None:
+        start = time.perf_counter()
+        self.batch_sizes[len(batch)] += 1
+        for _, _, queued in batch:
+            self.wait.record((start - queued) * 1000)
+        try:
+            results = await self.run_batch(key, [item for item, _, _ in batch])
+            if len(results) != len(batch):
+                # zip would leave the unmatched callers waiting forever
+                raise ValueError(f"Batch function returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self.call.record((time.perf_counter() - start) * 1000)
+        for (_, future, _), result in zip(batch, results):
+            # A caller may have been cancelled while the batch ran
+            if not future.done():
+                future.set_result(result)
+
+    def summary(self) -> dict:
+        batches = sum(self.batch_sizes.values())
+        items = sum(size * count for size, count in self.batch_sizes.items())
+        return {
+            "max_items": self.max_items,
+            "max_wait_ms": round(self.max_wait_s * 1000, 1),
+            "batches": batches,
+            "items": items,
+            "mean_batch_size": round(items / batches, 2) if batches else None,
+            "batch_sizes": {str(size): count for size, count in sorted(self.batch_sizes.items())},
+            "wait": self.wait.summary(),
+            "call": self.call.summary(),
+        }
+
+
+def critic_batching_enabled() -> bool:
+    return os.getenv("CRITIC_BATCHING", "false").lower() == "true"
+
+
+def critic_batch_scope() -> str:
+    """"workspace" (default) never mixes tenants in one prompt; "global" batches across them"""
+    return os.getenv("CRITIC_BATCH_SCOPE", "workspace")
+
+
+_critic_batcher: Optional[MicroBatcher] = None
+
+
+def get_critic_batcher(run_batch: BatchFunction) -> MicroBatcher:
+    """Process-wide critic batcher configured from the environment"""
+    global _critic_batcher
+    if _critic_batcher is None:
+        _critic_batcher = MicroBatcher(
+            run_batch,
+            max_items=int(os.getenv("CRITIC_BATCH_MAX_ITEMS", "8")),
+            max_wait_s=float(os.getenv("CRITIC_BATCH_WAIT_MS", "50")) / 1000,
+        )
+    return _critic_batcher
+
+
+def batching_summary() -> dict:
+    return {
+        "critic": {
+            "enabled": critic_batching_enabled(),
+            "scope": critic_batch_scope(),
+            **(_critic_batcher.summary() if _critic_batcher is not None else {}),
+        },
+    }
@@ -0,0 +1,132 @@
+"""
+GalaxyCo.ai - Content-Addressed Blob Store
+===========================================
+
+Write-once storage for payloads too large to keep in workflow state
+(full specialist results, long message bodies, archived history).
+
+Blobs are addressed by the SHA-256 of their bytes and laid out on local disk
+as `<root>/<first two hex chars>/<digest>`. Identical payloads are stored
+once, writes are atomic (temp file + rename) so concurrent workers writing
+the same blob are harmless, and a reference never changes meaning.
+
+File IO runs in a thread so node code can await it without blocking the
+event loop. `put_stream` hashes and writes a body chunk by chunk (uploads,
+see core/uploads.py), so a large payload is never held in memory whole.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, AsyncIterable
+
+
+class BlobNotFound(KeyError):
+    """Raised when a digest has no blob on disk"""
+
+
+class BlobTooLarge(ValueError):
+    """Raised when a streamed blob exceeds its size limit"""
+
+
+class BlobStore:
+    """Local-disk, content-addressed blob store"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path(self, digest: str) -> str:
+        if len(digest) != 64 or not all(c in "0123456789abcdef" for c in digest):
+            raise ValueError(f"Invalid blob digest: {digest!r}")
+        return os.path.join(self.root, digest[:2], digest)
+
+    def _write(self, digest: str, data: bytes) -> None:
+        path = self.path(digest)
+        if os.path.exists(path):
+            return
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _read(self, digest: str) -> bytes:
+        try:
+            with open(self.path(digest), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            raise BlobNotFound(digest) from None
+
+    async def put(self, data: bytes) -> str:
+        """Store bytes and return their digest"""
+        digest = hashlib.sha256(data).hexdigest()
+        await asyncio.to_thread(self._write, digest, data)
+        return digest
+
+    async def put_stream(self, chunks: AsyncIterable[bytes], max_bytes: int | None = None) -> tuple[str, int]:
+        """
+        Store a body arriving in chunks; returns (digest, size). The bytes
+        are hashed while they are written to a temp file, which is renamed
+        to its digest at the end. Raises BlobTooLarge past `max_bytes`.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".upload-")
+        f = os.fdopen(fd, "wb")
+        sha, size = hashlib.sha256(), 0
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise BlobTooLarge(f"Blob exceeds {max_bytes} bytes")
+                sha.update(chunk)
+                await asyncio.to_thread(f.write, chunk)
+            await asyncio.to_thread(f.close)
+            digest = sha.hexdigest()
+            await asyncio.to_thread(self._commit, tmp, digest)
+        except BaseException:
+            f.close()
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        return digest, size
+
+    def _commit(self, tmp: str, digest: str) -> None:
+        path = self.path(digest)
+        if os.path.exists(path):
+            os.unlink(tmp)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp, path)
+
+    async def get(self, digest: str) -> bytes:
+        """Read a blob; raises BlobNotFound if it does not exist"""
+        return await asyncio.to_thread(self._read, digest)
+
+    async def exists(self, digest: str) -> bool:
+        return await asyncio.to_thread(os.path.exists, self.path(digest))
+
+    async def put_json(self, value: Any) -> str:
+        """Store a JSON-serializable value (canonical encoding, so equal values share a blob)"""
+        data = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str).encode()
+        return await self.put(data)
+
+    async def get_json(self, digest: str) -> Any:
+        return json.loads(await self.get(digest))
+
+
+_store: BlobStore | None = None
+
+
+def get_blob_store() -> BlobStore:
+    """Process-wide blob store configured from the environment"""
+    global _store
+    if _store is None:
+        _store = BlobStore(os.getenv("BLOB_STORE_PATH", "./data/blobs"))
+    return _store
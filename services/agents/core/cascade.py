@@ -0,0 +1,125 @@
+"""
+GalaxyCo.ai - Model Cascade
+============================
+
+Cheap model first, larger model only when needed. A cascade lists the model
+tiers for an orchestrator node or an `/execute` provider, cheapest first.
+The caller checks every answer (schema, critic verdict, completeness) and
+moves to the next tier only when it is rejected; the last tier's answer is
+always used.
+
+Every tier attempt is recorded in a process-wide `CascadeStats` (accepted,
+escalated, latency, usage cost), served at GET /admin/cascade.
+
+MODEL_CASCADE=false skips the cheap tiers: each caller uses its own default
+model, exactly as before cascading existed.
+"""
+
+import os
+from collections import deque
+from dataclasses import dataclass, field
+
+# (provider, model)
+Tier = tuple[str, str]
+
+CASCADES: dict[str, tuple[Tier, ...]] = {
+    "planner": (("openai", "gpt-4o-mini"), ("openai", "gpt-4o")),
+    "critic": (("openai", "gpt-4o-mini"), ("openai", "gpt-4o")),
+    "execute:openai": (("openai", "gpt-4o-mini"), ("openai", "gpt-4o")),
+    "execute:anthropic": (
+        ("anthropic", "claude-3-5-haiku-20241022"),
+        ("anthropic", "claude-3-5-sonnet-20241022"),
+    ),
+}
+
+
+def cascade_enabled() -> bool:
+    return os.getenv("MODEL_CASCADE", "true").lower() == "true"
+
+
+def tiers_for(name: str, default: Tier) -> tuple[Tier, ...]:
+    """Tiers to try for a cascade, or just `default` when cascading is off"""
+    if not cascade_enabled() or name not in CASCADES:
+        return (default,)
+    return CASCADES[name]
+
+
+def min_quality() -> float:
+    """Critic quality score below which a cheap-tier verdict is escalated"""
+    return float(os.getenv("CASCADE_MIN_QUALITY", "70"))
+
+
+def is_complete(response) -> bool:
+    """Non-empty answer that was not cut off at the token limit"""
+    content = response.content if isinstance(response.content, str) else str(response.content or "")
+    metadata = getattr(response, "response_metadata", None) or {}
+    truncated = metadata.get("finish_reason") == "length" or metadata.get("stop_reason") == "max_tokens"
+    return bool(content.strip()) and not truncated
+
+
+# ============================================================================
+# STATS
+# ============================================================================
+
+@dataclass
+class TierStats:
+    """Outcomes of one model tier in one cascade"""
+    attempts: int = 0
+    accepted: int = 0
+    escalated: int = 0  # rejected, next tier tried
+    rejected_final: int = 0  # rejected on the last tier, used anyway
+    cost_usd: float = 0.0
+    latencies_ms: deque = field(default_factory=lambda: deque(maxlen=1000))
+
+    def summary(self) -> dict:
+        ordered = sorted(self.latencies_ms)
+
+        def pct(p: float) -> float | None:
+            return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))], 1) if ordered else None
+
+        return {
+            "attempts": self.attempts,
+            "accepted": self.accepted,
+            "escalated": self.escalated,
+            "rejected_final": self.rejected_final,
+            "success_rate": round(self.accepted / self.attempts, 3) if self.attempts else None,
+            "p50_ms": pct(50),
+            "p95_ms": pct(95),
+            "cost_usd": round(self.cost_usd, 6),
+            "mean_cost_usd": round(self.cost_usd / self.attempts, 6) if self.attempts else None,
+        }
+
+
+class CascadeStats:
+    """Per-cascade, per-tier counters since process start"""
+
+    def __init__(self):
+        self._tiers: dict[tuple[str, str], TierStats] = {}
+
+    def record(self, name: str, model: str, accepted: bool, final: bool, latency_ms: float, cost_usd: float) -> None:
+        stats = self._tiers.setdefault((name, model), TierStats())
+        stats.attempts += 1
+        stats.cost_usd += cost_usd
+        stats.latencies_ms.append(latency_ms)
+        if accepted:
+            stats.accepted += 1
+        elif final:
+            stats.rejected_final += 1
+        else:
+            stats.escalated += 1
+
+    def summary(self) -> dict:
+        report: dict[str, dict] = {}
+        for (name, model), stats in sorted(self._tiers.items()):
+            report.setdefault(name, {})[model] = stats.summary()
+        return {"enabled": cascade_enabled(), "cascades": report}
+
+
+_stats: CascadeStats | None = None
+
+
+def get_cascade_stats() -> CascadeStats:
+    global _stats
+    if _stats is None:
+        _stats = CascadeStats()
+    return _stats
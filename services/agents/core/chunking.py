@@ -0,0 +1,231 @@
+"""
+GalaxyCo.ai - Long-input Chunking
+==================================
+
+A two-hour sales call is 25-30k tokens. Pasted into one `/execute` prompt
+it is one slow call, and longer ones overflow the model's context. Above
+CHUNK_THRESHOLD_TOKENS the long input of an agent type (`transcript` for
+`call`, `email_content` for `scope`) is instead split and map-reduced:
+
+    split    at speaker turns (transcripts) or messages (email threads),
+             packed into chunks of at most CHUNK_TOKENS
+    map      every chunk analysed on its own, CHUNK_CONCURRENCY at a time,
+             with the agent's own system prompt (one cacheable prefix)
+    reduce   the partial analyses merged into one answer; when they are
+             themselves too long they are merged in groups first
+
+`count_tokens` is a local estimate, so deciding whether to chunk needs no
+tokenizer download and no provider call. `map_reduce` yields each partial
+analysis as it finishes, which POST /execute/stream forwards to the client.
+"""
+
+import asyncio
+import os
+import re
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from .prompts import get_template
+
+# Agent type -> the input that can grow without bound, and what it is
+CHUNKED_INPUTS: dict[str, tuple[str, str]] = {
+    "call": ("transcript", "call transcript"),
+    "scope": ("email_content", "email thread"),
+}
+
+MAP_INSTRUCTION = """This is part {index} of {total} of a longer {kind}, split for length.
+Analyze only this part. Keep every point a later summary needs: names, needs and
+pain points, commitments, action items, open questions. Be concise; do not
+summarize parts you have not seen.
+
+"""
+
+REDUCE_INSTRUCTION = """Below are analyses of {total} consecutive parts of one {kind}, in order.
+Combine them into a single analysis of the whole {kind}, in the format you would
+use for the full text. Merge duplicates; where parts disagree, later parts win.
+
+"""
+
+# Invokes the model on a user message, returns the answer text
+Invoke = Callable[[str], Awaitable[str]]
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+# "Jane Doe: ...", "[00:12:31] AE (ACME): ...", "00:12 Speaker 2: ..."
+_SPEAKER_TURN = re.compile(r"^[ \t]*(?:\[?\d{1,2}(?::\d{2}){1,2}\]?[ \t]+)?[A-Z][\w .'()&/-]{0,40}:[ \t]", re.M)
+# Start of a message in a thread: reply headers, forwards, "From:" blocks
+_EMAIL_MESSAGE = re.compile(
+    r"^[ \t]*(?:On .{4,200}wrote:|-{2,}[ \t]*(?:Original|Forwarded) [Mm]essage[ \t]*-{2,}|From:[ \t])",
+    re.M,
+)
+_PARAGRAPH = re.compile(r"\n[ \t]*\n")
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+
+
+def count_tokens(text: str) -> int:
+    """
+    Local LLM token estimate: one token per punctuation mark and one per
+    started six characters of a word, the way BPE vocabularies keep common
+    words whole and split long ones. Errs high on rare and long words, the
+    safe side for context limits. No tokenizer files, no network.
+    """
+    return sum((len(piece) + 5) // 6 for piece in _TOKEN.findall(text))
+
+
+def chunk_threshold() -> int:
+    """Inputs above this many tokens are map-reduced; 0 disables chunking"""
+    return int(os.getenv("CHUNK_THRESHOLD_TOKENS", "12000"))
+
+
+def chunk_tokens() -> int:
+    return int(os.getenv("CHUNK_TOKENS", "4000"))
+
+
+def chunk_concurrency() -> int:
+    return max(1, int(os.getenv("CHUNK_CONCURRENCY", "4")))
+
+
+def _split_at(text: str, pattern: re.Pattern) -> list[str]:
+    """Pieces starting at each match; ''.join(pieces) == text"""
+    starts = sorted({0, *(m.start() for m in pattern.finditer(text))})
+    return [text[a:b] for a, b in zip(starts, starts[1:] + [len(text)]) if a < b]
+
+
+def _split_after(text: str, pattern: re.Pattern) -> list[str]:
+    """Pieces ending after each match; ''.join(pieces) == text"""
+    ends = [m.end() for m in pattern.finditer(text)]
+    starts = [0, *ends]
+    return [text[a:b] for a, b in zip(starts, ends + [len(text)]) if a < b]
+
+
+def _hard_split(text: str, budget: int) -> list[str]:
+    """Last resort for a single oversized sentence: cut between words"""
+    pieces, current, size = [], [], 0
+    for word in re.findall(r"\S+\s*", text):
+        tokens = count_tokens(word)
+        if current and size + tokens > budget:
+            pieces.append("".join(current))
+            current, size = [], 0
+        current.append(word)
+        size += tokens
+    if current:
+        pieces.append("".join(current))
+    return pieces
+
+
+def segments(text: str, kind: str, budget: int) -> list[str]:
+    """
+    Natural units of `text`, none above `budget` tokens: speaker turns or
+    thread messages when present, paragraphs otherwise, with oversized
+    units split further at sentences and finally between words
+    """
+    pattern = _SPEAKER_TURN if kind == "call transcript" else _EMAIL_MESSAGE
+    units = _split_at(text, pattern)
+    if len(units) < 2:
+        units = _split_after(text, _PARAGRAPH)
+
+    result = []
+    for unit in units:
+        if count_tokens(unit) <= budget:
+            result.append(unit)
+            continue
+        for sentence in _split_after(unit, _SENTENCE):
+            result.extend([sentence] if count_tokens(sentence) <= budget else _hard_split(sentence, budget))
+    return result
+
+
+def pack(pieces: list[str], budget: int) -> list[str]:
+    """Greedily join consecutive pieces into chunks of at most `budget` tokens"""
+    chunks, current, size = [], [], 0
+    for piece in pieces:
+        tokens = count_tokens(piece)
+        if current and size + tokens > budget:
+            chunks.append("".join(current))
+            current, size = [], 0
+        current.append(piece)
+        size += tokens
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def _group(parts: list[str], budget: int) -> list[list[str]]:
+    """Consecutive parts grouped at most `budget` tokens per group"""
+    groups: list[list[str]] = []
+    size = 0
+    for part in parts:
+        tokens = count_tokens(part)
+        if groups and size + tokens <= budget:
+            groups[-1].append(part)
+            size += tokens
+        else:
+            groups.append([part])
+            size = tokens
+    return groups
+
+
+def plan_chunks(agent_type: str, inputs: dict[str, Any]) -> list[str] | None:
+    """Chunks of the agent type's long input, or None when one call will do"""
+    if agent_type not in CHUNKED_INPUTS:
+        return None
+    key, kind = CHUNKED_INPUTS[agent_type]
+    text = inputs.get(key)
+    threshold = chunk_threshold()
+    if not isinstance(text, str) or threshold <= 0 or count_tokens(text) <= threshold:
+        return None
+    chunks = pack(segments(text, kind, chunk_tokens()), chunk_tokens())
+    return chunks if len(chunks) > 1 else None
+
+
+async def map_reduce(
+    agent_type: str,
+    inputs: dict[str, Any],
+    chunks: list[str],
+    invoke: Invoke,
+    concurrency: int | None = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Run the map step over `chunks` and the reduce step over the results.
+    Yields {"event": "partial", "index", "total", "content"} per finished
+    chunk (completion order), then {"event": "result", "content", "chunks",
+    "reduce_calls"}.
+    """
+    key, kind = CHUNKED_INPUTS[agent_type]
+    template = get_template(agent_type)
+    semaphore = asyncio.Semaphore(concurrency or chunk_concurrency())
+    total = len(chunks)
+
+    async def analyze(index: int, chunk: str) -> tuple[int, str]:
+        header = MAP_INSTRUCTION.format(index=index + 1, total=total, kind=kind)
+        async with semaphore:
+            return index, await invoke(header + template.render_user({**inputs, key: chunk}))
+
+    tasks = [asyncio.create_task(analyze(i, chunk), name=f"chunk-{i}") for i, chunk in enumerate(chunks)]
+    partials: list[str] = [""] * total
+    try:
+        for finished in asyncio.as_completed(tasks):
+            index, content = await finished
+            partials[index] = content
+            yield {"event": "partial", "index": index, "total": total, "content": content}
+    finally:
+        # Error in one chunk, or the consumer went away
+        for task in tasks:
+            task.cancel()
+
+    reduce_calls = 0
+
+    async def combine(parts: list[str]) -> str:
+        nonlocal reduce_calls
+        reduce_calls += 1
+        body = "".join(f"## Part {i + 1}\n\n{part.strip()}\n\n" for i, part in enumerate(parts))
+        async with semaphore:
+            return await invoke(REDUCE_INSTRUCTION.format(total=len(parts), kind=kind) + body)
+
+    # Merge in groups until everything fits one reduce prompt
+    budget = chunk_tokens()
+    while len(partials) > 2 and count_tokens("".join(partials)) > budget:
+        groups = _group(partials, budget)
+        if len(groups) == len(partials):
+            break  # every partial is budget-sized already; merge them all at once
+        partials = list(await asyncio.gather(*(combine(group) for group in groups)))
+
+    content = await combine(partials)
+    yield {"event": "result", "content": content, "chunks": total, "reduce_calls": reduce_calls}
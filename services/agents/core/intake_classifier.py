@@ -0,0 +1,454 @@
+"""
+GalaxyCo.ai - Local Intake Classifier
+======================================
+
+`paa_intake_node` spends a full Claude round trip to pick a task type, a
+priority and whether approval is needed. This module answers the same
+questions in-process, in well under a millisecond, when it is confident:
+
+- features: hashed word unigrams and bigrams (crc32 into FEATURE_DIM buckets)
+- model: one softmax-regression head per output (task_type,
+  requires_approval, priority), NumPy only, trained with plain SGD
+- use: the intake LLM is skipped when both the task type and the approval
+  decision clear INTAKE_CLASSIFIER_THRESHOLD; otherwise it answers as before.
+  The classifier only routes: for task types whose specialist needs params,
+  they still come from one call to the cheap extraction model (paa_extract)
+- training data: every LLM intake result is logged to INTAKE_LOG_DB_PATH
+  (the classifier's own answers are not, so it never trains on itself)
+- monitoring: a small share of confident predictions
+  (INTAKE_CLASSIFIER_AUDIT_RATE) still goes to the LLM so disagreement can
+  be measured online; GET /admin/intake reports skip and disagreement rates
+
+Train and evaluate offline, then point INTAKE_CLASSIFIER_PATH at the model:
+
+    python -m core.intake_classifier train --out ./data/intake_classifier.npz
+    python -m core.intake_classifier evaluate --model ./data/intake_classifier.npz
+
+NumPy is imported only when a model is loaded or trained.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import aiosqlite
+
+from . import sqlite
+
+TASK_TYPES = ("lead_qualification", "email_composition", "data_enrichment", "general")
+PRIORITIES = ("high", "medium", "low")
+APPROVAL = ("no", "yes")
+
+FEATURE_DIM = 2 ** 16
+
+_WORD = re.compile(r"\w+")
+
+
+def hashed_features(text: str, dim: int = FEATURE_DIM):
+    """(bucket indices, L2-normalized counts) of the text's unigrams and bigrams"""
+    import numpy as np
+
+    words = _WORD.findall(text.lower())
+    grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    counts = Counter(zlib.crc32(gram.encode()) % dim for gram in grams or [""])
+    indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+    values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+    return indices, values / np.linalg.norm(values)
+
+
+# ============================================================================
+# MODEL
+# ============================================================================
+
+class LinearHead:
+    """Softmax regression over hashed features for one output"""
+
+    def __init__(self, labels: tuple[str, ...], dim: int = FEATURE_DIM, weights=None, bias=None):
+        import numpy as np
+
+        self.labels = tuple(labels)
+        self.weights = weights if weights is not None else np.zeros((dim, len(labels)), dtype=np.float32)
+        self.bias = bias if bias is not None else np.zeros(len(labels), dtype=np.float32)
+
+    def proba(self, features):
+        import numpy as np
+
+        indices, values = features
+        scores = values @ self.weights[indices] + self.bias
+        scores = np.exp(scores - scores.max())
+        return scores / scores.sum()
+
+    def fit(self, rows: list, targets: list[str], epochs: int = 10, learning_rate: float = 0.5, seed: int = 0) -> None:
+        import numpy as np
+
+        rng = np.random.default_rng(seed)
+        target_ids = [self.labels.index(target) for target in targets]
+        for epoch in range(epochs):
+            step = learning_rate / (1 + epoch)
+            for i in rng.permutation(len(rows)):
+                indices, values = rows[i]
+                gradient = self.proba(rows[i])
+                gradient[target_ids[i]] -= 1
+                self.weights[indices] -= step * np.outer(values, gradient)
+                self.bias -= step * gradient
+
+    def predict(self, features) -> tuple[str, float]:
+        probabilities = self.proba(features)
+        best = int(probabilities.argmax())
+        return self.labels[best], float(probabilities[best])
+
+
+@dataclass(frozen=True)
+class IntakePrediction:
+    task_type: str
+    requires_approval: bool
+    priority: str
+    # Lower of the task type and approval probabilities (priority is advisory)
+    confidence: float
+
+    def analysis(self) -> dict:
+        """Same shape as the intake LLM's JSON answer; params are extracted separately"""
+        return {
+            "task_type": self.task_type,
+            "requires_approval": self.requires_approval,
+            "approval_reason": "Approval predicted by the intake classifier" if self.requires_approval else None,
+            "extracted_params": {},
+            "priority": self.priority,
+        }
+
+
+class IntakeClassifier:
+    """Task type, approval and priority heads over shared hashed features"""
+
+    def __init__(self, heads: dict[str, LinearHead], dim: int = FEATURE_DIM):
+        self.heads = heads
+        self.dim = dim
+
+    @classmethod
+    def train(cls, examples: list[dict], epochs: int = 10, dim: int = FEATURE_DIM, seed: int = 0) -> "IntakeClassifier":
+        """Fit on logged intake results (see IntakeLog.examples)"""
+        rows = [hashed_features(example["message"], dim) for example in examples]
+        heads = {
+            "task_type": LinearHead(TASK_TYPES, dim),
+            "requires_approval": LinearHead(APPROVAL, dim),
+            "priority": LinearHead(PRIORITIES, dim),
+        }
+        heads["task_type"].fit(rows, [e["task_type"] for e in examples], epochs, seed=seed)
+        heads["requires_approval"].fit(rows, [APPROVAL[bool(e["requires_approval"])] for e in examples], epochs, seed=seed)
+        heads["priority"].fit(rows, [e["priority"] for e in examples], epochs, seed=seed)
+        return cls(heads, dim)
+
+    def predict(self, text: str) -> IntakePrediction:
+        features = hashed_features(text, self.dim)
+        task_type, task_p = self.heads["task_type"].predict(features)
+        approval, approval_p = self.heads["requires_approval"].predict(features)
+        priority, _ = self.heads["priority"].predict(features)
+        return IntakePrediction(task_type, approval == "yes", priority, min(task_p, approval_p))
+
+    def save(self, path: str) -> None:
+        import numpy as np
+
+        arrays = {"dim": np.array(self.dim)}
+        for name, head in self.heads.items():
+            arrays[f"{name}.weights"] = head.weights
+            arrays[f"{name}.bias"] = head.bias
+            arrays[f"{name}.labels"] = np.array(head.labels)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "wb") as f:
+            np.savez_compressed(f, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "IntakeClassifier":
+        import numpy as np
+
+        with np.load(path, allow_pickle=False) as data:
+            dim = int(data["dim"])
+            heads = {
+                name: LinearHead(
+                    tuple(str(label) for label in data[f"{name}.labels"]),
+                    dim,
+                    weights=data[f"{name}.weights"],
+                    bias=data[f"{name}.bias"],
+                )
+                for name in ("task_type", "requires_approval", "priority")
+            }
+        return cls(heads, dim)
+
+
+def evaluate(classifier: IntakeClassifier, examples: list[dict], thresholds=(0.5, 0.7, 0.8, 0.9, 0.95)) -> dict:
+    """
+    Accuracy per head against logged LLM answers, and for each confidence
+    threshold the share of requests that would skip the LLM and how often
+    those skipped requests disagree with it (task type or approval).
+    """
+    predictions = [classifier.predict(example["message"]) for example in examples]
+    disagrees = [
+        p.task_type != e["task_type"] or p.requires_approval != bool(e["requires_approval"])
+        for p, e in zip(predictions, examples)
+    ]
+    total = len(examples) or 1
+
+    report = {
+        "examples": len(examples),
+        "task_type_accuracy": round(sum(p.task_type == e["task_type"] for p, e in zip(predictions, examples)) / total, 3),
+        "approval_accuracy": round(
+            sum(p.requires_approval == bool(e["requires_approval"]) for p, e in zip(predictions, examples)) / total, 3
+        ),
+        "priority_accuracy": round(sum(p.priority == e["priority"] for p, e in zip(predictions, examples)) / total, 3),
+        "thresholds": {},
+    }
+    for threshold in thresholds:
+        skipped = [d for p, d in zip(predictions, disagrees) if p.confidence >= threshold]
+        report["thresholds"][str(threshold)] = {
+            "skip_rate": round(len(skipped) / total, 3),
+            "disagreement_rate": round(sum(skipped) / len(skipped), 3) if skipped else None,
+        }
+    return report
+
+
+# ============================================================================
+# ONLINE USE
+# ============================================================================
+
+def classifier_threshold() -> float:
+    return float(os.getenv("INTAKE_CLASSIFIER_THRESHOLD", "0.9"))
+
+
+def should_audit() -> bool:
+    """Send this confident prediction to the LLM anyway, to measure disagreement"""
+    return random.random() < float(os.getenv("INTAKE_CLASSIFIER_AUDIT_RATE", "0.05"))
+
+
+class IntakeStats:
+    """Skip and disagreement counters since process start"""
+
+    def __init__(self):
+        self.predictions = 0
+        self.skipped = 0
+        self.below_threshold = 0
+        self.audited = 0
+        self.compared = 0
+        self.disagreements = 0
+
+    def record_prediction(self, skipped: bool, confident: bool) -> None:
+        self.predictions += 1
+        if skipped:
+            self.skipped += 1
+        elif confident:
+            self.audited += 1
+        else:
+            self.below_threshold += 1
+
+    def record_comparison(self, prediction: IntakePrediction, analysis: dict) -> bool:
+        """Compare with the LLM's answer; returns True when they disagree"""
+        self.compared += 1
+        disagree = (
+            prediction.task_type != analysis.get("task_type")
+            or prediction.requires_approval != bool(analysis.get("requires_approval"))
+        )
+        self.disagreements += disagree
+        return disagree
+
+    def summary(self) -> dict:
+        return {
+            "loaded": get_intake_classifier() is not None,
+            "threshold": classifier_threshold(),
+            "predictions": self.predictions,
+            "skipped": self.skipped,
+            "below_threshold": self.below_threshold,
+            "audited": self.audited,
+            "skip_rate": round(self.skipped / self.predictions, 3) if self.predictions else None,
+            "compared": self.compared,
+            "disagreements": self.disagreements,
+            "disagreement_rate": round(self.disagreements / self.compared, 3) if self.compared else None,
+        }
+
+
+_classifier: Optional[IntakeClassifier] = None
+_classifier_loaded = False
+_stats: Optional[IntakeStats] = None
+
+
+def get_intake_classifier() -> Optional[IntakeClassifier]:
+    """The trained model at INTAKE_CLASSIFIER_PATH, or None when absent or disabled"""
+    global _classifier, _classifier_loaded
+    if not _classifier_loaded:
+        _classifier_loaded = True
+        path = os.getenv("INTAKE_CLASSIFIER_PATH", "./data/intake_classifier.npz")
+        if os.getenv("INTAKE_CLASSIFIER_ENABLED", "true").lower() == "true" and os.path.exists(path):
+            _classifier = IntakeClassifier.load(path)
+            print(f"[IntakeClassifier] Loaded {path}")
+    return _classifier
+
+
+def get_intake_stats() -> IntakeStats:
+    global _stats
+    if _stats is None:
+        _stats = IntakeStats()
+    return _stats
+
+
+# ============================================================================
+# INTAKE LOG (training data)
+# ============================================================================
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS intake_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    workflow_id TEXT NOT NULL,
+    workspace_id TEXT NOT NULL,
+    message TEXT NOT NULL,
+    task_type TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    requires_approval INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+
+class IntakeLog:
+    """SQLite log of LLM intake results, the classifier's training data"""
+
+    def __init__(self, db_path: str, enabled: bool = True):
+        self.db_path = db_path
+        self.enabled = enabled
+        self._conn: aiosqlite.Connection | None = None
+        self._connect_lock = asyncio.Lock()
+
+    async def _connection(self) -> aiosqlite.Connection:
+        if self._conn is None:
+            # Concurrent first callers must share one connection
+            async with self._connect_lock:
+                if self._conn is None:
+                    self._conn = await sqlite.connect(self.db_path, _SCHEMA)
+        return self._conn
+
+    async def open(self) -> None:
+        """Open the database ahead of the first request (worker warmup)"""
+        if self.enabled:
+            await self._connection()
+
+    async def add(self, workflow_id: str, workspace_id: str, message: str, analysis: dict[str, Any]) -> None:
+        if not self.enabled or analysis.get("task_type") not in TASK_TYPES:
+            return
+        conn = await self._connection()
+        await conn.execute(
+            "INSERT INTO intake_log (workflow_id, workspace_id, message, task_type, priority, requires_approval, created_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                workflow_id,
+                workspace_id,
+                message,
+                analysis["task_type"],
+                analysis.get("priority") if analysis.get("priority") in PRIORITIES else "medium",
+                int(bool(analysis.get("requires_approval"))),
+                time.time(),
+            ),
+        )
+        await conn.commit()
+
+    async def examples(self, limit: int | None = None) -> list[dict]:
+        """Most recent logged results first"""
+        conn = await self._connection()
+        query = "SELECT message, task_type, priority, requires_approval FROM intake_log ORDER BY id DESC"
+        params: tuple = ()
+        if limit:
+            query += " LIMIT ?"
+            params = (limit,)
+        async with conn.execute(query, params) as cursor:
+            rows = await cursor.fetchall()
+        return [
+            {"message": message, "task_type": task_type, "priority": priority, "requires_approval": bool(approval)}
+            for message, task_type, priority, approval in rows
+        ]
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+
+_log: IntakeLog | None = None
+
+
+def get_intake_log() -> IntakeLog:
+    """Process-wide intake log configured from the environment"""
+    global _log
+    if _log is None:
+        _log = IntakeLog(
+            os.getenv("INTAKE_LOG_DB_PATH", "./data/intake_log.db"),
+            enabled=os.getenv("INTAKE_LOG_ENABLED", "true").lower() == "true",
+        )
+    return _log
+
+
+# ============================================================================
+# OFFLINE TRAINING / EVALUATION
+# ============================================================================
+
+def _load_examples(args) -> list[dict]:
+    if args.data:
+        with open(args.data) as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    async def read() -> list[dict]:
+        log = IntakeLog(args.db)
+        try:
+            return await log.examples(args.limit)
+        finally:
+            await log.close()
+
+    return asyncio.run(read())
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Train or evaluate the local intake classifier")
+    parser.add_argument("command", choices=["train", "evaluate"])
+    parser.add_argument("--db", default=os.getenv("INTAKE_LOG_DB_PATH", "./data/intake_log.db"),
+                        help="intake log to read examples from")
+    parser.add_argument("--data", help="JSONL of {message, task_type, priority, requires_approval} instead of --db")
+    parser.add_argument("--limit", type=int, help="use only the most recent N logged results")
+    parser.add_argument("--model", default=os.getenv("INTAKE_CLASSIFIER_PATH", "./data/intake_classifier.npz"))
+    parser.add_argument("--out", help="where train writes the model (default: --model)")
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--holdout", type=float, default=0.2, help="share of examples held out for evaluation")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    examples = _load_examples(args)
+    if not examples:
+        print("No examples to use", file=sys.stderr)
+        return 1
+
+    if args.command == "evaluate":
+        print(json.dumps(evaluate(IntakeClassifier.load(args.model), examples), indent=2))
+        return 0
+
+    random.Random(args.seed).shuffle(examples)
+    split = int(len(examples) * (1 - args.holdout))
+    train, holdout = examples[:split], examples[split:]
+    start = time.perf_counter()
+    classifier = IntakeClassifier.train(train, epochs=args.epochs, seed=args.seed)
+    train_s = time.perf_counter() - start
+    classifier.save(args.out or args.model)
+
+    report = {"train_examples": len(train), "train_s": round(train_s, 2), "path": args.out or args.model}
+    if holdout:
+        report["holdout"] = evaluate(classifier, holdout)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
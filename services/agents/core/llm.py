@@ -0,0 +1,121 @@
+"""
+GalaxyCo.ai - Chat Model Factory
+=================================
+
+Single place where workflow nodes obtain chat models. Provider packages are
+imported on first use, and benchmarks/tests can swap in a fake model with
+`set_chat_model_factory` so whole workflows run offline.
+
+OPENAI_BASE_URL / ANTHROPIC_BASE_URL point the real clients at another
+endpoint, e.g. the mock provider in tests/load/mock_llm_server.py.
+"""
+
+import importlib
+import os
+import time
+from typing import Callable
+
+from langchain_core.language_models.chat_models import BaseChatModel
+
+# (provider, model, temperature) -> chat model
+ChatModelFactory = Callable[[str, str, float], BaseChatModel]
+
+# Provider -> (integration package, API key variable)
+PROVIDERS = {
+    "openai": ("langchain_openai", "OPENAI_API_KEY"),
+    "anthropic": ("langchain_anthropic", "ANTHROPIC_API_KEY"),
+}
+
+
+def _provider_factory(provider: str, model: str, temperature: float) -> BaseChatModel:
+    """Build a real provider client"""
+    if provider == "anthropic":
+        from langchain_anthropic import ChatAnthropic
+
+        options = {}
+        if os.getenv("ANTHROPIC_BASE_URL"):
+            options["anthropic_api_url"] = os.getenv("ANTHROPIC_BASE_URL")
+
+        return ChatAnthropic(
+            model=model,
+            temperature=temperature,
+            anthropic_api_key=os.getenv("ANTHROPIC_API_KEY"),
+            **options
+        )
+
+    if provider == "openai":
+        from langchain_openai import ChatOpenAI
+
+        options = {}
+        if os.getenv("OPENAI_BASE_URL"):
+            options["base_url"] = os.getenv("OPENAI_BASE_URL")
+
+        return ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            openai_api_key=os.getenv("OPENAI_API_KEY"),
+            **options
+        )
+
+    raise ValueError(f"Unknown LLM provider: {provider}")
+
+
+_factory: ChatModelFactory = _provider_factory
+
+# USD per 1M tokens (approximate). cached_input: prompt-cache reads;
+# cache_write: Anthropic's surcharge for writing a cache entry
+MODEL_PRICES = {
+    "gpt-4o": {"input": 2.50, "cached_input": 1.25, "output": 10.00},
+    "gpt-4o-mini": {"input": 0.15, "cached_input": 0.075, "output": 0.60},
+    "gpt-4-turbo": {"input": 10.00, "cached_input": 10.00, "output": 30.00},
+    "claude-3-5-sonnet-20241022": {"input": 3.00, "cached_input": 0.30, "cache_write": 3.75, "output": 15.00},
+    "claude-3-5-haiku-20241022": {"input": 0.80, "cached_input": 0.08, "cache_write": 1.00, "output": 4.00},
+}
+
+
+def estimate_cost(usage: dict, model: str) -> float:
+    """
+    Cost in USD of one call from LangChain's normalized `usage_metadata`
+    (input_tokens includes cache reads and writes). Unknown models are
+    priced as gpt-4o-mini.
+    """
+    prices = MODEL_PRICES.get(model, MODEL_PRICES["gpt-4o-mini"])
+    details = usage.get("input_token_details") or {}
+    cache_read = details.get("cache_read", 0) or 0
+    cache_write = details.get("cache_creation", 0) or 0
+    uncached = max(usage.get("input_tokens", 0) - cache_read - cache_write, 0)
+
+    cost = (
+        uncached * prices["input"]
+        + cache_read * prices["cached_input"]
+        + cache_write * prices.get("cache_write", prices["input"])
+        + usage.get("output_tokens", 0) * prices["output"]
+    )
+    return round(cost / 1_000_000, 6)
+
+
+def get_chat_model(provider: str, model: str, temperature: float = 0.7) -> BaseChatModel:
+    """Get a chat model for the given provider ("openai" or "anthropic")"""
+    return _factory(provider, model, temperature)
+
+
+def set_chat_model_factory(factory: ChatModelFactory | None) -> None:
+    """Override how chat models are built. Pass None to restore real providers."""
+    global _factory
+    _factory = factory or _provider_factory
+
+
+def preload_providers() -> dict[str, float]:
+    """
+    Import the integration package of every provider with an API key set,
+    so the first request does not pay for it (langchain_openai alone takes
+    ~0.5s). Returns milliseconds spent per provider; meant for startup.
+    """
+    timings = {}
+    for provider, (package, key_variable) in PROVIDERS.items():
+        if not os.getenv(key_variable):
+            continue
+        start = time.perf_counter()
+        importlib.import_module(package)
+        timings[provider] = round((time.perf_counter() - start) * 1000, 1)
+    return timings
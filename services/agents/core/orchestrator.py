@@ -10,25 +10,43 @@ Workflow: START → PAA Intake → Planner → Router → Specialist → Critic
 
 Features:
 - Persistent state with SQLite checkpointing (survives crashes/restarts)
-- Human-in-the-loop approval gates for sensitive operations
+- Human-in-the-loop approval gates for sensitive operations (real interrupts;
+  paused workflows are listed in the approval inbox)
 - Conditional routing based on task type
 - Comprehensive metrics tracking (cost, latency, success rate)
 - Async/await throughout for performance
 """
 
 import asyncio
+import functools
 import os
 import json
 from datetime import datetime
-from typing import TypedDict, Annotated, Sequence, Literal
+from typing import Callable, TypedDict, Annotated, NotRequired, Sequence, Literal
 from enum import Enum
 
+import aiosqlite
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
-from langgraph.prebuilt import ToolNode
+
+from .approvals import get_approval_inbox
+from .batching import critic_batch_scope, critic_batching_enabled, get_critic_batcher
+from .cascade import Tier, get_cascade_stats, min_quality, tiers_for
+from .intake_classifier import (
+    classifier_threshold,
+    get_intake_classifier,
+    get_intake_log,
+    get_intake_stats,
+    should_audit,
+)
+from .llm import estimate_cost, get_chat_model
+from .prompts import cached_tokens, system_message
+from .quotas import QuotaExceeded, get_quotas
+from .semantic_cache import get_semantic_cache, semantic_cache_enabled
+from .serialization import CompactSerializer
+from .state_bounds import append_message, load_result, record_outcome
+from .workflow_index import get_workflow_index
 
 # ============================================================================
 # STATE SCHEMA
@@ -56,6 +74,8 @@ class Outcome(TypedDict):
     timestamp: datetime
     cost: float
     latency_ms: int
+    result_ref: NotRequired[str]  # blob digest of the full result when spilled
+    model: NotRequired[str]  # model that produced the result (cascade tier)
 
 class Metrics(TypedDict):
     """Aggregate metrics for the entire workflow"""
@@ -64,6 +84,11 @@ class Metrics(TypedDict):
     success_count: int
     failure_count: int
     approval_requests: int
+    # Provider-reported usage; absent in checkpoints written before it existed
+    input_tokens: NotRequired[int]
+    cached_tokens: NotRequired[int]  # input tokens served from the provider prompt cache
+    usage_cost: NotRequired[float]   # priced from usage, including cache discounts
+    escalations: NotRequired[int]    # cascade steps up to a larger model
 
 class AgentState(TypedDict):
     """
@@ -75,16 +100,18 @@ class AgentState(TypedDict):
     user_id: str
     workflow_id: str
     
-    # Messages
+    # Messages (bounded; see core/state_bounds.py)
     messages: Annotated[Sequence[BaseMessage], "conversation history"]
+    archived_messages: list[str]
     
     # Workflow tracking
     current_step: str
     task_type: TaskType
     subtasks: list[dict]
     
-    # Results
+    # Results (bounded; large results and old outcomes live in the blob store)
     outcomes: list[Outcome]
+    archived_outcomes: list[str]
     final_summary: str | None
     
     # Approval workflow
@@ -98,24 +125,36 @@ class AgentState(TypedDict):
     error: str | None
 
 # ============================================================================
-# NODE FUNCTIONS (AGENTS)
+# MODEL DISPATCH
 # ============================================================================
 
-async def paa_intake_node(state: AgentState) -> AgentState:
-    """
-    PAA (Personal AI Assistant) analyzes the incoming request.
-    Determines task type, priority, and whether approval is needed.
-    """
-    print(f"[PAA Intake] Analyzing request for workflow {state['workflow_id']}")
-    
-    # Use Claude for intake analysis (excellent at understanding intent)
-    model = ChatAnthropic(
-        model="claude-3-5-sonnet-20241022",
-        temperature=0.3,
-        anthropic_api_key=os.getenv("ANTHROPIC_API_KEY")
-    )
-    
-    system_prompt = SystemMessage(content="""You are the PAA (Personal AI Assistant) intake analyzer.
+# Approximate cost per node run (USD); charged to quotas and reported in metrics.
+# Cascade nodes (planner, critic) are priced from each tier's token usage and
+# fall back to these when a provider reports none
+NODE_COSTS = {
+    "paa_intake": 0.005,  # Claude Sonnet
+    "paa_extract": 0.0003,  # gpt-4o-mini
+    "planner": 0.003,
+    "specialist": 0.01,
+    "critic": 0.002,
+    "paa_summarize": 0.004,
+}
+
+# Provider and model per LLM node; planner and critic try a cheaper tier
+# first (see core/cascade.py) and fall back to these
+NODE_MODELS = {
+    "paa_intake": ("anthropic", "claude-3-5-sonnet-20241022"),
+    "paa_extract": ("openai", "gpt-4o-mini"),
+    "planner": ("openai", "gpt-4o"),
+    "critic": ("openai", "gpt-4o"),
+    "paa_summarize": ("anthropic", "claude-3-5-sonnet-20241022"),
+}
+
+# System prompts are static module constants: nothing per-workflow is ever
+# interpolated into them, so every call starts with the same prefix and the
+# provider can serve it from its prompt cache (see core/prompts.py).
+NODE_PROMPTS = {
+    "paa_intake": """You are the PAA (Personal AI Assistant) intake analyzer.
 Your job is to:
 1. Understand the user's request
 2. Classify the task type
@@ -129,25 +168,327 @@ Respond in JSON format:
   "approval_reason": "explanation if approval needed",
   "extracted_params": {...},
   "priority": "high|medium|low"
-}""")
+}""",
+    "paa_extract": """You are the PAA (Personal AI Assistant) parameter extractor.
+The task type of the user's request is already known. Extract the parameters
+its specialist needs: people, companies, email addresses, recipients, leads,
+and any file (name or {"$blob": "<id>"} reference) to work on.
+
+Respond in JSON format:
+{
+  "extracted_params": {...}
+}""",
+    "planner": """You are the task planner.
+Break down the user's request into concrete subtasks.
+
+Respond in JSON:
+{
+  "subtasks": [
+    {
+      "id": "subtask_1",
+      "description": "what to do",
+      "specialist": "lead_qualifier|email_composer|data_enricher",
+      "depends_on": []
+    }
+  ],
+  "execution_order": ["subtask_1", "subtask_2"]
+}""",
+    "critic": """You are the quality critic.
+Evaluate if the specialist's output meets these criteria:
+1. Completeness: All required information present
+2. Accuracy: Results appear correct
+3. Format: Proper structure and formatting
+4. User value: Actually helpful to the user
+
+Respond in JSON:
+{
+  "passed": true|false,
+  "quality_score": 0-100,
+  "issues": ["list", "of", "problems"],
+  "recommendation": "approve|retry|escalate"
+}""",
+    "paa_summarize": """You are the PAA (Personal AI Assistant) summarizer.
+Create a clear, concise summary for the user that:
+1. States what was accomplished
+2. Highlights key insights or results
+3. Suggests next steps if applicable
+4. Uses friendly, non-technical language
+
+Keep it under 3 sentences unless critical details are needed.""",
+}
+
+# Critic prompt for micro-batched evaluations (CRITIC_BATCHING=true): same
+# criteria, one verdict per "### Item <id>" section
+BATCH_CRITIC_PROMPT = """You are the quality critic, evaluating several results at once.
+Each result starts with a line "### Item <id>". Evaluate every item on its own,
+exactly as if it were the only one, against these criteria:
+1. Completeness: All required information present
+2. Accuracy: Results appear correct
+3. Format: Proper structure and formatting
+4. User value: Actually helpful to the user
+
+Respond in JSON with one verdict per item:
+{
+  "verdicts": [
+    {
+      "id": "<id>",
+      "passed": true|false,
+      "quality_score": 0-100,
+      "issues": ["list", "of", "problems"],
+      "recommendation": "approve|retry|escalate"
+    }
+  ]
+}"""
+
+def _node_system_message(node: str, provider: str | None = None) -> SystemMessage:
+    """The node's system prompt, marked cacheable for its provider"""
+    return system_message(NODE_PROMPTS[node], provider or NODE_MODELS[node][0])
+
+def _record_usage(metrics: Metrics, usage: dict, model: str, cached: int) -> None:
+    metrics["input_tokens"] = metrics.get("input_tokens", 0) + usage.get("input_tokens", 0)
+    metrics["cached_tokens"] = metrics.get("cached_tokens", 0) + cached
+    metrics["usage_cost"] = round(metrics.get("usage_cost", 0.0) + estimate_cost(usage, model), 6)
+
+def _call_cost(node: str, usage: dict, model: str) -> float:
+    """A call's usage priced for its model; the node's flat estimate if the provider reported none"""
+    return estimate_cost(usage, model) if usage.get("total_tokens") else NODE_COSTS[node]
+
+def _parse_json(content) -> dict | None:
+    try:
+        parsed = json.loads(content)
+    except (TypeError, json.JSONDecodeError):
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+async def _invoke_model(
+    state: AgentState,
+    node: str,
+    messages: list[BaseMessage],
+    temperature: float,
+    tier: Tier | None = None,
+):
+    """
+    Dispatch a node's model call on behalf of the workflow's workspace.
+    The node's system prompt is prepended as a cacheable prefix. Enforces
+    per-workspace quotas before the call, charges usage after and adds the
+    provider-reported tokens (cached ones included) to the metrics. A cascade
+    tier is charged its usage priced for the tier's model, other calls the
+    node's NODE_COSTS estimate.
+    
+    Args:
+        tier: (provider, model) to use instead of the node's default
     
-    messages = [system_prompt] + list(state["messages"])
+    Returns:
+        (response, latency_ms)
+    """
+    provider, model_name = tier or NODE_MODELS[node]
+    quotas = get_quotas()
+    await quotas.check(state["workspace_id"])
     
     start_time = datetime.now()
-    response = await model.ainvoke(messages)
+    if node == "critic" and critic_batching_enabled():
+        # Concurrent critic requests share one provider call
+        scope = state["workspace_id"] if critic_batch_scope() == "workspace" else None
+        batcher = get_critic_batcher(_run_critic_batch)
+        response = await batcher.submit((scope, provider, model_name, temperature), messages[-1].content)
+    else:
+        model = get_chat_model(provider, model_name, temperature=temperature)
+        response = await model.ainvoke([_node_system_message(node, provider)] + messages)
     latency_ms = int((datetime.now() - start_time).total_seconds() * 1000)
     
-    # Parse PAA's analysis
-    try:
-        analysis = json.loads(response.content)
-    except json.JSONDecodeError:
-        analysis = {
-            "task_type": "general",
-            "requires_approval": False,
-            "approval_reason": None,
-            "extracted_params": {},
-            "priority": "medium"
-        }
+    usage = getattr(response, "usage_metadata", None) or {}
+    cost = _call_cost(node, usage, model_name) if tier is not None else NODE_COSTS[node]
+    await quotas.record_usage(state["workspace_id"], usage.get("total_tokens", 0), cost)
+    _record_usage(state["metrics"], usage, model_name, cached_tokens(response))
+    
+    return response, latency_ms
+
+def _split_usage(usage: dict, parts: int) -> list[dict]:
+    """Share one call's token usage between the items of a batch"""
+    def split(total: int) -> list[int]:
+        return [total // parts + (1 if i < total % parts else 0) for i in range(parts)]
+    
+    shares = [{} for _ in range(parts)]
+    for key in ("input_tokens", "output_tokens", "total_tokens"):
+        for share, value in zip(shares, split(usage.get(key, 0))):
+            share[key] = value
+    details = usage.get("input_token_details") or {}
+    for key, total in details.items():
+        for share, value in zip(shares, split(total or 0)):
+            share.setdefault("input_token_details", {})[key] = value
+    return shares
+
+async def _run_critic_batch(key: tuple, items: list[str]) -> list[AIMessage]:
+    """
+    One critic call for a micro-batch of "Evaluate this result" prompts.
+    Returns one response per item: its verdict as JSON (empty when the model
+    skipped it, which the cascade treats as a rejected answer) and its share
+    of the token usage.
+    """
+    _, provider, model_name, temperature = key
+    model = get_chat_model(provider, model_name, temperature=temperature)
+    body = "\n\n".join(f"### Item {index}\n{item}" for index, item in enumerate(items, 1))
+    # JSON mode keeps the verdict list parseable (OpenAI only)
+    options = {"response_format": {"type": "json_object"}} if provider == "openai" else {}
+    response = await model.ainvoke(
+        [system_message(BATCH_CRITIC_PROMPT, provider), HumanMessage(content=body)],
+        **options,
+    )
+    
+    verdicts = {}
+    for verdict in (_parse_json(response.content) or {}).get("verdicts") or []:
+        if isinstance(verdict, dict):
+            verdicts[str(verdict.pop("id", ""))] = verdict
+    usage = getattr(response, "usage_metadata", None) or {}
+    return [
+        AIMessage(
+            content=json.dumps(verdicts[str(index)]) if str(index) in verdicts else "",
+            usage_metadata=share,
+            response_metadata={"batch_size": len(items)},
+        )
+        for index, share in enumerate(_split_usage(usage, len(items)), 1)
+    ]
+
+async def _invoke_cascade(
+    state: AgentState,
+    node: str,
+    messages: list[BaseMessage],
+    temperature: float,
+    accept: Callable[[dict], bool],
+):
+    """
+    Run a node on its cascade tiers (core/cascade.py), cheapest first, until
+    `accept` takes the parsed JSON answer. The last tier's answer is used
+    even when rejected.
+    
+    Returns:
+        (answer or None if not JSON, total latency_ms, model used,
+         cost of every tier called)
+    """
+    stats = get_cascade_stats()
+    tiers = tiers_for(node, NODE_MODELS[node])
+    total_ms = 0
+    total_cost = 0.0
+    for index, tier in enumerate(tiers):
+        response, latency_ms = await _invoke_model(state, node, messages, temperature, tier=tier)
+        total_ms += latency_ms
+        answer = _parse_json(response.content)
+        accepted = answer is not None and accept(answer)
+        final = index == len(tiers) - 1
+        usage = getattr(response, "usage_metadata", None) or {}
+        cost = _call_cost(node, usage, tier[1])
+        total_cost += cost
+        stats.record(node, tier[1], accepted, final, latency_ms, cost)
+        if accepted or final:
+            return answer, total_ms, tier[1], round(total_cost, 6)
+        print(f"[Cascade] {node}: {tier[1]} answer rejected, escalating to {tiers[index + 1][1]}")
+        state["metrics"]["escalations"] = state["metrics"].get("escalations", 0) + 1
+
+def _valid_plan(plan: dict) -> bool:
+    """Planner answer fits the schema the router and specialists rely on"""
+    subtasks = plan.get("subtasks")
+    return (
+        isinstance(subtasks, list)
+        and bool(subtasks)
+        and all(isinstance(task, dict) and task.get("id") and task.get("specialist") for task in subtasks)
+    )
+
+def _confident_evaluation(evaluation: dict) -> bool:
+    """
+    A passing critic verdict with a high enough score. Failing or low-score
+    verdicts from a cheap tier are confirmed by the larger model before they
+    trigger a specialist retry.
+    """
+    score = evaluation.get("quality_score")
+    return (
+        evaluation.get("passed") is True
+        and evaluation.get("recommendation") == "approve"
+        and isinstance(score, (int, float))
+        and score >= min_quality()
+    )
+
+# Task types whose specialist needs no extracted params
+PARAMLESS_TASK_TYPES = frozenset({TaskType.GENERAL.value})
+
+# The part of an intake analysis a similar request may reuse: params (file,
+# leads, recipients) belong to one request and are always extracted anew
+INTAKE_ROUTING_FIELDS = ("task_type", "requires_approval", "approval_reason", "priority")
+
+async def _extract_params(state: AgentState, task_type: str, request_text: str) -> tuple[dict, int, float]:
+    """
+    extracted_params for a request routed without the intake LLM, from one
+    call to the cheap extraction model (none for PARAMLESS_TASK_TYPES)
+    
+    Returns:
+        (params, latency_ms, cost)
+    """
+    if task_type in PARAMLESS_TASK_TYPES:
+        return {}, 0, 0.0
+    message = HumanMessage(content=f"Task type: {task_type}\n\nRequest:\n{request_text}")
+    response, latency_ms = await _invoke_model(state, "paa_extract", [message], temperature=0.0)
+    params = (_parse_json(response.content) or {}).get("extracted_params")
+    return params if isinstance(params, dict) else {}, latency_ms, NODE_COSTS["paa_extract"]
+
+
+# ============================================================================
+# NODE FUNCTIONS (AGENTS)
+# ============================================================================
+
+async def paa_intake_node(state: AgentState) -> AgentState:
+    """
+    PAA (Personal AI Assistant) analyzes the incoming request.
+    Determines task type, priority, and whether approval is needed.
+    """
+    print(f"[PAA Intake] Analyzing request for workflow {state['workflow_id']}")
+    
+    # Local classifier first (core/intake_classifier.py): a confident
+    # prediction skips the LLM round trip; an audited one is checked against it
+    request_text = next((m.content for m in state["messages"] if isinstance(m, HumanMessage)), "")
+    classifier = get_intake_classifier()
+    prediction = classifier.predict(request_text) if classifier else None
+    confident = prediction is not None and prediction.confidence >= classifier_threshold()
+    skip = confident and not should_audit()
+    if prediction is not None:
+        get_intake_stats().record_prediction(skipped=skip, confident=confident)
+    
+    # Then the semantic cache (core/semantic_cache.py): a paraphrase of an
+    # earlier request in this workspace reuses its routing (never its params)
+    cache = get_semantic_cache() if semantic_cache_enabled() and not skip else None
+    hit = cache.lookup(state["workspace_id"], "intake", "intake", request_text) if cache else None
+    
+    if skip:
+        analysis = prediction.analysis()
+        analysis["extracted_params"], latency_ms, cost = await _extract_params(state, analysis["task_type"], request_text)
+        model_name = "intake-classifier"
+    elif hit is not None and not hit.audit:
+        analysis = hit.value
+        analysis["extracted_params"], latency_ms, cost = await _extract_params(state, analysis["task_type"], request_text)
+        model_name = "semantic-cache"
+    else:
+        # Claude for intake analysis (excellent at understanding intent)
+        response, latency_ms = await _invoke_model(state, "paa_intake", list(state["messages"]), temperature=0.3)
+        cost, model_name = NODE_COSTS["paa_intake"], NODE_MODELS["paa_intake"][1]
+        
+        # Parse PAA's analysis
+        analysis = _parse_json(response.content)
+        if analysis is None:
+            analysis = {
+                "task_type": "general",
+                "requires_approval": False,
+                "approval_reason": None,
+                "extracted_params": {},
+                "priority": "medium"
+            }
+        else:
+            # Training data for the classifier
+            await get_intake_log().add(state["workflow_id"], state["workspace_id"], request_text, analysis)
+            if confident:
+                get_intake_stats().record_comparison(prediction, analysis)
+            if hit is not None:
+                agreed = all(hit.value.get(key) == analysis.get(key) for key in ("task_type", "requires_approval"))
+                cache.record_audit("intake", 1.0 if agreed else 0.0)
+            elif cache is not None:
+                cache.put(state["workspace_id"], "intake", request_text, {key: analysis.get(key) for key in INTAKE_ROUTING_FIELDS})
     
     # Update state
     new_outcome = Outcome(
@@ -155,12 +496,13 @@ Respond in JSON format:
         agent_type="paa",
         result=analysis,
         timestamp=datetime.now(),
-        cost=0.005,  # Approximate cost for Claude Sonnet
-        latency_ms=latency_ms
+        cost=cost,
+        latency_ms=latency_ms,
+        model=model_name
     )
     
-    state["outcomes"].append(new_outcome)
-    state["current_step"] = "planner"
+    await record_outcome(state, new_outcome)
+    state["current_step"] = "human_approval" if analysis["requires_approval"] else "planner"
     state["task_type"] = TaskType(analysis["task_type"])
     state["approval_status"] = ApprovalStatus.PENDING if analysis["requires_approval"] else ApprovalStatus.NOT_REQUIRED
     state["approval_message"] = analysis.get("approval_reason")
@@ -169,7 +511,7 @@ Respond in JSON format:
     state["metrics"]["total_latency_ms"] += latency_ms
     state["metrics"]["success_count"] += 1
     
-    state["messages"].append(AIMessage(content=f"PAA Analysis: {json.dumps(analysis, indent=2)}"))
+    await append_message(state, AIMessage(content=f"PAA Analysis: {json.dumps(analysis, indent=2)}"))
     
     return state
 
@@ -181,37 +523,12 @@ async def planner_node(state: AgentState) -> AgentState:
     """
     print(f"[Planner] Creating execution plan for {state['task_type']}")
     
-    model = ChatOpenAI(
-        model="gpt-4o",
-        temperature=0.2,
-        openai_api_key=os.getenv("OPENAI_API_KEY")
+    # Cheap tier first; escalate when the plan does not fit the schema
+    plan, latency_ms, model_name, cost = await _invoke_cascade(
+        state, "planner", list(state["messages"]), temperature=0.2, accept=_valid_plan,
     )
     
-    system_prompt = SystemMessage(content="""You are the task planner.
-Break down the user's request into concrete subtasks.
-
-Respond in JSON:
-{
-  "subtasks": [
-    {
-      "id": "subtask_1",
-      "description": "what to do",
-      "specialist": "lead_qualifier|email_composer|data_enricher",
-      "depends_on": []
-    }
-  ],
-  "execution_order": ["subtask_1", "subtask_2"]
-}""")
-    
-    messages = [system_prompt] + list(state["messages"])
-    
-    start_time = datetime.now()
-    response = await model.ainvoke(messages)
-    latency_ms = int((datetime.now() - start_time).total_seconds() * 1000)
-    
-    try:
-        plan = json.loads(response.content)
-    except json.JSONDecodeError:
+    if plan is None or not _valid_plan(plan):
         plan = {
             "subtasks": [{"id": "main_task", "description": "Process request", "specialist": "general", "depends_on": []}],
             "execution_order": ["main_task"]
@@ -222,18 +539,19 @@ Respond in JSON:
         agent_type="planner",
         result=plan,
         timestamp=datetime.now(),
-        cost=0.003,
-        latency_ms=latency_ms
+        cost=cost,
+        latency_ms=latency_ms,
+        model=model_name
     )
     
-    state["outcomes"].append(new_outcome)
+    await record_outcome(state, new_outcome)
     state["subtasks"] = plan["subtasks"]
     state["current_step"] = "router"
     state["metrics"]["total_cost"] += new_outcome["cost"]
     state["metrics"]["total_latency_ms"] += latency_ms
     state["metrics"]["success_count"] += 1
     
-    state["messages"].append(AIMessage(content=f"Plan: {json.dumps(plan, indent=2)}"))
+    await append_message(state, AIMessage(content=f"Plan: {json.dumps(plan, indent=2)}"))
     
     return state
 
@@ -252,37 +570,53 @@ async def router_node(state: AgentState) -> AgentState:
 
 async def specialist_node(state: AgentState) -> AgentState:
     """
-    Executes the specialist agent for the given task type.
-    In Phase 1.2, this will dispatch to actual specialist implementations.
-    For now, it's a placeholder that simulates specialist work.
+    Executes the specialist registered for the task type (see
+    specialists/registry.py), within its concurrency limit and timeout.
+    A failed or timed-out specialist becomes an error result for the critic.
     """
+    # Imported here: specialist plugins import core themselves
+    from specialists import SpecialistContext, get_specialist_registry
+    
     print(f"[Specialist] Executing {state['task_type']} specialist")
     
-    # Placeholder: In Phase 1.2, this will call actual specialists
-    # For now, simulate specialist work
-    specialist_result = {
-        "status": "success",
-        "task_type": state["task_type"],
-        "result": f"Simulated result for {state['task_type']}",
-        "confidence": 0.95
-    }
+    intake = next((o for o in state["outcomes"] if o["agent_id"] == "paa_intake"), None)
+    params = (await load_result(intake)).get("extracted_params") if intake else None
+    context = SpecialistContext(
+        workspace_id=state["workspace_id"],
+        workflow_id=state["workflow_id"],
+        task_type=TaskType(state["task_type"]).value,
+        message=str(state["messages"][0].content) if state["messages"] else "",
+        params=params if isinstance(params, dict) else {},
+        subtasks=list(state["subtasks"]),
+    )
+    
+    start_time = datetime.now()
+    try:
+        _, specialist_result = await get_specialist_registry().dispatch(context)
+        state["metrics"]["success_count"] += 1
+    except QuotaExceeded:
+        raise
+    except Exception as e:
+        print(f"[Specialist] Failed: {e}")
+        specialist_result = {"status": "error", "task_type": context.task_type, "error": str(e) or type(e).__name__}
+        state["metrics"]["failure_count"] += 1
+    latency_ms = int((datetime.now() - start_time).total_seconds() * 1000)
     
     new_outcome = Outcome(
         agent_id=f"specialist_{state['task_type']}",
         agent_type="specialist",
         result=specialist_result,
         timestamp=datetime.now(),
-        cost=0.01,
-        latency_ms=500
+        cost=NODE_COSTS["specialist"],
+        latency_ms=latency_ms
     )
     
-    state["outcomes"].append(new_outcome)
+    await record_outcome(state, new_outcome)
     state["current_step"] = "critic"
     state["metrics"]["total_cost"] += new_outcome["cost"]
-    state["metrics"]["total_latency_ms"] += 500
-    state["metrics"]["success_count"] += 1
+    state["metrics"]["total_latency_ms"] += latency_ms
     
-    state["messages"].append(AIMessage(content=f"Specialist Result: {json.dumps(specialist_result, indent=2)}"))
+    await append_message(state, AIMessage(content=f"Specialist Result: {json.dumps(specialist_result, indent=2, default=str)}"))
     
     return state
 
@@ -294,42 +628,20 @@ async def critic_node(state: AgentState) -> AgentState:
     """
     print(f"[Critic] Evaluating specialist output")
     
-    model = ChatOpenAI(
-        model="gpt-4o",
-        temperature=0.1,
-        openai_api_key=os.getenv("OPENAI_API_KEY")
-    )
-    
-    system_prompt = SystemMessage(content="""You are the quality critic.
-Evaluate if the specialist's output meets these criteria:
-1. Completeness: All required information present
-2. Accuracy: Results appear correct
-3. Format: Proper structure and formatting
-4. User value: Actually helpful to the user
-
-Respond in JSON:
-{
-  "passed": true|false,
-  "quality_score": 0-100,
-  "issues": ["list", "of", "problems"],
-  "recommendation": "approve|retry|escalate"
-}""")
-    
-    # Get last specialist outcome
+    # Get last specialist outcome (full result, even if it was spilled)
     specialist_outcome = [o for o in state["outcomes"] if o["agent_type"] == "specialist"][-1]
+    specialist_result = await load_result(specialist_outcome)
     
     messages = [
-        system_prompt,
-        HumanMessage(content=f"Evaluate this result:\n{json.dumps(specialist_outcome['result'], indent=2)}")
+        HumanMessage(content=f"Evaluate this result:\n{json.dumps(specialist_result, indent=2)}")
     ]
     
-    start_time = datetime.now()
-    response = await model.ainvoke(messages)
-    latency_ms = int((datetime.now() - start_time).total_seconds() * 1000)
+    # Cheap tier first; a failing or unsure verdict is re-checked by the larger model
+    evaluation, latency_ms, model_name, cost = await _invoke_cascade(
+        state, "critic", messages, temperature=0.1, accept=_confident_evaluation,
+    )
     
-    try:
-        evaluation = json.loads(response.content)
-    except json.JSONDecodeError:
+    if evaluation is None:
         evaluation = {
             "passed": True,
             "quality_score": 80,
@@ -342,17 +654,18 @@ Respond in JSON:
         agent_type="critic",
         result=evaluation,
         timestamp=datetime.now(),
-        cost=0.002,
-        latency_ms=latency_ms
+        cost=cost,
+        latency_ms=latency_ms,
+        model=model_name
     )
     
-    state["outcomes"].append(new_outcome)
+    await record_outcome(state, new_outcome)
     state["current_step"] = "paa_summarize"
     state["metrics"]["total_cost"] += new_outcome["cost"]
     state["metrics"]["total_latency_ms"] += latency_ms
     state["metrics"]["success_count"] += 1
     
-    state["messages"].append(AIMessage(content=f"Critic Evaluation: {json.dumps(evaluation, indent=2)}"))
+    await append_message(state, AIMessage(content=f"Critic Evaluation: {json.dumps(evaluation, indent=2)}"))
     
     return state
 
@@ -364,60 +677,43 @@ async def paa_summarize_node(state: AgentState) -> AgentState:
     """
     print(f"[PAA Summarize] Creating final summary")
     
-    model = ChatAnthropic(
-        model="claude-3-5-sonnet-20241022",
-        temperature=0.7,
-        anthropic_api_key=os.getenv("ANTHROPIC_API_KEY")
-    )
-    
-    system_prompt = SystemMessage(content="""You are the PAA (Personal AI Assistant) summarizer.
-Create a clear, concise summary for the user that:
-1. States what was accomplished
-2. Highlights key insights or results
-3. Suggests next steps if applicable
-4. Uses friendly, non-technical language
-
-Keep it under 3 sentences unless critical details are needed.""")
-    
-    # Gather all outcomes for context
+    # Gather all outcomes for context. Results are the bounded in-state
+    # previews, so the prompt does not grow with payload size.
     outcomes_summary = "\n".join([
         f"- {o['agent_id']}: {json.dumps(o['result'])}"
         for o in state["outcomes"]
     ])
     
     messages = [
-        system_prompt,
         HumanMessage(content=f"Summarize this workflow:\n{outcomes_summary}")
     ]
     
-    start_time = datetime.now()
-    response = await model.ainvoke(messages)
-    latency_ms = int((datetime.now() - start_time).total_seconds() * 1000)
+    response, latency_ms = await _invoke_model(state, "paa_summarize", messages, temperature=0.7)
     
     state["final_summary"] = response.content
     state["current_step"] = "complete"
-    state["metrics"]["total_cost"] += 0.004
+    state["metrics"]["total_cost"] += NODE_COSTS["paa_summarize"]
     state["metrics"]["total_latency_ms"] += latency_ms
     state["metrics"]["success_count"] += 1
     
-    state["messages"].append(AIMessage(content=f"Summary: {response.content}"))
+    await append_message(state, AIMessage(content=f"Summary: {response.content}"))
     
     return state
 
 
 async def human_approval_node(state: AgentState) -> AgentState:
     """
-    Blocks execution and waits for human approval.
-    This is called when state["approval_status"] == PENDING.
+    Applies the reviewer's decision.
+    
+    The graph is compiled with interrupt_before=["human_approval"], so execution
+    pauses (and checkpoints) before this node. It only runs once
+    update_approval_status() has written APPROVED/REJECTED into the state.
     """
-    print(f"[Human Approval] Waiting for approval on workflow {state['workflow_id']}")
-    print(f"Reason: {state['approval_message']}")
+    print(f"[Human Approval] Workflow {state['workflow_id']} {state['approval_status']}")
     
     # Mark that an approval was requested
     state["metrics"]["approval_requests"] += 1
-    
-    # The workflow will pause here until approved/rejected via API
-    # See: apps/web/app/api/agents/approve/[workflow_id]/route.ts
+    state["current_step"] = "planner" if state["approval_status"] == ApprovalStatus.APPROVED else "rejected"
     
     return state
 
@@ -426,8 +722,12 @@ async def human_approval_node(state: AgentState) -> AgentState:
 # ============================================================================
 
 def should_request_approval(state: AgentState) -> Literal["request_approval", "continue"]:
-    """After PAA intake, decide if approval is needed"""
-    if state["approval_status"] == ApprovalStatus.PENDING:
+    """
+    After PAA intake, decide if approval is needed.
+    Re-evaluated when update_approval_status() writes the decision, so any
+    status other than NOT_REQUIRED must route through human_approval.
+    """
+    if state["approval_status"] != ApprovalStatus.NOT_REQUIRED:
         return "request_approval"
     return "continue"
 
@@ -449,25 +749,49 @@ def should_retry(state: AgentState) -> Literal["retry", "continue"]:
 # WORKFLOW BUILDER
 # ============================================================================
 
-async def create_workflow() -> StateGraph:
+def _indexed(node):
+    """Wrap a node so the workflow query index is updated on every transition"""
+    @functools.wraps(node)
+    async def run(state: AgentState) -> AgentState:
+        new_state = await node(state)
+        await get_workflow_index().upsert(new_state)
+        return new_state
+    return run
+
+
+CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", "./core/checkpoints.db")
+CHECKPOINT_SERIALIZER = os.getenv("CHECKPOINT_SERIALIZER", "compact")
+
+
+def create_serializer():
+    """
+    Checkpoint serializer selected by CHECKPOINT_SERIALIZER:
+    "compact" (msgpack + type tags + zstd) or "default" (LangGraph's own).
+    Compact reads default-format checkpoints, so switching needs no migration.
+    """
+    if CHECKPOINT_SERIALIZER == "default":
+        return None
+    return CompactSerializer(
+        enums=[TaskType, ApprovalStatus],
+        compress_threshold=int(os.getenv("CHECKPOINT_COMPRESS_THRESHOLD", "16384")),
+    )
+
+async def create_workflow(checkpointer: AsyncSqliteSaver) -> StateGraph:
     """
     Builds the complete LangGraph workflow with all nodes and edges.
     """
     
-    # Initialize checkpointer (persists state to SQLite)
-    checkpointer = AsyncSqliteSaver.from_conn_string("./core/checkpoints.db")
-    
     # Create the graph
     workflow = StateGraph(AgentState)
     
     # Add all nodes
-    workflow.add_node("paa_intake", paa_intake_node)
-    workflow.add_node("human_approval", human_approval_node)
-    workflow.add_node("planner", planner_node)
-    workflow.add_node("router", router_node)
-    workflow.add_node("specialist", specialist_node)
-    workflow.add_node("critic", critic_node)
-    workflow.add_node("paa_summarize", paa_summarize_node)
+    workflow.add_node("paa_intake", _indexed(paa_intake_node))
+    workflow.add_node("human_approval", _indexed(human_approval_node))
+    workflow.add_node("planner", _indexed(planner_node))
+    workflow.add_node("router", _indexed(router_node))
+    workflow.add_node("specialist", _indexed(specialist_node))
+    workflow.add_node("critic", _indexed(critic_node))
+    workflow.add_node("paa_summarize", _indexed(paa_summarize_node))
     
     # Define edges
     workflow.set_entry_point("paa_intake")
@@ -509,8 +833,63 @@ async def create_workflow() -> StateGraph:
     workflow.add_edge("specialist", "critic")
     workflow.add_edge("paa_summarize", END)
     
-    # Compile with checkpointing
-    return workflow.compile(checkpointer=checkpointer)
+    # Compile with checkpointing; pause before the approval gate so the
+    # workflow genuinely waits for update_approval_status()
+    return workflow.compile(checkpointer=checkpointer, interrupt_before=["human_approval"])
+
+
+_workflow = None
+_workflow_conn: aiosqlite.Connection | None = None
+_workflow_loop: asyncio.AbstractEventLoop | None = None
+_workflow_lock: asyncio.Lock | None = None
+
+async def get_workflow():
+    """
+    Compiled workflow shared by every execution in this process.
+    The graph is compiled and the checkpoint DB opened once per event loop,
+    not on every execute/resume call.
+    """
+    global _workflow, _workflow_conn, _workflow_loop, _workflow_lock
+    
+    loop = asyncio.get_running_loop()
+    if _workflow_loop is not loop:
+        await close_workflow()
+        _workflow_loop = loop
+        _workflow_lock = asyncio.Lock()
+    
+    async with _workflow_lock:
+        if _workflow is None:
+            directory = os.path.dirname(CHECKPOINT_DB_PATH)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            
+            # Initialize checkpointer (persists state to SQLite)
+            _workflow_conn = await aiosqlite.connect(CHECKPOINT_DB_PATH)
+            _workflow = await create_workflow(
+                AsyncSqliteSaver(_workflow_conn, serde=create_serializer())
+            )
+    
+    return _workflow
+
+
+async def close_workflow() -> None:
+    """Close the shared checkpoint connection (service shutdown, tests)"""
+    global _workflow, _workflow_conn, _workflow_loop
+    
+    if _workflow_conn is not None:
+        await _workflow_conn.close()
+    _workflow = None
+    _workflow_conn = None
+    _workflow_loop = None
+
+
+def _thread_config(workflow_id: str) -> dict:
+    """Checkpoint config for a workflow thread"""
+    return {
+        "configurable": {
+            "thread_id": workflow_id
+        }
+    }
 
 # ============================================================================
 # EXECUTION FUNCTIONS
@@ -551,10 +930,12 @@ async def execute_workflow(
         "user_id": user_id,
         "workflow_id": workflow_id,
         "messages": [HumanMessage(content=user_message)],
+        "archived_messages": [],
         "current_step": "paa_intake",
         "task_type": TaskType.GENERAL,
         "subtasks": [],
         "outcomes": [],
+        "archived_outcomes": [],
         "final_summary": None,
         "approval_status": ApprovalStatus.NOT_REQUIRED,
         "approval_message": None,
@@ -563,62 +944,87 @@ async def execute_workflow(
             "total_latency_ms": 0,
             "success_count": 0,
             "failure_count": 0,
-            "approval_requests": 0
+            "approval_requests": 0,
+            "input_tokens": 0,
+            "cached_tokens": 0,
+            "usage_cost": 0.0,
+            "escalations": 0
         },
         "error": None
     }
     
-    # Create and execute workflow
-    app = await create_workflow()
-    
-    config = {
-        "configurable": {
-            "thread_id": workflow_id,
-            "checkpoint_ns": workspace_id
-        }
-    }
+    quotas = get_quotas()
+    index = get_workflow_index()
+    lease_id = None
     
     try:
+        # Hold a concurrency slot for the workspace while the workflow runs
+        lease_id = await quotas.acquire(workspace_id)
+        await index.upsert(initial_state)
+        
         # Run workflow (automatically checkpoints at each step)
-        final_state = await app.ainvoke(initial_state, config)
+        app = await get_workflow()
+        final_state = await app.ainvoke(initial_state, _thread_config(workflow_id))
+        
+        # Interrupted before human_approval: list it in the inbox and return
+        if final_state["approval_status"] == ApprovalStatus.PENDING:
+            await get_approval_inbox().add(
+                workflow_id,
+                workspace_id,
+                user_id,
+                final_state.get("approval_message"),
+            )
+            print(f"⏸  Workflow awaiting approval: {workflow_id}")
+            return final_state
         
         print(f"\n{'='*60}")
         print(f"Workflow complete: {workflow_id}")
         print(f"Summary: {final_state.get('final_summary', 'No summary')}")
         print(f"Total cost: ${final_state['metrics']['total_cost']:.4f}")
         print(f"Total time: {final_state['metrics']['total_latency_ms']}ms")
+        print(f"Cached input tokens: {final_state['metrics'].get('cached_tokens', 0)}/{final_state['metrics'].get('input_tokens', 0)}")
         print(f"{'='*60}\n")
         
         return final_state
         
+    except QuotaExceeded as e:
+        print(f"⏳ Workflow throttled: {str(e)}")
+        await index.mark(workflow_id, "throttled", str(e))
+        return {
+            "error": str(e),
+            "workflow_id": workflow_id,
+            "retry_after": e.retry_after,
+            "metrics": initial_state["metrics"]
+        }
+        
     except Exception as e:
         print(f"❌ Workflow failed: {str(e)}")
+        await index.mark(workflow_id, "failed", str(e))
         return {
             "error": str(e),
             "workflow_id": workflow_id,
             "metrics": initial_state["metrics"]
         }
+    
+    finally:
+        await quotas.release(lease_id)
 
 
 async def resume_workflow(workflow_id: str) -> dict:
     """
-    Resume a paused workflow from checkpoint.
-    Used when user approves/rejects during human_approval_node.
+    Resume a paused or interrupted workflow from its last checkpoint.
+    Approvals go through update_approval_status(); this is for recovery
+    (e.g. a resume that was throttled or crashed part-way).
     """
     print(f"Resuming workflow: {workflow_id}")
     
-    app = await create_workflow()
-    
-    config = {
-        "configurable": {
-            "thread_id": workflow_id
-        }
-    }
+    app = await get_workflow()
+    config = _thread_config(workflow_id)
     
     # Get current state from checkpoint
     state = await app.aget_state(config)
     
-    if not state:
+    if not state or not state.values:
         return {"error": "Workflow not found", "workflow_id": workflow_id}
     
     # Continue execution
@@ -633,40 +1039,88 @@ async def update_approval_status(
     workspace_id: str
 ) -> dict:
     """
-    Update approval status for a paused workflow.
+    Record a reviewer's decision on a paused workflow and resume it.
     Called from the API endpoint when user approves/rejects.
+    
+    The inbox entry is claimed first so a workflow is resumed at most once.
+    Resuming is a single partial state write plus ainvoke(None) on the
+    shared compiled graph - no recompiling, no extra checkpoint reads.
     """
-    app = await create_workflow()
+    inbox = get_approval_inbox()
+    quotas = get_quotas()
+    status = ApprovalStatus.APPROVED if approved else ApprovalStatus.REJECTED
     
-    config = {
-        "configurable": {
-            "thread_id": workflow_id,
-            "checkpoint_ns": workspace_id
-        }
-    }
+    try:
+        lease_id = await quotas.acquire(workspace_id)
+    except QuotaExceeded as e:
+        return {"error": str(e), "workflow_id": workflow_id, "retry_after": e.retry_after}
     
-    # Get current state
-    state = await app.aget_state(config)
+    try:
+        if not await inbox.claim(workflow_id, workspace_id, status.value):
+            return {"error": "Workflow not awaiting approval", "workflow_id": workflow_id}
+        
+        app = await get_workflow()
+        config = _thread_config(workflow_id)
+        
+        try:
+            # Written as paa_intake's output so should_request_approval
+            # routes into human_approval, which applies the decision
+            await app.aupdate_state(config, {"approval_status": status}, as_node="paa_intake")
+        except Exception:
+            await inbox.release(workflow_id)
+            raise
+        
+        try:
+            # Rejected workflows also resume so the graph runs to END
+            final_state = await app.ainvoke(None, config)
+        except Exception:
+            # Decision is checkpointed; keep the workflow findable for resume_workflow()
+            await inbox.mark_failed(workflow_id)
+            await get_workflow_index().mark(workflow_id, "failed", "Resume after approval failed")
+            raise
+        
+    except QuotaExceeded as e:
+        print(f"⏳ Approval resume throttled: {str(e)}")
+        return {"error": str(e), "workflow_id": workflow_id, "retry_after": e.retry_after}
+        
+    except Exception as e:
+        print(f"❌ Approval resume failed: {str(e)}")
+        return {"error": str(e), "workflow_id": workflow_id}
     
-    if not state:
-        return {"error": "Workflow not found"}
+    finally:
+        await quotas.release(lease_id)
     
-    # Update approval status
-    current_values = state.values
-    current_values["approval_status"] = ApprovalStatus.APPROVED if approved else ApprovalStatus.REJECTED
+    if approved:
+        return final_state
+    return {
+        "status": "rejected",
+        "workflow_id": workflow_id,
+        "message": "Workflow rejected by user"
+    }
+
+
+async def bulk_update_approval_status(
+    workflow_ids: list[str],
+    approved: bool,
+    workspace_id: str,
+    max_concurrency: int = 4
+) -> dict[str, dict]:
+    """
+    Approve or reject many paused workflows in one call.
+    Workflows resume concurrently (bounded by max_concurrency).
     
-    # Update checkpoint
-    await app.aupdate_state(config, current_values)
+    Returns:
+        workflow_id -> result of update_approval_status
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    unique_ids = list(dict.fromkeys(workflow_ids))
     
-    # Resume workflow
-    if approved:
-        return await resume_workflow(workflow_id)
-    else:
-        return {
-            "status": "rejected",
-            "workflow_id": workflow_id,
-            "message": "Workflow rejected by user"
-        }
+    async def decide(workflow_id: str) -> dict:
+        async with semaphore:
+            return await update_approval_status(workflow_id, approved, workspace_id)
+    
+    results = await asyncio.gather(*(decide(workflow_id) for workflow_id in unique_ids))
+    return dict(zip(unique_ids, results))
 
 # ============================================================================
 # TEST HELPERS
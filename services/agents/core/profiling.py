@@ -0,0 +1,341 @@
+"""
+GalaxyCo.ai - On-Demand Profiling
+==================================
+
+Tools for finding out where a live worker spends its time, exposed through
+the admin endpoints in app.py:
+
+- `SamplingProfiler`: a background thread samples the event-loop thread's
+  Python stack every few milliseconds for N seconds and writes the result in
+  folded-stack format (`frame;frame;frame count`), which flamegraph.pl,
+  speedscope and inferno read directly
+- `dump_tasks()`: name, coroutine and current stack of every asyncio task
+- `LoopLagMonitor`: how late the event loop wakes up a periodic timer,
+  recorded in a histogram; lag is time the loop could not run callbacks. Its
+  watchdog thread prints the stack of any callback that blocks the loop for
+  longer than a threshold
+
+The profiler thread only exists while a profile is being taken. The lag
+monitor (one timer wakeup per interval plus a mostly idle watchdog thread)
+runs for the life of the worker unless LOOP_LAG_INTERVAL_MS=0.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from typing import Optional
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "./data/profiles")
+
+MAX_PROFILE_SECONDS = 120.0
+
+# Upper bounds (ms) of the loop lag histogram buckets; the last bucket is open
+LAG_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class ProfileInProgress(RuntimeError):
+    """Only one sampling profile can run per worker at a time"""
+
+
+# ============================================================================
+# SAMPLING PROFILER
+# ============================================================================
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    # Keep labels short and stable across machines
+    for prefix in sys.path:
+        if prefix and filename.startswith(prefix + os.sep):
+            filename = filename[len(prefix) + 1:]
+            break
+    return f"{code.co_qualname} ({filename}:{code.co_firstlineno})"
+
+
+def _collapse(frame) -> str:
+    """Root-first, semicolon-joined stack of a frame"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler for one thread (by default the calling thread, i.e.
+    the event loop). The sampler thread holds the GIL only for the duration
+    of one stack walk, so overhead is roughly proportional to the sampling
+    rate and zero when no profile is running.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, interval_s: float = 0.005, thread_id: Optional[int] = None):
+        self.interval_s = interval_s
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if not SamplingProfiler._lock.acquire(blocking=False):
+            raise ProfileInProgress("A profile is already running on this worker")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            SamplingProfiler._lock.release()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.stacks[_collapse(frame)] += 1
+            self.samples += 1
+
+    def folded(self) -> str:
+        """Folded stacks, one `stack count` per line, most frequent first"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top(self, limit: int = 20) -> list[dict]:
+        """Functions by self time (share of samples where they were on top)"""
+        leaf = Counter()
+        for stack, count in self.stacks.items():
+            leaf[stack.rsplit(";", 1)[-1]] += count
+        total = self.samples or 1
+        return [
+            {"frame": frame, "samples": count, "percent": round(100 * count / total, 2)}
+            for frame, count in leaf.most_common(limit)
+        ]
+
+    def write(self, directory: Optional[str] = None) -> str:
+        """Write folded stacks to <directory>/profile-<pid>-<timestamp>.folded (default PROFILE_DIR)"""
+        directory = directory or PROFILE_DIR
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+        path = os.path.join(directory, f"profile-{os.getpid()}-{stamp}.folded")
+        with open(path, "w") as f:
+            f.write(self.folded())
+        return path
+
+
+async def profile_for(seconds: float, interval_s: float = 0.005, directory: Optional[str] = None) -> dict:
+    """
+    Sample the event-loop thread for `seconds` while it keeps serving
+    requests, then write the folded stacks. Returns the file path, sample
+    count and the top functions by self time.
+    """
+    seconds = max(0.1, min(seconds, MAX_PROFILE_SECONDS))
+    profiler = SamplingProfiler(interval_s=interval_s)
+    profiler.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profiler.stop()
+    path = await asyncio.to_thread(profiler.write, directory)
+    return {
+        "path": path,
+        "seconds": seconds,
+        "interval_ms": interval_s * 1000,
+        "samples": profiler.samples,
+        "top": profiler.top(),
+    }
+
+
+# ============================================================================
+# ASYNCIO TASKS
+# ============================================================================
+
+def dump_tasks(limit_frames: int = 20) -> list[dict]:
+    """Every pending task on the running loop with its current await stack"""
+    tasks = []
+    for task in asyncio.all_tasks():
+        coro = task.get_coro()
+        stack = [
+            f"{frame.f_code.co_qualname} ({frame.f_code.co_filename}:{frame.f_lineno})"
+            for frame in task.get_stack(limit=limit_frames)
+        ]
+        tasks.append({
+            "name": task.get_name(),
+            "coroutine": getattr(coro, "__qualname__", repr(coro)),
+            "done": task.done(),
+            "stack": stack,
+        })
+    tasks.sort(key=lambda entry: entry["name"])
+    return tasks
+
+
+# ============================================================================
+# EVENT LOOP LAG
+# ============================================================================
+
+class LagHistogram:
+    """Bucketed counts plus a window of recent samples for percentiles"""
+
+    def __init__(self, window: int = 4096):
+        self.buckets = [0] * (len(LAG_BUCKETS_MS) + 1)
+        self.recent: deque = deque(maxlen=window)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, lag_ms: float) -> None:
+        index = next((i for i, bound in enumerate(LAG_BUCKETS_MS) if lag_ms <= bound), len(LAG_BUCKETS_MS))
+        self.buckets[index] += 1
+        self.recent.append(lag_ms)
+        self.count += 1
+        self.total_ms += lag_ms
+        self.max_ms = max(self.max_ms, lag_ms)
+
+    def percentile(self, pct: float) -> float:
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+    def summary(self) -> dict:
+        labels = [f"le_{bound}ms" for bound in LAG_BUCKETS_MS] + [f"gt_{LAG_BUCKETS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50), 3),
+            "p90_ms": round(self.percentile(90), 3),
+            "p99_ms": round(self.percentile(99), 3),
+            "max_ms": round(self.max_ms, 3),
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class LoopLagMonitor:
+    """
+    Measures event-loop lag: a task sleeps `interval_s` and records how much
+    later than requested it was resumed. Any callback that holds the loop
+    (CPU work, blocking I/O) shows up as lag for everything else.
+
+    With `block_threshold_s` set, a watchdog thread also checks the monitor's
+    heartbeat. When the loop has not run for longer than the threshold, it
+    captures the loop thread's stack while the offending callback is still
+    running, prints it, and keeps the stall (stack plus final duration) in
+    `stalls`.
+    """
+
+    def __init__(self, interval_s: float = 0.1, block_threshold_s: Optional[float] = None, max_stalls: int = 50):
+        self.interval_s = interval_s
+        self.block_threshold_s = block_threshold_s
+        self.histogram = LagHistogram()
+        self.stalls: deque = deque(maxlen=max_stalls)
+        self.stall_count = 0
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = 0.0
+        self._pending_stall: Optional[dict] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._task = asyncio.create_task(self._run(), name="loop-lag-monitor")
+        if self.block_threshold_s:
+            self._stop.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        if self._watchdog is not None:
+            self._stop.set()
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval_s
+            await asyncio.sleep(self.interval_s)
+            lag_ms = max(0.0, loop.time() - expected) * 1000
+            self._last_beat = time.monotonic()
+            self.histogram.record(lag_ms)
+            stall, self._pending_stall = self._pending_stall, None
+            if stall is not None:
+                stall["lag_ms"] = round(lag_ms, 3)
+
+    def _watch(self) -> None:
+        """Watchdog thread: catch the loop while it is blocked"""
+        poll_s = min(self.interval_s, self.block_threshold_s) / 4
+        while not self._stop.wait(poll_s):
+            silent_s = time.monotonic() - self._last_beat - self.interval_s
+            if silent_s < self.block_threshold_s or self._pending_stall is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = traceback.format_stack(frame) if frame is not None else []
+            stall = {
+                "detected_at": time.time(),
+                "blocked_ms": round(silent_s * 1000, 3),
+                "lag_ms": None,
+                "stack": [line.rstrip() for line in stack],
+            }
+            self._pending_stall = stall
+            self.stalls.append(stall)
+            self.stall_count += 1
+            print(
+                f"[LoopWatchdog] Event loop blocked for >{silent_s * 1000:.0f}ms, current stack:\n"
+                + "".join(stack),
+                file=sys.stderr,
+            )
+
+    def summary(self) -> dict:
+        return {
+            "running": self.running,
+            "interval_ms": self.interval_s * 1000,
+            "block_threshold_ms": self.block_threshold_s and self.block_threshold_s * 1000,
+            **self.histogram.summary(),
+            "stall_count": self.stall_count,
+            "stalls": list(self.stalls),
+        }
+
+
+_monitor: Optional[LoopLagMonitor] = None
+
+
+def get_loop_monitor() -> LoopLagMonitor:
+    """
+    Process-wide lag monitor: LOOP_LAG_INTERVAL_MS (default 100, 0 = off)
+    and LOOP_BLOCK_THRESHOLD_MS for the watchdog (default 250, 0 = off)
+    """
+    global _monitor
+    if _monitor is None:
+        block_threshold_ms = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "250"))
+        _monitor = LoopLagMonitor(
+            float(os.getenv("LOOP_LAG_INTERVAL_MS") or 100) / 1000,
+            block_threshold_s=block_threshold_ms / 1000 or None,
+        )
+    return _monitor
+
+
+def loop_monitor_enabled() -> bool:
+    return os.getenv("LOOP_LAG_INTERVAL_MS", "100") not in ("", "0")
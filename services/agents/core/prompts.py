@@ -0,0 +1,250 @@
+"""
+GalaxyCo.ai - Prompt Registry
+==============================
+
+System and user prompts for `/execute` agent types, built once at import
+instead of per request, plus versioned custom system prompts stored by id so
+clients send `promptId` instead of the full text on every call.
+
+Prompts are laid out for provider-side prompt caching: the system prompt is
+a stable prefix (nothing request-specific is ever interpolated into it) and
+comes first, which is all OpenAI's automatic prefix caching needs. For
+Anthropic, `system_message()` marks it with `cache_control`. Either way the
+provider reports cached input tokens in `usage_metadata`, see
+`cached_tokens()`.
+
+Stored prompts live in a local SQLite file (PROMPT_DB_PATH). Versions are
+immutable; saving an existing `prompt_id` creates the next version.
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import aiosqlite
+from langchain_core.messages import SystemMessage
+
+from . import sqlite
+
+# ============================================================================
+# BUILT-IN TEMPLATES
+# ============================================================================
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """System prompt plus a user message template for one agent type"""
+    agent_type: str
+    system: str
+    # str.format template over `inputs`; used when all `required` inputs are
+    # present, otherwise the generic key/value listing
+    user: Optional[str] = None
+    required: tuple[str, ...] = ()
+    defaults: dict[str, str] = field(default_factory=dict)
+
+    def render_user(self, inputs: dict[str, Any]) -> str:
+        if self.user is not None and all(key in inputs for key in self.required):
+            return self.user.format_map({**self.defaults, **inputs})
+        return "Input data:\n\n" + "".join(f"{key}: {value}\n" for key, value in inputs.items())
+
+
+TEMPLATES: dict[str, PromptTemplate] = {
+    "scope": PromptTemplate(
+        agent_type="scope",
+        system="""You are a Scope Agent that analyzes emails and extracts action items.
+
+Analyze the provided email and identify:
+        1. Key action items that need to be completed
+        2. Priority level (high, medium, low)
+        3. Overall sentiment of the email
+
+Provide a concise summary and list of actionable items.""",
+        user="""Email to analyze:
+
+Subject: {subject}
+
+{email_content}
+
+Please provide your analysis.""",
+        required=("email_content",),
+        defaults={"subject": "No subject"},
+    ),
+    "email": PromptTemplate(
+        agent_type="email",
+        system="""You are an Email Composer Agent that drafts professional email responses.
+
+Based on the provided context and requirements, compose a clear, professional email response.
+Match the tone to the situation and ensure all key points are addressed.""",
+        user="""Context: {context}
+
+Requirements: {requirements}
+
+Please compose the email.""",
+        required=("context",),
+        defaults={"requirements": "Draft a professional response"},
+    ),
+    "call": PromptTemplate(
+        agent_type="call",
+        system="""You are a Call Summary Agent that analyzes sales call transcripts.
+
+Review the call transcript and identify:
+        1. Key discussion points
+        2. Customer needs and pain points
+        3. Next steps and action items
+        4. Deal stage and qualification level""",
+        user="""Call Transcript:
+
+{transcript}
+
+Please analyze this call and provide a summary.""",
+        required=("transcript",),
+    ),
+    "custom": PromptTemplate(
+        agent_type="custom",
+        system="""You are a helpful AI assistant.
+
+Analyze the provided input and generate a helpful, accurate response.""",
+    ),
+}
+
+
+def get_template(agent_type: str) -> PromptTemplate:
+    """Template for an agent type; unknown types use the generic "custom" one"""
+    return TEMPLATES.get(agent_type, TEMPLATES["custom"])
+
+
+# ============================================================================
+# PROVIDER PROMPT CACHING
+# ============================================================================
+
+def system_message(text: str, provider: str) -> SystemMessage:
+    """
+    System message marked as a cacheable prefix. Anthropic needs an explicit
+    `cache_control` breakpoint; OpenAI caches identical prefixes (>=1024
+    tokens) automatically. Prompts below the provider minimum are simply
+    not cached.
+    """
+    if provider == "anthropic":
+        return SystemMessage(content=[{"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}])
+    return SystemMessage(content=text)
+
+
+def cached_tokens(response) -> int:
+    """Input tokens the provider served from its prompt cache"""
+    usage = getattr(response, "usage_metadata", None) or {}
+    return (usage.get("input_token_details") or {}).get("cache_read", 0) or 0
+
+
+# ============================================================================
+# STORED PROMPTS
+# ============================================================================
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS prompts (
+    prompt_id TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    workspace_id TEXT NOT NULL,
+    system_prompt TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (prompt_id, version)
+);
+"""
+
+
+class PromptNotFound(KeyError):
+    """No such prompt (or version) in this workspace"""
+
+
+@dataclass(frozen=True)
+class StoredPrompt:
+    prompt_id: str
+    version: int
+    workspace_id: str
+    system_prompt: str
+    created_at: float
+
+
+class PromptStore:
+    """SQLite-backed versioned system prompts, scoped to a workspace"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._conn: aiosqlite.Connection | None = None
+        self._connect_lock = asyncio.Lock()
+        # Versions never change, so pinned lookups are served from memory
+        self._versions: dict[tuple[str, int], StoredPrompt] = {}
+
+    async def _connection(self) -> aiosqlite.Connection:
+        if self._conn is None:
+            # Concurrent first callers must share one connection
+            async with self._connect_lock:
+                if self._conn is None:
+                    self._conn = await sqlite.connect(self.db_path, _SCHEMA)
+        return self._conn
+
+    async def open(self) -> None:
+        """Open the database ahead of the first request (worker warmup)"""
+        await self._connection()
+
+    async def save(self, workspace_id: str, system_prompt: str, prompt_id: str | None = None) -> StoredPrompt:
+        """Store a new prompt, or the next version of an existing one"""
+        prompt_id = prompt_id or f"prompt_{uuid.uuid4().hex[:12]}"
+        conn = await self._connection()
+        await conn.execute("BEGIN IMMEDIATE")
+        try:
+            async with conn.execute(
+                "SELECT workspace_id, MAX(version) FROM prompts WHERE prompt_id = ?",
+                (prompt_id,),
+            ) as cursor:
+                owner, latest = await cursor.fetchone()
+            if owner is not None and owner != workspace_id:
+                raise PromptNotFound(prompt_id)
+            prompt = StoredPrompt(prompt_id, (latest or 0) + 1, workspace_id, system_prompt, time.time())
+            await conn.execute(
+                "INSERT INTO prompts (prompt_id, version, workspace_id, system_prompt, created_at) VALUES (?, ?, ?, ?, ?)",
+                (prompt.prompt_id, prompt.version, prompt.workspace_id, prompt.system_prompt, prompt.created_at),
+            )
+            await conn.execute("COMMIT")
+        except BaseException:
+            await conn.execute("ROLLBACK")
+            raise
+        self._versions[(prompt.prompt_id, prompt.version)] = prompt
+        return prompt
+
+    async def get(self, prompt_id: str, workspace_id: str, version: int | None = None) -> StoredPrompt:
+        """A pinned version, or the latest one when `version` is None"""
+        prompt = self._versions.get((prompt_id, version)) if version is not None else None
+        if prompt is None:
+            conn = await self._connection()
+            query = "SELECT prompt_id, version, workspace_id, system_prompt, created_at FROM prompts WHERE prompt_id = ?"
+            params: tuple = (prompt_id,)
+            if version is not None:
+                query += " AND version = ?"
+                params += (version,)
+            async with conn.execute(query + " ORDER BY version DESC LIMIT 1", params) as cursor:
+                row = await cursor.fetchone()
+            if row is None:
+                raise PromptNotFound(prompt_id)
+            prompt = StoredPrompt(*row)
+            self._versions[(prompt.prompt_id, prompt.version)] = prompt
+        if prompt.workspace_id != workspace_id:
+            raise PromptNotFound(prompt_id)
+        return prompt
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+
+_store: PromptStore | None = None
+
+
+def get_prompt_store() -> PromptStore:
+    """Process-wide prompt store configured from the environment"""
+    global _store
+    if _store is None:
+        _store = PromptStore(os.getenv("PROMPT_DB_PATH", "./data/prompts.db"))
+    return _store
@@ -0,0 +1,374 @@
+"""
+GalaxyCo.ai - Per-Workspace Quotas
+===================================
+
+Fairness limits that stop a single heavy tenant from degrading latency for
+everyone else. Every workspace gets three limits, all checked before any LLM
+dispatch (both in `/execute` and in the orchestrator nodes):
+
+- Concurrent executions: lease-based; a live execution renews its lease in
+  the background, so only a crashed worker's leases ever expire
+- Tokens per minute: token bucket refilled continuously
+- Cost per day (USD): token bucket refilled over 24 hours
+
+State lives in a local SQLite file so all uvicorn workers on the same box
+share one view of each workspace. Usage is charged after the call returns,
+so a bucket can go negative; the debt simply delays the next dispatch.
+"""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, replace
+from typing import AsyncIterator, Callable
+
+import aiosqlite
+
+from . import sqlite
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+SECONDS_PER_MINUTE = 60.0
+SECONDS_PER_DAY = 86_400.0
+
+
+@dataclass(frozen=True)
+class QuotaLimits:
+    """Limits applied to a single workspace"""
+    max_concurrent: int = 8
+    tokens_per_minute: int = 200_000
+    cost_per_day: float = 50.0
+
+    @classmethod
+    def from_env(cls) -> "QuotaLimits":
+        """Build default limits from QUOTA_* environment variables"""
+        return cls(
+            max_concurrent=int(os.getenv("QUOTA_MAX_CONCURRENT", cls.max_concurrent)),
+            tokens_per_minute=int(os.getenv("QUOTA_TOKENS_PER_MINUTE", cls.tokens_per_minute)),
+            cost_per_day=float(os.getenv("QUOTA_COST_PER_DAY_USD", cls.cost_per_day)),
+        )
+
+
+def _overrides_from_env(defaults: QuotaLimits) -> dict[str, QuotaLimits]:
+    """
+    Parse QUOTA_OVERRIDES, a JSON object of per-workspace limits, e.g.
+    {"ws_enterprise": {"max_concurrent": 32, "cost_per_day": 500}}
+    """
+    raw = os.getenv("QUOTA_OVERRIDES")
+    if not raw:
+        return {}
+
+    try:
+        parsed = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"QUOTA_OVERRIDES is not valid JSON: {e}") from e
+    if not isinstance(parsed, dict):
+        raise ValueError("QUOTA_OVERRIDES must be a JSON object of workspace_id -> limits")
+
+    allowed = set(QuotaLimits.__dataclass_fields__)
+    overrides = {}
+    for workspace_id, values in parsed.items():
+        if not isinstance(values, dict):
+            raise ValueError(f"QUOTA_OVERRIDES[{workspace_id!r}] must be an object")
+        unknown = set(values) - allowed
+        if unknown:
+            raise ValueError(
+                f"QUOTA_OVERRIDES[{workspace_id!r}] has unknown keys {sorted(unknown)}; "
+                f"allowed: {sorted(allowed)}"
+            )
+        bad = [key for key, value in values.items() if isinstance(value, bool) or not isinstance(value, (int, float))]
+        if bad:
+            raise ValueError(f"QUOTA_OVERRIDES[{workspace_id!r}] values must be numbers: {sorted(bad)}")
+        overrides[workspace_id] = replace(defaults, **values)
+    return overrides
+
+
+class QuotaExceeded(Exception):
+    """Raised when a workspace is over one of its limits"""
+
+    def __init__(self, workspace_id: str, limit: str, retry_after: float):
+        self.workspace_id = workspace_id
+        self.limit = limit
+        self.retry_after = max(retry_after, 0.0)
+        super().__init__(
+            f"Workspace {workspace_id} exceeded {limit} quota, "
+            f"retry after {self.retry_after:.1f}s"
+        )
+
+# ============================================================================
+# QUOTA STORE
+# ============================================================================
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quota_leases (
+    lease_id TEXT PRIMARY KEY,
+    workspace_id TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_quota_leases_workspace
+    ON quota_leases (workspace_id, expires_at);
+CREATE TABLE IF NOT EXISTS quota_buckets (
+    workspace_id TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    level REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (workspace_id, bucket)
+);
+"""
+
+
+class WorkspaceQuotas:
+    """
+    SQLite-backed quota store shared by every worker process on the host.
+
+    Each process holds one connection; writes run inside `BEGIN IMMEDIATE`
+    so read-modify-write cycles are atomic across processes.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        defaults: QuotaLimits | None = None,
+        overrides: dict[str, QuotaLimits] | None = None,
+        lease_ttl_s: float = 300.0,
+        lease_renew_s: float | None = None,
+        enabled: bool = True,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.db_path = db_path
+        self.defaults = defaults or QuotaLimits()
+        self.overrides = overrides or {}
+        self.lease_ttl_s = lease_ttl_s
+        self.lease_renew_s = lease_renew_s or lease_ttl_s / 3
+        self.enabled = enabled
+        self.clock = clock
+        self._conn: aiosqlite.Connection | None = None
+        self._connect_lock = asyncio.Lock()
+        self._lock = asyncio.Lock()
+        self._renewals: dict[str, asyncio.Task] = {}
+
+    def limits_for(self, workspace_id: str) -> QuotaLimits:
+        """Effective limits for a workspace"""
+        return self.overrides.get(workspace_id, self.defaults)
+
+    def _buckets(self, limits: QuotaLimits) -> dict[str, tuple[float, float]]:
+        """Bucket name -> (capacity, refill rate per second)"""
+        return {
+            "tokens": (limits.tokens_per_minute, limits.tokens_per_minute / SECONDS_PER_MINUTE),
+            "cost": (limits.cost_per_day, limits.cost_per_day / SECONDS_PER_DAY),
+        }
+
+    async def _connection(self) -> aiosqlite.Connection:
+        if self._conn is None:
+            # Concurrent first callers must share one connection
+            async with self._connect_lock:
+                if self._conn is None:
+                    self._conn = await sqlite.connect(self.db_path, _SCHEMA)
+        return self._conn
+
+    async def open(self) -> None:
+        """Open the database ahead of the first request (worker warmup)"""
+        if self.enabled:
+            await self._connection()
+
+    async def _levels(self, conn: aiosqlite.Connection, workspace_id: str, now: float) -> dict[str, float]:
+        """Current bucket levels after refill"""
+        buckets = self._buckets(self.limits_for(workspace_id))
+        levels = {name: capacity for name, (capacity, _) in buckets.items()}
+        async with conn.execute(
+            "SELECT bucket, level, updated_at FROM quota_buckets WHERE workspace_id = ?",
+            (workspace_id,),
+        ) as cursor:
+            async for bucket, level, updated_at in cursor:
+                if bucket in buckets:
+                    capacity, rate = buckets[bucket]
+                    levels[bucket] = min(capacity, level + max(now - updated_at, 0.0) * rate)
+        return levels
+
+    async def acquire(self, workspace_id: str) -> str | None:
+        """
+        Take a concurrent-execution lease.
+        Returns the lease id, or None when quotas are disabled.
+        """
+        if not self.enabled:
+            return None
+
+        limits = self.limits_for(workspace_id)
+        lease_id = uuid.uuid4().hex
+        now = self.clock()
+
+        async with self._lock:
+            conn = await self._connection()
+            await conn.execute("BEGIN IMMEDIATE")
+            try:
+                await conn.execute("DELETE FROM quota_leases WHERE expires_at <= ?", (now,))
+                async with conn.execute(
+                    "SELECT COUNT(*) FROM quota_leases WHERE workspace_id = ?",
+                    (workspace_id,),
+                ) as cursor:
+                    (active,) = await cursor.fetchone()
+
+                if active >= limits.max_concurrent:
+                    await conn.execute("ROLLBACK")
+                    raise QuotaExceeded(workspace_id, "concurrency", retry_after=1.0)
+
+                await conn.execute(
+                    "INSERT INTO quota_leases (lease_id, workspace_id, expires_at) VALUES (?, ?, ?)",
+                    (lease_id, workspace_id, now + self.lease_ttl_s),
+                )
+                await conn.execute("COMMIT")
+            except QuotaExceeded:
+                raise
+            except Exception:
+                await conn.execute("ROLLBACK")
+                raise
+
+        # Keep the lease alive for as long as the execution runs
+        self._renewals[lease_id] = asyncio.create_task(self._renew(lease_id))
+        return lease_id
+
+    async def _renew(self, lease_id: str) -> None:
+        """
+        Heartbeat: push the lease's expiry forward until it is released.
+        A failed renewal (e.g. the database is briefly locked) is logged and
+        retried on the next beat; only cancellation by release() ends it.
+        """
+        while True:
+            await asyncio.sleep(self.lease_renew_s)
+            try:
+                async with self._lock:
+                    conn = await self._connection()
+                    await conn.execute(
+                        "UPDATE quota_leases SET expires_at = ? WHERE lease_id = ?",
+                        (self.clock() + self.lease_ttl_s, lease_id),
+                    )
+            except Exception as e:
+                print(f"[Quotas] Renewing lease {lease_id} failed, retrying: {e}")
+
+    async def release(self, lease_id: str | None) -> None:
+        """Give back a concurrent-execution lease"""
+        if lease_id is None:
+            return
+        renewal = self._renewals.pop(lease_id, None)
+        if renewal is not None:
+            renewal.cancel()
+        async with self._lock:
+            conn = await self._connection()
+            await conn.execute("DELETE FROM quota_leases WHERE lease_id = ?", (lease_id,))
+
+    @asynccontextmanager
+    async def execution_slot(self, workspace_id: str) -> AsyncIterator[None]:
+        """Hold a concurrent-execution lease for the duration of the block"""
+        lease_id = await self.acquire(workspace_id)
+        try:
+            yield
+        finally:
+            await self.release(lease_id)
+
+    async def check(
+        self,
+        workspace_id: str,
+        estimated_tokens: int = 0,
+        estimated_cost: float = 0.0,
+    ) -> None:
+        """
+        Raise QuotaExceeded if the workspace cannot afford another LLM call.
+        Call this immediately before dispatching to a provider.
+        """
+        if not self.enabled:
+            return
+
+        now = self.clock()
+        async with self._lock:
+            conn = await self._connection()
+            levels = await self._levels(conn, workspace_id, now)
+
+        needed = {"tokens": max(estimated_tokens, 1), "cost": max(estimated_cost, 1e-9)}
+        for name, (_, rate) in self._buckets(self.limits_for(workspace_id)).items():
+            if levels[name] < needed[name]:
+                retry_after = (needed[name] - levels[name]) / rate if rate > 0 else SECONDS_PER_DAY
+                raise QuotaExceeded(workspace_id, name, retry_after=retry_after)
+
+    async def record_usage(self, workspace_id: str, tokens: int, cost: float) -> None:
+        """Charge actual usage after a call completes"""
+        if not self.enabled or (tokens <= 0 and cost <= 0):
+            return
+
+        now = self.clock()
+        spent = {"tokens": float(tokens), "cost": float(cost)}
+
+        async with self._lock:
+            conn = await self._connection()
+            await conn.execute("BEGIN IMMEDIATE")
+            try:
+                levels = await self._levels(conn, workspace_id, now)
+                await conn.executemany(
+                    """
+                    INSERT INTO quota_buckets (workspace_id, bucket, level, updated_at)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT (workspace_id, bucket)
+                    DO UPDATE SET level = excluded.level, updated_at = excluded.updated_at
+                    """,
+                    [
+                        (workspace_id, name, levels[name] - spent[name], now)
+                        for name in levels
+                    ],
+                )
+                await conn.execute("COMMIT")
+            except Exception:
+                await conn.execute("ROLLBACK")
+                raise
+
+    async def usage(self, workspace_id: str) -> dict:
+        """Snapshot of a workspace's remaining budget and active leases"""
+        now = self.clock()
+        async with self._lock:
+            conn = await self._connection()
+            levels = await self._levels(conn, workspace_id, now)
+            async with conn.execute(
+                "SELECT COUNT(*) FROM quota_leases WHERE workspace_id = ? AND expires_at > ?",
+                (workspace_id, now),
+            ) as cursor:
+                (active,) = await cursor.fetchone()
+
+        limits = self.limits_for(workspace_id)
+        return {
+            "workspace_id": workspace_id,
+            "active_executions": active,
+            "max_concurrent": limits.max_concurrent,
+            "tokens_remaining": levels["tokens"],
+            "tokens_per_minute": limits.tokens_per_minute,
+            "cost_remaining_usd": levels["cost"],
+            "cost_per_day_usd": limits.cost_per_day,
+        }
+
+    async def close(self) -> None:
+        for renewal in self._renewals.values():
+            renewal.cancel()
+        self._renewals.clear()
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+
+_quotas: WorkspaceQuotas | None = None
+
+
+def get_quotas() -> WorkspaceQuotas:
+    """Process-wide quota store configured from the environment"""
+    global _quotas
+    if _quotas is None:
+        defaults = QuotaLimits.from_env()
+        _quotas = WorkspaceQuotas(
+            db_path=os.getenv("QUOTA_DB_PATH", "./data/quotas.db"),
+            defaults=defaults,
+            overrides=_overrides_from_env(defaults),
+            lease_ttl_s=float(os.getenv("QUOTA_LEASE_TTL_S", "300")),
+            enabled=os.getenv("QUOTAS_ENABLED", "true").lower() == "true",
+        )
+    return _quotas
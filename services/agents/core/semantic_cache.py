@@ -0,0 +1,357 @@
+"""
+GalaxyCo.ai - Semantic Response Cache
+======================================
+
+An exact-match cache misses paraphrases: "qualify John from ACME" and
+"please qualify John Doe (ACME Corp)" are the same request. This cache sits
+in front of /execute model calls and the PAA intake LLM call and answers a
+request from a previous one that means the same thing. Intake reuses only the
+routing (task type, approval, priority); params are always extracted anew:
+
+- embedding: local and network-free. Hashed bag of content words (stopwords
+  dropped) plus their character trigrams, SEMANTIC_CACHE_DIM buckets,
+  L2-normalized, so cosine similarity is a dot product
+- index: in memory, one NumPy matrix per (workspace, namespace) partition;
+  a lookup is one matrix-vector product. Tenants never see each other's
+  entries, and a namespace separates agent types and system prompts
+- entity guard: similar wording is not enough. Names, numbers, emails, file
+  names and identifiers of the shorter request must all appear in the other ("John" vs "John Doe"
+  matches, "John" vs "Jane" never does). A request that fits two cached ones
+  with conflicting entities ("John" with John Doe and John Smith cached) misses
+- thresholds: per agent type (SEMANTIC_CACHE_THRESHOLDS, e.g.
+  {"intake": 0.75, "scope": 0.95}); otherwise 0.7 for intake and
+  SEMANTIC_CACHE_THRESHOLD (0.9) for the rest
+- eviction: entries expire after SEMANTIC_CACHE_TTL_S; a partition over
+  SEMANTIC_CACHE_MAX_ENTRIES evicts its least recently used entry
+- hit quality: a share of hits (SEMANTIC_CACHE_AUDIT_RATE) still runs the
+  model and compares; GET /admin/semantic-cache reports, per agent type,
+  hit rate, hit similarity, near misses, entity-guard rejects, ambiguous
+  misses and audit agreement
+
+Off unless SEMANTIC_CACHE=true; a request can opt out with
+config.semanticCache: false. State is per worker process.
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+STOPWORDS = frozenset("""
+a an the and or but if of to in on at by for with from into about as is are was were be been being
+please can could would will shall should may might must do does did i me my we our you your he she it
+they them their this that these those there here hi hello thanks thank pls kindly just also some any
+""".split())
+
+_WORD = re.compile(r"\w+")
+_ENTITY = re.compile(
+    r"\S+@\S+\.\w+"  # emails
+    r"|[\w./-]*\w\.[A-Za-z]\w{0,4}\b"  # file names and paths: leads_march.csv
+    r"|\b\d[\d.,]*\b"  # numbers: 50,000
+    r"|\b[A-Za-z]+\w*(?:_|\d)[\w-]*"  # identifiers: ws_1, q3
+    r"|\b[A-Z][\w'-]*"  # names
+)
+_SENTENCE_START = re.compile(r"(?:^|[.!?:]\s+|\n)([A-Z][\w'-]*)")
+
+# A miss this close to the threshold is a near miss (threshold tuning signal)
+NEAR_MISS_MARGIN = 0.05
+
+# Intake answers are coarse (task type, approval, priority): short paraphrases
+# score ~0.75, and the entity guard keeps different people apart
+DEFAULT_THRESHOLDS = {"intake": 0.7}
+
+
+def semantic_cache_enabled() -> bool:
+    return os.getenv("SEMANTIC_CACHE", "false").lower() in ("1", "true", "yes")
+
+
+def embed(text: str, dim: int = 1024):
+    """L2-normalized hashed bag of content words and their character trigrams"""
+    import numpy as np
+
+    vector = np.zeros(dim, dtype=np.float32)
+    for word in _WORD.findall(text.lower()):
+        if word in STOPWORDS:
+            continue
+        vector[zlib.crc32(word.encode()) % dim] += 1.0
+        # Trigrams of the padded word match inflections ("qualify" / "qualifying")
+        padded = f"<{word}>"
+        for i in range(len(padded) - 2):
+            vector[zlib.crc32(padded[i:i + 3].encode()) % dim] += 0.25
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def entities(text: str) -> frozenset[str]:
+    """
+    Names, numbers, emails, file names and identifiers: capitalized words not
+    starting a sentence, digits, addresses, `name.ext` and snake_case tokens
+    """
+    starts = {match.start(1) for match in _SENTENCE_START.finditer(text)}
+    found = set()
+    for match in _ENTITY.finditer(text):
+        if match.start() in starts and not match.group().isupper():
+            continue
+        found.add(match.group().lower().strip(".,"))
+    return frozenset(found)
+
+
+def entities_compatible(a: frozenset[str], b: frozenset[str]) -> bool:
+    shorter, longer = (a, b) if len(a) <= len(b) else (b, a)
+    return shorter <= longer
+
+
+def namespace(*parts: Any) -> str:
+    """Stable namespace for a cache scope, e.g. agent type + system prompt + model tiers"""
+    return hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()[:16]
+
+
+# ============================================================================
+# INDEX
+# ============================================================================
+
+@dataclass
+class CacheEntry:
+    text: str
+    value: str  # JSON; every hit gets its own copy
+    entities: frozenset[str]
+    created_at: float
+    last_used: float
+    hits: int = 0
+
+
+@dataclass(frozen=True)
+class CacheHit:
+    value: Any
+    similarity: float
+    audit: bool  # run the model anyway and compare
+
+
+class Partition:
+    """Embeddings of one workspace namespace; row i of the matrix is entries[i]"""
+
+    def __init__(self, dim: int):
+        import numpy as np
+
+        self.vectors = np.zeros((16, dim), dtype=np.float32)
+        self.entries: list[CacheEntry] = []
+
+    def search(self, vector):
+        """Rows by descending cosine similarity, as (indices, similarities)"""
+        import numpy as np
+
+        if not self.entries:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        similarities = self.vectors[: len(self.entries)] @ vector
+        order = np.argsort(-similarities)
+        return order, similarities[order]
+
+    def add(self, vector, entry: CacheEntry) -> None:
+        import numpy as np
+
+        if len(self.entries) == len(self.vectors):
+            self.vectors = np.concatenate([self.vectors, np.zeros_like(self.vectors)])
+        self.vectors[len(self.entries)] = vector
+        self.entries.append(entry)
+
+    def remove(self, index: int) -> None:
+        """Swap-remove: the last row takes the removed one's place"""
+        last = len(self.entries) - 1
+        if index != last:
+            self.vectors[index] = self.vectors[last]
+            self.entries[index] = self.entries[last]
+        self.entries.pop()
+
+    def expire(self, now: float, ttl_s: float) -> int:
+        expired = [i for i, entry in enumerate(self.entries) if now - entry.created_at > ttl_s]
+        for index in reversed(expired):
+            self.remove(index)
+        return len(expired)
+
+
+# ============================================================================
+# STATS
+# ============================================================================
+
+@dataclass
+class AgentCacheStats:
+    """Lookups and hit quality for one agent type"""
+    lookups: int = 0
+    hits: int = 0
+    near_misses: int = 0
+    entity_rejects: int = 0
+    ambiguous: int = 0
+    audits: int = 0
+    audit_agreement_sum: float = 0.0
+    hit_similarities: list[float] = field(default_factory=list)
+
+    def summary(self) -> dict:
+        recent = self.hit_similarities[-1000:]
+        return {
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.lookups, 3) if self.lookups else 0.0,
+            "near_misses": self.near_misses,
+            "entity_rejects": self.entity_rejects,
+            "ambiguous": self.ambiguous,
+            "hit_similarity": {
+                "mean": round(sum(recent) / len(recent), 3) if recent else None,
+                "min": round(min(recent), 3) if recent else None,
+            },
+            "audits": self.audits,
+            # 1.0: audited answers matched the cached ones
+            "audit_agreement": round(self.audit_agreement_sum / self.audits, 3) if self.audits else None,
+        }
+
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+def thresholds_from_env() -> tuple[float, dict[str, float]]:
+    """Default threshold and SEMANTIC_CACHE_THRESHOLDS per-agent-type overrides"""
+    default = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9"))
+    raw = os.getenv("SEMANTIC_CACHE_THRESHOLDS")
+    if not raw:
+        return default, dict(DEFAULT_THRESHOLDS)
+    try:
+        parsed = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"SEMANTIC_CACHE_THRESHOLDS is not valid JSON: {e}") from e
+    if not isinstance(parsed, dict):
+        raise ValueError("SEMANTIC_CACHE_THRESHOLDS must be a JSON object of agent_type -> threshold")
+    bad = [key for key, value in parsed.items() if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 < value <= 1]
+    if bad:
+        raise ValueError(f"SEMANTIC_CACHE_THRESHOLDS values must be in (0, 1]: {sorted(bad)}")
+    return default, {**DEFAULT_THRESHOLDS, **{key: float(value) for key, value in parsed.items()}}
+
+
+class SemanticCache:
+    """Per-workspace cosine-similarity response cache"""
+
+    def __init__(
+        self,
+        dim: int = 1024,
+        ttl_s: float = 3600.0,
+        max_entries: int = 1000,
+        default_threshold: float = 0.9,
+        thresholds: Optional[dict[str, float]] = None,
+        audit_rate: float = 0.05,
+    ):
+        self.dim = dim
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.default_threshold = default_threshold
+        self.thresholds = thresholds or {}
+        self.audit_rate = audit_rate
+        self._partitions: dict[tuple[str, str], Partition] = {}
+        self._stats: dict[str, AgentCacheStats] = {}
+        self.evictions = 0
+        self.expirations = 0
+
+    def threshold_for(self, agent_type: str) -> float:
+        return self.thresholds.get(agent_type, self.default_threshold)
+
+    def stats_for(self, agent_type: str) -> AgentCacheStats:
+        return self._stats.setdefault(agent_type, AgentCacheStats())
+
+    def lookup(self, workspace_id: str, scope: str, agent_type: str, text: str) -> Optional[CacheHit]:
+        """The cached value of the most similar compatible request, if similar enough"""
+        stats = self.stats_for(agent_type)
+        stats.lookups += 1
+        partition = self._partitions.get((workspace_id, scope))
+        if partition is None:
+            return None
+        now = time.time()
+        self.expirations += partition.expire(now, self.ttl_s)
+
+        threshold = self.threshold_for(agent_type)
+        query_entities = entities(text)
+        indices, similarities = partition.search(embed(text, self.dim))
+        best = None
+        for index, similarity in zip(indices.tolist(), similarities.tolist()):
+            if similarity < threshold:
+                if best is None and similarity >= threshold - NEAR_MISS_MARGIN:
+                    stats.near_misses += 1
+                break
+            entry = partition.entries[index]
+            if not entities_compatible(query_entities, entry.entities):
+                stats.entity_rejects += 1
+            elif best is None:
+                best = (entry, similarity)
+            elif not entities_compatible(best[0].entities, entry.entities):
+                # "John from ACME" with both John Doe and John Smith cached
+                stats.ambiguous += 1
+                return None
+        if best is None:
+            return None
+        entry, similarity = best
+        entry.hits += 1
+        entry.last_used = now
+        stats.hits += 1
+        stats.hit_similarities.append(similarity)
+        del stats.hit_similarities[:-1000]
+        return CacheHit(value=json.loads(entry.value), similarity=round(similarity, 4), audit=random.random() < self.audit_rate)
+
+    def put(self, workspace_id: str, scope: str, text: str, value: Any) -> None:
+        """Cache a JSON-serializable answer to `text`"""
+        partition = self._partitions.get((workspace_id, scope))
+        if partition is None:
+            partition = self._partitions[(workspace_id, scope)] = Partition(self.dim)
+        now = time.time()
+        if len(partition.entries) >= self.max_entries:
+            self.expirations += partition.expire(now, self.ttl_s)
+        if len(partition.entries) >= self.max_entries:
+            partition.remove(min(range(len(partition.entries)), key=lambda i: partition.entries[i].last_used))
+            self.evictions += 1
+        partition.add(embed(text, self.dim), CacheEntry(text, json.dumps(value), entities(text), now, now))
+
+    def record_audit(self, agent_type: str, agreement: float) -> None:
+        """Agreement in [0, 1] between a cached answer and the model's fresh one"""
+        stats = self.stats_for(agent_type)
+        stats.audits += 1
+        stats.audit_agreement_sum += agreement
+
+    def summary(self) -> dict:
+        return {
+            "enabled": semantic_cache_enabled(),
+            "partitions": len(self._partitions),
+            "entries": sum(len(p.entries) for p in self._partitions.values()),
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "agent_types": {
+                agent_type: {"threshold": self.threshold_for(agent_type), **stats.summary()}
+                for agent_type, stats in self._stats.items()
+            },
+        }
+
+
+def text_agreement(a: Any, b: Any) -> float:
+    """Cosine similarity of two answers' embeddings, for audits of free-text outputs"""
+    left = embed(json.dumps(a, sort_keys=True, default=str))
+    right = embed(json.dumps(b, sort_keys=True, default=str))
+    return float(max(0.0, left @ right))
+
+
+_cache: SemanticCache | None = None
+
+
+def get_semantic_cache() -> SemanticCache:
+    """Process-wide semantic cache configured from the environment"""
+    global _cache
+    if _cache is None:
+        default, thresholds = thresholds_from_env()
+        _cache = SemanticCache(
+            dim=int(os.getenv("SEMANTIC_CACHE_DIM", "1024")),
+            ttl_s=float(os.getenv("SEMANTIC_CACHE_TTL_S", "3600")),
+            max_entries=int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1000")),
+            default_threshold=default,
+            thresholds=thresholds,
+            audit_rate=float(os.getenv("SEMANTIC_CACHE_AUDIT_RATE", "0.05")),
+        )
+    return _cache
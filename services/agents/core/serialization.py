@@ -0,0 +1,159 @@
+"""
+GalaxyCo.ai - Compact Checkpoint Serializer
+============================================
+
+Drop-in LangGraph `SerializerProtocol` for AgentState checkpoints.
+
+Values are packed with ormsgpack (already a LangGraph dependency). The types
+AgentState actually holds get explicit, cheap extension tags instead of
+LangGraph's generic constructor-by-import-path encoding:
+
+    EXT_DATETIME  datetime (ISO-8601, tz preserved)
+    EXT_ENUM      registered Enum classes (TaskType, ApprovalStatus, ...)
+    EXT_MESSAGE   LangChain BaseMessage (via message_to_dict)
+    EXT_TUPLE     tuple (LangGraph relies on tuples surviving a round trip)
+    EXT_SET       set / frozenset
+    EXT_UUID      uuid.UUID (16 raw bytes)
+    EXT_FALLBACK  dataclasses (e.g. langgraph.types.Interrupt) and subclasses
+                  of str/int/float/dict/list, encoded by JsonPlusSerializer
+
+ormsgpack would otherwise flatten dataclasses to dicts and UUIDs and
+subclasses to their base values, so Interrupt would come back as a dict.
+
+Payloads at or above `compress_threshold` bytes (None or 0 disables) are
+zstd-compressed when the optional `zstandard` package is installed. Anything
+the compact encoder does not understand is delegated, whole, to LangGraph's
+JsonPlusSerializer, and checkpoints written by it remain readable - switching
+serializers needs no migration.
+"""
+
+import dataclasses
+from datetime import datetime
+from enum import Enum
+from typing import Any, Iterable
+from uuid import UUID
+
+import ormsgpack
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+try:
+    import zstandard
+except ImportError:  # optional: compression disabled
+    zstandard = None
+
+EXT_DATETIME = 1
+EXT_ENUM = 2
+EXT_MESSAGE = 3
+EXT_TUPLE = 4
+EXT_SET = 5
+EXT_UUID = 6
+EXT_FALLBACK = 7
+
+TYPE_COMPACT = "cmsgpack"
+TYPE_COMPACT_ZSTD = "cmsgpack+zstd"
+
+_PACK_OPTIONS = (
+    ormsgpack.OPT_NON_STR_KEYS
+    | ormsgpack.OPT_PASSTHROUGH_DATETIME
+    | ormsgpack.OPT_PASSTHROUGH_ENUM
+    | ormsgpack.OPT_PASSTHROUGH_TUPLE
+    | ormsgpack.OPT_PASSTHROUGH_DATACLASS
+    | ormsgpack.OPT_PASSTHROUGH_UUID
+    | ormsgpack.OPT_PASSTHROUGH_SUBCLASS
+)
+
+
+class CompactSerializer:
+    """msgpack serializer with explicit type tags and optional zstd compression"""
+
+    def __init__(
+        self,
+        enums: Iterable[type[Enum]] = (),
+        compress_threshold: int | None = 16_384,
+        compression_level: int = 3,
+        fallback: JsonPlusSerializer | None = None,
+    ):
+        self._enums = {self._enum_key(cls): cls for cls in enums}
+        self.compress_threshold = (compress_threshold or None) if zstandard is not None else None
+        self.compression_level = compression_level
+        self.fallback = fallback or JsonPlusSerializer()
+
+    @staticmethod
+    def _enum_key(cls: type[Enum]) -> str:
+        return f"{cls.__module__}:{cls.__qualname__}"
+
+    # ------------------------------------------------------------------ encode
+
+    def _pack(self, obj: Any) -> bytes:
+        return ormsgpack.packb(obj, default=self._default, option=_PACK_OPTIONS)
+
+    def _default(self, obj: Any) -> ormsgpack.Ext:
+        if isinstance(obj, datetime):
+            return ormsgpack.Ext(EXT_DATETIME, obj.isoformat().encode())
+        if isinstance(obj, Enum):
+            key = self._enum_key(type(obj))
+            if key not in self._enums:
+                raise TypeError(f"Unregistered enum {key}")
+            return ormsgpack.Ext(EXT_ENUM, self._pack([key, obj.value]))
+        if isinstance(obj, BaseMessage):
+            return ormsgpack.Ext(EXT_MESSAGE, self._pack(message_to_dict(obj)))
+        if isinstance(obj, tuple):
+            return ormsgpack.Ext(EXT_TUPLE, self._pack(list(obj)))
+        if isinstance(obj, (set, frozenset)):
+            return ormsgpack.Ext(EXT_SET, self._pack(list(obj)))
+        if isinstance(obj, UUID):
+            return ormsgpack.Ext(EXT_UUID, obj.bytes)
+        if dataclasses.is_dataclass(obj) or isinstance(obj, (str, int, float, dict, list)):
+            # Dataclasses and subclasses of native types: JsonPlusSerializer restores them
+            return ormsgpack.Ext(EXT_FALLBACK, self._pack(list(self.fallback.dumps_typed(obj))))
+        raise TypeError(f"Unsupported type {type(obj).__name__}")
+
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        if obj is None or isinstance(obj, (bytes, bytearray)):
+            return self.fallback.dumps_typed(obj)
+
+        try:
+            data = self._pack(obj)
+        except (TypeError, ormsgpack.MsgpackEncodeError):
+            return self.fallback.dumps_typed(obj)
+
+        if self.compress_threshold is not None and len(data) >= self.compress_threshold:
+            compressor = zstandard.ZstdCompressor(level=self.compression_level)
+            return TYPE_COMPACT_ZSTD, compressor.compress(data)
+        return TYPE_COMPACT, data
+
+    # ------------------------------------------------------------------ decode
+
+    def _ext_hook(self, code: int, data: bytes) -> Any:
+        if code == EXT_DATETIME:
+            return datetime.fromisoformat(data.decode())
+        if code == EXT_ENUM:
+            key, value = self._unpack(data)
+            cls = self._enums.get(key)
+            return cls(value) if cls is not None else value
+        if code == EXT_MESSAGE:
+            return messages_from_dict([self._unpack(data)])[0]
+        if code == EXT_TUPLE:
+            return tuple(self._unpack(data))
+        if code == EXT_SET:
+            return set(self._unpack(data))
+        if code == EXT_UUID:
+            return UUID(bytes=data)
+        if code == EXT_FALLBACK:
+            type_, payload = self._unpack(data)
+            return self.fallback.loads_typed((type_, payload))
+        raise ValueError(f"Unknown extension code {code}")
+
+    def _unpack(self, data: bytes) -> Any:
+        return ormsgpack.unpackb(data, ext_hook=self._ext_hook, option=ormsgpack.OPT_NON_STR_KEYS)
+
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_ == TYPE_COMPACT:
+            return self._unpack(payload)
+        if type_ == TYPE_COMPACT_ZSTD:
+            if zstandard is None:
+                raise RuntimeError("Checkpoint is zstd-compressed but zstandard is not installed")
+            return self._unpack(zstandard.ZstdDecompressor().decompress(payload))
+        return self.fallback.loads_typed(data)
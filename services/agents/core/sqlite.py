@@ -0,0 +1,28 @@
+"""
+GalaxyCo.ai - Local SQLite Stores
+==================================
+
+Shared connection setup for the small side-stores the service keeps on local
+disk (quotas, approval inbox, ...). Every uvicorn worker opens its own
+connection to the same file; WAL mode lets readers proceed while a writer
+holds the lock.
+"""
+
+import os
+
+import aiosqlite
+
+
+async def connect(db_path: str, schema: str) -> aiosqlite.Connection:
+    """
+    Open a connection in autocommit mode and make sure the schema exists.
+    Callers manage transactions explicitly with BEGIN IMMEDIATE / COMMIT.
+    """
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    conn = await aiosqlite.connect(db_path, isolation_level=None, timeout=5.0)
+    await conn.execute("PRAGMA journal_mode=WAL")
+    await conn.executescript(schema)
+    return conn
@@ -0,0 +1,121 @@
+"""
+GalaxyCo.ai - Memory-Bounded Workflow State
+============================================
+
+`outcomes` and `messages` are appended to by every node (and again on every
+critic retry), and the whole state is held in memory and re-checkpointed at
+each step. These helpers keep that in-state representation bounded:
+
+- Outcome results larger than STATE_OUTCOME_INLINE_BYTES are spilled to the
+  blob store. The state keeps a preview (small top-level scalars such as
+  `status`, `recommendation`, `quality_score`) plus `result_ref`.
+- Message bodies longer than STATE_MESSAGE_INLINE_CHARS are truncated in
+  state; the full text is referenced by `additional_kwargs["content_ref"]`.
+- At most STATE_MAX_MESSAGES messages and STATE_MAX_OUTCOMES outcomes stay
+  in state. Older entries are archived to the blob store and their refs
+  appended to `archived_messages` / `archived_outcomes`. The first message
+  (the user's request) is never archived.
+
+Nodes that need a full payload load it lazily with `load_result()`,
+`load_message_content()` or the `load_archived_*()` helpers. Setting a limit
+to 0 disables that bound.
+"""
+
+import json
+import os
+from typing import Any
+
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+
+from .blob_store import get_blob_store
+
+OUTCOME_INLINE_BYTES = int(os.getenv("STATE_OUTCOME_INLINE_BYTES", "2048"))
+MESSAGE_INLINE_CHARS = int(os.getenv("STATE_MESSAGE_INLINE_CHARS", "4000"))
+MAX_MESSAGES = int(os.getenv("STATE_MAX_MESSAGES", "20"))
+MAX_OUTCOMES = int(os.getenv("STATE_MAX_OUTCOMES", "50"))
+
+# Largest string kept in a spilled result's preview
+_PREVIEW_MAX_CHARS = 200
+
+
+def _preview(result: dict) -> dict:
+    """Small top-level scalars of a result; routing decisions only need these"""
+    preview = {}
+    for key, value in result.items():
+        if isinstance(value, (bool, int, float)) or value is None:
+            preview[key] = value
+        elif isinstance(value, str) and len(value) <= _PREVIEW_MAX_CHARS:
+            preview[key] = value
+    preview["truncated"] = True
+    return preview
+
+
+async def record_outcome(state: dict, outcome: dict) -> None:
+    """Append an outcome to state, spilling a large result to the blob store"""
+    result = outcome["result"]
+    if OUTCOME_INLINE_BYTES:
+        encoded = json.dumps(result, default=str)
+        if len(encoded) > OUTCOME_INLINE_BYTES:
+            outcome["result_ref"] = await get_blob_store().put(encoded.encode())
+            outcome["result"] = _preview(result)
+
+    state["outcomes"].append(outcome)
+
+    if MAX_OUTCOMES and len(state["outcomes"]) > MAX_OUTCOMES:
+        evicted = state["outcomes"][:-MAX_OUTCOMES]
+        del state["outcomes"][:-MAX_OUTCOMES]
+        ref = await get_blob_store().put_json(evicted)
+        state.setdefault("archived_outcomes", []).append(ref)
+
+
+async def append_message(state: dict, message: BaseMessage) -> None:
+    """Append a message to state, truncating a long body and archiving old messages"""
+    content = message.content
+    if MESSAGE_INLINE_CHARS and isinstance(content, str) and len(content) > MESSAGE_INLINE_CHARS:
+        ref = await get_blob_store().put(content.encode())
+        message = message.model_copy(update={
+            "content": content[:MESSAGE_INLINE_CHARS] + "\n…[truncated]",
+            "additional_kwargs": {**message.additional_kwargs, "content_ref": ref},
+        })
+
+    state["messages"].append(message)
+
+    if MAX_MESSAGES and len(state["messages"]) > MAX_MESSAGES:
+        # Keep the user's request plus the most recent messages
+        keep = max(MAX_MESSAGES - 1, 1)
+        evicted = state["messages"][1:-keep]
+        del state["messages"][1:-keep]
+        ref = await get_blob_store().put_json([message_to_dict(m) for m in evicted])
+        state.setdefault("archived_messages", []).append(ref)
+
+
+async def load_result(outcome: dict) -> dict:
+    """Full result of an outcome, fetched from the blob store if it was spilled"""
+    ref = outcome.get("result_ref")
+    if ref is None:
+        return outcome["result"]
+    return await get_blob_store().get_json(ref)
+
+
+async def load_message_content(message: BaseMessage) -> Any:
+    """Full body of a message, fetched from the blob store if it was truncated"""
+    ref = message.additional_kwargs.get("content_ref")
+    if ref is None:
+        return message.content
+    return (await get_blob_store().get(ref)).decode()
+
+
+async def load_archived_outcomes(state: dict) -> list[dict]:
+    """Outcomes evicted from state, oldest first"""
+    outcomes = []
+    for ref in state.get("archived_outcomes", []):
+        outcomes.extend(await get_blob_store().get_json(ref))
+    return outcomes
+
+
+async def load_archived_messages(state: dict) -> list[BaseMessage]:
+    """Messages evicted from state, oldest first"""
+    messages = []
+    for ref in state.get("archived_messages", []):
+        messages.extend(messages_from_dict(await get_blob_store().get_json(ref)))
+    return messages
@@ -0,0 +1,185 @@
+"""
+GalaxyCo.ai - Uploaded Inputs
+==============================
+
+Call transcripts and long email threads used to arrive inline in the
+`/execute` JSON body, where every request re-sent, re-parsed and
+re-validated megabytes of text. Instead they can be uploaded once with
+POST /blobs, either as a raw streamed body or as a multipart `file`, and
+referenced from `/execute` inputs as `{"$blob": "<blob_id>"}`.
+
+Uploads go to the content-addressed blob store (`BlobStore.put_stream`),
+so the blob id is the SHA-256 of the bytes and uploading the same transcript
+twice stores it once. The `uploads` table (UPLOAD_DB_PATH) records which
+workspace uploaded which blob; a workspace can only reference its own.
+
+Decoded texts are kept in a per-worker LRU bounded by size
+(UPLOAD_TEXT_CACHE_MB), so a transcript reused by the `call`, `scope` and
+`email` agents is read from disk and decoded once. Blobs never change, so
+the cache never needs invalidating.
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Optional
+
+import aiosqlite
+
+from . import sqlite
+from .blob_store import get_blob_store
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploads (
+    workspace_id TEXT NOT NULL,
+    blob_id TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    media_type TEXT NOT NULL,
+    filename TEXT,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (workspace_id, blob_id)
+);
+"""
+
+BLOB_REF = "$blob"
+
+
+class UploadNotFound(KeyError):
+    """No such upload in this workspace"""
+
+
+@dataclass(frozen=True)
+class Upload:
+    blob_id: str
+    workspace_id: str
+    size: int
+    media_type: str
+    filename: Optional[str]
+    created_at: float
+
+
+def max_upload_bytes() -> int:
+    return int(os.getenv("UPLOAD_MAX_BYTES", str(50 * 1024 * 1024)))
+
+
+async def read_chunks(file: Any, chunk_size: int = 1024 * 1024) -> AsyncIterator[bytes]:
+    """Chunks of an uploaded multipart file (starlette UploadFile)"""
+    while chunk := await file.read(chunk_size):
+        yield chunk
+
+
+class UploadIndex:
+    """SQLite record of uploaded blobs per workspace"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._conn: aiosqlite.Connection | None = None
+        self._connect_lock = asyncio.Lock()
+
+    async def _connection(self) -> aiosqlite.Connection:
+        if self._conn is None:
+            # Concurrent first callers must share one connection
+            async with self._connect_lock:
+                if self._conn is None:
+                    self._conn = await sqlite.connect(self.db_path, _SCHEMA)
+        return self._conn
+
+    async def open(self) -> None:
+        """Open the database ahead of the first request (worker warmup)"""
+        await self._connection()
+
+    async def add(
+        self,
+        workspace_id: str,
+        blob_id: str,
+        size: int,
+        media_type: str,
+        filename: Optional[str] = None,
+    ) -> Upload:
+        """Record an upload; re-uploading the same bytes keeps the first record"""
+        conn = await self._connection()
+        await conn.execute(
+            "INSERT OR IGNORE INTO uploads (workspace_id, blob_id, size, media_type, filename, created_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (workspace_id, blob_id, size, media_type, filename, time.time()),
+        )
+        return await self.get(workspace_id, blob_id)
+
+    async def get(self, workspace_id: str, blob_id: str) -> Upload:
+        conn = await self._connection()
+        async with conn.execute(
+            "SELECT blob_id, workspace_id, size, media_type, filename, created_at FROM uploads"
+            " WHERE workspace_id = ? AND blob_id = ?",
+            (workspace_id, blob_id),
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            raise UploadNotFound(blob_id)
+        return Upload(*row)
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+
+class TextCache:
+    """LRU of decoded blob texts, bounded by their total length"""
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self._texts: OrderedDict[str, str] = OrderedDict()
+        self._chars = 0
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, blob_id: str) -> str:
+        text = self._texts.get(blob_id)
+        if text is not None:
+            self.hits += 1
+            self._texts.move_to_end(blob_id)
+            return text
+        self.misses += 1
+        text = (await get_blob_store().get(blob_id)).decode("utf-8", errors="replace")
+        if len(text) <= self.max_chars and blob_id not in self._texts:
+            self._texts[blob_id] = text
+            self._chars += len(text)
+            while self._chars > self.max_chars:
+                _, evicted = self._texts.popitem(last=False)
+                self._chars -= len(evicted)
+        return text
+
+
+async def resolve_inputs(workspace_id: str, inputs: dict[str, Any]) -> dict[str, Any]:
+    """
+    `inputs` with every top-level `{"$blob": blob_id}` replaced by the
+    uploaded text. Raises UploadNotFound for a blob the workspace did not
+    upload.
+    """
+    resolved = dict(inputs)
+    for key, value in inputs.items():
+        if isinstance(value, dict) and set(value) == {BLOB_REF}:
+            upload = await get_upload_index().get(workspace_id, str(value[BLOB_REF]))
+            resolved[key] = await get_text_cache().get(upload.blob_id)
+    return resolved
+
+
+_index: UploadIndex | None = None
+_text_cache: TextCache | None = None
+
+
+def get_upload_index() -> UploadIndex:
+    """Process-wide upload index configured from the environment"""
+    global _index
+    if _index is None:
+        _index = UploadIndex(os.getenv("UPLOAD_DB_PATH", "./data/uploads.db"))
+    return _index
+
+
+def get_text_cache() -> TextCache:
+    global _text_cache
+    if _text_cache is None:
+        _text_cache = TextCache(int(float(os.getenv("UPLOAD_TEXT_CACHE_MB", "64")) * 1024 * 1024))
+    return _text_cache
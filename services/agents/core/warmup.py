@@ -0,0 +1,162 @@
+"""
+GalaxyCo.ai - Worker Warmup
+============================
+
+Everything a new worker would otherwise do during its first requests, run
+once at startup so readiness means "fast", not just "listening":
+
+1. providers  import the configured provider SDKs (see core/llm.py)
+2. clients    build one chat model per provider; LangChain shares one
+              httpx connection pool per base URL, so this creates the pool
+              every later model instance reuses
+3. stores     open the approval inbox, workflow index, quota, prompt, upload and
+              intake log databases and load the intake classifier if one is trained
+4. workflow   compile the LangGraph workflow and open the checkpoint DB
+5. ping       optional (WARMUP_PING=true): a 1-token request per provider
+              so TCP/TLS connections are already in the pool; useful
+              against the load-test mock, costs a few tokens in production
+
+`GET /ready` answers 200 only after phases 1-4 succeed; `/health` stays a
+plain liveness check. A failed ping is reported but does not block
+readiness (a provider outage must not take every worker out of rotation).
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from .approvals import get_approval_inbox
+from .blob_store import get_blob_store
+from .intake_classifier import get_intake_classifier, get_intake_log
+from .llm import PROVIDERS, get_chat_model, preload_providers
+from .prompts import get_prompt_store
+from .quotas import get_quotas
+from .uploads import get_upload_index
+from .workflow_index import get_workflow_index
+
+# Cheapest model per provider for client construction and the warm ping
+WARMUP_MODELS = {
+    "openai": "gpt-4o-mini",
+    "anthropic": "claude-3-5-haiku-20241022",
+}
+
+
+def _configured_providers() -> list[str]:
+    return [provider for provider, (_, key_variable) in PROVIDERS.items() if os.getenv(key_variable)]
+
+
+async def _warm_providers() -> dict:
+    # Imports hold the GIL but release it between modules; in a thread the
+    # loop keeps answering /health while ~2s of SDK imports run
+    return {"import_ms": await asyncio.to_thread(preload_providers)}
+
+
+async def _warm_clients() -> dict:
+    for provider in _configured_providers():
+        get_chat_model(provider, WARMUP_MODELS[provider])
+    return {"providers": _configured_providers()}
+
+
+async def _warm_stores() -> dict:
+    await get_approval_inbox().open()
+    await get_workflow_index().open()
+    await get_quotas().open()
+    await get_prompt_store().open()
+    await get_intake_log().open()
+    await get_upload_index().open()
+    os.makedirs(get_blob_store().root, exist_ok=True)
+    # Model load imports NumPy; keep it off the event loop
+    classifier = await asyncio.to_thread(get_intake_classifier)
+    return {"intake_classifier": classifier is not None}
+
+
+async def _warm_workflow() -> dict:
+    from .orchestrator import get_workflow
+
+    await get_workflow()
+    return {}
+
+
+async def _ping() -> dict:
+    from langchain_core.messages import HumanMessage
+
+    results = {}
+    for provider in _configured_providers():
+        model = get_chat_model(provider, WARMUP_MODELS[provider], temperature=0.0)
+        start = time.perf_counter()
+        try:
+            await model.ainvoke([HumanMessage(content="ping")], max_tokens=1)
+            results[provider] = {"ok": True, "ms": round((time.perf_counter() - start) * 1000, 1)}
+        except Exception as e:
+            results[provider] = {"ok": False, "error": str(e)[:200]}
+    return results
+
+
+class Warmup:
+    """Runs the warmup phases once and records their timing and outcome"""
+
+    def __init__(self, ping: Optional[bool] = None):
+        self.ping = os.getenv("WARMUP_PING", "false").lower() == "true" if ping is None else ping
+        self.status = "pending"
+        self.phases: dict[str, dict[str, Any]] = {}
+        self.total_ms: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def phase_plan(self) -> list[tuple[str, Callable[[], Awaitable[dict]], bool]]:
+        """(name, phase, required for readiness)"""
+        plan = [
+            ("providers", _warm_providers, True),
+            ("clients", _warm_clients, True),
+            ("stores", _warm_stores, True),
+            ("workflow", _warm_workflow, True),
+        ]
+        if self.ping:
+            plan.append(("ping", _ping, False))
+        return plan
+
+    async def run(self) -> bool:
+        """Run every phase in order; returns True when the worker is ready"""
+        self.status = "warming"
+        started = time.perf_counter()
+        failed = False
+        for name, phase, required in self.phase_plan():
+            start = time.perf_counter()
+            try:
+                detail = await phase()
+                self.phases[name] = {"ok": True, "ms": round((time.perf_counter() - start) * 1000, 1), **detail}
+            except Exception as e:
+                self.phases[name] = {"ok": False, "ms": round((time.perf_counter() - start) * 1000, 1), "error": str(e)}
+                print(f"[Warmup] Phase {name} failed: {e}")
+                if required:
+                    failed = True
+                    break
+        self.total_ms = round((time.perf_counter() - started) * 1000, 1)
+        self.status = "failed" if failed else "ready"
+        print(f"[Warmup] {self.status} in {self.total_ms}ms")
+        return self.ready
+
+    def start(self) -> asyncio.Task:
+        """Run in the background so the worker answers /health while warming"""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run(), name="warmup")
+        return self._task
+
+    async def wait(self) -> bool:
+        """Block until warmup has finished (starting it if needed)"""
+        return await self.start()
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def report(self) -> dict:
+        return {"status": self.status, "total_ms": self.total_ms, "phases": self.phases}
@@ -0,0 +1,217 @@
+"""
+GalaxyCo.ai - Workflow Query Index
+===================================
+
+Materialized side-table with one row per workflow, updated on every node
+transition. Dashboards list "all workflows for workspace X" from here and
+never deserialize LangGraph checkpoint blobs.
+
+Derived `status` values:
+    running | awaiting_approval | completed | rejected | failed | throttled
+"""
+
+import asyncio
+import base64
+import os
+import time
+
+import aiosqlite
+
+from . import sqlite
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS workflow_index (
+    workflow_id TEXT PRIMARY KEY,
+    workspace_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    current_step TEXT NOT NULL,
+    task_type TEXT,
+    approval_status TEXT,
+    total_cost REAL NOT NULL DEFAULT 0,
+    total_latency_ms INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_workflow_index_workspace_time
+    ON workflow_index (workspace_id, updated_at DESC, workflow_id DESC);
+CREATE INDEX IF NOT EXISTS idx_workflow_index_workspace_status
+    ON workflow_index (workspace_id, status, updated_at DESC);
+"""
+
+_COLUMNS = (
+    "workflow_id", "workspace_id", "user_id", "status", "current_step", "task_type",
+    "approval_status", "total_cost", "total_latency_ms", "error", "created_at", "updated_at",
+)
+
+
+def _value(enum_or_str) -> str | None:
+    """Plain string for enum-valued state fields"""
+    return getattr(enum_or_str, "value", enum_or_str)
+
+
+def derive_status(state: dict) -> str:
+    """Dashboard status for a workflow state"""
+    if state.get("error"):
+        return "failed"
+    if state.get("current_step") == "complete":
+        return "completed"
+    if state.get("current_step") == "rejected":
+        return "rejected"
+    if _value(state.get("approval_status")) == "pending":
+        return "awaiting_approval"
+    return "running"
+
+
+def encode_cursor(updated_at: float, workflow_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{updated_at!r}|{workflow_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[float, str]:
+    try:
+        updated_at, workflow_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return float(updated_at), workflow_id
+    except ValueError as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+class WorkflowIndex:
+    """SQLite-backed per-workflow summary rows"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._conn: aiosqlite.Connection | None = None
+        self._connect_lock = asyncio.Lock()
+
+    async def _connection(self) -> aiosqlite.Connection:
+        if self._conn is None:
+            # Concurrent first callers must share one connection
+            async with self._connect_lock:
+                if self._conn is None:
+                    self._conn = await sqlite.connect(self.db_path, _SCHEMA)
+        return self._conn
+
+    async def open(self) -> None:
+        """Open the database ahead of the first request (worker warmup)"""
+        await self._connection()
+
+    async def upsert(self, state: dict) -> None:
+        """Record the workflow's current state (called after every node)"""
+        conn = await self._connection()
+        metrics = state.get("metrics") or {}
+        now = time.time()
+        await conn.execute(
+            """
+            INSERT INTO workflow_index
+                (workflow_id, workspace_id, user_id, status, current_step, task_type,
+                 approval_status, total_cost, total_latency_ms, error, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (workflow_id) DO UPDATE SET
+                status = excluded.status,
+                current_step = excluded.current_step,
+                task_type = excluded.task_type,
+                approval_status = excluded.approval_status,
+                total_cost = excluded.total_cost,
+                total_latency_ms = excluded.total_latency_ms,
+                error = excluded.error,
+                updated_at = excluded.updated_at
+            """,
+            (
+                state["workflow_id"],
+                state["workspace_id"],
+                state["user_id"],
+                derive_status(state),
+                state.get("current_step") or "",
+                _value(state.get("task_type")),
+                _value(state.get("approval_status")),
+                metrics.get("total_cost", 0.0),
+                metrics.get("total_latency_ms", 0),
+                state.get("error"),
+                now,
+                now,
+            ),
+        )
+
+    async def mark(self, workflow_id: str, status: str, error: str | None = None) -> None:
+        """Set an explicit status (e.g. failed/throttled) without a full state"""
+        conn = await self._connection()
+        await conn.execute(
+            "UPDATE workflow_index SET status = ?, error = ?, updated_at = ? WHERE workflow_id = ?",
+            (status, error, time.time(), workflow_id),
+        )
+
+    async def get(self, workflow_id: str) -> dict | None:
+        conn = await self._connection()
+        async with conn.execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM workflow_index WHERE workflow_id = ?",
+            (workflow_id,),
+        ) as cursor:
+            row = await cursor.fetchone()
+        return dict(zip(_COLUMNS, row)) if row else None
+
+    async def list_workflows(
+        self,
+        workspace_id: str,
+        status: str | None = None,
+        since: float | None = None,
+        until: float | None = None,
+        limit: int = 50,
+        cursor: str | None = None,
+    ) -> tuple[list[dict], str | None]:
+        """
+        Workflows for a workspace, most recently updated first.
+        Keyset pagination: pass the returned cursor to get the next page.
+
+        Returns:
+            (rows, next_cursor or None)
+        """
+        clauses = ["workspace_id = ?"]
+        params: list = [workspace_id]
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if since is not None:
+            clauses.append("updated_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("updated_at < ?")
+            params.append(until)
+        if cursor:
+            cursor_time, cursor_id = decode_cursor(cursor)
+            clauses.append("(updated_at < ? OR (updated_at = ? AND workflow_id < ?))")
+            params.extend([cursor_time, cursor_time, cursor_id])
+
+        conn = await self._connection()
+        async with conn.execute(
+            f"""
+            SELECT {', '.join(_COLUMNS)} FROM workflow_index
+            WHERE {' AND '.join(clauses)}
+            ORDER BY updated_at DESC, workflow_id DESC
+            LIMIT ?
+            """,
+            (*params, limit + 1),
+        ) as db_cursor:
+            rows = [dict(zip(_COLUMNS, row)) for row in await db_cursor.fetchall()]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["updated_at"], rows[-1]["workflow_id"])
+        return rows, next_cursor
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+
+_index: WorkflowIndex | None = None
+
+
+def get_workflow_index() -> WorkflowIndex:
+    """Process-wide workflow index (shares WORKFLOW_DB_PATH with the approval inbox)"""
+    global _index
+    if _index is None:
+        _index = WorkflowIndex(os.getenv("WORKFLOW_DB_PATH", "./data/workflows.db"))
+    return _index
@@ -2,10 +2,36 @@
 GalaxyCo.ai Specialist Agents
 ==============================
 
-Task-specific specialist agents with structured outputs.
+Task-specific specialist agents, registered per `TaskType` and dispatched
+by the orchestrator's specialist node through the registry.
 """
 
-# Placeholders for Phase 1.2
-# from .lead_qualifier import LeadQualifier
-# from .email_composer import EmailComposer
-# from .data_enricher import DataEnricher
+from .base import PlaceholderSpecialist, Specialist, SpecialistContext
+from .registry import (
+    SpecialistRegistry,
+    SpecialistTimeout,
+    get_specialist_registry,
+    register_specialist
+)
+
+# Specialists register themselves on import
+from .data_enricher import DataEnricher, SourceNotAllowed, get_enrichment_store
+from .email_composer import EmailComposer, compose_campaign, get_template_store
+from .lead_qualifier import LeadQualifier
+
+__all__ = [
+    "DataEnricher",
+    "EmailComposer",
+    "LeadQualifier",
+    "PlaceholderSpecialist",
+    "SourceNotAllowed",
+    "Specialist",
+    "SpecialistContext",
+    "SpecialistRegistry",
+    "SpecialistTimeout",
+    "compose_campaign",
+    "get_enrichment_store",
+    "get_specialist_registry",
+    "get_template_store",
+    "register_specialist"
+]
@@ -0,0 +1,120 @@
+"""
+GalaxyCo.ai - Specialist Base
+==============================
+
+A specialist is a plugin that handles one `TaskType`. It declares how it
+runs and the registry (specialists/registry.py) enforces it:
+
+    kind         "io": `run()` is awaited on the event loop (LLM and API
+                 calls); "cpu": `compute()` runs in the shared process pool
+                 so scoring or parsing never blocks the loop
+    concurrency  executions in flight per worker; further calls queue
+    timeout_s    per-execution deadline
+
+CPU-bound specialists get a plain-dict payload (built by `prepare()`, which
+may do I/O on the loop) and must return a plain dict, since both cross a
+process boundary.
+
+Specialists that call a model do so through `JsonModel`, which enforces and
+charges the workspace's quotas like the orchestrator nodes do.
+"""
+
+import json
+from dataclasses import asdict, dataclass, field
+from typing import Any, ClassVar, Literal, Optional
+
+from langchain_core.messages import HumanMessage
+
+from core.llm import estimate_cost, get_chat_model
+from core.prompts import system_message
+from core.quotas import get_quotas
+
+
+@dataclass(frozen=True)
+class SpecialistContext:
+    """What a specialist gets to work with"""
+    workspace_id: str
+    workflow_id: str
+    task_type: str
+    message: str  # the user's request
+    params: dict[str, Any] = field(default_factory=dict)  # extracted by PAA intake
+    subtasks: list[dict] = field(default_factory=list)  # from the planner
+
+
+class Specialist:
+    """Base class for specialist plugins"""
+
+    name: ClassVar[str]
+    task_type: ClassVar[str]
+    kind: ClassVar[Literal["io", "cpu"]] = "io"
+    concurrency: ClassVar[int] = 16
+    timeout_s: ClassVar[float] = 60.0
+
+    async def run(self, context: SpecialistContext) -> dict:
+        """I/O-bound work, on the event loop"""
+        raise NotImplementedError
+
+    async def prepare(self, context: SpecialistContext) -> dict:
+        """Picklable payload for `compute()`; runs on the event loop"""
+        return asdict(context)
+
+    @staticmethod
+    def compute(payload: dict) -> dict:
+        """CPU-bound work, in a worker process"""
+        raise NotImplementedError
+
+    def metrics(self) -> dict:
+        """Specialist-specific counters for GET /admin/specialists"""
+        return {}
+
+
+class JsonModel:
+    """JSON-answering model calls on behalf of one workspace; quota-checked and charged"""
+
+    def __init__(self, workspace_id: str, model: str, provider: str = "openai", temperature: float = 0.0):
+        self.workspace_id = workspace_id
+        self.model = model
+        self.provider = provider
+        self.temperature = temperature
+        self.calls = 0
+        self.tokens = 0
+        self.cost_usd = 0.0
+
+    async def ask(self, system: str, human: str) -> Optional[dict]:
+        """The model's JSON object answer, or None if it did not return one"""
+        quotas = get_quotas()
+        await quotas.check(self.workspace_id)
+        model = get_chat_model(self.provider, self.model, temperature=self.temperature)
+        # JSON mode keeps the answer parseable (OpenAI only)
+        options = {"response_format": {"type": "json_object"}} if self.provider == "openai" else {}
+        response = await model.ainvoke([system_message(system, self.provider), HumanMessage(content=human)], **options)
+        usage = response.usage_metadata or {}
+        cost = estimate_cost(usage, self.model)
+        await quotas.record_usage(self.workspace_id, usage.get("total_tokens", 0), cost)
+        self.calls += 1
+        self.tokens += usage.get("total_tokens", 0)
+        self.cost_usd += cost
+
+        try:
+            parsed = json.loads(response.content)
+        except (TypeError, json.JSONDecodeError):
+            return None
+        return parsed if isinstance(parsed, dict) else None
+
+
+class PlaceholderSpecialist(Specialist):
+    """Task types without an implementation yet get a marked, simulated result"""
+
+    name = "placeholder"
+    task_type = "*"
+    concurrency = 64
+    timeout_s = 5.0
+
+    async def run(self, context: SpecialistContext) -> dict:
+        return {
+            "status": "success",
+            "task_type": context.task_type,
+            "result": f"Simulated result for {context.task_type}",
+            "confidence": 0.95,
+            "simulated": True,
+        }
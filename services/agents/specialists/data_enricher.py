@@ -0,0 +1,601 @@
+"""
+GalaxyCo.ai - Data Enricher
+============================
+
+Bulk contact enrichment for `TaskType.DATA_ENRICHMENT`: adds company,
+industry, employee range and country to tens of thousands of contact rows
+from a CSV or JSONL file (a `{"$blob": blob_id}` upload, or a path relative
+to ENRICH_SOURCE_DIR).
+
+The file is streamed ENRICH_CHUNK_ROWS rows at a time, never loaded whole:
+
+    dedupe     rows are keyed by normalized email (or website/domain);
+               repeats of a key already seen are dropped
+    lookup     company data is per domain. Domains are answered from the
+               on-disk cache (ENRICH_DB_PATH, ENRICH_CACHE_TTL_DAYS) when
+               possible; the rest go to the model ENRICH_BATCH_SIZE domains
+               per call, ENRICH_CONCURRENCY calls at a time. Free-mail
+               domains are never looked up
+    write      enriched rows are appended to the output file, then the job
+               checkpoint (input rows consumed, output bytes written) is
+               saved
+
+An interrupted job (timeout, crash, deploy) resumes from its checkpoint
+under the same job_id: the output is truncated to the checkpointed size and
+reading continues at the checkpointed row, so no row is lost or written
+twice. Jobs report rows/sec.
+
+    python -m specialists.data_enricher contacts.csv enriched.csv --job-id contacts-2025-01
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import itertools
+import json
+import os
+import re
+import sys
+import time
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Awaitable, Callable, Iterator, Optional
+
+import aiosqlite
+
+from core import sqlite
+from core.blob_store import get_blob_store
+from core.quotas import get_quotas
+from core.uploads import get_upload_index
+
+from .base import JsonModel, Specialist, SpecialistContext
+from .registry import register_specialist
+
+ENRICHED_FIELDS = ("company", "industry", "employee_range", "country", "enrichment_status")
+
+FREE_MAIL_DOMAINS = frozenset({
+    "gmail.com", "googlemail.com", "yahoo.com", "hotmail.com", "outlook.com", "live.com",
+    "icloud.com", "me.com", "aol.com", "proton.me", "protonmail.com", "gmx.com", "mail.com",
+})
+
+ENRICH_PROMPT = """You are a company data enrichment service.
+
+For every domain listed, identify the company that owns it. Respond with a
+JSON object {"companies": [...]} holding one entry per domain:
+{"domain": "<domain as given>", "company": "...", "industry": "...",
+"employee_range": "1-10|11-50|51-200|201-1000|1001-5000|5000+", "country": "..."}
+Use null for anything you do not know. Never invent a company for a domain you do not recognize."""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS domain_cache (
+    domain TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS enrichment_jobs (
+    workspace_id TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (workspace_id, job_id)
+);
+"""
+
+# domains -> {domain: company data}; missing domains are unresolved
+DomainLookup = Callable[[list[str]], Awaitable[dict[str, dict]]]
+
+_WEBSITE = re.compile(r"^(?:[a-z][a-z0-9+.-]*://)?(?:www\.)?([^/:?#]+)")
+
+# Job ids and workspace ids name files under ENRICH_OUTPUT_DIR
+_SAFE_NAME = re.compile(r"[\w-]{1,128}", re.ASCII)
+
+
+# ============================================================================
+# KEYS
+# ============================================================================
+
+def normalize_email(value: Any) -> Optional[str]:
+    """Lowercased address without "mailto:" or a "+tag"; None if not an email"""
+    if not isinstance(value, str):
+        return None
+    value = value.strip().lower().removeprefix("mailto:")
+    local, at, domain = value.partition("@")
+    if not at or not local or "." not in domain:
+        return None
+    return f"{local.split('+', 1)[0]}@{domain}"
+
+
+def normalize_domain(value: Any) -> Optional[str]:
+    if not isinstance(value, str) or not value.strip():
+        return None
+    match = _WEBSITE.match(value.strip().lower())
+    domain = match.group(1).rstrip(".") if match else ""
+    return domain if "." in domain else None
+
+
+def record_key(record: dict) -> Optional[str]:
+    """Dedup key: normalized email, else the company domain"""
+    return normalize_email(record.get("email")) or normalize_domain(record.get("website") or record.get("domain"))
+
+
+def record_domain(record: dict) -> Optional[str]:
+    email = normalize_email(record.get("email"))
+    if email:
+        return email.split("@", 1)[1]
+    return normalize_domain(record.get("website") or record.get("domain"))
+
+
+# ============================================================================
+# STORE: DOMAIN CACHE AND JOB CHECKPOINTS
+# ============================================================================
+
+@dataclass
+class ChunkStats:
+    """Counters of one chunk; added to its job together with the chunk's checkpoint"""
+    duplicates: int = 0
+    domains_looked_up: int = 0
+    cache_hits: int = 0
+    llm_calls: int = 0
+    unresolved: int = 0
+
+
+@dataclass
+class EnrichmentJob:
+    """A bulk enrichment run and its checkpoint"""
+    job_id: str
+    source: str
+    output: str
+    format: str = "csv"
+    workspace_id: str = "cli"
+    offset: int = 0  # input rows consumed
+    output_bytes: int = 0  # output size at the checkpoint
+    rows_written: int = 0
+    duplicates: int = 0
+    domains_looked_up: int = 0
+    cache_hits: int = 0
+    llm_calls: int = 0
+    unresolved: int = 0
+    status: str = "running"
+    elapsed_s: float = 0.0
+    error: Optional[str] = None
+    extra: dict = field(default_factory=dict)
+
+    @property
+    def rows_per_s(self) -> float:
+        return round(self.offset / self.elapsed_s, 1) if self.elapsed_s else 0.0
+
+    def summary(self) -> dict:
+        return {**asdict(self), "rows_per_s": self.rows_per_s}
+
+    def add(self, stats: ChunkStats) -> None:
+        for f in fields(ChunkStats):
+            setattr(self, f.name, getattr(self, f.name) + getattr(stats, f.name))
+
+
+class EnrichmentStore:
+    """SQLite domain cache and job checkpoints"""
+
+    def __init__(self, db_path: str, ttl_s: float = 30 * 86400):
+        self.db_path = db_path
+        self.ttl_s = ttl_s
+        self._conn: aiosqlite.Connection | None = None
+        self._connect_lock = asyncio.Lock()
+
+    async def _connection(self) -> aiosqlite.Connection:
+        if self._conn is None:
+            # Concurrent first callers must share one connection
+            async with self._connect_lock:
+                if self._conn is None:
+                    self._conn = await sqlite.connect(self.db_path, _SCHEMA)
+        return self._conn
+
+    async def cached_domains(self, domains: list[str]) -> dict[str, dict]:
+        if not domains:
+            return {}
+        conn = await self._connection()
+        placeholders = ",".join("?" * len(domains))
+        async with conn.execute(
+            f"SELECT domain, data FROM domain_cache WHERE domain IN ({placeholders}) AND created_at >= ?",
+            (*domains, time.time() - self.ttl_s),
+        ) as cursor:
+            return {domain: json.loads(data) for domain, data in await cursor.fetchall()}
+
+    async def cache_domains(self, companies: dict[str, dict]) -> None:
+        if not companies:
+            return
+        conn = await self._connection()
+        now = time.time()
+        await conn.executemany(
+            "INSERT OR REPLACE INTO domain_cache (domain, data, created_at) VALUES (?, ?, ?)",
+            [(domain, json.dumps(data), now) for domain, data in companies.items()],
+        )
+
+    async def load_job(self, workspace_id: str, job_id: str) -> Optional[EnrichmentJob]:
+        conn = await self._connection()
+        async with conn.execute(
+            "SELECT state FROM enrichment_jobs WHERE workspace_id = ? AND job_id = ?", (workspace_id, job_id)
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return None
+        known = {f.name for f in fields(EnrichmentJob)}
+        return EnrichmentJob(**{k: v for k, v in json.loads(row[0]).items() if k in known})
+
+    async def save_job(self, job: EnrichmentJob) -> None:
+        conn = await self._connection()
+        await conn.execute(
+            "INSERT OR REPLACE INTO enrichment_jobs (workspace_id, job_id, state, updated_at) VALUES (?, ?, ?, ?)",
+            (job.workspace_id, job.job_id, json.dumps(asdict(job)), time.time()),
+        )
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+
+_store: EnrichmentStore | None = None
+
+
+def get_enrichment_store() -> EnrichmentStore:
+    """Process-wide enrichment store configured from the environment"""
+    global _store
+    if _store is None:
+        _store = EnrichmentStore(
+            os.getenv("ENRICH_DB_PATH", "./data/enrichment.db"),
+            ttl_s=float(os.getenv("ENRICH_CACHE_TTL_DAYS", "30")) * 86400,
+        )
+    return _store
+
+
+# ============================================================================
+# LOOKUP
+# ============================================================================
+
+class LLMDomainLookup:
+    """Company data for a batch of domains from one model call, charged to the workspace"""
+
+    def __init__(self, workspace_id: str, provider: str = "openai", model: Optional[str] = None):
+        self.model = JsonModel(workspace_id, model or os.getenv("ENRICH_MODEL", "gpt-4o-mini"), provider)
+
+    async def __call__(self, domains: list[str]) -> dict[str, dict]:
+        answer = await self.model.ask(ENRICH_PROMPT, "Domains:\n" + "\n".join(domains)) or {}
+        companies = answer.get("companies")
+        companies = companies if isinstance(companies, list) else []
+        wanted = set(domains)
+        return {
+            str(entry.get("domain", "")).lower(): {key: entry.get(key) for key in ENRICHED_FIELDS[:-1]}
+            for entry in companies
+            if isinstance(entry, dict) and str(entry.get("domain", "")).lower() in wanted
+        }
+
+
+# ============================================================================
+# STREAMING READ / WRITE
+# ============================================================================
+
+class RowReader:
+    """Chunks of rows from a CSV or JSONL file, read in a worker thread"""
+
+    def __init__(self, path: str, fmt: str):
+        self._file = open(path, newline="" if fmt == "csv" else None, encoding="utf-8")
+        self._rows: Iterator[dict] = (
+            csv.DictReader(self._file) if fmt == "csv" else (json.loads(line) for line in self._file if line.strip())
+        )
+        self.columns: list[str] = []
+
+    def _take(self, count: int) -> list[dict]:
+        rows = list(itertools.islice(self._rows, count))
+        if not self.columns and isinstance(self._rows, csv.DictReader):
+            self.columns = list(self._rows.fieldnames or [])
+        return rows
+
+    async def take(self, count: int) -> list[dict]:
+        return await asyncio.to_thread(self._take, count)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class RowWriter:
+    """Appends enriched rows; flushed and fsynced per chunk for checkpointing"""
+
+    def __init__(self, path: str, fmt: str, truncate_to: int):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.fmt = fmt
+        self._file = open(path, "a+b")
+        self._file.truncate(truncate_to)
+        self._file.seek(truncate_to)
+        self.columns: Optional[list[str]] = None
+
+    def _write(self, rows: list[dict], columns: list[str]) -> int:
+        buffer = io.StringIO()
+        if self.fmt == "csv":
+            self.columns = self.columns or [*columns, *(f for f in ENRICHED_FIELDS if f not in columns)]
+            writer = csv.DictWriter(buffer, fieldnames=self.columns, extrasaction="ignore")
+            if self._file.tell() == 0:
+                writer.writeheader()
+            writer.writerows(rows)
+        else:
+            buffer.writelines(json.dumps(row) + "\n" for row in rows)
+        self._file.write(buffer.getvalue().encode("utf-8"))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return self._file.tell()
+
+    async def write(self, rows: list[dict], columns: list[str]) -> int:
+        """Append rows; returns the output size"""
+        return await asyncio.to_thread(self._write, rows, columns)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def output_path(workspace_id: str, job_id: str, fmt: str) -> str:
+    """ENRICH_OUTPUT_DIR/<workspace_id>/<job_id>.<fmt>; ids that are not [A-Za-z0-9_-]+ are refused"""
+    for label, value in (("workspace_id", workspace_id), ("job_id", job_id)):
+        if not _SAFE_NAME.fullmatch(value):
+            raise ValueError(f"{label} must match [A-Za-z0-9_-]+ (at most 128 characters): {value!r}")
+    return os.path.join(os.getenv("ENRICH_OUTPUT_DIR", "./data/enriched"), workspace_id, f"{job_id}.{fmt}")
+
+
+def file_format(path: str) -> str:
+    return "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+
+
+class SourceNotAllowed(ValueError):
+    """Raised when a file source is outside ENRICH_SOURCE_DIR (or no such dir is configured)"""
+
+
+def source_path(source: str) -> str:
+    """
+    A plain-string source is a path relative to ENRICH_SOURCE_DIR. It comes
+    from intake params the user controls, so absolute paths, `..` and
+    symlinks out of the directory are refused.
+    """
+    root = os.getenv("ENRICH_SOURCE_DIR")
+    if not root:
+        raise SourceNotAllowed("File sources are disabled (ENRICH_SOURCE_DIR is not set); upload with POST /blobs")
+    if os.path.isabs(source) or ".." in re.split(r"[\\/]", source):
+        raise SourceNotAllowed(f"Source must be a relative path inside ENRICH_SOURCE_DIR: {source!r}")
+    root = os.path.realpath(root)
+    path = os.path.realpath(os.path.join(root, source))
+    if os.path.commonpath([root, path]) != root:
+        raise SourceNotAllowed(f"Source must be a relative path inside ENRICH_SOURCE_DIR: {source!r}")
+    return path
+
+
+async def source_file(workspace_id: str, source: Any) -> tuple[str, str]:
+    """
+    Path and format of a {"$blob": blob_id} source, which the workspace must
+    have uploaded (UploadNotFound otherwise), or of a path inside
+    ENRICH_SOURCE_DIR (SourceNotAllowed otherwise)
+    """
+    if isinstance(source, dict) and "$blob" in source:
+        upload = await get_upload_index().get(workspace_id, str(source["$blob"]))
+        jsonl = "json" in upload.media_type or file_format(upload.filename or "") == "jsonl"
+        return get_blob_store().path(upload.blob_id), "jsonl" if jsonl else "csv"
+    if not isinstance(source, str):
+        raise SourceNotAllowed(f"Unsupported source: {source!r}")
+    return source_path(source), file_format(source)
+
+
+async def read_rows(workspace_id: str, source: Any, max_rows: int) -> list[dict]:
+    """
+    Every row of a source (checked by source_file), for callers that need the
+    whole batch in memory. More than `max_rows` rows is a ValueError.
+    """
+    path, fmt = await source_file(workspace_id, source)
+    reader = RowReader(path, fmt)
+    try:
+        rows: list[dict] = []
+        while chunk := await reader.take(min(1000, max_rows + 1 - len(rows))):
+            rows.extend(chunk)
+            if len(rows) > max_rows:
+                raise ValueError(f"Source has more than {max_rows} rows")
+        return rows
+    finally:
+        reader.close()
+
+
+# ============================================================================
+# ENRICHMENT
+# ============================================================================
+
+class Enricher:
+    """Streams a file through dedupe, cached + batched domain lookups and incremental writes"""
+
+    def __init__(
+        self,
+        lookup: DomainLookup,
+        store: Optional[EnrichmentStore] = None,
+        chunk_rows: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+    ):
+        self.lookup = lookup
+        self.store = store or get_enrichment_store()
+        self.chunk_rows = chunk_rows or int(os.getenv("ENRICH_CHUNK_ROWS", "1000"))
+        self.batch_size = batch_size or int(os.getenv("ENRICH_BATCH_SIZE", "25"))
+        self.concurrency = concurrency or int(os.getenv("ENRICH_CONCURRENCY", "4"))
+        # Per-run memo in front of the disk cache
+        self._known: dict[str, Optional[dict]] = {}
+
+    async def _resolve(self, domains: set[str], stats: ChunkStats) -> None:
+        """Fill self._known for `domains`: memo, then disk cache, then batched lookups"""
+        missing = sorted(d for d in domains if d not in self._known)
+        if not missing:
+            return
+        cached = await self.store.cached_domains(missing)
+        self._known.update(cached)
+        stats.cache_hits += len(cached)
+        missing = [d for d in missing if d not in cached]
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def lookup(batch: list[str]) -> dict[str, dict]:
+            async with semaphore:
+                stats.llm_calls += 1
+                return await self.lookup(batch)
+
+        batches = [missing[i:i + self.batch_size] for i in range(0, len(missing), self.batch_size)]
+        found: dict[str, dict] = {}
+        for answer in await asyncio.gather(*(lookup(batch) for batch in batches)):
+            found.update(answer)
+        stats.domains_looked_up += len(missing)
+        await self.store.cache_domains(found)
+        for domain in missing:
+            # Unresolved domains are remembered for this run only, not cached
+            self._known[domain] = found.get(domain)
+
+    def _enrich(self, row: dict, stats: ChunkStats) -> dict:
+        domain = record_domain(row)
+        if domain is None:
+            status, data = "no_domain", {}
+        elif domain in FREE_MAIL_DOMAINS:
+            status, data = "personal_email", {}
+        elif self._known.get(domain):
+            status, data = "enriched", self._known[domain]
+        else:
+            status, data = "unresolved", {}
+            stats.unresolved += 1
+        return {**row, **{key: data.get(key) for key in ENRICHED_FIELDS[:-1]}, "enrichment_status": status}
+
+    async def enrich_rows(self, rows: list[dict], stats: ChunkStats, seen: set[str]) -> list[dict]:
+        """Dedupe and enrich one chunk of rows, counting into `stats`"""
+        unique = []
+        for row in rows:
+            key = record_key(row)
+            if key is not None and key in seen:
+                stats.duplicates += 1
+                continue
+            if key is not None:
+                seen.add(key)
+            unique.append(row)
+        domains = {d for d in map(record_domain, unique) if d and d not in FREE_MAIL_DOMAINS}
+        await self._resolve(domains, stats)
+        return [self._enrich(row, stats) for row in unique]
+
+    async def run(self, job: EnrichmentJob) -> EnrichmentJob:
+        """Run (or resume) a job to completion, checkpointing after every chunk"""
+        reader = RowReader(job.source, job.format)
+        writer = RowWriter(job.output, job.format, truncate_to=job.output_bytes)
+        seen: set[str] = set()
+        started = time.perf_counter() - job.elapsed_s
+        try:
+            # Resume: rebuild the dedupe keys of rows already consumed
+            for start in range(0, job.offset, self.chunk_rows):
+                seen.update(filter(None, map(record_key, await reader.take(min(self.chunk_rows, job.offset - start)))))
+            while rows := await reader.take(self.chunk_rows):
+                stats = ChunkStats()
+                enriched = await self.enrich_rows(rows, stats, seen)
+                output_bytes = await writer.write(enriched, reader.columns or list(rows[0]))
+                # The chunk counts only once written: a chunk interrupted before
+                # this point is redone on resume and must not be counted twice
+                job.output_bytes = output_bytes
+                job.offset += len(rows)
+                job.rows_written += len(enriched)
+                job.add(stats)
+                job.elapsed_s = time.perf_counter() - started
+                await self.store.save_job(job)
+            job.status = "completed"
+        except asyncio.CancelledError:
+            job.status = "interrupted"
+            raise
+        except Exception as e:
+            job.status, job.error = "failed", str(e)
+            raise
+        finally:
+            job.elapsed_s = time.perf_counter() - started
+            reader.close()
+            writer.close()
+            # Shielded: a timeout must still leave a resumable checkpoint
+            await asyncio.shield(self.store.save_job(job))
+        return job
+
+
+async def start_or_resume(
+    job_id: str,
+    source: str,
+    output: str,
+    lookup: DomainLookup,
+    fmt: Optional[str] = None,
+    workspace_id: str = "cli",
+    **options: Any,
+) -> EnrichmentJob:
+    """
+    Resume the workspace's `job_id` from its checkpoint, or start it (again,
+    once completed). Checkpoints are per workspace: another workspace's job
+    of the same id is a different job.
+    """
+    store = options.pop("store", None) or get_enrichment_store()
+    job = await store.load_job(workspace_id, job_id)
+    if job is None or job.status == "completed":
+        job = EnrichmentJob(
+            job_id=job_id, source=source, output=output, format=fmt or file_format(source), workspace_id=workspace_id
+        )
+    job.status, job.error = "running", None
+    return await Enricher(lookup, store=store, **options).run(job)
+
+
+# ============================================================================
+# SPECIALIST
+# ============================================================================
+
+@register_specialist
+class DataEnricher(Specialist):
+    """
+    Bulk enrichment when intake extracted a `source` file ({"$blob": id}, or
+    a path inside ENRICH_SOURCE_DIR); otherwise enriches the single contact
+    in the params
+    """
+
+    name = "data_enricher"
+    task_type = "data_enrichment"
+    kind = "io"
+    concurrency = int(os.getenv("ENRICH_MAX_JOBS", "2"))
+    timeout_s = float(os.getenv("ENRICH_TIMEOUT_S", "3600"))
+
+    async def run(self, context: SpecialistContext) -> dict:
+        lookup = LLMDomainLookup(context.workspace_id)
+        source = context.params.get("source")
+        if not source:
+            stats = ChunkStats()
+            rows = await Enricher(lookup).enrich_rows([context.params], stats, set())
+            return {"status": "success", "record": rows[0], "llm_calls": stats.llm_calls, "cost_usd": lookup.model.cost_usd}
+
+        path, fmt = await source_file(context.workspace_id, source)
+        job_id = context.params.get("job_id") or "enrich_" + re.sub(r"[^\w-]", "_", context.workflow_id, flags=re.ASCII)
+        output = output_path(context.workspace_id, str(job_id), fmt)
+
+        job = await start_or_resume(str(job_id), path, output, lookup, fmt=fmt, workspace_id=context.workspace_id)
+        # The job only returns once completed; failures raise
+        return {**job.summary(), "status": "success", "cost_usd": round(lookup.model.cost_usd, 6)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bulk contact enrichment (CSV or JSONL)")
+    parser.add_argument("source")
+    parser.add_argument("output")
+    parser.add_argument("--job-id", help="checkpoint name; rerun with the same id to resume")
+    parser.add_argument("--workspace", default="cli", help="workspace charged for model usage")
+    args = parser.parse_args()
+
+    async def run() -> EnrichmentJob:
+        try:
+            job_id = args.job_id or os.path.basename(args.output)
+            return await start_or_resume(
+                job_id, args.source, args.output, LLMDomainLookup(args.workspace), workspace_id=args.workspace
+            )
+        finally:
+            await get_enrichment_store().close()
+            await get_quotas().close()
+
+    print(json.dumps(asyncio.run(run()).summary(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
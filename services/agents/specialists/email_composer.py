@@ -0,0 +1,397 @@
+"""
+GalaxyCo.ai - Email Composer
+=============================
+
+Campaign email composition for `TaskType.EMAIL_COMPOSITION` and for
+/execute `email` requests that list `recipients`. Campaign emails to many
+contacts are near-identical, so instead of one model call per email:
+
+    template      one model call per (workspace, campaign, segment, brief)
+                  writes a subject and body with {{variable}} placeholders.
+                  Templates are cached in SQLite (EMAIL_TEMPLATE_DB_PATH,
+                  EMAIL_TEMPLATE_TTL_DAYS); concurrent sends of the same
+                  campaign share one generation
+    fill          every recipient's variables (first_name, company, ...) are
+                  substituted locally
+    personalize   only high-value recipients (`high_value: true`, or a
+                  `value` of at least EMAIL_PERSONALIZE_MIN_VALUE) get a
+                  model rewrite of their filled draft, EMAIL_PERSONALIZE_BATCH
+                  per call and at most EMAIL_PERSONALIZE_MAX per send
+
+A 1,000-recipient send with 20 high-value contacts costs 1 + 4 model calls
+instead of 1,000, and 4 once the template is cached.
+
+Inputs (specialist params or /execute inputs):
+    recipients         list of contacts (or `source`: a CSV/JSONL {"$blob": id} or path
+                       inside ENRICH_SOURCE_DIR, at most EMAIL_MAX_SOURCE_ROWS rows)
+    campaign, segment  template cache key (defaults: the workflow/agent id, "default")
+    brief              what the email is about (defaults: the user's request)
+    sender_name
+    personalize_above  overrides EMAIL_PERSONALIZE_MIN_VALUE
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
+
+import aiosqlite
+
+from core import sqlite
+
+from .base import JsonModel, Specialist, SpecialistContext
+from .data_enricher import read_rows
+from .registry import register_specialist
+
+FALLBACKS = {"first_name": "there", "company": "your team", "sender_name": "The GalaxyCo team"}
+
+TEMPLATE_PROMPT = """You are a campaign email template writer.
+
+Write ONE reusable outbound email for the campaign brief and audience segment
+given. It will be sent to many recipients, so never mention a specific person
+or company: use these placeholders instead, written exactly like this:
+{{first_name}}, {{last_name}}, {{company}}, {{title}}, {{industry}}, {{sender_name}}
+
+Respond with a JSON object: {"subject": "...", "body": "..."}"""
+
+PERSONALIZE_PROMPT = """You are an account executive personalizing outreach to key accounts.
+
+Each draft below (under "### Recipient <id>") was filled in from a campaign
+template. Rewrite it for that recipient using the details given: keep the
+offer, length and call to action, make the opening specific to them.
+Respond with a JSON object {"emails": [...]} holding one entry per recipient:
+{"id": "<id as given>", "subject": "...", "body": "..."}"""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS email_templates (
+    workspace_id TEXT NOT NULL,
+    template_key TEXT NOT NULL,
+    campaign TEXT NOT NULL,
+    segment TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    model TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (workspace_id, template_key)
+);
+"""
+
+_PLACEHOLDER = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+# ============================================================================
+# TEMPLATES
+# ============================================================================
+
+@dataclass(frozen=True)
+class EmailTemplate:
+    """A cached campaign template"""
+    workspace_id: str
+    template_key: str
+    campaign: str
+    segment: str
+    subject: str
+    body: str
+    model: str
+    created_at: float
+
+
+def template_key(campaign: str, segment: str, brief: str) -> str:
+    """Cache key: a changed brief is a new template"""
+    brief_hash = hashlib.sha256(brief.strip().encode()).hexdigest()[:16]
+    return f"{campaign}:{segment}:{brief_hash}"
+
+
+def fill(text: str, variables: dict[str, str]) -> tuple[str, set[str]]:
+    """Substitute {{placeholders}}; returns the text and the placeholders that used a fallback"""
+    fallbacks: set[str] = set()
+
+    def substitute(match: re.Match) -> str:
+        name = match.group(1)
+        value = variables.get(name)
+        if value:
+            return value
+        fallbacks.add(name)
+        return FALLBACKS.get(name, "")
+
+    return _PLACEHOLDER.sub(substitute, text), fallbacks
+
+
+def recipient_variables(recipient: dict, sender_name: Optional[str]) -> dict[str, str]:
+    name = str(recipient.get("name") or "").split()
+    variables = {
+        "first_name": recipient.get("first_name") or (name[0] if name else None),
+        "last_name": recipient.get("last_name") or (name[-1] if len(name) > 1 else None),
+        "company": recipient.get("company"),
+        "title": recipient.get("title"),
+        "industry": recipient.get("industry"),
+        "sender_name": sender_name,
+    }
+    return {key: str(value).strip() for key, value in variables.items() if value not in (None, "")}
+
+
+def is_high_value(recipient: dict, min_value: float) -> bool:
+    if recipient.get("high_value") is True:
+        return True
+    try:
+        return float(recipient.get("value") or 0) >= min_value
+    except (TypeError, ValueError):
+        return False
+
+
+class TemplateStore:
+    """SQLite cache of campaign templates per workspace"""
+
+    def __init__(self, db_path: str, ttl_s: float = 7 * 86400):
+        self.db_path = db_path
+        self.ttl_s = ttl_s
+        self._conn: aiosqlite.Connection | None = None
+        self._connect_lock = asyncio.Lock()
+
+    async def _connection(self) -> aiosqlite.Connection:
+        if self._conn is None:
+            # Concurrent first callers must share one connection
+            async with self._connect_lock:
+                if self._conn is None:
+                    self._conn = await sqlite.connect(self.db_path, _SCHEMA)
+        return self._conn
+
+    async def get(self, workspace_id: str, key: str) -> Optional[EmailTemplate]:
+        conn = await self._connection()
+        async with conn.execute(
+            "SELECT workspace_id, template_key, campaign, segment, subject, body, model, created_at"
+            " FROM email_templates WHERE workspace_id = ? AND template_key = ? AND created_at >= ?",
+            (workspace_id, key, time.time() - self.ttl_s),
+        ) as cursor:
+            row = await cursor.fetchone()
+        return EmailTemplate(*row) if row else None
+
+    async def put(self, template: EmailTemplate) -> None:
+        conn = await self._connection()
+        await conn.execute("DELETE FROM email_templates WHERE created_at < ?", (time.time() - self.ttl_s,))
+        await conn.execute(
+            "INSERT OR REPLACE INTO email_templates"
+            " (workspace_id, template_key, campaign, segment, subject, body, model, created_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            tuple(asdict(template).values()),
+        )
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+
+_store: TemplateStore | None = None
+
+
+def get_template_store() -> TemplateStore:
+    """Process-wide template cache configured from the environment"""
+    global _store
+    if _store is None:
+        _store = TemplateStore(
+            os.getenv("EMAIL_TEMPLATE_DB_PATH", "./data/email_templates.db"),
+            ttl_s=float(os.getenv("EMAIL_TEMPLATE_TTL_DAYS", "7")) * 86400,
+        )
+    return _store
+
+
+# ============================================================================
+# COMPOSITION
+# ============================================================================
+
+@dataclass
+class ComposerStats:
+    """Campaign composition since the worker started"""
+    sends: int = 0
+    emails: int = 0
+    templates_generated: int = 0
+    template_cache_hits: int = 0
+    personalized: int = 0
+    llm_calls: int = 0
+
+    def summary(self) -> dict:
+        return {
+            **asdict(self),
+            # Against one model call per email
+            "llm_calls_avoided": self.emails - self.llm_calls,
+        }
+
+
+_stats = ComposerStats()
+# template key -> generation in progress, so concurrent sends share one call
+_generating: dict[tuple[str, str], asyncio.Future] = {}
+
+
+def get_composer_stats() -> ComposerStats:
+    return _stats
+
+
+async def _template(model: JsonModel, campaign: str, segment: str, brief: str) -> tuple[EmailTemplate, bool]:
+    """The campaign template, from the cache or generated; and whether it was cached"""
+    store = get_template_store()
+    key = template_key(campaign, segment, brief)
+    cached = await store.get(model.workspace_id, key)
+    if cached is not None:
+        return cached, True
+
+    inflight = _generating.get((model.workspace_id, key))
+    if inflight is not None:
+        return await asyncio.shield(inflight), True
+
+    future = asyncio.get_running_loop().create_future()
+    _generating[(model.workspace_id, key)] = future
+    try:
+        answer = await model.ask(TEMPLATE_PROMPT, f"Campaign: {campaign}\nSegment: {segment}\n\nBrief:\n{brief}")
+        if not answer or not isinstance(answer.get("subject"), str) or not isinstance(answer.get("body"), str):
+            raise ValueError("Template model did not return a subject and body")
+        template = EmailTemplate(
+            workspace_id=model.workspace_id,
+            template_key=key,
+            campaign=campaign,
+            segment=segment,
+            subject=answer["subject"],
+            body=answer["body"],
+            model=model.model,
+            created_at=time.time(),
+        )
+        await store.put(template)
+        _stats.templates_generated += 1
+        future.set_result(template)
+        return template, False
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        # Retrieved so a failed generation nobody else awaited is not logged as unhandled
+        future.exception()
+        raise
+    finally:
+        del _generating[(model.workspace_id, key)]
+
+
+async def _personalize(model: JsonModel, drafts: list[tuple[int, dict, dict]]) -> dict[int, dict]:
+    """Model rewrites for one batch of (index, recipient, filled draft)"""
+    human = "\n\n".join(
+        f"### Recipient {index}\nDetails: {json.dumps(recipient, default=str)}\n"
+        f"Subject: {draft['subject']}\n\n{draft['body']}"
+        for index, recipient, draft in drafts
+    )
+    answer = await model.ask(PERSONALIZE_PROMPT, human) or {}
+    emails = answer.get("emails")
+    wanted = {index for index, _, _ in drafts}
+    return {
+        int(entry["id"]): entry
+        for entry in (emails if isinstance(emails, list) else [])
+        if isinstance(entry, dict)
+        and str(entry.get("id")).isdigit()
+        and int(entry["id"]) in wanted
+        and isinstance(entry.get("subject"), str)
+        and isinstance(entry.get("body"), str)
+    }
+
+
+async def compose_campaign(
+    workspace_id: str,
+    inputs: dict[str, Any],
+    provider: str = "openai",
+    model: Optional[str] = None,
+    default_campaign: str = "default",
+) -> dict:
+    """
+    Emails for every recipient in `inputs` (see the module docstring):
+    {"emails": [...], "template": {...}, "summary": {...}}
+    """
+    recipients = inputs.get("recipients")
+    if not isinstance(recipients, list):
+        max_recipients = int(os.getenv("EMAIL_MAX_SOURCE_ROWS", "50000"))
+        recipients = await read_rows(workspace_id, inputs["source"], max_recipients)
+    recipients = [r for r in recipients if isinstance(r, dict)]
+    campaign = str(inputs.get("campaign") or default_campaign)
+    segment = str(inputs.get("segment") or "default")
+    brief = str(inputs.get("brief") or inputs.get("context") or "")
+    sender_name = inputs.get("sender_name")
+    min_value = float(inputs.get("personalize_above") or os.getenv("EMAIL_PERSONALIZE_MIN_VALUE", "10000"))
+
+    model = JsonModel(workspace_id, model or os.getenv("EMAIL_MODEL", "gpt-4o-mini"), provider, temperature=0.7)
+    template, cached = await _template(model, campaign, segment, brief)
+
+    emails = []
+    for index, recipient in enumerate(recipients):
+        variables = recipient_variables(recipient, sender_name)
+        subject, _ = fill(template.subject, variables)
+        body, fallbacks = fill(template.body, variables)
+        emails.append({
+            "index": index,
+            "to": recipient.get("email"),
+            "subject": subject,
+            "body": body,
+            "personalized": False,
+            "fallbacks": sorted(fallbacks),
+        })
+
+    high_value = [i for i, r in enumerate(recipients) if is_high_value(r, min_value)]
+    limit = int(os.getenv("EMAIL_PERSONALIZE_MAX", "100"))
+    batch_size = int(os.getenv("EMAIL_PERSONALIZE_BATCH", "5"))
+    drafts = [(i, recipients[i], emails[i]) for i in high_value[:limit]]
+    semaphore = asyncio.Semaphore(int(os.getenv("EMAIL_PERSONALIZE_CONCURRENCY", "4")))
+
+    async def personalize(batch: list[tuple[int, dict, dict]]) -> dict[int, dict]:
+        async with semaphore:
+            return await _personalize(model, batch)
+
+    rewrites: dict[int, dict] = {}
+    batches = [drafts[i:i + batch_size] for i in range(0, len(drafts), batch_size)]
+    for answer in await asyncio.gather(*(personalize(batch) for batch in batches)):
+        rewrites.update(answer)
+    for index, rewrite in rewrites.items():
+        # A rewrite may still carry placeholders; fill them like the template
+        variables = recipient_variables(recipients[index], sender_name)
+        emails[index].update(subject=fill(rewrite["subject"], variables)[0], body=fill(rewrite["body"], variables)[0], personalized=True)
+
+    _stats.sends += 1
+    _stats.emails += len(emails)
+    _stats.template_cache_hits += int(cached)
+    _stats.personalized += len(rewrites)
+    _stats.llm_calls += model.calls
+    return {
+        "emails": emails,
+        "template": {"campaign": campaign, "segment": segment, "subject": template.subject, "body": template.body, "cached": cached},
+        "summary": {
+            "emails": len(emails),
+            "high_value": len(high_value),
+            "personalized": len(rewrites),
+            "template_cached": cached,
+            "llm_calls": model.calls,
+            "tokens_used": model.tokens,
+            "cost_usd": round(model.cost_usd, 6),
+        },
+    }
+
+
+@register_specialist
+class EmailComposer(Specialist):
+    """Template once per campaign and segment, local fill, model personalization for key accounts"""
+
+    name = "email_composer"
+    task_type = "email_composition"
+    kind = "io"
+    concurrency = 8
+    timeout_s = float(os.getenv("EMAIL_TIMEOUT_S", "300"))
+
+    def metrics(self) -> dict:
+        return _stats.summary()
+
+    async def run(self, context: SpecialistContext) -> dict:
+        params = dict(context.params)
+        if not isinstance(params.get("recipients"), list) and not params.get("source"):
+            # A single email: the contact intake extracted is the only recipient
+            params["recipients"] = [params]
+        params.setdefault("brief", context.message)
+        result = await compose_campaign(context.workspace_id, params, default_campaign=context.workflow_id)
+        return {"status": "success", **result}
@@ -0,0 +1,341 @@
+"""
+GalaxyCo.ai - Lead Qualifier
+=============================
+
+Qualifies leads for `TaskType.LEAD_QUALIFICATION`: a batch from the intake
+params (`leads`: a list, or `source`: a CSV/JSONL {"$blob": id} or path
+inside ENRICH_SOURCE_DIR, at most LEAD_MAX_SOURCE_ROWS rows), or the single
+lead intake extracted.
+
+Most leads are clearly in or out from their structured fields alone, so the
+whole batch is scored first with one vectorized pass (NumPy, no model call)
+over six signals:
+
+    seniority        title: C-level/founder > VP/head > director > manager
+    company_size     employees or employee_range, log-scaled
+    corporate_email  work domain vs free-mail
+    budget           log-scaled
+    engagement       interactions (opens, visits, replies), capped at 10
+    phone            reachable by phone
+
+    score = signals @ LEAD_WEIGHTS (0-100)
+
+Leads scoring at least `qualify_at` are qualified and those under
+`reject_below` rejected, as long as at least `min_signals` signals are known.
+Only the ambiguous rest goes to the model, LEAD_LLM_BATCH_SIZE leads per
+call. Thresholds default from LEAD_QUALIFY_AT / LEAD_REJECT_BELOW /
+LEAD_MIN_SIGNALS and can be set per workspace in LEAD_THRESHOLDS, e.g.
+{"ws_enterprise": {"qualify_at": 80, "reject_below": 50}}.
+
+Results and GET /admin/specialists report how many model calls the
+pre-filter avoided, against sending every lead to the model.
+"""
+
+import asyncio
+import json
+import math
+import os
+import re
+from dataclasses import asdict, dataclass, fields, replace
+from typing import Any, Optional
+
+from .base import JsonModel, Specialist, SpecialistContext
+from .data_enricher import FREE_MAIL_DOMAINS, normalize_email, read_rows
+from .registry import register_specialist
+
+SIGNALS = ("seniority", "company_size", "corporate_email", "budget", "engagement", "phone")
+DEFAULT_WEIGHTS = (30.0, 20.0, 15.0, 20.0, 10.0, 5.0)
+
+SENIORITY = (
+    (re.compile(r"\b(ceo|cto|cfo|coo|cmo|cro|cio|chief|founder|co-founder|owner|president)\b"), 1.0),
+    (re.compile(r"\b(vp|svp|evp|vice president|head)\b"), 0.8),
+    (re.compile(r"\b(director)\b"), 0.6),
+    (re.compile(r"\b(manager|lead)\b"), 0.4),
+)
+
+LEAD_PROMPT = """You are a B2B lead qualification analyst.
+
+For every lead below (each under "### Lead <id>", with the rule-based score
+it got from its structured fields), decide whether it is a qualified sales
+lead. Respond with a JSON object {"leads": [...]} holding one entry per lead:
+{"id": "<id as given>", "qualified": true|false, "score": 0-100, "reason": "<one sentence>"}"""
+
+_NUMBER = re.compile(r"(\d+(?:\.\d+)?)\s*([km]?)")
+
+
+# ============================================================================
+# THRESHOLDS
+# ============================================================================
+
+@dataclass(frozen=True)
+class LeadThresholds:
+    """Pre-filter decision thresholds for one workspace"""
+    qualify_at: float = 70.0
+    reject_below: float = 35.0
+    min_signals: int = 2  # fewer known signals: the rules cannot reject, the model decides
+
+    @classmethod
+    def from_env(cls) -> "LeadThresholds":
+        """Default thresholds from LEAD_* environment variables"""
+        return cls(
+            qualify_at=float(os.getenv("LEAD_QUALIFY_AT", cls.qualify_at)),
+            reject_below=float(os.getenv("LEAD_REJECT_BELOW", cls.reject_below)),
+            min_signals=int(os.getenv("LEAD_MIN_SIGNALS", cls.min_signals)),
+        )
+
+
+def thresholds_for(workspace_id: str) -> LeadThresholds:
+    """
+    Thresholds for a workspace: LEAD_THRESHOLDS, a JSON object of
+    per-workspace overrides, over the LEAD_* defaults
+    """
+    defaults = LeadThresholds.from_env()
+    raw = os.getenv("LEAD_THRESHOLDS")
+    if not raw:
+        return defaults
+
+    try:
+        parsed = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"LEAD_THRESHOLDS is not valid JSON: {e}") from e
+    if not isinstance(parsed, dict):
+        raise ValueError("LEAD_THRESHOLDS must be a JSON object of workspace_id -> thresholds")
+    values = parsed.get(workspace_id)
+    if values is None:
+        return defaults
+    if not isinstance(values, dict):
+        raise ValueError(f"LEAD_THRESHOLDS[{workspace_id!r}] must be an object")
+    unknown = set(values) - {f.name for f in fields(LeadThresholds)}
+    if unknown:
+        raise ValueError(f"LEAD_THRESHOLDS[{workspace_id!r}] has unknown keys {sorted(unknown)}")
+    thresholds = replace(defaults, **values)
+    if thresholds.reject_below > thresholds.qualify_at:
+        raise ValueError(f"LEAD_THRESHOLDS[{workspace_id!r}]: reject_below is above qualify_at")
+    return thresholds
+
+
+# ============================================================================
+# VECTORIZED SCORING
+# ============================================================================
+
+def _number(value: Any) -> Optional[float]:
+    """123, "1,200", "$50k", "2.5M", "51-200" (geometric midpoint), "5000+" -> float"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str):
+        return None
+    found = [
+        float(number) * {"k": 1e3, "m": 1e6}.get(suffix, 1.0)
+        for number, suffix in _NUMBER.findall(value.lower().replace(",", ""))
+    ]
+    if not found:
+        return None
+    return math.sqrt(found[0] * found[1]) if len(found) == 2 else found[0]
+
+
+def _seniority(lead: dict) -> Optional[float]:
+    title = lead.get("title") or lead.get("job_title")
+    if not isinstance(title, str) or not title.strip():
+        return None
+    title = title.lower()
+    return next((level for pattern, level in SENIORITY if pattern.search(title)), 0.1)
+
+
+def _corporate_email(lead: dict) -> Optional[float]:
+    email = normalize_email(lead.get("email"))
+    if email is None:
+        return None
+    return 0.0 if email.split("@", 1)[1] in FREE_MAIL_DOMAINS else 1.0
+
+
+def _field(lead: dict, *names: str) -> Any:
+    return next((lead[name] for name in names if lead.get(name) not in (None, "")), None)
+
+
+def signal_matrix(leads: list[dict]):
+    """
+    (n, len(SIGNALS)) float array of raw signal values, NaN where unknown.
+    Parsing is per lead; all scaling is vectorized.
+    """
+    import numpy as np
+
+    raw = np.array(
+        [
+            [
+                _seniority(lead),
+                _number(_field(lead, "employees", "employee_count", "employee_range", "company_size")),
+                _corporate_email(lead),
+                _number(_field(lead, "budget")),
+                _number(_field(lead, "engagement", "interactions")),
+                1.0 if _field(lead, "phone") else None,
+            ]
+            for lead in leads
+        ],
+        dtype=np.float64,
+    ).reshape(len(leads), len(SIGNALS))
+    size, budget, engagement = (SIGNALS.index(name) for name in ("company_size", "budget", "engagement"))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # 10k+ employees, $1M+ budget and 10+ interactions score full marks
+        raw[:, size] = np.clip(np.log10(np.maximum(raw[:, size], 1.0)) / 4.0, 0.0, 1.0)
+        raw[:, budget] = np.clip(np.log10(np.maximum(raw[:, budget], 1.0)) / 6.0, 0.0, 1.0)
+        raw[:, engagement] = np.clip(raw[:, engagement] / 10.0, 0.0, 1.0)
+    return raw
+
+
+def score_leads(leads: list[dict], weights: tuple[float, ...] = DEFAULT_WEIGHTS):
+    """(scores 0-100, known signal counts) for every lead, in one matrix product"""
+    import numpy as np
+
+    signals = signal_matrix(leads)
+    known = ~np.isnan(signals)
+    scores = np.nan_to_num(signals, nan=0.0) @ np.asarray(weights, dtype=np.float64)
+    return scores, known.sum(axis=1)
+
+
+def prefilter(leads: list[dict], thresholds: LeadThresholds, weights: tuple[float, ...] = DEFAULT_WEIGHTS):
+    """(scores, qualified, rejected, ambiguous) arrays over the batch"""
+    scores, known = score_leads(leads, weights)
+    qualified = scores >= thresholds.qualify_at
+    rejected = (scores < thresholds.reject_below) & (known >= thresholds.min_signals)
+    return scores, qualified, rejected, ~(qualified | rejected)
+
+
+def weights_from_env() -> tuple[float, ...]:
+    """LEAD_WEIGHTS: comma-separated weights in SIGNALS order"""
+    raw = os.getenv("LEAD_WEIGHTS")
+    if not raw:
+        return DEFAULT_WEIGHTS
+    weights = tuple(float(w) for w in raw.split(","))
+    if len(weights) != len(SIGNALS):
+        raise ValueError(f"LEAD_WEIGHTS needs {len(SIGNALS)} weights ({', '.join(SIGNALS)})")
+    return weights
+
+
+# ============================================================================
+# SPECIALIST
+# ============================================================================
+
+@dataclass
+class LeadQualifierStats:
+    """Pre-filter effectiveness since the worker started"""
+    leads: int = 0
+    auto_qualified: int = 0
+    auto_rejected: int = 0
+    sent_to_llm: int = 0
+    llm_calls: int = 0
+    llm_calls_without_prefilter: int = 0
+
+    def summary(self) -> dict:
+        without = self.llm_calls_without_prefilter
+        return {
+            **asdict(self),
+            "llm_calls_avoided": without - self.llm_calls,
+            "llm_calls_avoided_fraction": round(1 - self.llm_calls / without, 3) if without else 0.0,
+        }
+
+
+@register_specialist
+class LeadQualifier(Specialist):
+    """Vectorized rule pre-filter over the batch; the model only sees ambiguous leads"""
+
+    name = "lead_qualifier"
+    task_type = "lead_qualification"
+    kind = "io"
+    concurrency = 8
+    timeout_s = float(os.getenv("LEAD_TIMEOUT_S", "300"))
+
+    def __init__(self):
+        self.stats = LeadQualifierStats()
+
+    def metrics(self) -> dict:
+        return self.stats.summary()
+
+    async def _leads(self, context: SpecialistContext) -> tuple[list[dict], bool]:
+        """The leads to qualify, and whether this is a batch"""
+        if isinstance(context.params.get("leads"), list):
+            return [lead for lead in context.params["leads"] if isinstance(lead, dict)], True
+        if context.params.get("source"):
+            max_leads = int(os.getenv("LEAD_MAX_SOURCE_ROWS", "50000"))
+            return await read_rows(context.workspace_id, context.params["source"], max_leads), True
+        return [context.params], False
+
+    async def _ask_model(self, model: JsonModel, leads: list[tuple[int, dict, float]]) -> dict[int, dict]:
+        """Model decisions for one batch of (index, lead, rule score)"""
+        human = "\n\n".join(
+            f"### Lead {index}\nRule score: {score:.0f}\n{json.dumps(lead, default=str)}" for index, lead, score in leads
+        )
+        answer = await model.ask(LEAD_PROMPT, human) or {}
+        decisions = answer.get("leads")
+        wanted = {index for index, _, _ in leads}
+        return {
+            int(entry["id"]): entry
+            for entry in (decisions if isinstance(decisions, list) else [])
+            if isinstance(entry, dict) and str(entry.get("id")).isdigit() and int(entry["id"]) in wanted
+        }
+
+    async def run(self, context: SpecialistContext) -> dict:
+        leads, batch = await self._leads(context)
+        thresholds = thresholds_for(context.workspace_id)
+        # Per-lead parsing is Python; keep a large batch off the event loop
+        scores, qualified, rejected, ambiguous = await asyncio.to_thread(prefilter, leads, thresholds, weights_from_env())
+
+        batch_size = int(os.getenv("LEAD_LLM_BATCH_SIZE", "20"))
+        pending = [(int(i), leads[i], float(scores[i])) for i in ambiguous.nonzero()[0]]
+        batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        model = JsonModel(context.workspace_id, os.getenv("LEAD_MODEL", "gpt-4o-mini"))
+        semaphore = asyncio.Semaphore(int(os.getenv("LEAD_LLM_CONCURRENCY", "4")))
+
+        async def ask(chunk: list[tuple[int, dict, float]]) -> dict[int, dict]:
+            async with semaphore:
+                return await self._ask_model(model, chunk)
+
+        decided: dict[int, dict] = {}
+        for answer in await asyncio.gather(*(ask(chunk) for chunk in batches)):
+            decided.update(answer)
+
+        results = []
+        for index, lead in enumerate(leads):
+            result = {"index": index, "id": _field(lead, "id", "email", "name", "lead"), "score": round(float(scores[index]), 1)}
+            if not ambiguous[index]:
+                result.update(qualified=bool(qualified[index]), decided_by="rules")
+            elif index in decided:
+                entry = decided[index]
+                result.update(
+                    qualified=bool(entry.get("qualified")),
+                    decided_by="llm",
+                    llm_score=entry.get("score"),
+                    reason=entry.get("reason"),
+                )
+            else:
+                # The model skipped it: the midpoint between the thresholds decides
+                midpoint = (thresholds.qualify_at + thresholds.reject_below) / 2
+                result.update(qualified=bool(scores[index] >= midpoint), decided_by="rules_fallback")
+            results.append(result)
+
+        without = math.ceil(len(leads) / batch_size)
+        for name, value in (
+            ("leads", len(leads)),
+            ("auto_qualified", int(qualified.sum())),
+            ("auto_rejected", int(rejected.sum())),
+            ("sent_to_llm", len(pending)),
+            ("llm_calls", model.calls),
+            ("llm_calls_without_prefilter", without),
+        ):
+            setattr(self.stats, name, getattr(self.stats, name) + value)
+
+        summary = {
+            "leads": len(leads),
+            "qualified": sum(r["qualified"] for r in results),
+            "auto_qualified": int(qualified.sum()),
+            "auto_rejected": int(rejected.sum()),
+            "sent_to_llm": len(pending),
+            "llm_calls": model.calls,
+            "llm_calls_avoided": without - model.calls,
+            "thresholds": asdict(thresholds),
+            "cost_usd": round(model.cost_usd, 6),
+        }
+        if not batch:
+            return {"status": "success", "lead_score": results[0]["score"], **results[0], "summary": summary}
+        return {"status": "success", "summary": summary, "leads": results}
@@ -0,0 +1,172 @@
+"""
+GalaxyCo.ai - Specialist Registry
+==================================
+
+Maps each `TaskType` to its specialist plugin and runs it the way the
+plugin declares (see specialists/base.py):
+
+- every specialist has its own slot pool (`concurrency` executions in
+  flight per worker), so a slow specialist cannot take the whole worker
+- I/O-bound specialists are awaited on the event loop; CPU-bound ones run
+  in one process pool shared by the worker (SPECIALIST_PROCESS_WORKERS,
+  default CPU count), started on first use
+- `timeout_s` bounds each execution. A timed-out process-pool task still
+  finishes in its worker process; only its result is dropped
+
+Task types with nothing registered fall back to `PlaceholderSpecialist`.
+Per-specialist calls, failures, timeouts, queue wait, latency and
+throughput are served at GET /admin/specialists.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from core.profiling import LagHistogram
+
+from .base import PlaceholderSpecialist, Specialist, SpecialistContext
+
+
+class SpecialistTimeout(TimeoutError):
+    """A specialist did not finish within its timeout"""
+
+
+class SpecialistStats:
+    """Counters and latency histograms for one specialist"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.calls = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.in_flight = 0
+        self.wait = LagHistogram()  # queued for a slot
+        self.latency = LagHistogram()  # running
+
+    def summary(self) -> dict:
+        uptime = max(time.monotonic() - self.started, 1e-9)
+        return {
+            "calls": self.calls,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "in_flight": self.in_flight,
+            "throughput_per_s": round(self.succeeded / uptime, 3),
+            "wait": self.wait.summary(),
+            "latency": self.latency.summary(),
+        }
+
+
+class SpecialistRegistry:
+    """Specialist plugins by task type, with per-specialist execution pools"""
+
+    def __init__(self, process_workers: Optional[int] = None):
+        self.process_workers = process_workers
+        self.fallback: Specialist = PlaceholderSpecialist()
+        self._by_task: dict[str, Specialist] = {}
+        self._stats: dict[str, SpecialistStats] = {}
+        # Semaphores bind to the loop they first wait on; one per loop
+        self._slots: dict[str, tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def register(self, specialist: Specialist) -> Specialist:
+        if specialist.kind not in ("io", "cpu"):
+            raise ValueError(f"Specialist {specialist.name}: kind must be 'io' or 'cpu'")
+        existing = self._by_task.get(specialist.task_type)
+        if existing is not None and existing.name != specialist.name:
+            raise ValueError(f"Task type {specialist.task_type} already handled by {existing.name}")
+        self._by_task[specialist.task_type] = specialist
+        return specialist
+
+    def get(self, task_type: str) -> Specialist:
+        return self._by_task.get(task_type, self.fallback)
+
+    def _slot(self, specialist: Specialist) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        bound = self._slots.get(specialist.name)
+        if bound is None or bound[0] is not loop:
+            bound = (loop, asyncio.Semaphore(max(1, specialist.concurrency)))
+            self._slots[specialist.name] = bound
+        return bound[1]
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            workers = self.process_workers or int(os.getenv("SPECIALIST_PROCESS_WORKERS", "0")) or os.cpu_count()
+            # forkserver: workers are not forked from a process running an event loop and sqlite threads
+            self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("forkserver"))
+        return self._pool
+
+    async def _execute(self, specialist: Specialist, context: SpecialistContext) -> dict:
+        if specialist.kind == "cpu":
+            payload = await specialist.prepare(context)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._process_pool(), type(specialist).compute, payload)
+        return await specialist.run(context)
+
+    async def dispatch(self, context: SpecialistContext) -> tuple[Specialist, dict]:
+        """Run the specialist for `context.task_type`; returns it with its result"""
+        specialist = self.get(context.task_type)
+        stats = self._stats.setdefault(specialist.name, SpecialistStats())
+        stats.calls += 1
+
+        queued = time.perf_counter()
+        async with self._slot(specialist):
+            start = time.perf_counter()
+            stats.wait.record((start - queued) * 1000)
+            stats.in_flight += 1
+            try:
+                result = await asyncio.wait_for(self._execute(specialist, context), specialist.timeout_s)
+            except asyncio.TimeoutError:
+                stats.timeouts += 1
+                raise SpecialistTimeout(f"{specialist.name} timed out after {specialist.timeout_s}s") from None
+            except Exception:
+                stats.failed += 1
+                raise
+            finally:
+                stats.in_flight -= 1
+                stats.latency.record((time.perf_counter() - start) * 1000)
+        stats.succeeded += 1
+        return specialist, result
+
+    def summary(self) -> dict:
+        specialists = {s.name: s for s in [*self._by_task.values(), self.fallback]}
+        return {
+            "process_pool_started": self._pool is not None,
+            "specialists": {
+                name: {
+                    "task_type": specialist.task_type,
+                    "kind": specialist.kind,
+                    "concurrency": specialist.concurrency,
+                    "timeout_s": specialist.timeout_s,
+                    **self._stats.get(name, SpecialistStats()).summary(),
+                    **({"metrics": metrics} if (metrics := specialist.metrics()) else {}),
+                }
+                for name, specialist in specialists.items()
+            },
+        }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+_registry: Optional[SpecialistRegistry] = None
+
+
+def get_specialist_registry() -> SpecialistRegistry:
+    """Process-wide registry; built-in specialists register on import of `specialists`"""
+    global _registry
+    if _registry is None:
+        _registry = SpecialistRegistry()
+    return _registry
+
+
+def register_specialist(cls: type[Specialist]) -> type[Specialist]:
+    """Class decorator: register one instance of a specialist plugin"""
+    get_specialist_registry().register(cls())
+    return cls
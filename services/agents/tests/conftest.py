@@ -0,0 +1,60 @@
+"""
+Shared fixtures for the agent test suite
+=========================================
+"""
+
+import pytest_asyncio
+
+from core import approvals, blob_store, intake_classifier, orchestrator, prompts, quotas, semantic_cache, uploads, workflow_index
+from core.llm import set_chat_model_factory
+from specialists import data_enricher, email_composer
+
+
+@pytest_asyncio.fixture
+async def local_stores(tmp_path, monkeypatch):
+    """
+    Point every local store (checkpoints, approval inbox, workflow index, quotas, blobs,
+    prompts, intake log, uploads, enrichment cache, email templates) at a temporary
+    directory. Quotas are disabled unless a test enables them, no intake classifier
+    is loaded, and the semantic cache starts empty.
+    """
+    monkeypatch.setattr(orchestrator, "CHECKPOINT_DB_PATH", str(tmp_path / "checkpoints.db"))
+    monkeypatch.setattr(approvals, "_inbox", approvals.ApprovalInbox(str(tmp_path / "workflows.db")))
+    monkeypatch.setattr(workflow_index, "_index", workflow_index.WorkflowIndex(str(tmp_path / "workflows.db")))
+    monkeypatch.setattr(quotas, "_quotas", quotas.WorkspaceQuotas(str(tmp_path / "quotas.db"), enabled=False))
+    monkeypatch.setattr(blob_store, "_store", blob_store.BlobStore(str(tmp_path / "blobs")))
+    monkeypatch.setattr(prompts, "_store", prompts.PromptStore(str(tmp_path / "prompts.db")))
+    monkeypatch.setattr(intake_classifier, "_log", intake_classifier.IntakeLog(str(tmp_path / "intake_log.db")))
+    monkeypatch.setattr(intake_classifier, "_classifier", None)
+    monkeypatch.setattr(intake_classifier, "_classifier_loaded", True)
+    monkeypatch.setattr(uploads, "_index", uploads.UploadIndex(str(tmp_path / "uploads.db")))
+    monkeypatch.setattr(uploads, "_text_cache", None)
+    monkeypatch.setattr(data_enricher, "_store", data_enricher.EnrichmentStore(str(tmp_path / "enrichment.db")))
+    monkeypatch.setattr(email_composer, "_store", email_composer.TemplateStore(str(tmp_path / "email_templates.db")))
+    monkeypatch.setattr(email_composer, "_stats", email_composer.ComposerStats())
+    monkeypatch.setattr(semantic_cache, "_cache", None)
+
+    yield tmp_path
+
+    await orchestrator.close_workflow()
+    await approvals.get_approval_inbox().close()
+    await workflow_index.get_workflow_index().close()
+    await quotas.get_quotas().close()
+    await prompts.get_prompt_store().close()
+    await intake_classifier.get_intake_log().close()
+    await uploads.get_upload_index().close()
+    await data_enricher.get_enrichment_store().close()
+    await email_composer.get_template_store().close()
+
+
+@pytest_asyncio.fixture
+async def fake_llm(local_stores):
+    """Run workflows offline against the deterministic fake chat model"""
+    from benchmarks.fake_llm import fake_model_factory
+
+    def use(**options):
+        set_chat_model_factory(fake_model_factory(**options))
+
+    use()
+    yield use
+    set_chat_model_factory(None)
@@ -0,0 +1,188 @@
+"""
+Tests for interrupt-based human approval
+=========================================
+
+Run with: pytest tests/test_approvals.py -v
+"""
+
+import pytest
+
+from core import orchestrator
+from core.approvals import get_approval_inbox
+from core.orchestrator import (
+    ApprovalStatus,
+    bulk_update_approval_status,
+    execute_workflow,
+    get_workflow,
+    update_approval_status,
+)
+from core.quotas import QuotaExceeded
+
+
+async def checkpointed_state(workflow_id: str) -> dict:
+    """Values stored in the workflow's latest checkpoint"""
+    app = await get_workflow()
+    snapshot = await app.aget_state({"configurable": {"thread_id": workflow_id}})
+    return snapshot.values
+
+
+async def start_paused(workflow_id: str, workspace_id: str = "ws_1") -> dict:
+    return await execute_workflow(
+        workspace_id=workspace_id,
+        user_id="user_1",
+        user_message="Email every lead in the pipeline",
+        workflow_id=workflow_id,
+    )
+
+
+class TestApprovalInterrupt:
+    """Workflows really pause before human_approval"""
+
+    @pytest.mark.asyncio
+    async def test_pauses_and_lists_in_inbox(self, fake_llm):
+        """A workflow needing approval stops before planning and is listed"""
+        fake_llm(requires_approval=True)
+
+        state = await start_paused("wf_pause")
+
+        assert state["approval_status"] == ApprovalStatus.PENDING
+        assert state["final_summary"] is None
+        assert [o["agent_id"] for o in state["outcomes"]] == ["paa_intake"]
+
+        pending = await get_approval_inbox().list_pending("ws_1")
+        assert [entry["workflow_id"] for entry in pending] == ["wf_pause"]
+        assert await get_approval_inbox().list_pending("ws_other") == []
+
+    @pytest.mark.asyncio
+    async def test_approve_resumes_to_completion(self, fake_llm):
+        """Approving resumes from the checkpoint and finishes the workflow"""
+        fake_llm(requires_approval=True)
+        await start_paused("wf_approve")
+
+        result = await update_approval_status("wf_approve", True, "ws_1")
+
+        assert result["approval_status"] == ApprovalStatus.APPROVED
+        assert result["current_step"] == "complete"
+        assert result["final_summary"]
+        assert result["metrics"]["approval_requests"] == 1
+        # Intake ran exactly once - resume did not start from scratch
+        assert [o["agent_id"] for o in result["outcomes"]].count("paa_intake") == 1
+        assert await get_approval_inbox().list_pending("ws_1") == []
+
+    @pytest.mark.asyncio
+    async def test_reject_ends_workflow(self, fake_llm):
+        """Rejecting ends the workflow without planning"""
+        fake_llm(requires_approval=True)
+        await start_paused("wf_reject")
+
+        result = await update_approval_status("wf_reject", False, "ws_1")
+
+        assert result["status"] == "rejected"
+        entry = await get_approval_inbox().get("wf_reject")
+        assert entry["status"] == "rejected"
+
+        state = await checkpointed_state("wf_reject")
+        assert "planner" not in [o["agent_id"] for o in state["outcomes"]]
+        assert state["final_summary"] is None
+        assert state["current_step"] == "rejected"
+        assert state["metrics"]["approval_requests"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_resume_is_findable(self, fake_llm, monkeypatch):
+        """A resume that raises after the decision is listed as failed"""
+        fake_llm(requires_approval=True)
+        await start_paused("wf_fail")
+
+        async def throttled(*args, **kwargs):
+            raise QuotaExceeded("ws_1", "tokens", retry_after=12.0)
+
+        monkeypatch.setattr(orchestrator, "_invoke_model", throttled)
+
+        result = await update_approval_status("wf_fail", True, "ws_1")
+
+        assert result["retry_after"] == 12.0
+        failed = await get_approval_inbox().list_entries("ws_1", status="failed")
+        assert [entry["workflow_id"] for entry in failed] == ["wf_fail"]
+
+    @pytest.mark.asyncio
+    async def test_decision_is_applied_once(self, fake_llm):
+        """A second decision on the same workflow is refused"""
+        fake_llm(requires_approval=True)
+        await start_paused("wf_once")
+
+        await update_approval_status("wf_once", True, "ws_1")
+        second = await update_approval_status("wf_once", False, "ws_1")
+
+        assert "error" in second
+
+    @pytest.mark.asyncio
+    async def test_wrong_workspace_is_refused(self, fake_llm):
+        """A workspace cannot decide another workspace's workflow"""
+        fake_llm(requires_approval=True)
+        await start_paused("wf_scoped", workspace_id="ws_1")
+
+        result = await update_approval_status("wf_scoped", True, "ws_2")
+
+        assert "error" in result
+        assert (await get_approval_inbox().get("wf_scoped"))["status"] == "pending"
+
+    @pytest.mark.asyncio
+    async def test_no_approval_needed_runs_through(self, fake_llm):
+        """Workflows without approval never touch the inbox"""
+        fake_llm(requires_approval=False)
+
+        state = await start_paused("wf_direct")
+
+        assert state["current_step"] == "complete"
+        assert await get_approval_inbox().get("wf_direct") is None
+
+
+class TestBulkApproval:
+    """Approving many workflows in one call"""
+
+    @pytest.mark.asyncio
+    async def test_bulk_approve(self, fake_llm):
+        """Every pending workflow is resumed; unknown ids report errors"""
+        fake_llm(requires_approval=True)
+        workflow_ids = [f"wf_bulk_{i}" for i in range(5)]
+        for workflow_id in workflow_ids:
+            await start_paused(workflow_id)
+
+        results = await bulk_update_approval_status(workflow_ids + ["wf_missing"], True, "ws_1")
+
+        for workflow_id in workflow_ids:
+            assert results[workflow_id]["current_step"] == "complete"
+        assert "error" in results["wf_missing"]
+        assert await get_approval_inbox().list_pending("ws_1") == []
+
+
+class TestApprovalEndpoints:
+    """HTTP surface for the approval inbox"""
+
+    @pytest.mark.asyncio
+    async def test_list_and_bulk_reject(self, fake_llm):
+        """Inbox is listed per workspace and bulk decisions are applied"""
+        import httpx
+        from app import app
+
+        fake_llm(requires_approval=True)
+        for workflow_id in ("wf_api_1", "wf_api_2"):
+            await start_paused(workflow_id)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            listed = await client.get("/approvals", params={"workspace_id": "ws_1"})
+            assert listed.status_code == 200
+            assert {e["workflow_id"] for e in listed.json()["approvals"]} == {"wf_api_1", "wf_api_2"}
+
+            decided = await client.post("/approvals/bulk", json={
+                "workspace_id": "ws_1",
+                "workflow_ids": ["wf_api_1", "wf_api_2"],
+                "approved": False,
+            })
+            assert decided.status_code == 200
+            results = decided.json()["results"]
+            assert all(r["success"] and r["status"] == "rejected" for r in results.values())
+
+            listed = await client.get("/approvals", params={"workspace_id": "ws_1"})
+            assert listed.json()["approvals"] == []
@@ -0,0 +1,166 @@
+"""
+Tests for critic micro-batching
+================================
+
+Run with: pytest tests/test_batching.py -v
+"""
+
+import asyncio
+
+import pytest
+
+from core import batching, orchestrator
+from core.batching import MicroBatcher
+from core.orchestrator import execute_workflow
+
+
+def recording_batcher(max_items: int = 4, max_wait_s: float = 0.02, fail: bool = False):
+    batches = []
+
+    async def run_batch(key, items):
+        batches.append((key, list(items)))
+        await asyncio.sleep(0)
+        if fail:
+            raise RuntimeError("provider down")
+        return [f"{key}:{item}" for item in items]
+
+    return MicroBatcher(run_batch, max_items=max_items, max_wait_s=max_wait_s), batches
+
+
+class TestMicroBatcher:
+    """Collecting, flushing and dispatching results"""
+
+    @pytest.mark.asyncio
+    async def test_flushes_when_full(self):
+        batcher, batches = recording_batcher(max_items=3, max_wait_s=10)
+
+        results = await asyncio.gather(*(batcher.submit("k", i) for i in range(3)))
+
+        assert results == ["k:0", "k:1", "k:2"]
+        assert batches == [("k", [0, 1, 2])]
+
+    @pytest.mark.asyncio
+    async def test_flushes_after_wait(self):
+        batcher, batches = recording_batcher(max_items=8, max_wait_s=0.02)
+
+        results = await asyncio.gather(batcher.submit("k", "a"), batcher.submit("k", "b"))
+
+        assert results == ["k:a", "k:b"]
+        summary = batcher.summary()
+        assert summary["batch_sizes"] == {"2": 1}
+        assert summary["wait"]["max_ms"] >= 15
+
+    @pytest.mark.asyncio
+    async def test_keys_are_batched_separately(self):
+        batcher, batches = recording_batcher(max_items=2)
+
+        await asyncio.gather(batcher.submit("a", 1), batcher.submit("b", 2), batcher.submit("a", 3))
+
+        assert sorted(batches) == [("a", [1, 3]), ("b", [2])]
+
+    @pytest.mark.asyncio
+    async def test_failure_reaches_every_caller(self):
+        batcher, _ = recording_batcher(max_items=2, fail=True)
+
+        results = await asyncio.gather(batcher.submit("k", 1), batcher.submit("k", 2), return_exceptions=True)
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_result_count_mismatch_fails_every_caller(self):
+        async def run_batch(key, items):
+            return items[:-1]
+
+        batcher = MicroBatcher(run_batch, max_items=3, max_wait_s=10)
+
+        results = await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit("k", i) for i in range(3)), return_exceptions=True), timeout=1
+        )
+
+        assert all(isinstance(result, ValueError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_break_batch(self):
+        batcher, _ = recording_batcher(max_items=8, max_wait_s=0.02)
+
+        cancelled = asyncio.create_task(batcher.submit("k", 1))
+        kept = asyncio.create_task(batcher.submit("k", 2))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+
+        assert await kept == "k:2"
+
+
+class TestSplitUsage:
+    """Token usage shared between batch items"""
+
+    def test_shares_add_up(self):
+        usage = {"input_tokens": 10, "output_tokens": 5, "total_tokens": 15, "input_token_details": {"cache_read": 7}}
+
+        shares = orchestrator._split_usage(usage, 3)
+
+        assert [share["input_tokens"] for share in shares] == [4, 3, 3]
+        assert sum(share["total_tokens"] for share in shares) == 15
+        assert sum(share["input_token_details"]["cache_read"] for share in shares) == 7
+
+
+class TestWorkflowCriticBatching:
+    """Concurrent workflows share critic calls"""
+
+    @pytest.fixture(autouse=True)
+    def enabled(self, monkeypatch):
+        monkeypatch.setenv("CRITIC_BATCHING", "true")
+        monkeypatch.setenv("CRITIC_BATCH_WAIT_MS", "50")
+        monkeypatch.setattr(batching, "_critic_batcher", None)
+
+    @staticmethod
+    async def run_all(workspaces: list[str]) -> list[dict]:
+        return await asyncio.gather(*(
+            execute_workflow(workspace, "user_1", "Qualify John Doe", workflow_id=f"wf_batch_{i}")
+            for i, workspace in enumerate(workspaces)
+        ))
+
+    @pytest.mark.asyncio
+    async def test_one_call_for_concurrent_critics(self, fake_llm):
+        fake_llm()
+
+        results = await self.run_all(["ws_1"] * 3)
+
+        for result in results:
+            critic = next(o for o in result["outcomes"] if o["agent_id"] == "critic")
+            assert critic["result"]["passed"] is True
+            assert result["current_step"] == "complete"
+        summary = batching.batching_summary()["critic"]
+        assert summary["batch_sizes"] == {"3": 1}
+        # Intake, planner and summarize calls per workflow, plus one shared critic call
+        assert sum(result["metrics"]["input_tokens"] for result in results) == 3 * 3 * 400 + 400
+
+    @pytest.mark.asyncio
+    async def test_workspaces_not_mixed_by_default(self, fake_llm):
+        fake_llm()
+
+        await self.run_all(["ws_1", "ws_2", "ws_1"])
+
+        assert batching.batching_summary()["critic"]["batch_sizes"] == {"1": 1, "2": 1}
+
+    @pytest.mark.asyncio
+    async def test_global_scope(self, fake_llm, monkeypatch):
+        monkeypatch.setenv("CRITIC_BATCH_SCOPE", "global")
+        fake_llm()
+
+        await self.run_all(["ws_1", "ws_2", "ws_1"])
+
+        assert batching.batching_summary()["critic"]["batch_sizes"] == {"3": 1}
+
+    @pytest.mark.asyncio
+    async def test_unusable_batch_escalates(self, fake_llm):
+        """Items without a verdict are rejected answers; the larger tier evaluates them"""
+        fake_llm(model_responses={"gpt-4o-mini": {"quality critic": "I cannot do that"}})
+
+        results = await self.run_all(["ws_1"] * 2)
+
+        for result in results:
+            critic = next(o for o in result["outcomes"] if o["agent_id"] == "critic")
+            assert critic["model"] == "gpt-4o"
+            assert critic["result"]["passed"] is True
+        assert batching.batching_summary()["critic"]["batch_sizes"] == {"2": 2}
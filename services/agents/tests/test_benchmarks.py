@@ -0,0 +1,155 @@
+"""
+Tests for the offline benchmark harness
+========================================
+
+Run with: pytest tests/test_benchmarks.py -v
+"""
+
+import os
+
+import pytest
+
+from benchmarks import bench_orchestrator, bench_prompt_cache
+from benchmarks.bench_cold_start import import_audit, parse_importtime
+from benchmarks.bench_orchestrator import Timings, instrument
+from benchmarks.fake_llm import latency_sampler
+from benchmarks.harness import compare, latency_stats
+from core import orchestrator
+from core.orchestrator import execute_workflow
+
+
+class TestLatencySampler:
+    """Fake model latency distributions"""
+
+    def test_constant(self):
+        assert latency_sampler("0.05")() == 0.05
+        assert latency_sampler(0.1)() == 0.1
+
+    @pytest.mark.parametrize("spec", ["uniform:0.01,0.02", "lognormal:0.05,0.5", "exponential:0.05"])
+    def test_distributions_are_seeded(self, spec):
+        first = latency_sampler(spec, seed=7)
+        second = latency_sampler(spec, seed=7)
+        samples = [first() for _ in range(50)]
+
+        assert samples == [second() for _ in range(50)]
+        assert all(sample > 0 for sample in samples)
+
+    def test_uniform_bounds(self):
+        sample = latency_sampler("uniform:0.01,0.02", seed=1)
+        assert all(0.01 <= sample() <= 0.02 for _ in range(100))
+
+    def test_unknown(self):
+        with pytest.raises(ValueError):
+            latency_sampler("gamma:1,2")
+
+
+class TestCompare:
+    """Regression detection between two runs"""
+
+    def test_direction(self):
+        baseline = {"throughput": {"workflows_per_s": 100.0}, "workflow_latency": {"p50_ms": 10.0}}
+        slower = {"throughput": {"workflows_per_s": 80.0}, "workflow_latency": {"p50_ms": 12.0}}
+        faster = {"throughput": {"workflows_per_s": 120.0}, "workflow_latency": {"p50_ms": 8.0}}
+
+        assert all(row["regression"] for row in compare(baseline, slower))
+        assert not any(row["regression"] for row in compare(baseline, faster))
+
+    def test_skips_config_counts_and_model_time(self):
+        baseline = {"result": {
+            "config": {"workflows": 10},
+            "workflow_latency": latency_stats([1.0, 2.0]),
+            "nodes": {"planner": {"model": {"mean_ms": 1.0}}},
+        }}
+        current = {"result": {
+            "config": {"workflows": 99},
+            "workflow_latency": latency_stats([1.0, 2.0, 3.0]),
+            "nodes": {"planner": {"model": {"mean_ms": 9.0}}},
+        }}
+        metrics = {row["metric"] for row in compare(baseline, current)}
+
+        assert "config.workflows" not in metrics
+        assert "workflow_latency.count" not in metrics
+        assert "workflow_latency.max_ms" not in metrics
+        assert "nodes.planner.model.mean_ms" not in metrics
+        assert "workflow_latency.p50_ms" in metrics
+
+
+class TestInstrumentation:
+    """Per-node and checkpoint timing"""
+
+    @pytest.mark.asyncio
+    async def test_collects_and_restores(self, fake_llm):
+        fake_llm(latency="0.01")
+        original = orchestrator.planner_node
+        timings = Timings()
+
+        with instrument(timings):
+            result = await execute_workflow("ws_1", "user_1", "Qualify John", workflow_id="wf_bench")
+
+        assert result.get("error") is None
+        assert orchestrator.planner_node is original
+        report = timings.node_report()
+        assert set(report) >= {"paa_intake", "planner", "router", "specialist", "critic", "paa_summarize"}
+        assert report["planner"]["model"]["mean_ms"] >= 10
+        assert report["router"]["model"]["mean_ms"] == 0
+        assert timings.checkpoint_report()["aput"]["count"] > 0
+
+
+class TestEventLoopBlocking:
+    """Hot path must not hold the event loop (budget: LOOP_BLOCK_BUDGET_MS)"""
+
+    @pytest.mark.asyncio
+    async def test_workflows_do_not_block_loop(self):
+        budget_ms = float(os.getenv("LOOP_BLOCK_BUDGET_MS", "200"))
+
+        result = await bench_orchestrator.run(count=20, concurrency=8, warmup=2, max_block_ms=budget_ms)
+
+        event_loop = result["event_loop"]
+        stacks = "\n\n".join("\n".join(stall["stack"]) for stall in event_loop["stalls"])
+        assert event_loop["stall_count"] == 0, f"Event loop blocked >{budget_ms}ms:\n{stacks}"
+        assert event_loop["count"] > 0
+
+
+class TestImportAudit:
+    """Parsing `python -X importtime` output"""
+
+    OUTPUT = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       100 |        100 |     anthropic._types\n"
+        "import time:      1200 |       1300 |   anthropic\n"
+        "import time:       300 |        300 |   langgraph.graph\n"
+        "import time:       500 |       2100 | app\n"
+    )
+
+    def test_parse(self):
+        rows = parse_importtime(self.OUTPUT)
+
+        assert [row["module"] for row in rows] == ["anthropic._types", "anthropic", "langgraph.graph", "app"]
+        assert rows[0]["depth"] == 2
+        assert rows[-1]["depth"] == 0
+        assert rows[-1]["cumulative_ms"] == 2.1
+
+    def test_audit_groups_by_package(self):
+        audit = import_audit(parse_importtime(self.OUTPUT), top=2)
+
+        assert audit["total_ms"] == 2.1
+        assert audit["packages"] == {"anthropic": 1.3, "app": 0.5}
+        assert list(audit["slowest"]) == ["app", "anthropic"]
+
+
+class TestPromptCacheBenchmark:
+    """Repeated workflows with and without provider prompt caching"""
+
+    @pytest.mark.asyncio
+    async def test_caching_reduces_cost(self):
+        result = await bench_prompt_cache.run(count=3, latency="0")
+
+        assert result["uncached"]["cached_share"] == 0
+        assert result["cached"]["cached_share"] > 0
+        assert result["saving_pct"]["warm_workflow_cost"] > 0
+
+    @pytest.mark.asyncio
+    async def test_provider_minimum(self):
+        result = await bench_prompt_cache.run(count=2, latency="0", min_prefix_tokens=1024)
+
+        assert result["cached"]["cached_share"] == 0
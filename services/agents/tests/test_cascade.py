@@ -0,0 +1,164 @@
+"""
+Tests for the model cascade
+============================
+
+Run with: pytest tests/test_cascade.py -v
+"""
+
+import httpx
+import pytest
+from langchain_core.messages import AIMessage
+
+from core import cascade
+from core.cascade import CascadeStats, is_complete, tiers_for
+from core.orchestrator import execute_workflow
+
+BAD_CRITIC = '{"passed": false, "quality_score": 40, "issues": ["thin"], "recommendation": "retry"}'
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    """Fresh process-wide cascade stats"""
+    fresh = CascadeStats()
+    monkeypatch.setattr(cascade, "_stats", fresh)
+    monkeypatch.delenv("MODEL_CASCADE", raising=False)
+    return fresh
+
+
+def models(result: dict) -> dict[str, str]:
+    return {o["agent_id"]: o.get("model") for o in result["outcomes"] if o["agent_id"] in ("planner", "critic")}
+
+
+class TestPolicy:
+    """Tier selection and answer checks"""
+
+    def test_tiers_cheapest_first(self, stats):
+        assert tiers_for("planner", ("openai", "gpt-4o")) == (("openai", "gpt-4o-mini"), ("openai", "gpt-4o"))
+
+    def test_disabled_uses_default(self, stats, monkeypatch):
+        monkeypatch.setenv("MODEL_CASCADE", "false")
+
+        assert tiers_for("planner", ("openai", "gpt-4o")) == (("openai", "gpt-4o"),)
+
+    def test_is_complete(self):
+        assert is_complete(AIMessage(content="Done."))
+        assert not is_complete(AIMessage(content="  "))
+        assert not is_complete(AIMessage(content="Cut", response_metadata={"finish_reason": "length"}))
+        assert not is_complete(AIMessage(content="Cut", response_metadata={"stop_reason": "max_tokens"}))
+
+    def test_stats_summary(self):
+        stats = CascadeStats()
+        stats.record("planner", "gpt-4o-mini", accepted=True, final=False, latency_ms=100, cost_usd=0.001)
+        stats.record("planner", "gpt-4o-mini", accepted=False, final=False, latency_ms=300, cost_usd=0.001)
+        stats.record("planner", "gpt-4o", accepted=False, final=True, latency_ms=900, cost_usd=0.01)
+
+        summary = stats.summary()["cascades"]["planner"]
+        assert summary["gpt-4o-mini"]["success_rate"] == 0.5
+        assert summary["gpt-4o-mini"]["escalated"] == 1
+        assert summary["gpt-4o-mini"]["cost_usd"] == 0.002
+        assert summary["gpt-4o"]["rejected_final"] == 1
+
+
+class TestWorkflowCascade:
+    """Planner and critic start on the cheap tier"""
+
+    @pytest.mark.asyncio
+    async def test_cheap_tier_accepted(self, fake_llm, stats):
+        fake_llm()
+
+        result = await execute_workflow("ws_1", "user_1", "Qualify John Doe", workflow_id="wf_cheap")
+
+        assert models(result) == {"planner": "gpt-4o-mini", "critic": "gpt-4o-mini"}
+        assert result["metrics"]["escalations"] == 0
+        assert stats.summary()["cascades"]["planner"]["gpt-4o-mini"]["accepted"] == 1
+
+    @pytest.mark.asyncio
+    async def test_invalid_plan_escalates(self, fake_llm, stats):
+        fake_llm(model_responses={"gpt-4o-mini": {"task planner": '{"subtasks": []}'}})
+
+        result = await execute_workflow("ws_1", "user_1", "Qualify John Doe", workflow_id="wf_plan")
+
+        assert models(result) == {"planner": "gpt-4o", "critic": "gpt-4o-mini"}
+        assert result["subtasks"][0]["id"] == "subtask_1"
+        assert result["metrics"]["escalations"] == 1
+        planner = stats.summary()["cascades"]["planner"]
+        assert planner["gpt-4o-mini"]["escalated"] == 1
+        assert planner["gpt-4o"]["accepted"] == 1
+
+        # The plan cost both calls, each priced for its model
+        outcome = next(o for o in result["outcomes"] if o["agent_id"] == "planner")
+        tier_costs = [planner[model]["cost_usd"] for model in ("gpt-4o-mini", "gpt-4o")]
+        assert outcome["cost"] == pytest.approx(sum(tier_costs))
+        assert 0 < tier_costs[0] < tier_costs[1]
+
+    @pytest.mark.asyncio
+    async def test_failing_verdict_confirmed_by_larger_model(self, fake_llm, stats):
+        """A cheap critic's failure does not trigger a retry until the larger model agrees"""
+        fake_llm(model_responses={"gpt-4o-mini": {"quality critic": BAD_CRITIC}})
+
+        result = await execute_workflow("ws_1", "user_1", "Qualify John Doe", workflow_id="wf_critic")
+
+        critic = [o for o in result["outcomes"] if o["agent_id"] == "critic"]
+        assert [o["model"] for o in critic] == ["gpt-4o"]
+        assert critic[0]["result"]["passed"] is True
+        assert result["current_step"] == "complete"
+
+    @pytest.mark.asyncio
+    async def test_disabled(self, fake_llm, stats, monkeypatch):
+        monkeypatch.setenv("MODEL_CASCADE", "false")
+        fake_llm()
+
+        result = await execute_workflow("ws_1", "user_1", "Qualify John Doe", workflow_id="wf_off")
+
+        assert models(result) == {"planner": "gpt-4o", "critic": "gpt-4o"}
+
+
+class TestExecuteCascade:
+    """/execute escalates empty or truncated answers"""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        from app import app
+
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        transport = httpx.ASGITransport(app=app)
+        return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+    @staticmethod
+    def body(**config):
+        return {
+            "agent_id": "agent_1",
+            "workspace_id": "ws_a",
+            "user_id": "user_1",
+            "agent_type": "scope",
+            "inputs": {"email_content": "hi"},
+            "config": config,
+        }
+
+    @pytest.mark.asyncio
+    async def test_empty_answer_escalates(self, client, fake_llm, stats):
+        fake_llm(model_responses={"gpt-4o-mini": {"Scope Agent": ""}})
+
+        async with client:
+            response = await client.post("/execute", json=self.body())
+            summary = await client.get("/admin/cascade", headers={"Authorization": "Bearer secret"})
+
+        metrics = response.json()["metrics"]
+        assert metrics["model"] == "gpt-4o"
+        assert metrics["escalations"] == 1
+        assert metrics["tokens_used"] == 2 * 520
+        tiers = summary.json()["cascades"]["execute:openai"]
+        assert tiers["gpt-4o-mini"]["escalated"] == 1
+        assert tiers["gpt-4o"]["accepted"] == 1
+
+    @pytest.mark.asyncio
+    async def test_pinned_model_is_not_cascaded(self, client, fake_llm, stats):
+        fake_llm(model_responses={"gpt-4o-mini": {"Scope Agent": ""}})
+
+        async with client:
+            response = await client.post("/execute", json=self.body(model="gpt-4o-mini"))
+
+        assert response.json()["metrics"]["model"] == "gpt-4o-mini"
+        assert response.json()["metrics"]["escalations"] == 0
+        assert stats.summary()["cascades"] == {}
@@ -0,0 +1,243 @@
+"""
+Tests for long-input chunking
+==============================
+
+Run with: pytest tests/test_chunking.py -v
+"""
+
+import asyncio
+import json
+import re
+
+import httpx
+import pytest
+
+from benchmarks.bench_chunking import synthetic_transcript
+from core.chunking import count_tokens, map_reduce, pack, plan_chunks, segments
+
+TURN = re.compile(r"^\[\d{2}:\d{2}:\d{2}\] ")
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setenv("CHUNK_THRESHOLD_TOKENS", "2000")
+    monkeypatch.setenv("CHUNK_TOKENS", "600")
+
+
+class TestSplitting:
+    """Token counting, segments and chunk packing"""
+
+    def test_count_tokens(self):
+        assert count_tokens("") == 0
+        assert count_tokens("Hello, world!") == 4
+        assert count_tokens("questionnaire") == 3
+
+    def test_transcript_chunks_at_speaker_turns(self, small_chunks):
+        transcript = synthetic_transcript(30)
+
+        chunks = plan_chunks("call", {"transcript": transcript})
+
+        assert len(chunks) > 3
+        assert "".join(chunks) == transcript
+        assert all(TURN.match(chunk) for chunk in chunks)
+        assert all(count_tokens(chunk) <= 600 for chunk in chunks)
+
+    def test_email_thread_chunks_at_messages(self):
+        thread = "".join(
+            f"On Mon, Jan {day}, 2025 at 9:00 AM Dana <dana@acme.com> wrote:\n" + "Pricing question again. " * 40 + "\n"
+            for day in range(1, 7)
+        )
+
+        pieces = segments(thread, "email thread", 300)
+
+        assert len(pieces) == 6
+        assert all(piece.startswith("On Mon") for piece in pieces)
+
+    def test_oversized_turn_is_split(self):
+        turn = "Dana: " + "We need approvals for every outgoing email. " * 200
+
+        pieces = segments(turn, "call transcript", 100)
+
+        assert "".join(pieces) == turn
+        assert all(count_tokens(piece) <= 100 for piece in pieces)
+        assert all(count_tokens(chunk) <= 100 for chunk in pack(pieces, 100))
+
+    def test_sentence_without_breaks_is_cut_between_words(self):
+        turn = "Dana: " + "approvals " * 500
+
+        pieces = segments(turn, "call transcript", 100)
+
+        assert "".join(pieces) == turn
+        assert len(pieces) > 1
+        assert all(count_tokens(piece) <= 100 for piece in pieces)
+
+    def test_short_or_unsupported_inputs_are_not_chunked(self, small_chunks):
+        transcript = synthetic_transcript(30)
+
+        assert plan_chunks("call", {"transcript": "Dana: hi"}) is None
+        assert plan_chunks("email", {"context": transcript}) is None
+        assert plan_chunks("call", {"transcript": {"not": "text"}}) is None
+
+
+class TestMapReduce:
+    """Concurrent map step, partial events and the reduce step"""
+
+    @staticmethod
+    def recorder(answer=lambda message: "notes", delay: float = 0.0):
+        calls = []
+
+        async def invoke(message: str) -> str:
+            calls.append(message)
+            await asyncio.sleep(delay)
+            return answer(message)
+
+        return invoke, calls
+
+    @pytest.mark.asyncio
+    async def test_partials_then_result(self, small_chunks):
+        invoke, calls = self.recorder(answer=lambda m: "merged" if m.startswith("Below are") else "notes")
+        chunks = ["Dana: one\n", "Alex: two\n", "Dana: three\n"]
+
+        events = [event async for event in map_reduce("call", {"transcript": "x"}, chunks, invoke)]
+
+        assert [e["event"] for e in events] == ["partial"] * 3 + ["result"]
+        assert sorted(e["index"] for e in events[:3]) == [0, 1, 2]
+        assert events[-1] == {"event": "result", "content": "merged", "chunks": 3, "reduce_calls": 1}
+        assert "This is part 2 of 3 of a longer call transcript" in calls[1]
+        assert "Alex: two" in calls[1]
+        assert calls[-1].count("## Part ") == 3
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit(self, small_chunks):
+        in_flight, peak = 0, 0
+
+        async def invoke(message: str) -> str:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return "notes"
+
+        events = [e async for e in map_reduce("call", {}, [f"T: {i}\n" for i in range(10)], invoke, concurrency=3)]
+
+        assert peak == 3
+        assert events[-1]["chunks"] == 10
+
+    @pytest.mark.asyncio
+    async def test_long_partials_reduced_in_groups(self, small_chunks):
+        invoke, calls = self.recorder(answer=lambda m: "short" if m.startswith("Below are") else "word " * 250)
+
+        events = [e async for e in map_reduce("call", {}, [f"T: {i}\n" for i in range(6)], invoke)]
+
+        # 6 partials of ~250 tokens, 600-token budget: 3 group merges, then the final one
+        assert events[-1]["reduce_calls"] == 4
+        assert len(calls) == 10
+
+    @pytest.mark.asyncio
+    async def test_failed_chunk_cancels_the_rest(self, small_chunks):
+        started = []
+
+        async def invoke(message: str) -> str:
+            started.append(message)
+            if "part 1 of" in message:
+                raise RuntimeError("provider down")
+            await asyncio.sleep(10)
+            return "notes"
+
+        with pytest.raises(RuntimeError):
+            async for _ in map_reduce("call", {}, ["A: 1\n", "B: 2\n", "C: 3\n"], invoke):
+                pass
+        await asyncio.sleep(0)
+
+        assert not [t for t in asyncio.all_tasks() if t.get_name().startswith("chunk-")]
+
+
+class TestExecuteChunking:
+    """/execute and /execute/stream map-reduce long transcripts"""
+
+    @pytest.fixture
+    def client(self, monkeypatch, small_chunks):
+        from app import app
+
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        transport = httpx.ASGITransport(app=app)
+        return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+    @staticmethod
+    def body(transcript: str, **config):
+        return {
+            "agent_id": "agent_1",
+            "workspace_id": "ws_a",
+            "user_id": "user_1",
+            "agent_type": "call",
+            "inputs": {"transcript": transcript},
+            "config": {"cascade": False, **config},
+        }
+
+    @pytest.mark.asyncio
+    async def test_long_transcript_fits_context_when_chunked(self, client, fake_llm):
+        fake_llm(context_window=1500)
+        transcript = synthetic_transcript(30)
+
+        async with client:
+            single = (await client.post("/execute", json=self.body(transcript, chunking=False))).json()
+            chunked = (await client.post("/execute", json=self.body(transcript))).json()
+
+        assert not single["success"]
+        assert "context_length_exceeded" in single["error"]
+        assert chunked["success"]
+        metrics = chunked["metrics"]
+        assert metrics["chunks"] > 3
+        assert metrics["llm_calls"] == metrics["chunks"] + 1
+        assert metrics["tokens_used"] > count_tokens(transcript)
+
+    @pytest.mark.asyncio
+    async def test_short_input_single_call(self, client, fake_llm):
+        fake_llm()
+
+        async with client:
+            response = (await client.post("/execute", json=self.body("Dana: hello"))).json()
+
+        assert response["metrics"]["chunks"] == 0
+        assert response["metrics"]["llm_calls"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stream_sends_partials_then_result(self, client, fake_llm):
+        fake_llm()
+
+        async with client:
+            response = await client.post("/execute/stream", json=self.body(synthetic_transcript(30)))
+
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        events = [json.loads(line) for line in response.text.splitlines()]
+        result = events[-1]
+        assert result["event"] == "result"
+        assert result["success"]
+        partials = [e for e in events if e["event"] == "partial"]
+        assert len(partials) == result["metrics"]["chunks"]
+        assert all(e["total"] == len(partials) for e in partials)
+
+    @pytest.mark.asyncio
+    async def test_stream_reports_quota_error(self, client, fake_llm, monkeypatch):
+        from core import quotas
+        from core.quotas import QuotaExceeded
+
+        fake_llm()
+
+        async def exhausted(workspace_id, *args, **kwargs):
+            raise QuotaExceeded(workspace_id, "tokens_per_day", 30.0)
+
+        monkeypatch.setattr(quotas.get_quotas(), "check", exhausted)
+
+        async with client:
+            response = await client.post("/execute/stream", json=self.body(synthetic_transcript(30)))
+
+        events = [json.loads(line) for line in response.text.splitlines()]
+        assert events == [{
+            "event": "error",
+            "status_code": 429,
+            "detail": events[0]["detail"],
+            "limit": "tokens_per_day",
+            "retry_after": 30,
+        }]
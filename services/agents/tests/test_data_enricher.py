@@ -0,0 +1,324 @@
+"""
+Tests for the bulk DataEnricher specialist
+===========================================
+
+Run with: pytest tests/test_data_enricher.py -v
+"""
+
+import asyncio
+import csv
+import json
+
+import pytest
+
+from specialists.base import SpecialistContext
+from specialists.data_enricher import (
+    DataEnricher,
+    Enricher,
+    EnrichmentJob,
+    SourceNotAllowed,
+    get_enrichment_store,
+    normalize_email,
+    record_key,
+    source_file,
+    start_or_resume,
+)
+
+
+def write_contacts(path, rows: int, duplicate_every: int = 0) -> None:
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["name", "email"])
+        writer.writeheader()
+        for i in range(rows):
+            n = i - 1 if duplicate_every and i % duplicate_every == 0 and i else i
+            # 10 companies, so domains repeat across rows
+            writer.writerow({"name": f"Contact {n}", "email": f"Person.{n}+news@company{n % 10}.com"})
+
+
+class CountingLookup:
+    """Domain lookup that records every batch it is asked for"""
+
+    def __init__(self, fail_after: int | None = None):
+        self.batches: list[list[str]] = []
+        self.fail_after = fail_after
+
+    async def __call__(self, domains: list[str]) -> dict[str, dict]:
+        if self.fail_after is not None and len(self.batches) >= self.fail_after:
+            raise RuntimeError("lookup service down")
+        self.batches.append(domains)
+        return {d: {"company": d.split(".")[0].title(), "industry": "Software"} for d in domains if "unknown" not in d}
+
+
+class TestKeys:
+    """Dedupe keys"""
+
+    def test_normalize_email(self):
+        assert normalize_email(" mailto:Jane.Doe+promo@Acme.COM ") == "jane.doe@acme.com"
+        assert normalize_email("not an email") is None
+        assert normalize_email(None) is None
+
+    def test_record_key_falls_back_to_domain(self):
+        assert record_key({"email": "JANE@acme.com"}) == "jane@acme.com"
+        assert record_key({"website": "https://www.Acme.com/about"}) == "acme.com"
+        assert record_key({"name": "No contact"}) is None
+
+
+class TestEnricher:
+    """Streaming, dedupe, caching and resume"""
+
+    @pytest.mark.asyncio
+    async def test_enriches_and_dedupes(self, local_stores):
+        source, output = local_stores / "contacts.csv", local_stores / "out.csv"
+        write_contacts(source, 100, duplicate_every=10)
+        lookup = CountingLookup()
+
+        job = await start_or_resume("job_1", str(source), str(output), lookup, chunk_rows=30, batch_size=4)
+
+        with open(output, newline="") as f:
+            rows = list(csv.DictReader(f))
+        assert job.status == "completed"
+        assert (job.offset, job.rows_written, job.duplicates) == (100, 91, 9)
+        assert len(rows) == 91
+        assert rows[0]["company"] == "Company0"
+        assert {row["enrichment_status"] for row in rows} == {"enriched"}
+        # 10 distinct domains, each looked up once across all chunks
+        assert sorted(d for batch in lookup.batches for d in batch) == [f"company{i}.com" for i in range(10)]
+        assert all(len(batch) <= 4 for batch in lookup.batches)
+        assert job.summary()["rows_per_s"] > 0
+
+    @pytest.mark.asyncio
+    async def test_disk_cache_across_jobs(self, local_stores):
+        source = local_stores / "contacts.csv"
+        write_contacts(source, 20)
+        first, second = CountingLookup(), CountingLookup()
+
+        await start_or_resume("job_a", str(source), str(local_stores / "a.csv"), first)
+        job = await start_or_resume("job_b", str(source), str(local_stores / "b.csv"), second)
+
+        assert first.batches and not second.batches
+        assert (job.cache_hits, job.llm_calls) == (10, 0)
+
+    @pytest.mark.asyncio
+    async def test_free_mail_and_unresolved(self, local_stores):
+        source = local_stores / "contacts.jsonl"
+        source.write_text("\n".join(json.dumps(r) for r in [
+            {"email": "jane@gmail.com"},
+            {"email": "bob@unknown-startup.io"},
+            {"name": "No contact"},
+        ]))
+        lookup = CountingLookup()
+
+        job = await start_or_resume("job_j", str(source), str(local_stores / "out.jsonl"), lookup)
+
+        rows = [json.loads(line) for line in open(local_stores / "out.jsonl")]
+        assert [r["enrichment_status"] for r in rows] == ["personal_email", "unresolved", "no_domain"]
+        assert lookup.batches == [["unknown-startup.io"]]
+        assert job.unresolved == 1
+        # Unresolved domains are not cached
+        assert await get_enrichment_store().cached_domains(["unknown-startup.io"]) == {}
+
+    @pytest.mark.asyncio
+    async def test_resume_after_failure(self, local_stores):
+        source, output = local_stores / "contacts.csv", local_stores / "out.csv"
+        write_contacts(source, 50)
+
+        with pytest.raises(RuntimeError):
+            # Chunks 1-2 look up 2 domains each; the third chunk's lookup fails
+            await start_or_resume("job_r", str(source), str(output), CountingLookup(fail_after=2), chunk_rows=2, batch_size=10)
+        interrupted = await get_enrichment_store().load_job("cli", "job_r")
+        assert (interrupted.status, interrupted.offset) == ("failed", 4)
+
+        job = await start_or_resume("job_r", str(source), str(output), CountingLookup(), chunk_rows=2)
+
+        with open(output, newline="") as f:
+            rows = list(csv.DictReader(f))
+        assert job.status == "completed"
+        assert [row["name"] for row in rows] == [f"Contact {i}" for i in range(50)]
+
+    @pytest.mark.asyncio
+    async def test_resume_counts_interrupted_chunk_once(self, local_stores):
+        """Counters of a chunk that failed midway are not in its checkpoint"""
+        source = local_stores / "contacts.csv"
+        write_contacts(source, 50, duplicate_every=5)
+
+        with pytest.raises(RuntimeError):
+            # The third chunk (rows 4-5) counts its duplicate, then its lookup fails
+            await start_or_resume("job_r", str(source), str(local_stores / "out.csv"), CountingLookup(fail_after=2), chunk_rows=2, batch_size=10)
+        interrupted = await get_enrichment_store().load_job("cli", "job_r")
+        job = await start_or_resume("job_r", str(source), str(local_stores / "out.csv"), CountingLookup(), chunk_rows=2)
+        full = await start_or_resume("job_full", str(source), str(local_stores / "full.csv"), CountingLookup(), chunk_rows=2)
+
+        assert (interrupted.offset, interrupted.duplicates) == (4, 0)
+        assert (job.duplicates, job.rows_written, job.unresolved) == (full.duplicates, full.rows_written, full.unresolved)
+
+    @pytest.mark.asyncio
+    async def test_resume_drops_partial_output(self, local_stores):
+        source, output = local_stores / "contacts.csv", local_stores / "out.csv"
+        write_contacts(source, 10)
+        store = get_enrichment_store()
+        job = EnrichmentJob(job_id="job_p", source=str(source), output=str(output))
+        await Enricher(CountingLookup(), chunk_rows=5).run(job)
+
+        # Crash after chunk 1's checkpoint, mid-way through writing chunk 2
+        with open(output, "rb") as f:
+            data = f.read()
+        job.status, job.offset = "interrupted", 5
+        job.output_bytes = len(b"".join(data.splitlines(keepends=True)[:6]))
+        await store.save_job(job)
+        with open(output, "wb") as f:
+            f.write(data[: job.output_bytes + 10])
+
+        await start_or_resume("job_p", str(source), str(output), CountingLookup(), chunk_rows=5)
+
+        with open(output, "rb") as f:
+            assert f.read() == data
+
+
+class TestSpecialist:
+    """DataEnricher through the specialist interface"""
+
+    @pytest.mark.asyncio
+    async def test_bulk_job_from_blob(self, fake_llm, local_stores, monkeypatch):
+        from core.blob_store import get_blob_store
+        from core.uploads import get_upload_index
+
+        monkeypatch.setenv("ENRICH_OUTPUT_DIR", str(local_stores / "enriched"))
+        source = local_stores / "contacts.csv"
+        write_contacts(source, 40)
+        digest = await get_blob_store().put(source.read_bytes())
+        await get_upload_index().add("ws_1", digest, source.stat().st_size, "text/csv", "contacts.csv")
+        context = SpecialistContext(
+            workspace_id="ws_1", workflow_id="wf_1", task_type="data_enrichment",
+            message="Enrich my contacts", params={"source": {"$blob": digest}},
+        )
+
+        result = await DataEnricher().run(context)
+
+        assert result["status"] == "success"
+        assert result["rows_written"] == 40
+        assert result["llm_calls"] == 1
+        assert result["output"] == str(local_stores / "enriched" / "ws_1" / "enrich_wf_1.csv")
+
+    @pytest.mark.asyncio
+    async def test_foreign_blob_rejected(self, fake_llm, local_stores):
+        from core.uploads import UploadNotFound
+
+        context = SpecialistContext(
+            workspace_id="ws_1", workflow_id="wf_1", task_type="data_enrichment",
+            message="Enrich", params={"source": {"$blob": "0" * 64}},
+        )
+
+        with pytest.raises(UploadNotFound):
+            await DataEnricher().run(context)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("job_id", ["../../x", "a/b", "..", "job id", ""])
+    async def test_unsafe_job_id_rejected(self, fake_llm, local_stores, monkeypatch, job_id):
+        monkeypatch.setenv("ENRICH_SOURCE_DIR", str(local_stores))
+        monkeypatch.setenv("ENRICH_OUTPUT_DIR", str(local_stores / "enriched"))
+        write_contacts(local_stores / "contacts.csv", 5)
+        context = SpecialistContext(
+            workspace_id="ws_1", workflow_id="wf_1", task_type="data_enrichment",
+            message="Enrich contacts.csv", params={"source": "contacts.csv", "job_id": job_id},
+        )
+
+        if job_id:
+            with pytest.raises(ValueError):
+                await DataEnricher().run(context)
+        else:
+            # Empty falls back to the workflow's default job id
+            assert (await DataEnricher().run(context))["job_id"] == "enrich_wf_1"
+        assert not (local_stores / "x.csv").exists()
+
+    @pytest.mark.asyncio
+    async def test_jobs_scoped_per_workspace(self, fake_llm, local_stores, monkeypatch):
+        """Another workspace's job of the same id never resumes this one's checkpoint"""
+        monkeypatch.setenv("ENRICH_SOURCE_DIR", str(local_stores))
+        monkeypatch.setenv("ENRICH_OUTPUT_DIR", str(local_stores / "enriched"))
+        write_contacts(local_stores / "a.csv", 10)
+        write_contacts(local_stores / "b.csv", 3)
+        store = get_enrichment_store()
+        await store.save_job(EnrichmentJob(
+            job_id="shared", workspace_id="ws_a", source=str(local_stores / "a.csv"),
+            output=str(local_stores / "enriched" / "ws_a" / "shared.csv"), status="interrupted",
+        ))
+
+        def context(workspace_id: str, source: str) -> SpecialistContext:
+            return SpecialistContext(
+                workspace_id=workspace_id, workflow_id="wf_1", task_type="data_enrichment",
+                message="Enrich", params={"source": source, "job_id": "shared"},
+            )
+
+        result = await DataEnricher().run(context("ws_b", "b.csv"))
+
+        assert result["workspace_id"] == "ws_b"
+        assert result["source"] == str(local_stores / "b.csv")
+        assert result["rows_written"] == 3
+        assert result["output"].endswith("ws_b/shared.csv")
+        assert (await store.load_job("ws_a", "shared")).status == "interrupted"
+
+    @pytest.mark.asyncio
+    async def test_path_source_inside_source_dir(self, fake_llm, local_stores, monkeypatch):
+        monkeypatch.setenv("ENRICH_SOURCE_DIR", str(local_stores / "sources"))
+        monkeypatch.setenv("ENRICH_OUTPUT_DIR", str(local_stores / "enriched"))
+        (local_stores / "sources" / "march").mkdir(parents=True)
+        write_contacts(local_stores / "sources" / "march" / "contacts.csv", 10)
+        context = SpecialistContext(
+            workspace_id="ws_1", workflow_id="wf_1", task_type="data_enrichment",
+            message="Enrich march/contacts.csv", params={"source": "march/contacts.csv"},
+        )
+
+        result = await DataEnricher().run(context)
+
+        assert result["rows_written"] == 10
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("source", ["/etc/passwd", "../secrets.csv", "march/../../secrets.csv", "link/contacts.csv", {"path": "x"}])
+    async def test_path_source_escapes_rejected(self, local_stores, monkeypatch, source):
+        root = local_stores / "sources"
+        root.mkdir()
+        (local_stores / "secrets.csv").write_text("email\nroot@example.com\n")
+        (root / "link").symlink_to(local_stores)
+        monkeypatch.setenv("ENRICH_SOURCE_DIR", str(root))
+
+        with pytest.raises(SourceNotAllowed):
+            await source_file("ws_1", source)
+
+    @pytest.mark.asyncio
+    async def test_path_source_disabled_by_default(self, fake_llm, local_stores, monkeypatch):
+        monkeypatch.delenv("ENRICH_SOURCE_DIR", raising=False)
+        context = SpecialistContext(
+            workspace_id="ws_1", workflow_id="wf_1", task_type="data_enrichment",
+            message="Enrich /etc/passwd", params={"source": "/etc/passwd"},
+        )
+
+        with pytest.raises(SourceNotAllowed):
+            await DataEnricher().run(context)
+
+    @pytest.mark.asyncio
+    async def test_single_record(self, fake_llm):
+        context = SpecialistContext(
+            workspace_id="ws_1", workflow_id="wf_1", task_type="data_enrichment",
+            message="Enrich Jane", params={"name": "Jane", "email": "jane@acme.com"},
+        )
+
+        result = await DataEnricher().run(context)
+
+        assert result["record"]["company"] == "Acme"
+        assert result["record"]["enrichment_status"] == "enriched"
+        assert result["llm_calls"] == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_jobs_share_cache(self, local_stores):
+        source = local_stores / "contacts.csv"
+        write_contacts(source, 30)
+        lookup = CountingLookup()
+
+        await asyncio.gather(*(
+            start_or_resume(f"job_{i}", str(source), str(local_stores / f"{i}.csv"), lookup) for i in range(3)
+        ))
+
+        # Each job may look domains up before another cached them, but every job completes
+        for i in range(3):
+            job = await get_enrichment_store().load_job("cli", f"job_{i}")
+            assert (job.status, job.rows_written) == ("completed", 30)
@@ -0,0 +1,175 @@
+"""
+Tests for campaign email composition
+=====================================
+
+Run with: pytest tests/test_email_composer.py -v
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from specialists import SourceNotAllowed, email_composer
+from specialists.base import SpecialistContext
+from specialists.email_composer import EmailComposer, compose_campaign, fill, recipient_variables
+
+RECIPIENTS = [
+    {"name": "Jane Doe", "email": "jane@acme.com", "company": "ACME"},
+    {"first_name": "Bob", "email": "bob@globex.com", "company": "Globex", "value": 50000},
+    {"email": "anon@initech.com", "high_value": True},
+]
+
+
+def campaign(**overrides) -> dict:
+    return {"campaign": "q3_launch", "segment": "smb", "brief": "Announce lead scoring", "sender_name": "Alex", "recipients": RECIPIENTS, **overrides}
+
+
+class TestFill:
+    """Local placeholder substitution"""
+
+    def test_fill_and_fallbacks(self):
+        text, fallbacks = fill("Hi {{first_name}} at {{ company }}{{title}}", {"first_name": "Jane"})
+
+        assert text == "Hi Jane at your team"
+        assert fallbacks == {"company", "title"}
+
+    def test_recipient_variables(self):
+        assert recipient_variables({"name": "Jane Q Doe", "company": " ACME "}, "Alex") == {
+            "first_name": "Jane", "last_name": "Doe", "company": "ACME", "sender_name": "Alex",
+        }
+
+
+class TestComposeCampaign:
+    """One template call, local fill, personalization for key accounts"""
+
+    @pytest.mark.asyncio
+    async def test_template_fill_and_personalization(self, fake_llm, monkeypatch):
+        monkeypatch.setenv("EMAIL_PERSONALIZE_BATCH", "1")
+
+        result = await compose_campaign("ws_1", campaign())
+
+        jane, bob, anon = result["emails"]
+        assert jane["subject"] == "A faster pipeline for ACME"
+        assert jane["body"].startswith("Hi Jane,") and jane["body"].endswith("Alex")
+        assert not jane["personalized"]
+        assert bob["personalized"] and bob["body"] == "Hi Bob, a note just for Globex."
+        assert anon["personalized"] and anon["fallbacks"] == ["company", "first_name"]
+        # 1 template + 2 personalization calls (batch of 1)
+        assert result["summary"]["llm_calls"] == 3
+        assert result["template"]["cached"] is False
+
+    @pytest.mark.asyncio
+    async def test_template_cached_per_campaign_segment_and_workspace(self, fake_llm):
+        recipients = [RECIPIENTS[0]]
+
+        first = await compose_campaign("ws_1", campaign(recipients=recipients))
+        again = await compose_campaign("ws_1", campaign(recipients=recipients))
+        other_segment = await compose_campaign("ws_1", campaign(recipients=recipients, segment="enterprise"))
+        other_workspace = await compose_campaign("ws_2", campaign(recipients=recipients))
+        new_brief = await compose_campaign("ws_1", campaign(recipients=recipients, brief="Webinar invite"))
+
+        assert first["summary"]["llm_calls"] == 1
+        assert (again["summary"]["llm_calls"], again["template"]["cached"]) == (0, True)
+        assert not any(r["template"]["cached"] for r in (other_segment, other_workspace, new_brief))
+        assert email_composer.get_composer_stats().summary()["template_cache_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_sends_share_one_generation(self, fake_llm):
+        fake_llm(latency_s=0.05)
+
+        results = await asyncio.gather(*(compose_campaign("ws_1", campaign(recipients=[RECIPIENTS[0]])) for _ in range(5)))
+
+        assert sum(r["summary"]["llm_calls"] for r in results) == 1
+        assert email_composer.get_composer_stats().templates_generated == 1
+
+    @pytest.mark.asyncio
+    async def test_bulk_send_call_count(self, fake_llm, monkeypatch):
+        monkeypatch.setenv("EMAIL_PERSONALIZE_MAX", "3")
+        recipients = [{"name": f"Contact {i}", "company": f"Co {i}", "value": 20000 if i % 100 == 0 else 10} for i in range(1000)]
+
+        result = await compose_campaign("ws_1", campaign(recipients=recipients))
+
+        assert result["summary"]["emails"] == 1000
+        assert result["summary"]["high_value"] == 10
+        # Capped at EMAIL_PERSONALIZE_MAX: 1 template call + 1 batch of 3
+        assert result["summary"]["personalized"] == 3
+        assert result["summary"]["llm_calls"] == 2
+
+    @pytest.mark.asyncio
+    async def test_invalid_template_fails(self, fake_llm):
+        fake_llm(model_responses={"gpt-4o-mini": {"campaign email template writer": json.dumps({"subject": "Hi"})}})
+
+        with pytest.raises(ValueError):
+            await compose_campaign("ws_1", campaign())
+
+
+class TestEntryPoints:
+    """Specialist and /execute"""
+
+    @pytest.mark.asyncio
+    async def test_specialist_single_recipient(self, fake_llm):
+        context = SpecialistContext(
+            workspace_id="ws_1", workflow_id="wf_1", task_type="email_composition",
+            message="Email John about the demo", params={"name": "John Doe", "company": "ACME Corp"},
+        )
+
+        result = await EmailComposer().run(context)
+
+        assert result["status"] == "success"
+        assert result["emails"][0]["subject"] == "A faster pipeline for ACME Corp"
+        assert result["template"]["campaign"] == "wf_1"
+
+    @pytest.mark.asyncio
+    async def test_execute_email_campaign(self, fake_llm, monkeypatch):
+        from app import app
+
+        monkeypatch.setenv("OPENAI_API_KEY", "test")
+        transport = httpx.ASGITransport(app=app)
+        payload = {
+            "agent_id": "agent_campaign", "workspace_id": "ws_1", "user_id": "u_1",
+            "agent_type": "email", "inputs": campaign(campaign=None, recipients=[RECIPIENTS[0]] * 3),
+        }
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = (await client.post("/execute", json=payload)).json()
+            second = (await client.post("/execute", json=payload)).json()
+
+        assert first["success"]
+        assert len(first["outputs"]["emails"]) == 3
+        assert first["outputs"]["template"]["campaign"] == "agent_campaign"
+        assert (first["metrics"]["llm_calls"], second["metrics"]["llm_calls"]) == (1, 0)
+        assert second["metrics"]["template_cached"] is True
+
+    @pytest.mark.asyncio
+    async def test_recipients_from_source(self, fake_llm, local_stores, monkeypatch):
+        monkeypatch.setenv("ENRICH_SOURCE_DIR", str(local_stores))
+        (local_stores / "recipients.jsonl").write_text("\n".join(json.dumps(r) for r in RECIPIENTS[:2]))
+
+        result = await compose_campaign("ws_1", campaign(recipients=None, source="recipients.jsonl"))
+
+        assert len(result["emails"]) == 2
+        assert result["emails"][0]["subject"] == "A faster pipeline for ACME"
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("source", ["/etc/passwd", "../recipients.csv"])
+    async def test_source_outside_source_dir_rejected(self, fake_llm, local_stores, monkeypatch, source):
+        (local_stores / "sources").mkdir()
+        (local_stores / "recipients.csv").write_text("email\njane@acme.com\n")
+        monkeypatch.setenv("ENRICH_SOURCE_DIR", str(local_stores / "sources"))
+        context = SpecialistContext(
+            workspace_id="ws_1", workflow_id="wf_1", task_type="email_composition",
+            message="Email everyone in the file", params={"source": source},
+        )
+
+        with pytest.raises(SourceNotAllowed):
+            await EmailComposer().run(context)
+
+    @pytest.mark.asyncio
+    async def test_source_row_limit(self, fake_llm, local_stores, monkeypatch):
+        monkeypatch.setenv("ENRICH_SOURCE_DIR", str(local_stores))
+        monkeypatch.setenv("EMAIL_MAX_SOURCE_ROWS", "2")
+        (local_stores / "recipients.jsonl").write_text("\n".join(json.dumps(r) for r in RECIPIENTS))
+
+        with pytest.raises(ValueError, match="more than 2 rows"):
+            await compose_campaign("ws_1", campaign(recipients=None, source="recipients.jsonl"))
@@ -0,0 +1,234 @@
+"""
+Tests for the local intake classifier
+======================================
+
+Run with: pytest tests/test_intake_classifier.py -v
+"""
+
+import json
+import random
+import sys
+
+import pytest
+
+from core import intake_classifier
+from core.intake_classifier import IntakeClassifier, IntakeLog, IntakeStats, evaluate, hashed_features
+from core.orchestrator import NODE_COSTS, execute_workflow
+from core.state_bounds import load_result
+
+NAMES = ["John Doe", "Maria Lopez", "Wei Chen", "Priya Patel", "Tom Baker", "Anna Berg"]
+COMPANIES = ["ACME Corp", "Globex", "Initech", "Umbrella", "Stark Industries", "Hooli"]
+TEMPLATES = {
+    "lead_qualification": [
+        "Qualify {name} from {company}",
+        "Is {company} a good lead for our enterprise plan",
+        "Score the lead {name} at {company}",
+    ],
+    "email_composition": [
+        "Draft an email to {name} at {company} and send it",
+        "Write and send a follow-up email to {name}",
+        "Send {company} a reply email about pricing",
+    ],
+    "data_enrichment": [
+        "Enrich the contact record for {name}",
+        "Find company size and industry for {company}",
+        "Look up the LinkedIn profile and title of {name} at {company}",
+    ],
+    "general": [
+        "What is on my calendar tomorrow",
+        "Summarize my week",
+        "Remind me what we discussed last time",
+    ],
+}
+
+
+def synthetic_examples(count: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    examples = []
+    for _ in range(count):
+        task_type = rng.choice(list(TEMPLATES))
+        message = rng.choice(TEMPLATES[task_type]).format(name=rng.choice(NAMES), company=rng.choice(COMPANIES))
+        urgent = rng.random() < 0.3
+        examples.append({
+            "message": ("Urgent: " if urgent else "") + message,
+            "task_type": task_type,
+            "priority": "high" if urgent else "medium",
+            "requires_approval": task_type == "email_composition",
+        })
+    return examples
+
+
+@pytest.fixture(scope="module")
+def classifier() -> IntakeClassifier:
+    return IntakeClassifier.train(synthetic_examples(300), epochs=8)
+
+
+class TestModel:
+    """Hashed features and the softmax heads"""
+
+    def test_features_are_normalized_and_stable(self):
+        indices, values = hashed_features("Qualify John Doe")
+        again, _ = hashed_features("qualify  JOHN doe")
+
+        assert len(indices) == 5  # 3 words + 2 bigrams
+        assert sorted(indices) == sorted(again)
+        assert abs(float((values ** 2).sum()) - 1.0) < 1e-6
+
+    def test_learns_task_type_and_approval(self, classifier):
+        prediction = classifier.predict("Draft an email to Anna Berg at Globex and send it")
+
+        assert prediction.task_type == "email_composition"
+        assert prediction.requires_approval
+        assert prediction.confidence > 0.8
+        assert classifier.predict("Urgent: Qualify Tom Baker from Hooli").priority == "high"
+
+    def test_holdout_evaluation(self, classifier):
+        report = evaluate(classifier, synthetic_examples(100, seed=1), thresholds=(0.5, 0.9))
+
+        assert report["task_type_accuracy"] >= 0.95
+        assert report["approval_accuracy"] >= 0.95
+        assert report["thresholds"]["0.9"]["skip_rate"] <= report["thresholds"]["0.5"]["skip_rate"]
+        assert report["thresholds"]["0.5"]["disagreement_rate"] <= 0.05
+
+    def test_save_and_load(self, classifier, tmp_path):
+        path = str(tmp_path / "model" / "intake.npz")
+        classifier.save(path)
+
+        loaded = IntakeClassifier.load(path)
+
+        text = "Enrich the contact record for Wei Chen"
+        assert loaded.predict(text) == classifier.predict(text)
+
+
+class TestIntakeLog:
+    """Logged LLM intake results"""
+
+    @pytest.mark.asyncio
+    async def test_add_and_read(self, tmp_path):
+        log = IntakeLog(str(tmp_path / "intake_log.db"))
+        try:
+            await log.add("wf_1", "ws_1", "Qualify John", {"task_type": "lead_qualification", "priority": "high"})
+            await log.add("wf_2", "ws_1", "Send an email", {
+                "task_type": "email_composition", "priority": "urgent!", "requires_approval": True,
+            })
+            await log.add("wf_3", "ws_1", "???", {"task_type": "poetry"})
+
+            examples = await log.examples()
+        finally:
+            await log.close()
+
+        assert [e["message"] for e in examples] == ["Send an email", "Qualify John"]
+        assert examples[0] == {
+            "message": "Send an email", "task_type": "email_composition", "priority": "medium", "requires_approval": True,
+        }
+
+
+class TestWorkflowIntake:
+    """paa_intake_node skips the LLM on confident predictions"""
+
+    @pytest.fixture
+    def loaded(self, classifier, monkeypatch):
+        monkeypatch.setattr(intake_classifier, "_classifier", classifier)
+        monkeypatch.setattr(intake_classifier, "_stats", IntakeStats())
+        monkeypatch.setenv("INTAKE_CLASSIFIER_THRESHOLD", "0.8")
+        monkeypatch.setenv("INTAKE_CLASSIFIER_AUDIT_RATE", "0")
+        return classifier
+
+    @staticmethod
+    def intake(result: dict) -> dict:
+        return next(o for o in result["outcomes"] if o["agent_id"] == "paa_intake")
+
+    @pytest.mark.asyncio
+    async def test_confident_prediction_skips_llm(self, fake_llm, loaded):
+        result = await execute_workflow("ws_1", "user_1", "Qualify John Doe from ACME Corp", workflow_id="wf_skip")
+
+        outcome = self.intake(result)
+        assert outcome["model"] == "intake-classifier"
+        # Params still come from the cheap extraction model
+        assert outcome["cost"] == NODE_COSTS["paa_extract"]
+        assert outcome["result"]["extracted_params"] == {"lead": "John Doe", "company": "ACME Corp"}
+        assert result["task_type"] == "lead_qualification"
+        assert result["current_step"] == "complete"
+        # Nothing logged: the classifier never trains on its own answers
+        assert await intake_classifier.get_intake_log().examples() == []
+        assert intake_classifier.get_intake_stats().summary()["skip_rate"] == 1.0
+
+    @pytest.mark.asyncio
+    async def test_skipped_enrichment_reaches_specialist_with_source(self, fake_llm, local_stores, loaded, monkeypatch):
+        """A classifier-routed request still hands its specialist the extracted source file"""
+        monkeypatch.setenv("ENRICH_SOURCE_DIR", str(local_stores))
+        monkeypatch.setenv("ENRICH_OUTPUT_DIR", str(local_stores / "enriched"))
+        (local_stores / "contacts.csv").write_text("name,email\nWei Chen,wei@initech.com\n")
+
+        result = await execute_workflow(
+            "ws_1", "user_1", "Enrich the contact record for Wei Chen in contacts.csv", workflow_id="wf_enrich"
+        )
+
+        assert self.intake(result)["model"] == "intake-classifier"
+        assert result["task_type"] == "data_enrichment"
+        specialist = next(o for o in result["outcomes"] if o["agent_type"] == "specialist")
+        job = await load_result(specialist)
+        assert job["status"] == "success"
+        assert job["source"].endswith("contacts.csv")
+        assert job["rows_written"] == 1
+
+    @pytest.mark.asyncio
+    async def test_general_request_needs_no_extraction(self, fake_llm, loaded):
+        result = await execute_workflow("ws_1", "user_1", "Summarize my week", workflow_id="wf_general")
+
+        outcome = self.intake(result)
+        assert (outcome["model"], outcome["cost"]) == ("intake-classifier", 0.0)
+        assert outcome["result"]["extracted_params"] == {}
+
+    @pytest.mark.asyncio
+    async def test_unsure_prediction_falls_back_and_logs(self, fake_llm, loaded, monkeypatch):
+        monkeypatch.setenv("INTAKE_CLASSIFIER_THRESHOLD", "1.01")
+
+        result = await execute_workflow("ws_1", "user_1", "Qualify John Doe from ACME Corp", workflow_id="wf_llm")
+
+        assert self.intake(result)["model"] == "claude-3-5-sonnet-20241022"
+        logged = await intake_classifier.get_intake_log().examples()
+        assert logged == [{
+            "message": "Qualify John Doe from ACME Corp",
+            "task_type": "lead_qualification",
+            "priority": "medium",
+            "requires_approval": False,
+        }]
+        summary = intake_classifier.get_intake_stats().summary()
+        assert summary["below_threshold"] == 1
+        assert summary["compared"] == 0
+
+    @pytest.mark.asyncio
+    async def test_audit_measures_disagreement(self, fake_llm, loaded, monkeypatch):
+        monkeypatch.setenv("INTAKE_CLASSIFIER_AUDIT_RATE", "1")
+
+        # The fake LLM always answers lead_qualification
+        await execute_workflow("ws_1", "user_1", "Qualify John Doe from ACME Corp", workflow_id="wf_agree")
+        await execute_workflow("ws_1", "user_1", "Enrich the contact record for Wei Chen", workflow_id="wf_disagree")
+
+        summary = intake_classifier.get_intake_stats().summary()
+        assert summary["audited"] == 2
+        assert summary["disagreements"] == 1
+        assert summary["disagreement_rate"] == 0.5
+
+
+class TestTrainingCli:
+    """python -m core.intake_classifier train / evaluate"""
+
+    def test_train_then_evaluate(self, tmp_path, monkeypatch, capsys):
+        data = tmp_path / "intake.jsonl"
+        data.write_text("".join(json.dumps(e) + "\n" for e in synthetic_examples(120)))
+        model = str(tmp_path / "intake.npz")
+
+        monkeypatch.setattr(sys, "argv", ["intake_classifier", "train", "--data", str(data), "--model", model])
+        assert intake_classifier.main() == 0
+        trained = json.loads(capsys.readouterr().out)
+
+        monkeypatch.setattr(sys, "argv", ["intake_classifier", "evaluate", "--data", str(data), "--model", model])
+        assert intake_classifier.main() == 0
+        evaluated = json.loads(capsys.readouterr().out)
+
+        assert trained["train_examples"] == 96
+        assert trained["holdout"]["examples"] == 24
+        assert evaluated["examples"] == 120
+        assert evaluated["task_type_accuracy"] >= 0.9
@@ -0,0 +1,161 @@
+"""
+Tests for the LeadQualifier specialist
+=======================================
+
+Run with: pytest tests/test_lead_qualifier.py -v
+"""
+
+import json
+
+import pytest
+
+from specialists import SourceNotAllowed
+from specialists.base import SpecialistContext
+from specialists.lead_qualifier import (
+    LeadQualifier,
+    LeadThresholds,
+    _number,
+    prefilter,
+    score_leads,
+    thresholds_for,
+)
+
+STRONG = {"title": "Chief Revenue Officer", "employees": 5000, "email": "cro@bigco.com", "budget": "$500k", "engagement": 12, "phone": "555-0100"}
+WEAK = {"title": "Student", "email": "kid@gmail.com", "employees": "1-10"}
+AMBIGUOUS = {"title": "Marketing Manager", "employee_range": "51-200", "email": "m@midco.com"}
+BARE = {"lead": "John Doe", "company": "ACME Corp"}
+
+
+def context(params: dict, workspace_id: str = "ws_1") -> SpecialistContext:
+    return SpecialistContext(
+        workspace_id=workspace_id, workflow_id="wf_1", task_type="lead_qualification", message="Qualify", params=params
+    )
+
+
+class TestScoring:
+    """Vectorized pre-filter"""
+
+    def test_number_parsing(self):
+        assert _number("$50k") == 50_000
+        assert _number("2.5M") == 2_500_000
+        assert _number("1,200") == 1200
+        assert _number("100-400") == 200
+        assert _number("5000+") == 5000
+        assert _number("unknown") is None
+        assert _number(True) is None
+
+    def test_scores_and_known_signals(self):
+        scores, known = score_leads([STRONG, WEAK, BARE])
+
+        assert scores[0] > 90
+        assert scores[1] < 10
+        assert scores[2] == 0
+        assert known.tolist() == [6, 3, 0]
+
+    def test_prefilter_decisions(self):
+        _, qualified, rejected, ambiguous = prefilter([STRONG, WEAK, AMBIGUOUS, BARE], LeadThresholds())
+
+        assert qualified.tolist() == [True, False, False, False]
+        assert rejected.tolist() == [False, True, False, False]
+        # Too few known signals to reject: the model decides
+        assert ambiguous.tolist() == [False, False, True, True]
+
+    def test_workspace_thresholds(self, monkeypatch):
+        monkeypatch.setenv("LEAD_QUALIFY_AT", "60")
+        monkeypatch.setenv("LEAD_THRESHOLDS", json.dumps({"ws_strict": {"qualify_at": 95, "reject_below": 50}}))
+
+        assert thresholds_for("ws_strict") == LeadThresholds(qualify_at=95, reject_below=50)
+        assert thresholds_for("ws_other") == LeadThresholds(qualify_at=60)
+
+    @pytest.mark.parametrize("raw", ['{"ws_1": {"qualify": 80}}', '{"ws_1": {"reject_below": 90}}', "[1]", "{nope"])
+    def test_invalid_thresholds(self, monkeypatch, raw):
+        monkeypatch.setenv("LEAD_THRESHOLDS", raw)
+
+        with pytest.raises(ValueError):
+            thresholds_for("ws_1")
+
+
+class TestLeadQualifier:
+    """Only ambiguous leads reach the model"""
+
+    @pytest.mark.asyncio
+    async def test_batch(self, fake_llm, monkeypatch):
+        monkeypatch.setenv("LEAD_LLM_BATCH_SIZE", "2")
+        qualifier = LeadQualifier()
+        leads = [STRONG] * 5 + [WEAK] * 4 + [AMBIGUOUS] * 3
+
+        result = await qualifier.run(context({"leads": leads}))
+
+        summary = result["summary"]
+        assert (summary["auto_qualified"], summary["auto_rejected"], summary["sent_to_llm"]) == (5, 4, 3)
+        # 6 calls to send all 12 leads; 2 for the 3 ambiguous ones
+        assert (summary["llm_calls"], summary["llm_calls_avoided"]) == (2, 4)
+        assert summary["qualified"] == 8
+        decided_by = [lead["decided_by"] for lead in result["leads"]]
+        assert decided_by == ["rules"] * 9 + ["llm"] * 3
+        assert result["leads"][9]["reason"]
+        assert qualifier.metrics()["llm_calls_avoided_fraction"] == pytest.approx(4 / 6, abs=1e-3)
+
+    @pytest.mark.asyncio
+    async def test_clear_batch_makes_no_model_call(self, local_stores):
+        # No fake model installed: a model call would fail
+        result = await LeadQualifier().run(context({"leads": [STRONG, WEAK]}))
+
+        assert result["summary"]["llm_calls"] == 0
+        assert [lead["qualified"] for lead in result["leads"]] == [True, False]
+
+    @pytest.mark.asyncio
+    async def test_workspace_thresholds_change_decisions(self, local_stores, monkeypatch):
+        monkeypatch.setenv("LEAD_THRESHOLDS", json.dumps({"ws_loose": {"qualify_at": 30, "reject_below": 20}}))
+
+        result = await LeadQualifier().run(context({"leads": [AMBIGUOUS]}, workspace_id="ws_loose"))
+
+        assert result["leads"][0]["decided_by"] == "rules"
+        assert result["leads"][0]["qualified"] is True
+
+    @pytest.mark.asyncio
+    async def test_model_skipping_a_lead_falls_back_to_rules(self, fake_llm):
+        fake_llm(model_responses={"gpt-4o-mini": {"lead qualification": "not json"}})
+
+        result = await LeadQualifier().run(context({"leads": [AMBIGUOUS]}))
+
+        assert result["leads"][0]["decided_by"] == "rules_fallback"
+        assert result["summary"]["llm_calls"] == 1
+
+    @pytest.mark.asyncio
+    async def test_single_lead_from_intake(self, fake_llm):
+        result = await LeadQualifier().run(context(BARE))
+
+        assert result["decided_by"] == "llm"
+        assert result["qualified"] is True
+        assert result["id"] == "John Doe"
+
+    @pytest.mark.asyncio
+    async def test_leads_from_file(self, local_stores, monkeypatch):
+        monkeypatch.setenv("ENRICH_SOURCE_DIR", str(local_stores))
+        source = local_stores / "leads.jsonl"
+        source.write_text("\n".join(json.dumps(lead) for lead in [STRONG, WEAK]))
+
+        result = await LeadQualifier().run(context({"source": "leads.jsonl"}))
+
+        assert result["summary"]["leads"] == 2
+        assert result["summary"]["llm_calls"] == 0
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("source", ["/etc/passwd", "../leads.jsonl"])
+    async def test_source_outside_source_dir_rejected(self, local_stores, monkeypatch, source):
+        (local_stores / "sources").mkdir()
+        (local_stores / "leads.jsonl").write_text(json.dumps(STRONG))
+        monkeypatch.setenv("ENRICH_SOURCE_DIR", str(local_stores / "sources"))
+
+        with pytest.raises(SourceNotAllowed):
+            await LeadQualifier().run(context({"source": source}))
+
+    @pytest.mark.asyncio
+    async def test_source_row_limit(self, local_stores, monkeypatch):
+        monkeypatch.setenv("ENRICH_SOURCE_DIR", str(local_stores))
+        monkeypatch.setenv("LEAD_MAX_SOURCE_ROWS", "2")
+        (local_stores / "leads.jsonl").write_text("\n".join(json.dumps(lead) for lead in [STRONG, WEAK, STRONG]))
+
+        with pytest.raises(ValueError, match="more than 2 rows"):
+            await LeadQualifier().run(context({"source": "leads.jsonl"}))
@@ -0,0 +1,87 @@
+"""
+Tests for the chat model factory
+=================================
+
+Run with: pytest tests/test_llm.py -v
+"""
+
+import pytest
+
+from core.llm import estimate_cost, get_chat_model, preload_providers
+
+
+class TestProviderBaseUrl:
+    """OPENAI_BASE_URL / ANTHROPIC_BASE_URL redirect the real clients"""
+
+    @pytest.fixture(autouse=True)
+    def api_keys(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-ant-test")
+        monkeypatch.delenv("OPENAI_BASE_URL", raising=False)
+        monkeypatch.delenv("ANTHROPIC_BASE_URL", raising=False)
+
+    def test_openai_base_url(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_BASE_URL", "http://127.0.0.1:8900/v1")
+
+        model = get_chat_model("openai", "gpt-4o-mini")
+
+        assert model.openai_api_base == "http://127.0.0.1:8900/v1"
+        assert str(model.root_async_client.base_url).startswith("http://127.0.0.1:8900/v1")
+
+    def test_anthropic_base_url(self, monkeypatch):
+        monkeypatch.setenv("ANTHROPIC_BASE_URL", "http://127.0.0.1:8900")
+
+        model = get_chat_model("anthropic", "claude-3-5-sonnet-20241022")
+
+        assert model.anthropic_api_url == "http://127.0.0.1:8900"
+
+    def test_defaults_without_override(self):
+        model = get_chat_model("openai", "gpt-4o-mini")
+
+        assert model.openai_api_base is None
+
+    def test_unknown_provider(self):
+        with pytest.raises(ValueError):
+            get_chat_model("cohere", "command-r")
+
+
+class TestPreloadProviders:
+    """Startup import of configured provider packages"""
+
+    def test_only_configured_providers(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+
+        timings = preload_providers()
+
+        assert set(timings) == {"openai"}
+        assert timings["openai"] >= 0
+
+
+class TestEstimateCost:
+    """Pricing from normalized usage metadata"""
+
+    def test_uncached(self):
+        usage = {"input_tokens": 1_000_000, "output_tokens": 1_000_000}
+
+        assert estimate_cost(usage, "gpt-4o") == 12.5
+
+    def test_openai_cache_reads_at_half_price(self):
+        usage = {"input_tokens": 1_000_000, "output_tokens": 0, "input_token_details": {"cache_read": 1_000_000}}
+
+        assert estimate_cost(usage, "gpt-4o") == 1.25
+
+    def test_anthropic_cache_write_and_read(self):
+        usage = {
+            "input_tokens": 3_000_000,
+            "output_tokens": 0,
+            "input_token_details": {"cache_read": 1_000_000, "cache_creation": 1_000_000},
+        }
+
+        # 1M uncached at 3.00 + 1M read at 0.30 + 1M written at 3.75
+        assert estimate_cost(usage, "claude-3-5-sonnet-20241022") == 7.05
+
+    def test_unknown_model_priced_as_mini(self):
+        usage = {"input_tokens": 1_000_000, "output_tokens": 0}
+
+        assert estimate_cost(usage, "some-new-model") == 0.15
@@ -132,7 +132,7 @@ class TestErrorHandling:
     """Test error handling and edge cases"""
     
     @pytest.mark.asyncio
-    async def test_missing_api_keys(self):
+    async def test_missing_api_keys(self, local_stores):
         """Test behavior when API keys are missing"""
         # Temporarily remove API keys
         openai_key = os.environ.pop("OPENAI_API_KEY", None)
@@ -0,0 +1,187 @@
+"""
+Tests for on-demand profiling and the admin endpoints
+======================================================
+
+Run with: pytest tests/test_profiling.py -v
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from core import profiling
+from core.profiling import LagHistogram, LoopLagMonitor, ProfileInProgress, SamplingProfiler, dump_tasks, profile_for
+
+
+def busy_wait(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class TestSamplingProfiler:
+    """Folded-stack sampling of the event-loop thread"""
+
+    def test_samples_calling_thread(self, tmp_path):
+        profiler = SamplingProfiler(interval_s=0.001)
+        profiler.start()
+        try:
+            busy_wait(0.2)
+        finally:
+            profiler.stop()
+
+        assert profiler.samples > 10
+        assert any("busy_wait" in entry["frame"] for entry in profiler.top(5))
+
+        path = profiler.write(str(tmp_path))
+        lines = open(path).read().splitlines()
+        stack, count = lines[0].rsplit(" ", 1)
+        assert int(count) > 0
+        assert "test_samples_calling_thread" in stack
+
+    def test_one_profile_at_a_time(self):
+        first = SamplingProfiler()
+        first.start()
+        try:
+            with pytest.raises(ProfileInProgress):
+                SamplingProfiler().start()
+        finally:
+            first.stop()
+
+        # Released after stop
+        second = SamplingProfiler()
+        second.start()
+        second.stop()
+
+    @pytest.mark.asyncio
+    async def test_profile_for_sees_blocking_callback(self, tmp_path):
+        async def blocker():
+            await asyncio.sleep(0.02)
+            busy_wait(0.15)
+
+        task = asyncio.create_task(blocker())
+        result = await profile_for(0.3, interval_s=0.002, directory=str(tmp_path))
+        await task
+
+        assert result["samples"] > 0
+        assert result["path"].endswith(".folded")
+        assert "busy_wait" in open(result["path"]).read()
+
+
+class TestDumpTasks:
+    """asyncio task stacks"""
+
+    @pytest.mark.asyncio
+    async def test_lists_named_task(self):
+        async def parked():
+            await asyncio.sleep(10)
+
+        task = asyncio.create_task(parked(), name="parked-task")
+        await asyncio.sleep(0)
+        try:
+            entry = next(t for t in dump_tasks() if t["name"] == "parked-task")
+        finally:
+            task.cancel()
+
+        assert entry["coroutine"].endswith("parked")
+        assert any("parked" in frame for frame in entry["stack"])
+
+
+class TestLoopLag:
+    """Event-loop lag histogram"""
+
+    def test_histogram_buckets(self):
+        histogram = LagHistogram()
+        for lag_ms in (0.5, 3, 3, 40, 9000):
+            histogram.record(lag_ms)
+
+        summary = histogram.summary()
+        assert summary["count"] == 5
+        assert summary["buckets"]["le_1ms"] == 1
+        assert summary["buckets"]["le_5ms"] == 2
+        assert summary["buckets"]["le_50ms"] == 1
+        assert summary["buckets"]["gt_5000ms"] == 1
+        assert summary["p50_ms"] == 3
+        assert summary["max_ms"] == 9000
+
+    @pytest.mark.asyncio
+    async def test_blocking_call_shows_as_lag(self):
+        monitor = LoopLagMonitor(interval_s=0.01)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        time.sleep(0.1)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+        summary = monitor.summary()
+        assert not summary["running"]
+        assert summary["max_ms"] >= 80
+
+    @pytest.mark.asyncio
+    async def test_watchdog_captures_blocking_stack(self, capsys):
+        monitor = LoopLagMonitor(interval_s=0.01, block_threshold_s=0.05)
+        monitor.start()
+        await asyncio.sleep(0.03)
+        busy_wait(0.2)
+        await asyncio.sleep(0.03)
+        await monitor.stop()
+
+        summary = monitor.summary()
+        assert summary["stall_count"] == 1
+        stall = summary["stalls"][0]
+        assert stall["lag_ms"] >= 150
+        assert any("busy_wait" in line for line in stall["stack"])
+        assert "test_watchdog_captures_blocking_stack" in capsys.readouterr().err
+
+    @pytest.mark.asyncio
+    async def test_watchdog_quiet_when_loop_is_free(self):
+        monitor = LoopLagMonitor(interval_s=0.01, block_threshold_s=0.05)
+        monitor.start()
+        await asyncio.gather(*(asyncio.sleep(0.01) for _ in range(100)))
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+
+        assert monitor.summary()["stall_count"] == 0
+
+
+class TestAdminEndpoints:
+    """Admin-only profiling surface"""
+
+    @pytest.fixture
+    def client(self):
+        from app import app
+
+        transport = httpx.ASGITransport(app=app)
+        return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+    @pytest.mark.asyncio
+    async def test_hidden_without_admin_token(self, client, monkeypatch):
+        monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+        async with client:
+            response = await client.get("/admin/tasks")
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_rejects_wrong_token(self, client, monkeypatch):
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        async with client:
+            response = await client.get("/admin/tasks", headers={"Authorization": "Bearer nope"})
+        assert response.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_profile_and_introspection(self, client, monkeypatch, tmp_path):
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+        headers = {"Authorization": "Bearer secret"}
+
+        async with client:
+            profile = await client.post("/admin/profile?seconds=0.2&interval_ms=2", headers=headers)
+            tasks = await client.get("/admin/tasks", headers=headers)
+            lag = await client.get("/admin/loop-lag", headers=headers)
+
+        assert profile.status_code == 200
+        assert profile.json()["path"].startswith(str(tmp_path))
+        assert tasks.json()["count"] >= 1
+        assert "p99_ms" in lag.json()
@@ -0,0 +1,204 @@
+"""
+Tests for the prompt registry and stored prompts
+=================================================
+
+Run with: pytest tests/test_prompts.py -v
+"""
+
+import httpx
+import pytest
+from langchain_core.messages import AIMessage
+
+from core import orchestrator
+from core.orchestrator import execute_workflow
+from core.prompts import PromptNotFound, PromptStore, cached_tokens, get_template, system_message
+
+
+class TestTemplates:
+    """Built-in prompts per agent type"""
+
+    def test_renders_with_defaults(self):
+        user = get_template("scope").render_user({"email_content": "Can we meet {soon}?"})
+
+        assert "Subject: No subject" in user
+        assert "Can we meet {soon}?" in user
+
+    def test_generic_listing_without_required_inputs(self):
+        user = get_template("call").render_user({"notes": "short call", "duration": 5})
+
+        assert user == "Input data:\n\nnotes: short call\nduration: 5\n"
+
+    def test_unknown_agent_type_uses_custom(self):
+        assert get_template("unknown") is get_template("custom")
+
+    def test_system_prompts_are_static(self):
+        """Nothing request-specific goes into the cacheable prefix"""
+        for agent_type in ("scope", "email", "call", "custom"):
+            assert "{" not in get_template(agent_type).system
+
+
+class TestProviderCaching:
+    """Cache markers and cached-token accounting"""
+
+    def test_anthropic_cache_control(self):
+        message = system_message("You are helpful.", "anthropic")
+
+        assert message.content == [
+            {"type": "text", "text": "You are helpful.", "cache_control": {"type": "ephemeral"}}
+        ]
+
+    def test_openai_plain_prefix(self):
+        assert system_message("You are helpful.", "openai").content == "You are helpful."
+
+    def test_cached_tokens(self):
+        response = AIMessage(content="ok", usage_metadata={
+            "input_tokens": 1500,
+            "output_tokens": 10,
+            "total_tokens": 1510,
+            "input_token_details": {"cache_read": 1024},
+        })
+
+        assert cached_tokens(response) == 1024
+        assert cached_tokens(AIMessage(content="ok")) == 0
+
+
+class TestWorkflowPromptCaching:
+    """Orchestrator nodes send cacheable prefixes and report cached tokens"""
+
+    def test_node_system_messages(self):
+        """Each node's prefix is its static prompt, marked for its provider"""
+        for node, (provider, _) in orchestrator.NODE_MODELS.items():
+            message = orchestrator._node_system_message(node)
+            if provider == "anthropic":
+                assert message.content[0]["text"] == orchestrator.NODE_PROMPTS[node]
+                assert message.content[0]["cache_control"] == {"type": "ephemeral"}
+            else:
+                assert message.content == orchestrator.NODE_PROMPTS[node]
+
+    @pytest.mark.asyncio
+    async def test_repeated_workflow_reads_cache(self, fake_llm):
+        fake_llm(prompt_cache=True)
+
+        first = await execute_workflow("ws_1", "user_1", "Qualify John Doe", workflow_id="wf_cache_1")
+        second = await execute_workflow("ws_1", "user_1", "Qualify John Doe", workflow_id="wf_cache_2")
+
+        # Cold: Anthropic prefixes are written, nothing is read yet
+        assert first["metrics"]["cached_tokens"] == 0
+        assert second["metrics"]["cached_tokens"] > 0
+        assert second["metrics"]["input_tokens"] == first["metrics"]["input_tokens"]
+        assert second["metrics"]["usage_cost"] < first["metrics"]["usage_cost"]
+
+    @pytest.mark.asyncio
+    async def test_uncached_provider(self, fake_llm):
+        fake_llm()
+
+        result = await execute_workflow("ws_1", "user_1", "Qualify John Doe", workflow_id="wf_nocache")
+
+        assert result["metrics"]["cached_tokens"] == 0
+        assert result["metrics"]["input_tokens"] > 0
+        assert result["metrics"]["usage_cost"] > 0
+
+    def test_metrics_from_older_checkpoints(self):
+        """Workflows checkpointed before token metrics existed keep working"""
+        metrics = {"total_cost": 0.0, "total_latency_ms": 0, "success_count": 0,
+                   "failure_count": 0, "approval_requests": 0}
+        usage = {"input_tokens": 100, "output_tokens": 10, "input_token_details": {"cache_read": 60}}
+
+        orchestrator._record_usage(metrics, usage, "gpt-4o", cached=60)
+
+        assert metrics["input_tokens"] == 100
+        assert metrics["cached_tokens"] == 60
+        assert metrics["usage_cost"] > 0
+
+
+class TestPromptStore:
+    """Versioned prompts scoped to a workspace"""
+
+    @pytest.mark.asyncio
+    async def test_versions(self, tmp_path):
+        store = PromptStore(str(tmp_path / "prompts.db"))
+        try:
+            first = await store.save("ws_a", "Be brief.")
+            second = await store.save("ws_a", "Be very brief.", prompt_id=first.prompt_id)
+
+            assert (first.version, second.version) == (1, 2)
+            assert (await store.get(first.prompt_id, "ws_a")).system_prompt == "Be very brief."
+            assert (await store.get(first.prompt_id, "ws_a", version=1)).system_prompt == "Be brief."
+            with pytest.raises(PromptNotFound):
+                await store.get(first.prompt_id, "ws_a", version=3)
+        finally:
+            await store.close()
+
+    @pytest.mark.asyncio
+    async def test_workspace_isolation(self, tmp_path):
+        store = PromptStore(str(tmp_path / "prompts.db"))
+        try:
+            prompt = await store.save("ws_a", "Secret sauce.")
+
+            with pytest.raises(PromptNotFound):
+                await store.get(prompt.prompt_id, "ws_b")
+            with pytest.raises(PromptNotFound):
+                await store.get(prompt.prompt_id, "ws_b", version=1)
+            with pytest.raises(PromptNotFound):
+                await store.save("ws_b", "Hijack", prompt_id=prompt.prompt_id)
+        finally:
+            await store.close()
+
+
+class TestExecuteWithPrompts:
+    """/execute resolves stored, inline and built-in prompts"""
+
+    @pytest.fixture
+    def client(self, fake_llm, monkeypatch):
+        from app import app
+
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        transport = httpx.ASGITransport(app=app)
+        return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+    @staticmethod
+    def body(**config):
+        return {
+            "agent_id": "agent_1",
+            "workspace_id": "ws_a",
+            "user_id": "user_1",
+            "agent_type": "scope",
+            "inputs": {"email_content": "hi"},
+            "config": config,
+        }
+
+    @pytest.mark.asyncio
+    async def test_stored_prompt(self, client):
+        async with client:
+            saved = await client.post("/prompts", json={"workspace_id": "ws_a", "system_prompt": "Be brief."})
+            prompt_id = saved.json()["prompt_id"]
+            await client.post("/prompts", json={"workspace_id": "ws_a", "system_prompt": "Be briefer.", "prompt_id": prompt_id})
+
+            latest = await client.post("/execute", json=self.body(promptId=prompt_id))
+            pinned = await client.post("/execute", json=self.body(promptId=prompt_id, promptVersion=1))
+            fetched = await client.get(f"/prompts/{prompt_id}", params={"workspace_id": "ws_a", "version": 1})
+
+        assert saved.status_code == 201
+        assert latest.json()["success"]
+        assert latest.json()["metrics"]["prompt"] == {"source": "stored", "prompt_id": prompt_id, "version": 2}
+        assert pinned.json()["metrics"]["prompt"]["version"] == 1
+        assert latest.json()["metrics"]["cached_tokens"] == 0
+        assert fetched.json()["system_prompt"] == "Be brief."
+
+    @pytest.mark.asyncio
+    async def test_unknown_prompt(self, client):
+        async with client:
+            response = await client.post("/execute", json=self.body(promptId="prompt_missing"))
+            fetched = await client.get("/prompts/prompt_missing", params={"workspace_id": "ws_a"})
+
+        assert response.status_code == 404
+        assert fetched.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_builtin_and_inline(self, client):
+        async with client:
+            builtin = await client.post("/execute", json=self.body())
+            inline = await client.post("/execute", json=self.body(systemPrompt="Answer in French."))
+
+        assert builtin.json()["metrics"]["prompt"] == {"source": "builtin", "agent_type": "scope"}
+        assert inline.json()["metrics"]["prompt"] == {"source": "inline"}
@@ -0,0 +1,306 @@
+"""
+Tests for per-workspace quotas
+===============================
+
+Run with: pytest tests/test_quotas.py -v
+"""
+
+import asyncio
+
+import aiosqlite
+import httpx
+import pytest
+import pytest_asyncio
+
+from core import orchestrator, quotas as quotas_module
+from core.quotas import QuotaExceeded, QuotaLimits, WorkspaceQuotas, _overrides_from_env
+from core.state_bounds import load_result
+
+
+class FakeClock:
+    """Manually advanced clock so bucket refill is deterministic"""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest_asyncio.fixture
+async def quotas(tmp_path, clock):
+    store = WorkspaceQuotas(
+        db_path=str(tmp_path / "quotas.db"),
+        defaults=QuotaLimits(max_concurrent=2, tokens_per_minute=600, cost_per_day=1.0),
+        overrides={"ws_big": QuotaLimits(max_concurrent=5, tokens_per_minute=6000, cost_per_day=10.0)},
+        clock=clock,
+    )
+    yield store
+    await store.close()
+
+
+class TestConcurrency:
+    """Concurrent execution leases"""
+
+    @pytest.mark.asyncio
+    async def test_rejects_over_limit(self, quotas):
+        """Third concurrent execution for a 2-slot workspace is rejected"""
+        await quotas.acquire("ws_a")
+        await quotas.acquire("ws_a")
+
+        with pytest.raises(QuotaExceeded) as exc_info:
+            await quotas.acquire("ws_a")
+
+        assert exc_info.value.limit == "concurrency"
+        assert exc_info.value.retry_after > 0
+
+    @pytest.mark.asyncio
+    async def test_workspaces_are_isolated(self, quotas):
+        """One tenant filling its slots does not block another"""
+        await quotas.acquire("ws_a")
+        await quotas.acquire("ws_a")
+
+        assert await quotas.acquire("ws_b") is not None
+
+    @pytest.mark.asyncio
+    async def test_release_frees_slot(self, quotas):
+        """Slots return to the pool when released"""
+        async with quotas.execution_slot("ws_a"):
+            async with quotas.execution_slot("ws_a"):
+                pass
+        async with quotas.execution_slot("ws_a"):
+            usage = await quotas.usage("ws_a")
+            assert usage["active_executions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_leases_are_reclaimed(self, quotas, clock):
+        """A crashed worker's leases expire after the TTL"""
+        await quotas.acquire("ws_a")
+        await quotas.acquire("ws_a")
+
+        clock.now += quotas.lease_ttl_s + 1
+
+        assert await quotas.acquire("ws_a") is not None
+
+    @pytest.mark.asyncio
+    async def test_live_lease_is_renewed(self, tmp_path, clock):
+        """A long-running execution keeps its slot past the original TTL"""
+        store = WorkspaceQuotas(
+            str(tmp_path / "renew.db"),
+            defaults=QuotaLimits(max_concurrent=1),
+            lease_ttl_s=10.0,
+            lease_renew_s=0.01,
+            clock=clock,
+        )
+        try:
+            lease_id = await store.acquire("ws_a")
+            for _ in range(3):
+                clock.now += 8
+                await asyncio.sleep(0.05)
+
+            with pytest.raises(QuotaExceeded):
+                await store.acquire("ws_a")
+
+            await store.release(lease_id)
+            assert await store.acquire("ws_a") is not None
+        finally:
+            await store.close()
+
+    @pytest.mark.asyncio
+    async def test_renewal_survives_database_errors(self, tmp_path, clock, monkeypatch):
+        """A failed heartbeat is retried; it does not let the lease lapse"""
+        store = WorkspaceQuotas(
+            str(tmp_path / "renew.db"),
+            defaults=QuotaLimits(max_concurrent=1),
+            lease_ttl_s=10.0,
+            lease_renew_s=0.01,
+            clock=clock,
+        )
+        try:
+            lease_id = await store.acquire("ws_a")
+            connect = store._connection
+            failures = [aiosqlite.OperationalError("database is locked")] * 3
+
+            async def flaky_connection():
+                if failures:
+                    raise failures.pop()
+                return await connect()
+
+            monkeypatch.setattr(store, "_connection", flaky_connection)
+            for _ in range(3):
+                clock.now += 8
+                await asyncio.sleep(0.05)
+
+            assert not failures and not store._renewals[lease_id].done()
+            with pytest.raises(QuotaExceeded):
+                await store.acquire("ws_a")
+
+            await store.release(lease_id)
+            assert store._renewals == {}
+        finally:
+            await store.close()
+
+    @pytest.mark.asyncio
+    async def test_overrides_apply(self, quotas):
+        """Per-workspace overrides raise the limit"""
+        for _ in range(5):
+            await quotas.acquire("ws_big")
+
+        with pytest.raises(QuotaExceeded):
+            await quotas.acquire("ws_big")
+
+
+class TestBudgets:
+    """Token and cost buckets"""
+
+    @pytest.mark.asyncio
+    async def test_token_bucket_rejects_then_refills(self, quotas, clock):
+        """Spending the full minute budget blocks until it refills"""
+        await quotas.check("ws_a")
+        await quotas.record_usage("ws_a", tokens=600, cost=0.0)
+
+        with pytest.raises(QuotaExceeded) as exc_info:
+            await quotas.check("ws_a")
+        assert exc_info.value.limit == "tokens"
+        # 600 tokens/minute refills 10 tokens/second; 1 token needed
+        assert exc_info.value.retry_after == pytest.approx(0.1)
+
+        clock.now += 1
+        await quotas.check("ws_a")
+
+    @pytest.mark.asyncio
+    async def test_debt_delays_dispatch(self, quotas, clock):
+        """Overspending goes negative and lengthens the wait"""
+        await quotas.record_usage("ws_a", tokens=1200, cost=0.0)
+
+        with pytest.raises(QuotaExceeded) as exc_info:
+            await quotas.check("ws_a")
+        assert exc_info.value.retry_after == pytest.approx(60.1)
+
+    @pytest.mark.asyncio
+    async def test_cost_bucket(self, quotas):
+        """Daily cost budget is enforced"""
+        await quotas.record_usage("ws_a", tokens=0, cost=1.5)
+
+        with pytest.raises(QuotaExceeded) as exc_info:
+            await quotas.check("ws_a")
+        assert exc_info.value.limit == "cost"
+
+    @pytest.mark.asyncio
+    async def test_shared_across_instances(self, tmp_path, clock):
+        """Two workers pointing at the same file see each other's usage"""
+        db_path = str(tmp_path / "shared.db")
+        limits = QuotaLimits(max_concurrent=1, tokens_per_minute=100, cost_per_day=1.0)
+        worker_a = WorkspaceQuotas(db_path, defaults=limits, clock=clock)
+        worker_b = WorkspaceQuotas(db_path, defaults=limits, clock=clock)
+
+        try:
+            await worker_a.acquire("ws_a")
+            with pytest.raises(QuotaExceeded):
+                await worker_b.acquire("ws_a")
+
+            await worker_a.record_usage("ws_a", tokens=100, cost=0.0)
+            with pytest.raises(QuotaExceeded):
+                await worker_b.check("ws_a")
+        finally:
+            await worker_a.close()
+            await worker_b.close()
+
+    @pytest.mark.asyncio
+    async def test_disabled_is_noop(self, tmp_path):
+        """Disabled quotas never reject"""
+        store = WorkspaceQuotas(
+            str(tmp_path / "off.db"),
+            defaults=QuotaLimits(max_concurrent=0, tokens_per_minute=1, cost_per_day=0.01),
+            enabled=False,
+        )
+        assert await store.acquire("ws_a") is None
+        await store.record_usage("ws_a", tokens=10_000, cost=100.0)
+        await store.check("ws_a")
+
+
+class TestOverrideConfig:
+    """QUOTA_OVERRIDES parsing"""
+
+    def test_valid_overrides(self, monkeypatch):
+        monkeypatch.setenv("QUOTA_OVERRIDES", '{"ws_big": {"max_concurrent": 32}}')
+        overrides = _overrides_from_env(QuotaLimits())
+        assert overrides["ws_big"].max_concurrent == 32
+        assert overrides["ws_big"].cost_per_day == QuotaLimits().cost_per_day
+
+    @pytest.mark.parametrize("raw, message", [
+        ("{not json", "not valid JSON"),
+        ('["ws_a"]', "JSON object"),
+        ('{"ws_a": {"max_concurent": 3}}', "unknown keys"),
+        ('{"ws_a": {"max_concurrent": "lots"}}', "must be numbers"),
+    ])
+    def test_invalid_overrides_fail_clearly(self, monkeypatch, raw, message):
+        monkeypatch.setenv("QUOTA_OVERRIDES", raw)
+        with pytest.raises(ValueError, match=message):
+            _overrides_from_env(QuotaLimits())
+
+
+class TestEnforcement:
+    """Quotas applied by /execute and the orchestrator"""
+
+    @pytest.mark.asyncio
+    async def test_execute_returns_429_with_retry_after(self, local_stores, monkeypatch):
+        """/execute rejects an over-limit workspace before doing any work"""
+        from app import app
+
+        store = WorkspaceQuotas(str(local_stores / "q.db"), defaults=QuotaLimits(max_concurrent=0))
+        monkeypatch.setattr(quotas_module, "_quotas", store)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/execute", json={
+                "agent_id": "agent_1",
+                "workspace_id": "ws_a",
+                "user_id": "user_1",
+                "agent_type": "scope",
+                "inputs": {"email_content": "hi"},
+            })
+
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "1"
+        assert response.json()["limit"] == "concurrency"
+
+    @pytest.mark.asyncio
+    async def test_workflow_throttled_before_dispatch(self, fake_llm, local_stores, monkeypatch):
+        """An exhausted token budget stops the workflow before any LLM call"""
+        store = WorkspaceQuotas(str(local_stores / "q.db"), defaults=QuotaLimits(tokens_per_minute=600))
+        monkeypatch.setattr(quotas_module, "_quotas", store)
+        await store.record_usage("ws_a", tokens=1200, cost=0.0)
+
+        from benchmarks.fake_llm import FakeChatModel
+
+        async def must_not_dispatch(*args, **kwargs):
+            raise AssertionError("LLM dispatched despite exhausted quota")
+
+        monkeypatch.setattr(FakeChatModel, "_agenerate", must_not_dispatch)
+
+        result = await orchestrator.execute_workflow("ws_a", "user_1", "Qualify John")
+
+        assert result["retry_after"] == pytest.approx(60.1, rel=0.01)
+        assert (await store.usage("ws_a"))["active_executions"] == 0
+
+    @pytest.mark.asyncio
+    async def test_workflow_usage_is_charged(self, fake_llm, local_stores, monkeypatch):
+        """Each node's token usage and cost are charged to the workspace"""
+        store = WorkspaceQuotas(str(local_stores / "q.db"))
+        monkeypatch.setattr(quotas_module, "_quotas", store)
+
+        result = await orchestrator.execute_workflow("ws_a", "user_1", "Qualify John")
+
+        usage = await store.usage("ws_a")
+        charged = QuotaLimits().cost_per_day - usage["cost_remaining_usd"]
+        # The specialist's outcome is its flat estimate; quotas get its model calls
+        specialist = next(o for o in result["outcomes"] if o["agent_type"] == "specialist")
+        specialist_calls = (await load_result(specialist))["summary"]["cost_usd"]
+        llm_costs = result["metrics"]["total_cost"] - orchestrator.NODE_COSTS["specialist"] + specialist_calls
+        assert charged == pytest.approx(llm_costs, rel=0.01)
@@ -0,0 +1,206 @@
+"""
+Tests for the semantic response cache
+======================================
+
+Run with: pytest tests/test_semantic_cache.py -v
+"""
+
+import httpx
+import pytest
+
+from core import semantic_cache
+from core.orchestrator import INTAKE_ROUTING_FIELDS, execute_workflow
+from core.state_bounds import load_result
+from core.semantic_cache import SemanticCache, embed, entities, entities_compatible, thresholds_from_env
+
+
+def similarity(a: str, b: str) -> float:
+    return float(embed(a) @ embed(b))
+
+
+class TestEmbedding:
+    """Local embeddings and the entity guard"""
+
+    def test_paraphrases_score_higher_than_unrelated(self):
+        paraphrase = similarity("qualify John from ACME", "please qualify John Doe (ACME Corp)")
+        unrelated = similarity("qualify John from ACME", "write a newsletter about pricing")
+
+        assert paraphrase > 0.7
+        assert unrelated < 0.3
+
+    def test_entities(self):
+        found = entities("Please qualify John Doe from ACME, budget 50,000. Email: jd@acme.com")
+
+        assert {"john", "doe", "acme", "50,000", "jd@acme.com"} <= found
+        assert "please" not in found and "email" not in found
+        assert {"leads_march.csv", "ws_1", "q3"} <= entities("enrich leads_march.csv for ws_1 in q3")
+
+    def test_entity_guard(self):
+        assert entities_compatible(entities("qualify John from ACME"), entities("please qualify John Doe (ACME Corp)"))
+        assert not entities_compatible(entities("qualify John from ACME"), entities("qualify Jane from ACME"))
+        assert not entities_compatible(
+            entities("Enrich the contacts in leads_march.csv"), entities("Enrich the contacts in leads_april.csv")
+        )
+
+
+class TestSemanticCache:
+    """Lookup, partitions and eviction"""
+
+    def test_paraphrase_hit(self):
+        cache = SemanticCache(thresholds={"intake": 0.7}, audit_rate=0)
+        cache.put("ws_1", "intake", "qualify John from ACME", {"task_type": "lead_qualification"})
+
+        hit = cache.lookup("ws_1", "intake", "intake", "please qualify John Doe (ACME Corp)")
+
+        assert hit is not None and hit.value == {"task_type": "lead_qualification"}
+        assert hit.similarity >= 0.7 and not hit.audit
+
+    def test_different_person_never_hits(self):
+        cache = SemanticCache(thresholds={"intake": 0.5}, audit_rate=0)
+        cache.put("ws_1", "intake", "qualify John from ACME", {"task_type": "lead_qualification"})
+
+        assert cache.lookup("ws_1", "intake", "intake", "qualify Jane from ACME") is None
+        assert cache.summary()["agent_types"]["intake"]["entity_rejects"] == 1
+
+    def test_ambiguous_request_misses(self):
+        cache = SemanticCache(thresholds={"intake": 0.6}, audit_rate=0)
+        cache.put("ws_1", "intake", "qualify John Doe from ACME", {"name": "John Doe"})
+        cache.put("ws_1", "intake", "qualify John Smith from ACME", {"name": "John Smith"})
+
+        assert cache.lookup("ws_1", "intake", "intake", "qualify John from ACME") is None
+        assert cache.lookup("ws_1", "intake", "intake", "please qualify John Smith from ACME").value == {"name": "John Smith"}
+        assert cache.summary()["agent_types"]["intake"]["ambiguous"] == 1
+
+    def test_workspaces_and_scopes_are_partitioned(self):
+        cache = SemanticCache(audit_rate=0)
+        cache.put("ws_1", "scope_a", "summarize the ACME contract", {"summary": "..."})
+
+        assert cache.lookup("ws_2", "scope_a", "scope", "summarize the ACME contract") is None
+        assert cache.lookup("ws_1", "scope_b", "scope", "summarize the ACME contract") is None
+        assert cache.lookup("ws_1", "scope_a", "scope", "summarize the ACME contract") is not None
+
+    def test_hits_are_copies(self):
+        cache = SemanticCache(audit_rate=0)
+        cache.put("ws_1", "s", "summarize the ACME contract", {"items": []})
+
+        cache.lookup("ws_1", "s", "scope", "summarize the ACME contract").value["items"].append("mutated")
+
+        assert cache.lookup("ws_1", "s", "scope", "summarize the ACME contract").value == {"items": []}
+
+    def test_ttl_and_lru_eviction(self, monkeypatch):
+        clock = [1000.0]
+        monkeypatch.setattr(semantic_cache.time, "time", lambda: clock[0])
+        cache = SemanticCache(ttl_s=60, max_entries=2, audit_rate=0)
+        for text, n in (("summarize the ACME contract", 1), ("translate the Globex invoice", 2)):
+            cache.put("ws_1", "s", text, {"n": n})
+            clock[0] += 1
+        cache.lookup("ws_1", "s", "scope", "summarize the ACME contract")
+        clock[0] += 1
+
+        cache.put("ws_1", "s", "draft a reply to Initech", {"n": 3})
+
+        assert cache.evictions == 1
+        assert cache.lookup("ws_1", "s", "scope", "translate the Globex invoice") is None
+        clock[0] += 61
+        assert cache.lookup("ws_1", "s", "scope", "summarize the ACME contract") is None
+        assert cache.summary()["entries"] == 0
+
+    def test_thresholds_from_env(self, monkeypatch):
+        monkeypatch.setenv("SEMANTIC_CACHE_THRESHOLD", "0.95")
+        monkeypatch.setenv("SEMANTIC_CACHE_THRESHOLDS", '{"scope": 0.8}')
+
+        assert thresholds_from_env() == (0.95, {"intake": 0.7, "scope": 0.8})
+
+        for bad in ("not json", "[0.8]", '{"scope": 1.5}', '{"scope": true}'):
+            monkeypatch.setenv("SEMANTIC_CACHE_THRESHOLDS", bad)
+            with pytest.raises(ValueError):
+                thresholds_from_env()
+
+
+class TestIntegration:
+    """Intake node and /execute"""
+
+    @pytest.mark.asyncio
+    async def test_intake_paraphrase_skips_llm(self, fake_llm, monkeypatch):
+        monkeypatch.setenv("SEMANTIC_CACHE", "true")
+        monkeypatch.setenv("SEMANTIC_CACHE_AUDIT_RATE", "0")
+
+        first = await execute_workflow("ws_1", "user_1", "qualify John from ACME", workflow_id="wf_1")
+        second = await execute_workflow("ws_1", "user_1", "please qualify John Doe (ACME Corp)", workflow_id="wf_2")
+        other = await execute_workflow("ws_1", "user_1", "qualify Jane from ACME", workflow_id="wf_3")
+
+        def intake_model(result):
+            return next(o["model"] for o in result["outcomes"] if o["agent_id"] == "paa_intake")
+
+        assert intake_model(first) != "semantic-cache"
+        assert intake_model(second) == "semantic-cache"
+        assert intake_model(other) != "semantic-cache"
+        assert second["task_type"] == first["task_type"]
+        cached = semantic_cache.get_semantic_cache().lookup("ws_1", "intake", "intake", "qualify John from ACME")
+        assert set(cached.value) == set(INTAKE_ROUTING_FIELDS)
+
+    @pytest.mark.asyncio
+    async def test_intake_hit_extracts_its_own_params(self, fake_llm, local_stores, monkeypatch):
+        """A routing hit still reads the file this request names, not the cached one's"""
+        fake_llm(task_type="data_enrichment")
+        monkeypatch.setenv("SEMANTIC_CACHE", "true")
+        monkeypatch.setenv("SEMANTIC_CACHE_AUDIT_RATE", "0")
+        monkeypatch.setenv("ENRICH_SOURCE_DIR", str(local_stores))
+        monkeypatch.setenv("ENRICH_OUTPUT_DIR", str(local_stores / "enriched"))
+        for name in ("leads_march.csv", "leads_april.csv"):
+            (local_stores / name).write_text("email,company\nwei@initech.com,Initech\n")
+
+        await execute_workflow("ws_1", "user_1", "Enrich the contacts in leads_march.csv", workflow_id="wf_1")
+        april = await execute_workflow("ws_1", "user_1", "Enrich the contacts in leads_april.csv", workflow_id="wf_2")
+        again = await execute_workflow("ws_1", "user_1", "Please enrich the contacts in leads_april.csv", workflow_id="wf_3")
+
+        for result, hit in ((april, False), (again, True)):
+            intake = next(o for o in result["outcomes"] if o["agent_id"] == "paa_intake")
+            specialist = next(o for o in result["outcomes"] if o["agent_type"] == "specialist")
+            assert (intake["model"] == "semantic-cache") is hit
+            assert (await load_result(specialist))["source"].endswith("leads_april.csv")
+
+    @pytest.mark.asyncio
+    async def test_execute_hits_and_admin_stats(self, fake_llm, monkeypatch):
+        from app import app
+
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        monkeypatch.setenv("ADMIN_TOKEN", "admin")
+        monkeypatch.setenv("SEMANTIC_CACHE", "true")
+        monkeypatch.setenv("SEMANTIC_CACHE_AUDIT_RATE", "0")
+
+        def body(email_content: str, **config):
+            return {
+                "agent_id": "agent_1", "workspace_id": "ws_a", "user_id": "user_1",
+                "agent_type": "scope", "inputs": {"email_content": email_content}, "config": config,
+            }
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = (await client.post("/execute", json=body("Send the Q3 report to Jane Doe by Friday"))).json()
+            second = (await client.post("/execute", json=body("Please send the Q3 report to Jane Doe by Friday."))).json()
+            other = (await client.post("/execute", json=body("Send the Q4 report to Jane Doe by Friday"))).json()
+            opted_out = (await client.post("/execute", json=body("Send the Q3 report to Jane Doe by Friday", semanticCache=False))).json()
+            stats = (await client.get("/admin/semantic-cache", headers={"Authorization": "Bearer admin"})).json()
+
+        assert first["metrics"]["llm_calls"] == 1
+        assert second["metrics"]["model"] == "semantic-cache"
+        assert second["metrics"]["llm_calls"] == 0
+        assert second["outputs"] == first["outputs"]
+        assert other["metrics"]["llm_calls"] == 1
+        assert opted_out["metrics"]["llm_calls"] == 1
+        assert stats["agent_types"]["scope"]["hits"] == 1
+        assert stats["agent_types"]["scope"]["lookups"] == 3
+
+    @pytest.mark.asyncio
+    async def test_audited_hit_calls_model(self, fake_llm, monkeypatch):
+        monkeypatch.setenv("SEMANTIC_CACHE", "true")
+        monkeypatch.setenv("SEMANTIC_CACHE_AUDIT_RATE", "1")
+
+        await execute_workflow("ws_1", "user_1", "qualify John from ACME", workflow_id="wf_1")
+        audited = await execute_workflow("ws_1", "user_1", "please qualify John Doe (ACME Corp)", workflow_id="wf_2")
+
+        intake = next(o for o in audited["outcomes"] if o["agent_id"] == "paa_intake")
+        assert intake["model"] != "semantic-cache"
+        summary = semantic_cache.get_semantic_cache().summary()["agent_types"]["intake"]
+        assert (summary["hits"], summary["audits"], summary["audit_agreement"]) == (1, 1, 1.0)
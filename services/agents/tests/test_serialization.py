@@ -0,0 +1,161 @@
+"""
+Tests for the compact checkpoint serializer
+============================================
+
+Run with: pytest tests/test_serialization.py -v
+"""
+
+import sqlite3
+from datetime import datetime, timezone
+from enum import Enum
+from uuid import UUID
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.types import Interrupt
+
+from core import orchestrator, serialization
+from core.orchestrator import ApprovalStatus, TaskType, execute_workflow, get_workflow
+from core.serialization import TYPE_COMPACT, TYPE_COMPACT_ZSTD, CompactSerializer
+
+
+def realistic_state(outcomes: int = 5) -> dict:
+    return {
+        "workspace_id": "ws_1",
+        "user_id": "user_1",
+        "workflow_id": "wf_1",
+        "messages": [
+            HumanMessage(content="Qualify John Doe from ACME Corp"),
+            AIMessage(content='PAA Analysis: {"task_type": "lead_qualification"}', id="msg_1"),
+            SystemMessage(content="system"),
+            ToolMessage(content="tool output", tool_call_id="call_1"),
+        ],
+        "current_step": "critic",
+        "task_type": TaskType.LEAD_QUALIFICATION,
+        "subtasks": [{"id": "subtask_1", "depends_on": []}],
+        "outcomes": [
+            {
+                "agent_id": f"agent_{i}",
+                "agent_type": "specialist",
+                "result": {"score": i, "notes": ["a", "b"], "nested": {"ok": True}},
+                "timestamp": datetime(2025, 1, 1, 12, i // 60, i % 60),
+                "cost": 0.01 * i,
+                "latency_ms": 100 + i,
+            }
+            for i in range(outcomes)
+        ],
+        "final_summary": None,
+        "approval_status": ApprovalStatus.PENDING,
+        "approval_message": "needs review",
+        "metrics": {"total_cost": 0.05, "total_latency_ms": 500, "success_count": 3,
+                    "failure_count": 0, "approval_requests": 1},
+        "error": None,
+    }
+
+
+@pytest.fixture
+def serde():
+    return CompactSerializer(enums=[TaskType, ApprovalStatus])
+
+
+class TestRoundTrip:
+    """Values survive encode/decode with their types"""
+
+    def test_agent_state(self, serde):
+        state = realistic_state()
+        type_, data = serde.dumps_typed(state)
+
+        assert type_ == TYPE_COMPACT
+        assert serde.loads_typed((type_, data)) == state
+
+    def test_types_preserved(self, serde):
+        decoded = serde.loads_typed(serde.dumps_typed(realistic_state()))
+
+        assert decoded["task_type"] is TaskType.LEAD_QUALIFICATION
+        assert decoded["approval_status"] is ApprovalStatus.PENDING
+        assert isinstance(decoded["outcomes"][0]["timestamp"], datetime)
+        assert [type(m) for m in decoded["messages"]] == [HumanMessage, AIMessage, SystemMessage, ToolMessage]
+        assert decoded["messages"][1].id == "msg_1"
+
+    @pytest.mark.parametrize("value", [
+        None,
+        b"raw",
+        (1, ("nested", 2)),
+        {"a", "b"},
+        {1: "int keys"},
+        datetime(2025, 6, 1, 8, 30, tzinfo=timezone.utc),
+        [TaskType.GENERAL, ApprovalStatus.APPROVED],
+        "",
+        0,
+    ])
+    def test_scalars_and_containers(self, serde, value):
+        assert serde.loads_typed(serde.dumps_typed(value)) == value
+
+    @pytest.mark.parametrize("value", [
+        Interrupt(value={"question": "Send it?"}, id="interrupt_1"),
+        UUID("12345678-1234-5678-1234-567812345678"),
+        TaskType.DATA_ENRICHMENT,
+    ])
+    def test_types_msgpack_would_flatten(self, serde, value):
+        """Dataclasses, UUIDs and str-Enum subclasses come back as themselves, not dicts or strings"""
+        type_, data = serde.dumps_typed({"pending": [value]})
+        decoded = serde.loads_typed((type_, data))["pending"][0]
+
+        assert type_ == TYPE_COMPACT
+        assert type(decoded) is type(value) and decoded == value
+
+    def test_unknown_types_fall_back(self, serde):
+        """Types the compact encoder does not know go through JsonPlus"""
+        from decimal import Decimal
+
+        value = {"amount": Decimal("1.50")}
+        type_, data = serde.dumps_typed(value)
+
+        assert type_ not in (TYPE_COMPACT, TYPE_COMPACT_ZSTD)
+        assert serde.loads_typed((type_, data)) == value
+
+    def test_reads_default_format(self, serde):
+        """Checkpoints written by the default serializer stay readable"""
+        state = realistic_state()
+        legacy = JsonPlusSerializer().dumps_typed(state)
+
+        assert serde.loads_typed(legacy)["outcomes"] == state["outcomes"]
+
+
+class TestCompression:
+    """zstd for large payloads"""
+
+    @pytest.mark.skipif(serialization.zstandard is None, reason="zstandard not installed")
+    def test_large_payload_compressed(self):
+        serde = CompactSerializer(enums=[TaskType, ApprovalStatus], compress_threshold=1024)
+        state = realistic_state(outcomes=200)
+
+        type_, data = serde.dumps_typed(state)
+        plain_type, plain = CompactSerializer(enums=[TaskType, ApprovalStatus], compress_threshold=None).dumps_typed(state)
+
+        assert type_ == TYPE_COMPACT_ZSTD
+        assert plain_type == TYPE_COMPACT
+        assert len(data) < len(plain)
+        assert serde.loads_typed((type_, data)) == state
+
+    def test_small_payload_not_compressed(self):
+        serde = CompactSerializer(compress_threshold=1024)
+        assert serde.dumps_typed({"a": 1})[0] == TYPE_COMPACT
+
+
+class TestCheckpointer:
+    """The orchestrator's checkpointer uses the compact format"""
+
+    @pytest.mark.asyncio
+    async def test_workflow_checkpoints_round_trip(self, fake_llm):
+        result = await execute_workflow("ws_1", "user_1", "Qualify John", workflow_id="wf_serde")
+
+        app = await get_workflow()
+        snapshot = await app.aget_state({"configurable": {"thread_id": "wf_serde"}})
+        assert snapshot.values["task_type"] is TaskType.LEAD_QUALIFICATION
+        assert snapshot.values["outcomes"] == result["outcomes"]
+
+        with sqlite3.connect(orchestrator.CHECKPOINT_DB_PATH) as conn:
+            types = {row[0] for row in conn.execute("SELECT type FROM checkpoints")}
+        assert types <= {TYPE_COMPACT, TYPE_COMPACT_ZSTD}
@@ -0,0 +1,166 @@
+"""
+Tests for the specialist registry
+==================================
+
+Run with: pytest tests/test_specialists.py -v
+"""
+
+import asyncio
+import os
+
+import httpx
+import pytest
+
+from core.orchestrator import execute_workflow
+from specialists import registry
+from specialists.base import Specialist, SpecialistContext
+from specialists.registry import SpecialistRegistry, SpecialistTimeout
+
+
+def context(task_type: str = "lead_qualification") -> SpecialistContext:
+    return SpecialistContext(workspace_id="ws_1", workflow_id="wf_1", task_type=task_type, message="Qualify John")
+
+
+class EchoSpecialist(Specialist):
+    name = "echo"
+    task_type = "lead_qualification"
+    concurrency = 2
+    timeout_s = 1.0
+
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.in_flight = 0
+        self.peak = 0
+
+    async def run(self, context: SpecialistContext) -> dict:
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.fail:
+                raise RuntimeError("CRM unavailable")
+            return {"status": "success", "message": context.message, "params": context.params}
+        finally:
+            self.in_flight -= 1
+
+
+class CpuSpecialist(Specialist):
+    name = "cpu_echo"
+    task_type = "data_enrichment"
+    kind = "cpu"
+
+    @staticmethod
+    def compute(payload: dict) -> dict:
+        return {"status": "success", "pid": os.getpid(), "words": len(payload["message"].split())}
+
+
+@pytest.fixture
+def fresh_registry(monkeypatch):
+    fresh = SpecialistRegistry(process_workers=1)
+    monkeypatch.setattr(registry, "_registry", fresh)
+    yield fresh
+    fresh.shutdown()
+
+
+class TestRegistry:
+    """Dispatch, pools, timeouts and stats"""
+
+    @pytest.mark.asyncio
+    async def test_dispatch_and_fallback(self, fresh_registry):
+        fresh_registry.register(EchoSpecialist())
+
+        specialist, result = await fresh_registry.dispatch(context())
+        fallback, simulated = await fresh_registry.dispatch(context("general"))
+
+        assert specialist.name == "echo"
+        assert result["message"] == "Qualify John"
+        assert fallback.name == "placeholder"
+        assert simulated["simulated"] is True
+
+    def test_one_specialist_per_task_type(self, fresh_registry):
+        fresh_registry.register(EchoSpecialist())
+
+        class Other(EchoSpecialist):
+            name = "other"
+
+        with pytest.raises(ValueError):
+            fresh_registry.register(Other())
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit(self, fresh_registry):
+        echo = fresh_registry.register(EchoSpecialist(delay=0.02))
+
+        await asyncio.gather(*(fresh_registry.dispatch(context()) for _ in range(6)))
+
+        assert echo.peak == 2
+        stats = fresh_registry.summary()["specialists"]["echo"]
+        assert stats["succeeded"] == 6
+        assert stats["wait"]["max_ms"] >= 20
+
+    @pytest.mark.asyncio
+    async def test_timeout_and_failure(self, fresh_registry, monkeypatch):
+        echo = fresh_registry.register(EchoSpecialist(delay=0.2))
+        monkeypatch.setattr(EchoSpecialist, "timeout_s", 0.05)
+
+        with pytest.raises(SpecialistTimeout):
+            await fresh_registry.dispatch(context())
+        echo.delay, echo.fail = 0, True
+        with pytest.raises(RuntimeError):
+            await fresh_registry.dispatch(context())
+
+        stats = fresh_registry.summary()["specialists"]["echo"]
+        assert (stats["calls"], stats["timeouts"], stats["failed"], stats["in_flight"]) == (2, 1, 1, 0)
+
+    @pytest.mark.asyncio
+    async def test_cpu_specialist_runs_in_process_pool(self, fresh_registry):
+        fresh_registry.register(CpuSpecialist())
+
+        _, result = await fresh_registry.dispatch(context("data_enrichment"))
+
+        assert result == {"status": "success", "pid": result["pid"], "words": 2}
+        assert result["pid"] != os.getpid()
+        assert fresh_registry.summary()["process_pool_started"]
+
+
+class TestWorkflowDispatch:
+    """specialist_node goes through the registry"""
+
+    @pytest.mark.asyncio
+    async def test_registered_specialist_result(self, fake_llm, fresh_registry):
+        fresh_registry.register(EchoSpecialist())
+
+        result = await execute_workflow("ws_1", "user_1", "Qualify John Doe", workflow_id="wf_spec")
+
+        outcome = next(o for o in result["outcomes"] if o["agent_type"] == "specialist")
+        assert outcome["result"]["message"] == "Qualify John Doe"
+        # extracted_params from the (fake) intake analysis
+        assert outcome["result"]["params"]["company"] == "ACME Corp"
+        assert result["current_step"] == "complete"
+
+    @pytest.mark.asyncio
+    async def test_failure_becomes_error_result(self, fake_llm, fresh_registry):
+        fresh_registry.register(EchoSpecialist(fail=True))
+
+        result = await execute_workflow("ws_1", "user_1", "Qualify John Doe", workflow_id="wf_spec_fail")
+
+        outcome = next(o for o in result["outcomes"] if o["agent_type"] == "specialist")
+        assert outcome["result"] == {"status": "error", "task_type": "lead_qualification", "error": "CRM unavailable"}
+        assert result["metrics"]["failure_count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_admin_endpoint(self, fresh_registry, monkeypatch):
+        from app import app
+
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        fresh_registry.register(EchoSpecialist())
+        await fresh_registry.dispatch(context())
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/admin/specialists", headers={"Authorization": "Bearer secret"})
+
+        echo = response.json()["specialists"]["echo"]
+        assert echo["kind"] == "io"
+        assert echo["concurrency"] == 2
+        assert echo["succeeded"] == 1
@@ -0,0 +1,149 @@
+"""
+Tests for memory-bounded workflow state and the blob store
+===========================================================
+
+Run with: pytest tests/test_state_bounds.py -v
+"""
+
+from datetime import datetime
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from core import state_bounds
+from core.blob_store import BlobNotFound, BlobStore, get_blob_store
+from core.orchestrator import execute_workflow
+from core.state_bounds import (
+    append_message,
+    load_archived_messages,
+    load_archived_outcomes,
+    load_message_content,
+    load_result,
+    record_outcome,
+)
+
+
+def empty_state() -> dict:
+    return {
+        "messages": [HumanMessage(content="Enrich every account")],
+        "archived_messages": [],
+        "outcomes": [],
+        "archived_outcomes": [],
+    }
+
+
+def outcome(agent_id: str, result: dict) -> dict:
+    return {
+        "agent_id": agent_id,
+        "agent_type": "specialist",
+        "result": result,
+        "timestamp": datetime(2025, 1, 1),
+        "cost": 0.01,
+        "latency_ms": 100,
+    }
+
+
+class TestBlobStore:
+    """Content-addressed local storage"""
+
+    @pytest.mark.asyncio
+    async def test_round_trip_and_dedupe(self, tmp_path):
+        store = BlobStore(str(tmp_path))
+
+        first = await store.put(b"payload")
+        second = await store.put(b"payload")
+
+        assert first == second
+        assert await store.get(first) == b"payload"
+        assert len(list((tmp_path / first[:2]).iterdir())) == 1
+
+    @pytest.mark.asyncio
+    async def test_json_is_canonical(self, tmp_path):
+        store = BlobStore(str(tmp_path))
+        assert await store.put_json({"a": 1, "b": 2}) == await store.put_json({"b": 2, "a": 1})
+
+    @pytest.mark.asyncio
+    async def test_missing_and_invalid(self, tmp_path):
+        store = BlobStore(str(tmp_path))
+
+        with pytest.raises(BlobNotFound):
+            await store.get("0" * 64)
+        with pytest.raises(ValueError):
+            await store.get("../../etc/passwd")
+
+
+class TestOutcomes:
+    """Large results spill to the blob store"""
+
+    @pytest.mark.asyncio
+    async def test_small_result_stays_inline(self, local_stores):
+        state = empty_state()
+        await record_outcome(state, outcome("critic", {"recommendation": "approve"}))
+
+        assert state["outcomes"][0]["result"] == {"recommendation": "approve"}
+        assert "result_ref" not in state["outcomes"][0]
+
+    @pytest.mark.asyncio
+    async def test_large_result_spilled(self, local_stores):
+        full = {"status": "success", "confidence": 0.9, "records": ["row" * 50] * 100}
+        state = empty_state()
+        await record_outcome(state, outcome("specialist", full))
+
+        kept = state["outcomes"][0]
+        assert kept["result"] == {"status": "success", "confidence": 0.9, "truncated": True}
+        assert await load_result(kept) == full
+
+    @pytest.mark.asyncio
+    async def test_old_outcomes_archived(self, local_stores, monkeypatch):
+        monkeypatch.setattr(state_bounds, "MAX_OUTCOMES", 3)
+        state = empty_state()
+        for i in range(5):
+            await record_outcome(state, outcome(f"agent_{i}", {"i": i}))
+
+        assert [o["agent_id"] for o in state["outcomes"]] == ["agent_2", "agent_3", "agent_4"]
+        archived = await load_archived_outcomes(state)
+        assert [o["agent_id"] for o in archived] == ["agent_0", "agent_1"]
+
+
+class TestMessages:
+    """Long bodies are truncated and old messages archived"""
+
+    @pytest.mark.asyncio
+    async def test_long_message_truncated(self, local_stores, monkeypatch):
+        monkeypatch.setattr(state_bounds, "MESSAGE_INLINE_CHARS", 100)
+        state = empty_state()
+        body = "Specialist Result: " + "y" * 1000
+        await append_message(state, AIMessage(content=body))
+
+        kept = state["messages"][-1]
+        assert len(kept.content) < 200
+        assert await load_message_content(kept) == body
+
+    @pytest.mark.asyncio
+    async def test_window_keeps_request(self, local_stores, monkeypatch):
+        monkeypatch.setattr(state_bounds, "MAX_MESSAGES", 4)
+        state = empty_state()
+        for i in range(6):
+            await append_message(state, AIMessage(content=f"step {i}"))
+
+        assert [m.content for m in state["messages"]] == ["Enrich every account", "step 3", "step 4", "step 5"]
+        archived = await load_archived_messages(state)
+        assert [m.content for m in archived] == ["step 0", "step 1", "step 2"]
+
+
+class TestWorkflow:
+    """Workflows with large model outputs keep a bounded state"""
+
+    @pytest.mark.asyncio
+    async def test_large_outputs_spilled(self, fake_llm):
+        fake_llm(padding_bytes=20_000)
+        result = await execute_workflow("ws_1", "user_1", "Qualify John", workflow_id="wf_big")
+
+        assert result.get("error") is None
+        assert result["final_summary"]
+        intake = result["outcomes"][0]
+        assert intake["result"]["truncated"] is True
+        assert intake["result"]["task_type"] == "lead_qualification"
+        assert len((await load_result(intake))["extracted_params"]["context"]) == 20_000
+        assert all(len(m.content) <= state_bounds.MESSAGE_INLINE_CHARS + 20 for m in result["messages"])
+        assert await get_blob_store().exists(intake["result_ref"])
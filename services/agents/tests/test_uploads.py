@@ -0,0 +1,167 @@
+"""
+Tests for uploaded /execute inputs
+===================================
+
+Run with: pytest tests/test_uploads.py -v
+"""
+
+import hashlib
+import os
+
+import httpx
+import pytest
+
+from benchmarks.bench_chunking import synthetic_transcript
+from core.blob_store import BlobStore, BlobTooLarge
+from core.uploads import TextCache, get_text_cache
+
+
+async def chunked(data: bytes, size: int = 1000):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+class TestStreamingPut:
+    """BlobStore.put_stream"""
+
+    @pytest.mark.asyncio
+    async def test_digest_and_dedupe(self, tmp_path):
+        store = BlobStore(str(tmp_path))
+        data = b"Dana: hello\n" * 500
+
+        digest, size = await store.put_stream(chunked(data))
+        again, _ = await store.put_stream(chunked(data, 333))
+
+        assert digest == again == hashlib.sha256(data).hexdigest()
+        assert size == len(data)
+        assert await store.get(digest) == data
+        assert not [name for name in os.listdir(tmp_path) if name.startswith(".upload-")]
+
+    @pytest.mark.asyncio
+    async def test_too_large_leaves_nothing(self, tmp_path):
+        store = BlobStore(str(tmp_path))
+
+        with pytest.raises(BlobTooLarge):
+            await store.put_stream(chunked(b"x" * 5000), max_bytes=4096)
+
+        assert os.listdir(tmp_path) == []
+
+
+class TestTextCache:
+    """Decoded blob texts, LRU by size"""
+
+    @pytest.mark.asyncio
+    async def test_hits_and_eviction(self, local_stores):
+        from core.blob_store import get_blob_store
+
+        first = await get_blob_store().put(b"a" * 60)
+        second = await get_blob_store().put(b"b" * 60)
+        cache = TextCache(max_chars=100)
+
+        await cache.get(first)
+        await cache.get(first)
+        await cache.get(second)
+        await cache.get(first)
+
+        assert (cache.hits, cache.misses) == (1, 3)
+
+
+class TestUploadEndpoints:
+    """POST /blobs and {"$blob": ...} references in /execute"""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        from app import app
+
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        monkeypatch.setenv("CHUNK_THRESHOLD_TOKENS", "2000")
+        monkeypatch.setenv("CHUNK_TOKENS", "600")
+        transport = httpx.ASGITransport(app=app)
+        return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+    @staticmethod
+    def execute_body(agent_type: str, inputs: dict, workspace_id: str = "ws_a") -> dict:
+        return {
+            "agent_id": "agent_1",
+            "workspace_id": workspace_id,
+            "user_id": "user_1",
+            "agent_type": agent_type,
+            "inputs": inputs,
+            "config": {"cascade": False},
+        }
+
+    @pytest.mark.asyncio
+    async def test_raw_upload(self, client, local_stores):
+        data = synthetic_transcript(5).encode()
+
+        async with client:
+            response = await client.post(
+                "/blobs", params={"workspace_id": "ws_a"}, content=chunked(data),
+                headers={"Content-Type": "text/plain"},
+            )
+            again = await client.post("/blobs", params={"workspace_id": "ws_a"}, content=data)
+            info = await client.get(f"/blobs/{response.json()['blob_id']}", params={"workspace_id": "ws_a"})
+            other = await client.get(f"/blobs/{response.json()['blob_id']}", params={"workspace_id": "ws_b"})
+
+        assert response.status_code == 201
+        upload = response.json()
+        assert upload["blob_id"] == hashlib.sha256(data).hexdigest()
+        assert upload["size"] == len(data)
+        assert upload["media_type"] == "text/plain"
+        assert again.json() == upload
+        assert info.json() == upload
+        assert other.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_too_large(self, client, local_stores, monkeypatch):
+        monkeypatch.setenv("UPLOAD_MAX_BYTES", "1000")
+
+        async with client:
+            declared = await client.post("/blobs", params={"workspace_id": "ws_a"}, content=b"x" * 2000)
+            streamed = await client.post("/blobs", params={"workspace_id": "ws_a"}, content=chunked(b"x" * 2000, 500))
+
+        assert declared.status_code == 413
+        assert streamed.status_code == 413
+
+    @pytest.mark.asyncio
+    async def test_multipart_upload(self, client, local_stores):
+        pytest.importorskip("multipart")
+        data = synthetic_transcript(5).encode()
+
+        async with client:
+            response = await client.post(
+                "/blobs", params={"workspace_id": "ws_a"}, files={"file": ("call.txt", data, "text/plain")},
+            )
+
+        assert response.status_code == 201
+        assert response.json()["blob_id"] == hashlib.sha256(data).hexdigest()
+        assert response.json()["filename"] == "call.txt"
+
+    @pytest.mark.asyncio
+    async def test_execute_reuses_uploaded_transcript(self, client, fake_llm):
+        transcript = synthetic_transcript(30)
+
+        async with client:
+            upload = await client.post("/blobs", params={"workspace_id": "ws_a"}, content=transcript.encode())
+            ref = {"$blob": upload.json()["blob_id"]}
+            call = await client.post("/execute", json=self.execute_body("call", {"transcript": ref}))
+            scope = await client.post("/execute", json=self.execute_body("scope", {"email_content": ref}))
+
+        assert call.json()["success"]
+        assert scope.json()["success"]
+        # The uploaded text, not the reference, reached the chunker
+        assert call.json()["metrics"]["chunks"] > 3
+        assert scope.json()["metrics"]["chunks"] > 1
+        cache = get_text_cache()
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_other_workspace_cannot_reference(self, client, fake_llm):
+        async with client:
+            upload = await client.post("/blobs", params={"workspace_id": "ws_a"}, content=b"Dana: hi\n")
+            ref = {"$blob": upload.json()["blob_id"]}
+            foreign = await client.post("/execute", json=self.execute_body("call", {"transcript": ref}, "ws_b"))
+            unknown = await client.post("/execute", json=self.execute_body("call", {"transcript": {"$blob": "0" * 64}}))
+
+        assert foreign.status_code == 404
+        assert unknown.status_code == 404
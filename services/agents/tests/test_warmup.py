@@ -0,0 +1,95 @@
+"""
+Tests for worker warmup and readiness
+======================================
+
+Run with: pytest tests/test_warmup.py -v
+"""
+
+import httpx
+import pytest
+
+from core import orchestrator, warmup as warmup_module
+from core.warmup import Warmup
+
+
+@pytest.fixture
+def no_provider_keys(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+
+
+class TestWarmup:
+    """Startup phases and their outcome"""
+
+    @pytest.mark.asyncio
+    async def test_ready_after_all_phases(self, local_stores, no_provider_keys):
+        warmup = Warmup(ping=False)
+
+        assert await warmup.wait()
+
+        report = warmup.report()
+        assert report["status"] == "ready"
+        assert list(report["phases"]) == ["providers", "clients", "stores", "workflow"]
+        assert all(phase["ok"] for phase in report["phases"].values())
+        assert orchestrator._workflow is not None
+        assert (local_stores / "workflows.db").exists()
+
+    @pytest.mark.asyncio
+    async def test_failed_required_phase(self, local_stores, no_provider_keys, monkeypatch):
+        async def broken():
+            raise OSError("disk full")
+
+        monkeypatch.setattr(warmup_module, "_warm_stores", broken)
+        warmup = Warmup(ping=False)
+
+        assert not await warmup.wait()
+        assert warmup.status == "failed"
+        assert warmup.phases["stores"]["error"] == "disk full"
+        assert "workflow" not in warmup.phases
+
+    @pytest.mark.asyncio
+    async def test_ping_failure_does_not_block_readiness(self, local_stores, monkeypatch):
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+
+        class Unreachable:
+            async def ainvoke(self, *args, **kwargs):
+                raise ConnectionError("provider down")
+
+        monkeypatch.setattr(warmup_module, "get_chat_model", lambda *args, **kwargs: Unreachable())
+        warmup = Warmup(ping=True)
+
+        assert await warmup.wait()
+        assert warmup.phases["ping"]["openai"] == {"ok": False, "error": "provider down"}
+
+    @pytest.mark.asyncio
+    async def test_ping(self, fake_llm, monkeypatch):
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+
+        warmup = Warmup(ping=True)
+
+        assert await warmup.wait()
+        assert warmup.phases["ping"]["openai"]["ok"] is True
+
+
+class TestReadyEndpoint:
+    """GET /ready gates traffic on warmup"""
+
+    @pytest.mark.asyncio
+    async def test_not_ready_until_warm(self, local_stores, no_provider_keys):
+        from app import app
+
+        app.state.warmup = Warmup(ping=False)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            before = await client.get("/ready")
+            await app.state.warmup.wait()
+            after = await client.get("/ready")
+            health = await client.get("/health")
+
+        assert before.status_code == 503
+        assert before.json()["status"] == "pending"
+        assert after.status_code == 200
+        assert after.json()["phases"]["workflow"]["ok"]
+        assert health.status_code == 200
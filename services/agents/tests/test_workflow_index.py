@@ -0,0 +1,198 @@
+"""
+Tests for the workflow query index
+===================================
+
+Run with: pytest tests/test_workflow_index.py -v
+"""
+
+import asyncio
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from core import orchestrator, sqlite
+from core.orchestrator import ApprovalStatus, execute_workflow, update_approval_status
+from core.workflow_index import WorkflowIndex, get_workflow_index
+
+
+def make_state(workflow_id: str, workspace_id: str = "ws_1", **overrides) -> dict:
+    state = {
+        "workflow_id": workflow_id,
+        "workspace_id": workspace_id,
+        "user_id": "user_1",
+        "current_step": "planner",
+        "task_type": "general",
+        "approval_status": ApprovalStatus.NOT_REQUIRED,
+        "metrics": {"total_cost": 0.01, "total_latency_ms": 120},
+        "error": None,
+    }
+    state.update(overrides)
+    return state
+
+
+@pytest_asyncio.fixture
+async def index(tmp_path):
+    store = WorkflowIndex(str(tmp_path / "index.db"))
+    yield store
+    await store.close()
+
+
+class TestWorkflowIndex:
+    """Index rows and queries"""
+
+    @pytest.mark.asyncio
+    async def test_upsert_tracks_latest_state(self, index):
+        """Later transitions overwrite progress but keep created_at"""
+        await index.upsert(make_state("wf_1"))
+        first = await index.get("wf_1")
+
+        await index.upsert(make_state("wf_1", current_step="complete", metrics={"total_cost": 0.5, "total_latency_ms": 900}))
+        row = await index.get("wf_1")
+
+        assert row["status"] == "completed"
+        assert row["total_cost"] == 0.5
+        assert row["created_at"] == first["created_at"]
+        assert row["updated_at"] >= first["updated_at"]
+        assert row["approval_status"] == "not_required"
+
+    @pytest.mark.asyncio
+    async def test_derived_statuses(self, index):
+        """Status is derived from step, approval and error"""
+        await index.upsert(make_state("wf_wait", approval_status=ApprovalStatus.PENDING, current_step="human_approval"))
+        await index.upsert(make_state("wf_err", error="boom"))
+        await index.upsert(make_state("wf_no", current_step="rejected", approval_status=ApprovalStatus.REJECTED))
+
+        assert (await index.get("wf_wait"))["status"] == "awaiting_approval"
+        assert (await index.get("wf_err"))["status"] == "failed"
+        assert (await index.get("wf_no"))["status"] == "rejected"
+
+    @pytest.mark.asyncio
+    async def test_pagination_covers_every_row_once(self, index):
+        """Keyset pages are disjoint and ordered newest first"""
+        for i in range(7):
+            await index.upsert(make_state(f"wf_{i}"))
+        await index.upsert(make_state("wf_other", workspace_id="ws_2"))
+
+        seen, cursor = [], None
+        while True:
+            rows, cursor = await index.list_workflows("ws_1", limit=3, cursor=cursor)
+            seen.extend(row["workflow_id"] for row in rows)
+            if cursor is None:
+                break
+
+        assert sorted(seen) == [f"wf_{i}" for i in range(7)]
+        assert len(seen) == len(set(seen))
+
+    @pytest.mark.asyncio
+    async def test_filters(self, index):
+        """Status and time-range filters"""
+        await index.upsert(make_state("wf_done", current_step="complete"))
+        await index.upsert(make_state("wf_running"))
+        cutoff = (await index.get("wf_running"))["updated_at"]
+
+        done, _ = await index.list_workflows("ws_1", status="completed")
+        assert [row["workflow_id"] for row in done] == ["wf_done"]
+
+        recent, _ = await index.list_workflows("ws_1", since=cutoff)
+        assert "wf_running" in [row["workflow_id"] for row in recent]
+
+        before, _ = await index.list_workflows("ws_1", until=0)
+        assert before == []
+
+    @pytest.mark.asyncio
+    async def test_bad_cursor(self, index):
+        with pytest.raises(ValueError):
+            await index.list_workflows("ws_1", cursor="not-a-cursor")
+
+    @pytest.mark.asyncio
+    async def test_concurrent_first_use_opens_one_connection(self, index, monkeypatch):
+        """A burst of first writes must not race to open (and leak) extra connections"""
+        connect = sqlite.connect
+        opened = []
+
+        async def counting_connect(*args, **kwargs):
+            opened.append(args)
+            return await connect(*args, **kwargs)
+
+        monkeypatch.setattr(sqlite, "connect", counting_connect)
+        await asyncio.gather(*(index.upsert(make_state(f"wf_{i}")) for i in range(50)))
+
+        assert len(opened) == 1
+        rows, _ = await index.list_workflows("ws_1", limit=100)
+        assert len(rows) == 50
+
+
+class TestIndexedWorkflows:
+    """The orchestrator keeps the index current"""
+
+    @pytest.mark.asyncio
+    async def test_every_transition_updates_index(self, fake_llm, monkeypatch):
+        """One index write per node, ending in completed"""
+        steps = []
+        original = WorkflowIndex.upsert
+
+        async def recording_upsert(self, state):
+            steps.append(state["current_step"])
+            await original(self, state)
+
+        monkeypatch.setattr(WorkflowIndex, "upsert", recording_upsert)
+
+        await execute_workflow("ws_1", "user_1", "Qualify John", workflow_id="wf_steps")
+
+        assert steps == ["paa_intake", "planner", "router", "specialist", "critic", "paa_summarize", "complete"]
+        row = await get_workflow_index().get("wf_steps")
+        assert row["status"] == "completed"
+        assert row["task_type"] == "lead_qualification"
+        assert row["total_cost"] > 0
+
+    @pytest.mark.asyncio
+    async def test_approval_flow_is_indexed(self, fake_llm):
+        """Paused and approved workflows are reflected"""
+        fake_llm(requires_approval=True)
+        await execute_workflow("ws_1", "user_1", "Email all leads", workflow_id="wf_gate")
+        assert (await get_workflow_index().get("wf_gate"))["status"] == "awaiting_approval"
+
+        await update_approval_status("wf_gate", True, "ws_1")
+        assert (await get_workflow_index().get("wf_gate"))["status"] == "completed"
+
+    @pytest.mark.asyncio
+    async def test_endpoint_never_reads_checkpoints(self, fake_llm, monkeypatch):
+        """GET /workflows is served from the index alone"""
+        from app import app
+
+        await execute_workflow("ws_1", "user_1", "Qualify John", workflow_id="wf_api")
+
+        async def no_checkpoints():
+            raise AssertionError("listing touched the checkpointer")
+
+        monkeypatch.setattr(orchestrator, "get_workflow", no_checkpoints)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/workflows", params={"workspace_id": "ws_1", "limit": 10})
+            bad = await client.get("/workflows", params={"workspace_id": "ws_1", "cursor": "zzz"})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["workflows"][0]["workflow_id"] == "wf_api"
+        assert body["workflows"][0]["updated_at"].endswith("Z")
+        assert body["next_cursor"] is None
+        assert bad.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_submit_endpoint(self, fake_llm):
+        """POST /workflows accepts and runs the workflow"""
+        from app import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/workflows", json={
+                "workspace_id": "ws_1",
+                "user_id": "user_1",
+                "message": "Qualify John",
+            })
+
+        assert response.status_code == 202
+        row = await get_workflow_index().get(response.json()["workflow_id"])
+        assert row["status"] == "completed"
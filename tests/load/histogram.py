@@ -0,0 +1,131 @@
+"""
+GalaxyCo.ai Load Test - Latency Histogram
+
+Pure-Python HDR (High Dynamic Range) histogram, bucketed the same way as
+HdrHistogram: values are integers (microseconds here), every bucket keeps
+`significant_figures` decimal digits of precision, and memory stays constant
+no matter how many values are recorded. Percentiles are exact to that
+precision at any sample count, unlike sorting a truncated sample.
+"""
+
+import math
+
+
+class LatencyHistogram:
+    """Fixed-precision histogram of integer values (e.g. microseconds)"""
+
+    def __init__(self, lowest=1, highest=3_600_000_000, significant_figures=3):
+        if lowest < 1:
+            raise ValueError('lowest must be >= 1')
+        if not 1 <= significant_figures <= 5:
+            raise ValueError('significant_figures must be between 1 and 5')
+
+        self.lowest = lowest
+        self.highest = highest
+        self.significant_figures = significant_figures
+
+        largest_single_unit = 2 * 10 ** significant_figures
+        sub_bucket_count_magnitude = math.ceil(math.log2(largest_single_unit))
+        self.sub_bucket_half_count_magnitude = max(sub_bucket_count_magnitude, 1) - 1
+        self.sub_bucket_count = 2 ** (self.sub_bucket_half_count_magnitude + 1)
+        self.sub_bucket_half_count = self.sub_bucket_count // 2
+        self.unit_magnitude = int(math.floor(math.log2(lowest)))
+        self.sub_bucket_mask = (self.sub_bucket_count - 1) << self.unit_magnitude
+
+        self.counts = {}
+        self.total_count = 0
+        self.min_value = None
+        self.max_value = 0
+        self._total = 0
+
+    # -- bucket math -------------------------------------------------------
+
+    def _bucket_index(self, value):
+        pow2_ceiling = (value | self.sub_bucket_mask).bit_length()
+        return pow2_ceiling - self.unit_magnitude - (self.sub_bucket_half_count_magnitude + 1)
+
+    def _counts_index(self, value):
+        bucket_index = self._bucket_index(value)
+        sub_bucket_index = value >> (bucket_index + self.unit_magnitude)
+        base = (bucket_index + 1) << self.sub_bucket_half_count_magnitude
+        return base + (sub_bucket_index - self.sub_bucket_half_count)
+
+    def _value_from_index(self, index):
+        bucket_index = (index >> self.sub_bucket_half_count_magnitude) - 1
+        sub_bucket_index = (index & (self.sub_bucket_half_count - 1)) + self.sub_bucket_half_count
+        if bucket_index < 0:
+            sub_bucket_index -= self.sub_bucket_half_count
+            bucket_index = 0
+        return sub_bucket_index << (bucket_index + self.unit_magnitude)
+
+    def _highest_equivalent(self, value):
+        bucket_index = self._bucket_index(value)
+        sub_bucket_index = value >> (bucket_index + self.unit_magnitude)
+        adjusted = bucket_index + (1 if sub_bucket_index >= self.sub_bucket_count else 0)
+        size = 1 << (self.unit_magnitude + adjusted)
+        lowest_equivalent = self._value_from_index(self._counts_index(value))
+        return lowest_equivalent + size - 1
+
+    # -- recording ---------------------------------------------------------
+
+    def record(self, value, count=1):
+        """Record a value; values outside [lowest, highest] are clamped"""
+        value = min(max(int(value), self.lowest), self.highest)
+        index = self._counts_index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.total_count += count
+        self._total += value * count
+        self.min_value = value if self.min_value is None else min(self.min_value, value)
+        self.max_value = max(self.max_value, value)
+
+    def record_corrected(self, value, expected_interval):
+        """
+        Record a value and back-fill the samples a stalled closed-loop client
+        would have missed (HdrHistogram's coordinated-omission correction).
+        Open-loop runs measure from the scheduled send time and don't need it.
+        """
+        self.record(value)
+        if not expected_interval or value <= expected_interval:
+            return
+        missing = value - expected_interval
+        while missing >= expected_interval:
+            self.record(missing)
+            missing -= expected_interval
+
+    def merge(self, other):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total_count += other.total_count
+        self._total += other._total
+        if other.min_value is not None:
+            self.min_value = other.min_value if self.min_value is None else min(self.min_value, other.min_value)
+        self.max_value = max(self.max_value, other.max_value)
+
+    # -- queries -----------------------------------------------------------
+
+    def percentile(self, pct):
+        """Value at a percentile (0-100), reported as the bucket's highest equivalent value"""
+        if not self.total_count:
+            return 0
+        target = max(1, math.ceil(min(pct, 100.0) / 100.0 * self.total_count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._highest_equivalent(self._value_from_index(index)), self.max_value)
+        return self.max_value
+
+    def mean(self):
+        return self._total / self.total_count if self.total_count else 0.0
+
+    def summary(self, scale=1000.0, percentiles=(50, 90, 95, 99, 99.9)):
+        """Count, min/mean/max and percentiles, divided by `scale` (us -> ms by default)"""
+        result = {
+            'count': self.total_count,
+            'min': (self.min_value or 0) / scale,
+            'mean': self.mean() / scale,
+            'max': self.max_value / scale,
+        }
+        for pct in percentiles:
+            result[f'p{pct:g}'] = self.percentile(pct) / scale
+        return result
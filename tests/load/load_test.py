@@ -2,200 +2,470 @@
 """
 GalaxyCo.ai Load Test
 
-Simple concurrent load test for API endpoints.
-Measures response times, success rate, and throughput.
+Open-loop async load generator for API endpoints.
+
+Requests are sent on a fixed arrival schedule (constant rate or a linear
+ramp) regardless of how fast the server answers, and latency is measured
+from each request's *scheduled* send time. A slow server therefore shows up
+as higher latency instead of silently lowering the offered load
+(coordinated omission). Latencies go into an HDR histogram, so p50 through
+p99.9 are exact to 3 significant figures at any request count.
+
+Requires: httpx (pip install httpx)
+
+Examples:
+    # GET /health at 50 req/s for 30s
+    python tests/load/load_test.py http://localhost:5001/health --rate 50 --duration 30
+
+    # Ramp /execute from 5 to 100 req/s over 2 minutes
+    python tests/load/load_test.py http://localhost:5001 --target execute \\
+        --profile ramp --rate 5 --end-rate 100 --duration 120 --json results.json
+
+    # Custom POST payload template (${seq}, ${uuid}, ${ts} and --var values)
+    python tests/load/load_test.py http://localhost:5001/workflows -X POST \\
+        --body '{"workspace_id": "${workspace}", "user_id": "u_${seq}", "message": "hi"}' \\
+        --var workspace=ws_load --csv requests.csv
 """
 
-import time
-import statistics
-import concurrent.futures
 import argparse
-from urllib.request import urlopen, Request
-from urllib.error import HTTPError, URLError
+import asyncio
+import csv
 import json
+import math
+import os
+import random
+import string
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from histogram import LatencyHistogram  # noqa: E402
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - reported at startup
+    httpx = None
+
+
+# Request presets for the agents service
+TARGETS = {
+    'health': {
+        'method': 'GET',
+        'path': '/health',
+        'body': None,
+    },
+    'execute': {
+        'method': 'POST',
+        'path': '/execute',
+        'body': json.dumps({
+            'agent_id': 'agent_load_${seq}',
+            'workspace_id': '${workspace}',
+            'user_id': 'user_load',
+            'agent_type': 'knowledge',
+            'inputs': {'query': 'Summarize the latest pipeline activity (${uuid})'},
+        }),
+    },
+    'workflow': {
+        'method': 'POST',
+        'path': '/workflows',
+        'body': json.dumps({
+            'workspace_id': '${workspace}',
+            'user_id': 'user_load',
+            'message': 'Qualify the lead John Doe from ACME Corp (${uuid})',
+        }),
+    },
+    'workflows-list': {
+        'method': 'GET',
+        'path': '/workflows?workspace_id=${workspace}&limit=50',
+        'body': None,
+    },
+}
+
+DEFAULT_VARS = {'workspace': 'ws_load'}
+
+DROPPED = 'dropped (in-flight cap)'
+
+
+# ============================================================================
+# ARRIVAL SCHEDULE
+# ============================================================================
+
+def arrival_times(profile, rate, end_rate, duration, poisson=False, seed=None):
+    """
+    Scheduled send offsets (seconds from start).
+
+    constant: `rate` req/s for `duration` seconds
+    ramp:     rate rises linearly from `rate` to `end_rate` over `duration`
+    poisson:  exponential inter-arrival gaps with the same instantaneous rate
+
+    The n-th arrival is due when the expected arrival count - the rate
+    integrated from 0 - reaches n (a running sum of unit exponentials for
+    poisson), so a ramp that starts at 0 req/s still sends.
+    """
+    rng = random.Random(seed)
+    slope = (end_rate - rate) / duration if profile == 'ramp' and duration > 0 else 0.0
+    count = 0.0
+    while True:
+        count += rng.expovariate(1.0) if poisson else 1.0
+        # First t >= 0 with rate * t + slope * t**2 / 2 == count
+        discriminant = rate * rate + 2 * slope * count
+        if discriminant < 0:
+            return
+        denominator = rate + math.sqrt(discriminant)
+        if denominator <= 0:
+            return
+        t = 2 * count / denominator
+        if t >= duration:
+            return
+        yield t
+
 
-def make_request(url, request_id):
-    """Make a single HTTP request and measure response time"""
-    start = time.time()
+def render(template, seq, variables):
+    """Fill ${seq}, ${uuid}, ${ts} and user variables into a template string"""
+    if template is None:
+        return None
+    values = dict(variables)
+    values.update(seq=seq, uuid=uuid.uuid4().hex, ts=int(time.time() * 1000))
+    return string.Template(template).safe_substitute(values)
+
+
+# ============================================================================
+# RUNNER
+# ============================================================================
+
+class LoadRun:
+    """State of one load run: histograms, per-request records, error counts"""
+
+    def __init__(self, keep_records=False):
+        self.latency = LatencyHistogram()   # scheduled send -> response (us)
+        self.service = LatencyHistogram()   # actual send -> response (us)
+        self.statuses = {}
+        self.errors = {}
+        self.success_count = 0
+        self.dropped = 0
+        self.records = [] if keep_records else None
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def drop(self, seq, scheduled):
+        """An arrival past the in-flight cap: never sent, counted as a failure"""
+        self.dropped += 1
+        self.errors[DROPPED] = self.errors.get(DROPPED, 0) + 1
+        if self.records is not None:
+            self.records.append({
+                'seq': seq,
+                'scheduled_s': round(scheduled, 6),
+                'sent_s': '',
+                'latency_ms': '',
+                'service_ms': '',
+                'status': 0,
+                'error': DROPPED,
+            })
+
+    def add(self, seq, scheduled, sent, finished, status, error):
+        latency_us = (finished - scheduled) * 1e6
+        service_us = (finished - sent) * 1e6
+        self.latency.record(latency_us)
+        self.service.record(service_us)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if error is None and 200 <= status < 300:
+            self.success_count += 1
+        else:
+            key = error or f'HTTP {status}'
+            self.errors[key] = self.errors.get(key, 0) + 1
+        if self.records is not None:
+            self.records.append({
+                'seq': seq,
+                'scheduled_s': round(scheduled, 6),
+                'sent_s': round(sent, 6),
+                'latency_ms': round(latency_us / 1000, 3),
+                'service_ms': round(service_us / 1000, 3),
+                'status': status,
+                'error': error or '',
+            })
+
+
+async def send(client, run, seq, scheduled, started, method, url, body, headers):
+    sent = time.perf_counter() - started
+    status, error = 0, None
     try:
-        req = Request(url, headers={'User-Agent': 'GalaxyCo-LoadTest/1.0'})
-        with urlopen(req, timeout=10) as response:
-            status_code = response.status
-            body = response.read()
-            duration = (time.time() - start) * 1000  # Convert to ms
-            
-            # Try to parse JSON response
-            try:
-                data = json.loads(body)
-                has_status = 'status' in data
-                has_service = 'service' in data
-            except:
-                has_status = False
-                has_service = False
-            
-            return {
-                'id': request_id,
-                'status': status_code,
-                'duration': duration,
-                'success': status_code == 200,
-                'has_status': has_status,
-                'has_service': has_service,
-            }
-    except (HTTPError, URLError) as e:
-        duration = (time.time() - start) * 1000
-        return {
-            'id': request_id,
-            'status': getattr(e, 'code', 0),
-            'duration': duration,
-            'success': False,
-            'error': str(e),
-        }
+        response = await client.request(method, url, content=body, headers=headers)
+        status = response.status_code
+        await response.aread()
+    except httpx.TimeoutException:
+        error = 'timeout'
     except Exception as e:
-        duration = (time.time() - start) * 1000
-        return {
-            'id': request_id,
-            'status': 0,
-            'duration': duration,
-            'success': False,
-            'error': str(e),
-        }
-
-def run_load_test(url, total_requests=100, num_concurrent=10):
-    """Run load test with concurrent workers"""
-    print("=" * 60)
-    print("GalaxyCo.ai Load Test")
-    print("=" * 60)
-    print(f"Target: {url}")
-    print(f"Total Requests: {total_requests}")
-    print(f"Concurrent: {num_concurrent}")
-    print("=" * 60)
-    print()
-    
-    print("Starting load test...")
-    
-    start_time = time.time()
-    results = []
-    
-    # Run requests concurrently
-    with concurrent.futures.ThreadPoolExecutor(max_workers=num_concurrent) as executor:
-        futures = [executor.submit(make_request, url, i) for i in range(1, total_requests + 1)]
-        for future in concurrent.futures.as_completed(futures):
-            results.append(future.result())
-    
-    end_time = time.time()
-    total_duration = end_time - start_time
-    
-    print()
-    print("Load test complete!")
+        error = type(e).__name__
+    finally:
+        finished = time.perf_counter() - started
+        run.in_flight -= 1
+        run.add(seq, scheduled, sent, finished, status, error)
+
+
+async def run_load_test(
+    url,
+    method='GET',
+    body=None,
+    headers=None,
+    variables=None,
+    profile='constant',
+    rate=10.0,
+    end_rate=None,
+    duration=10.0,
+    poisson=False,
+    max_in_flight=1000,
+    timeout=10.0,
+    keep_records=False,
+    seed=None,
+):
+    """Drive the schedule open-loop and return the finished LoadRun plus wall time"""
+    variables = {**DEFAULT_VARS, **(variables or {})}
+    headers = {'User-Agent': 'GalaxyCo-LoadTest/2.0', **(headers or {})}
+    if body is not None:
+        headers.setdefault('Content-Type', 'application/json')
+
+    run = LoadRun(keep_records=keep_records)
+    limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+    tasks = set()
+
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        started = time.perf_counter()
+        schedule = arrival_times(profile, rate, end_rate if end_rate is not None else rate, duration, poisson, seed)
+        for seq, scheduled in enumerate(schedule, start=1):
+            delay = scheduled - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            # Never wait for the server: past the in-flight cap the arrival is
+            # dropped and counted as failed, not delayed
+            if run.in_flight >= max_in_flight:
+                run.drop(seq, scheduled)
+                continue
+
+            run.in_flight += 1
+            run.max_in_flight = max(run.max_in_flight, run.in_flight)
+            task = asyncio.create_task(send(
+                client, run, seq, scheduled, started, method,
+                render(url, seq, variables),
+                render(body, seq, variables),
+                headers,
+            ))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        if tasks:
+            await asyncio.gather(*tasks)
+        wall = time.perf_counter() - started
+
+    return run, wall
+
+
+# ============================================================================
+# REPORTING
+# ============================================================================
+
+def build_report(run, wall, config):
+    """
+    Dropped arrivals count as failed requests. Throughput is over the arrival
+    window (`duration`), not the wall time, which includes draining the
+    last in-flight requests.
+    """
+    total = run.latency.total_count + run.dropped
+    window = config['duration']
+    return {
+        'config': config,
+        'total_requests': total,
+        'success_count': run.success_count,
+        'error_count': total - run.success_count,
+        'dropped': run.dropped,
+        'success_rate': (run.success_count / total * 100) if total else 0.0,
+        'duration': wall,
+        'throughput_rps': run.latency.total_count / window if window else 0.0,
+        'max_in_flight': run.max_in_flight,
+        'status_codes': {str(code): count for code, count in sorted(run.statuses.items())},
+        'errors': run.errors,
+        'latency_ms': run.latency.summary(),
+        'service_time_ms': run.service.summary(),
+    }
+
+
+def print_report(report, max_p95_ms, min_success_rate):
+    """Human-readable summary; returns True if every threshold passed"""
+    config = report['config']
+    latency = report['latency_ms']
+    service = report['service_time_ms']
+
+    print('=' * 60)
+    print('LOAD TEST RESULTS')
+    print('=' * 60)
     print()
-    
-    # Calculate statistics
-    success_results = [r for r in results if r['success']]
-    error_results = [r for r in results if not r['success']]
-    
-    durations = [r['duration'] for r in results]
-    success_durations = [r['duration'] for r in success_results]
-    
-    # Print results
-    print("=" * 60)
-    print("LOAD TEST RESULTS")
-    print("=" * 60)
+    print(f"Target: {config['method']} {config['url']}")
+    print(f"Profile: {config['profile']} ({config['rate']}"
+          + (f" -> {config['end_rate']}" if config['profile'] == 'ramp' else '')
+          + f" req/s, {config['duration']}s, {'poisson' if config['poisson'] else 'uniform'} arrivals)")
     print()
-    print(f"Total Requests: {len(results)}")
-    print(f"Test Duration: {total_duration:.2f}s")
-    print(f"Requests/sec: {len(results) / total_duration:.2f}")
+    print(f"Total Requests: {report['total_requests']}")
+    print(f"Test Duration: {report['duration']:.2f}s ({config['duration']}s of arrivals)")
+    print(f"Requests/sec: {report['throughput_rps']:.2f}")
+    print(f"Max In-Flight: {report['max_in_flight']}")
+    if report['dropped']:
+        print(f"Dropped (in-flight cap): {report['dropped']}")
     print()
-    
-    success_rate = (len(success_results) / len(results)) * 100
-    print(f"Success Rate: {success_rate:.2f}%")
-    print(f"Successful: {len(success_results)}")
-    print(f"Failed: {len(error_results)}")
+    print(f"Success Rate: {report['success_rate']:.2f}%")
+    print(f"Successful: {report['success_count']}")
+    print(f"Failed: {report['error_count']}")
     print()
-    
-    if durations:
-        print("Response Times (ms):")
-        print(f"  Min: {min(durations):.2f}")
-        print(f"  Average: {statistics.mean(durations):.2f}")
-        print(f"  Median (p50): {statistics.median(durations):.2f}")
-        
-        sorted_durations = sorted(durations)
-        p95_idx = int(len(sorted_durations) * 0.95)
-        p99_idx = int(len(sorted_durations) * 0.99)
-        print(f"  p95: {sorted_durations[p95_idx]:.2f}")
-        print(f"  p99: {sorted_durations[p99_idx]:.2f}")
-        print(f"  Max: {max(durations):.2f}")
+    print('Latency (ms, from scheduled send)      Service time (ms)')
+    for key in ('min', 'mean', 'p50', 'p90', 'p95', 'p99', 'p99.9', 'max'):
+        print(f"  {key:<6} {latency[key]:>12.2f}                   {service[key]:>12.2f}")
     print()
-    print("=" * 60)
+    print('=' * 60)
     print()
-    
-    # Threshold checks
-    print("Threshold Checks:")
-    
-    # Success rate check
-    if success_rate == 100:
-        print("  ✓ PASS: 100% success rate")
-    elif success_rate >= 95:
-        print(f"  ✓ PASS: Success rate ({success_rate:.2f}%) >= 95%")
+
+    passed = True
+    print('Threshold Checks:')
+    if report['success_rate'] >= min_success_rate:
+        print(f"  ✓ PASS: Success rate ({report['success_rate']:.2f}%) >= {min_success_rate}%")
     else:
-        print(f"  ✗ FAIL: Success rate ({success_rate:.2f}%) < 95%")
-    
-    # p95 latency check
-    if durations:
-        p95 = sorted_durations[p95_idx]
-        if p95 < 500:
-            print(f"  ✓ PASS: p95 ({p95:.2f} ms) < 500ms")
-        else:
-            print(f"  ✗ FAIL: p95 ({p95:.2f} ms) >= 500ms")
-    
-    # Average latency check
-    if durations:
-        avg = statistics.mean(durations)
-        if avg < 300:
-            print(f"  ✓ PASS: Average ({avg:.2f} ms) < 300ms")
-        else:
-            print(f"  ⚠ WARNING: Average ({avg:.2f} ms) >= 300ms")
-    
+        print(f"  ✗ FAIL: Success rate ({report['success_rate']:.2f}%) < {min_success_rate}%")
+        passed = False
+    if latency['p95'] < max_p95_ms:
+        print(f"  ✓ PASS: p95 ({latency['p95']:.2f} ms) < {max_p95_ms}ms")
+    else:
+        print(f"  ✗ FAIL: p95 ({latency['p95']:.2f} ms) >= {max_p95_ms}ms")
+        passed = False
     print()
-    print("=" * 60)
-    
-    # Show errors if any
-    if error_results:
-        print()
-        print("Error Details:")
-        error_counts = {}
-        for r in error_results:
-            error_msg = r.get('error', f"HTTP {r['status']}")
-            error_counts[error_msg] = error_counts.get(error_msg, 0) + 1
-        
-        for error, count in error_counts.items():
+
+    if report['errors']:
+        print('Error Details:')
+        for error, count in report['errors'].items():
             print(f"  {error}: {count} occurrences")
         print()
-    
-    return {
-        'total_requests': len(results),
-        'success_count': len(success_results),
-        'error_count': len(error_results),
-        'success_rate': success_rate,
-        'duration': total_duration,
-        'stats': {
-            'min': min(durations) if durations else 0,
-            'avg': statistics.mean(durations) if durations else 0,
-            'median': statistics.median(durations) if durations else 0,
-            'p95': sorted_durations[p95_idx] if durations else 0,
-            'p99': sorted_durations[p99_idx] if durations else 0,
-            'max': max(durations) if durations else 0,
-        }
-    }
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description='Load test for GalaxyCo.ai API')
+    return passed
+
+
+def write_csv(path, records):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=[
+            'seq', 'scheduled_s', 'sent_s', 'latency_ms', 'service_ms', 'status', 'error',
+        ])
+        writer.writeheader()
+        writer.writerows(sorted(records, key=lambda r: r['seq']))
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def parse_key_values(pairs, separator):
+    result = {}
+    for pair in pairs or []:
+        key, sep, value = pair.partition(separator)
+        if not sep:
+            raise SystemExit(f'Expected KEY{separator}VALUE, got: {pair}')
+        result[key.strip()] = value.strip()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Open-loop load test for GalaxyCo.ai API')
     parser.add_argument('url', nargs='?', default='https://api.galaxyco.ai/health',
-                        help='URL to test (default: https://api.galaxyco.ai/health)')
-    parser.add_argument('-n', '--requests', type=int, default=100,
-                        help='Total number of requests (default: 100)')
-    parser.add_argument('-c', '--concurrent', type=int, default=10,
-                        help='Number of concurrent requests (default: 10)')
-    
-    args = parser.parse_args()
-    
-    run_load_test(args.url, args.requests, args.concurrent)
+                        help='URL to test, or the base URL when --target is given')
+    parser.add_argument('--target', choices=sorted(TARGETS),
+                        help='request preset (method, path and body) for the agents service')
+    parser.add_argument('-X', '--method', help='HTTP method (default: GET, or the preset)')
+    parser.add_argument('--body', help='request body template (JSON), e.g. with ${seq} / ${uuid}')
+    parser.add_argument('--body-file', help='read the body template from a file')
+    parser.add_argument('-H', '--header', action='append', help='extra header "Name: value"')
+    parser.add_argument('--var', action='append', help='template variable KEY=VALUE')
+    parser.add_argument('--profile', choices=['constant', 'ramp'], default='constant')
+    parser.add_argument('-r', '--rate', type=float, default=10.0, help='arrivals per second (start rate for ramp)')
+    parser.add_argument('--end-rate', type=float, help='final arrivals per second for ramp')
+    parser.add_argument('-d', '--duration', type=float, default=10.0, help='seconds of arrivals')
+    parser.add_argument('--poisson', action='store_true', help='exponential inter-arrival times')
+    parser.add_argument('--max-in-flight', type=int, default=1000,
+                        help='drop arrivals beyond this many outstanding requests (counted as failures)')
+    parser.add_argument('--timeout', type=float, default=10.0, help='per-request timeout in seconds')
+    parser.add_argument('--seed', type=int, help='seed for poisson arrivals')
+    parser.add_argument('--json', dest='json_path', help='write the report as JSON')
+    parser.add_argument('--csv', dest='csv_path', help='write one CSV row per request')
+    parser.add_argument('--max-p95-ms', type=float, default=500.0)
+    parser.add_argument('--min-success-rate', type=float, default=95.0)
+    args = parser.parse_args(argv)
+
+    if httpx is None:
+        raise SystemExit('httpx is required: pip install httpx')
+    if args.profile == 'ramp' and args.end_rate is None:
+        parser.error('--profile ramp requires --end-rate')
+
+    url, method, body = args.url, args.method, args.body
+    if args.target:
+        preset = TARGETS[args.target]
+        url = url.rstrip('/') + preset['path']
+        method = method or preset['method']
+        body = body if body is not None else preset['body']
+    if args.body_file:
+        with open(args.body_file) as f:
+            body = f.read()
+    method = (method or ('POST' if body is not None else 'GET')).upper()
+
+    config = {
+        'url': url,
+        'method': method,
+        'profile': args.profile,
+        'rate': args.rate,
+        'end_rate': args.end_rate,
+        'duration': args.duration,
+        'poisson': args.poisson,
+        'max_in_flight': args.max_in_flight,
+    }
+
+    print('=' * 60)
+    print('GalaxyCo.ai Load Test')
+    print('=' * 60)
+    print(f'Target: {method} {url}')
+    print(f'Profile: {args.profile}, {args.duration}s')
+    print('=' * 60)
+    print()
+    print('Starting load test...')
+
+    run, wall = asyncio.run(run_load_test(
+        url,
+        method=method,
+        body=body,
+        headers=parse_key_values(args.header, ':'),
+        variables=parse_key_values(args.var, '='),
+        profile=args.profile,
+        rate=args.rate,
+        end_rate=args.end_rate,
+        duration=args.duration,
+        poisson=args.poisson,
+        max_in_flight=args.max_in_flight,
+        timeout=args.timeout,
+        keep_records=bool(args.csv_path),
+        seed=args.seed,
+    ))
+
+    print()
+    print('Load test complete!')
+    print()
+
+    report = build_report(run, wall, config)
+    passed = print_report(report, args.max_p95_ms, args.min_success_rate)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'Report written to {args.json_path}')
+    if args.csv_path:
+        write_csv(args.csv_path, run.records)
+        print(f'Per-request CSV written to {args.csv_path}')
+
+    return 0 if passed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+GalaxyCo.ai Load Test - Mock LLM Server
+
+Local stand-in for the OpenAI and Anthropic chat APIs, so `/execute` and the
+orchestrator can be load tested without provider keys or spend, with
+reproducible capacity numbers on a single box.
+
+Endpoints:
+    POST /v1/chat/completions   OpenAI chat completions (stream and non-stream)
+    POST /v1/messages           Anthropic messages (stream and non-stream)
+    GET  /health                liveness
+    GET  /stats                 request counts by provider and outcome
+
+Behaviour knobs:
+    --latency SPEC       time to first token: seconds, "uniform:a,b",
+                         "lognormal:median,sigma" or "exponential:mean"
+    --tokens-per-s N     output token throughput after the first token
+                         (0 = whole response at once)
+    --error-rate F       fraction of requests answered with a provider 500
+    --429-rate F         fraction of requests answered with 429 + Retry-After
+    --rate-limit-rps N   token-bucket limit; requests over it get 429
+    --seed N             make sampled latency and injected faults repeatable
+
+Responses are chosen by rules from a JSON file (first rule whose `contains`
+strings all appear in the prompt wins), falling back to a short generic
+answer. The bundled mock_responses.json returns the JSON each orchestrator
+node expects, including approval-gated requests ("Send ...").
+
+Usage:
+    python tests/load/mock_llm_server.py --port 8900 --latency lognormal:0.4,0.3 --tokens-per-s 80
+
+    # Point the agents service at it
+    OPENAI_API_KEY=sk-mock ANTHROPIC_API_KEY=sk-ant-mock \\
+    OPENAI_BASE_URL=http://127.0.0.1:8900/v1 ANTHROPIC_BASE_URL=http://127.0.0.1:8900 \\
+        uvicorn app:app --port 5001
+
+Requires: fastapi, uvicorn (already dependencies of services/agents)
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+DEFAULT_RESPONSES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mock_responses.json')
+DEFAULT_CONTENT = 'Mock response: the request was processed successfully.'
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+def load_rules(path):
+    if not path:
+        return []
+    with open(path) as f:
+        return json.load(f)['rules']
+
+
+def latency_sampler(spec, rng):
+    """Seconds to wait before the first token, from a distribution spec"""
+    kind, _, params = str(spec).partition(':')
+    if not params:
+        value = float(kind)
+        return lambda: value
+    args = [float(p) for p in params.split(',')]
+    if kind == 'uniform':
+        return lambda: rng.uniform(*args)
+    if kind == 'lognormal':
+        mu = math.log(args[0])
+        return lambda: rng.lognormvariate(mu, args[1])
+    if kind == 'exponential':
+        return lambda: rng.expovariate(1.0 / args[0])
+    raise ValueError(f'Unknown latency distribution: {spec}')
+
+
+class MockConfig:
+    def __init__(
+        self,
+        rules=None,
+        latency='0',
+        tokens_per_s=0.0,
+        error_rate=0.0,
+        rate_limit_429=0.0,
+        rate_limit_rps=0.0,
+        retry_after_s=1,
+        seed=None,
+    ):
+        self.rng = random.Random(seed)
+        self.rules = rules or []
+        self.first_token = latency_sampler(latency, self.rng)
+        self.tokens_per_s = tokens_per_s
+        self.error_rate = error_rate
+        self.rate_limit_429 = rate_limit_429
+        self.rate_limit_rps = rate_limit_rps
+        self.retry_after_s = retry_after_s
+        # Token bucket for --rate-limit-rps
+        self._tokens = rate_limit_rps
+        self._refilled = time.monotonic()
+
+    def take_rate_limit_token(self):
+        if not self.rate_limit_rps:
+            return True
+        now = time.monotonic()
+        self._tokens = min(self.rate_limit_rps, self._tokens + (now - self._refilled) * self.rate_limit_rps)
+        self._refilled = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def injected_fault(self):
+        """None, 'rate_limit' or 'server_error' for the next request"""
+        if not self.take_rate_limit_token():
+            return 'rate_limit'
+        roll = self.rng.random()
+        if roll < self.rate_limit_429:
+            return 'rate_limit'
+        if roll < self.rate_limit_429 + self.error_rate:
+            return 'server_error'
+        return None
+
+
+# ============================================================================
+# CONTENT
+# ============================================================================
+
+def text_of(content):
+    if isinstance(content, list):
+        return ' '.join(block.get('text', '') for block in content if isinstance(block, dict))
+    return content or ''
+
+
+def pick_content(rules, text):
+    for rule in rules:
+        if all(needle in text for needle in rule['contains']):
+            content = rule['content']
+            return content if isinstance(content, str) else json.dumps(content)
+    return DEFAULT_CONTENT
+
+
+def count_tokens(text):
+    """Rough token estimate (~4 characters per token)"""
+    return max(1, len(text) // 4)
+
+
+def split_tokens(text):
+    """Stream chunks of roughly one token (4 characters) each"""
+    return [text[i:i + 4] for i in range(0, len(text), 4)] or ['']
+
+
+async def paced(chunks, tokens_per_s):
+    """Yield chunks at the configured output throughput"""
+    interval = 1.0 / tokens_per_s if tokens_per_s else 0.0
+    for index, chunk in enumerate(chunks):
+        if index and interval:
+            await asyncio.sleep(interval)
+        yield chunk
+
+
+def sse(data, event=None):
+    prefix = f'event: {event}\n' if event else ''
+    return f'{prefix}data: {json.dumps(data)}\n\n'
+
+
+# ============================================================================
+# APP
+# ============================================================================
+
+def create_app(config):
+    app = FastAPI(title='Mock LLM Server')
+    app.state.stats = {}
+
+    def count(provider, outcome):
+        key = f'{provider}.{outcome}'
+        app.state.stats[key] = app.state.stats.get(key, 0) + 1
+
+    def openai_error(status, message, error_type, code):
+        headers = {'retry-after': str(config.retry_after_s)} if status == 429 else None
+        return JSONResponse(
+            {'error': {'message': message, 'type': error_type, 'param': None, 'code': code}},
+            status_code=status,
+            headers=headers,
+        )
+
+    def anthropic_error(status, message, error_type):
+        headers = {'retry-after': str(config.retry_after_s)} if status == 429 else None
+        return JSONResponse(
+            {'type': 'error', 'error': {'type': error_type, 'message': message}},
+            status_code=status,
+            headers=headers,
+        )
+
+    @app.get('/health')
+    async def health():
+        return {'status': 'healthy'}
+
+    @app.get('/stats')
+    async def stats():
+        return app.state.stats
+
+    @app.post('/v1/chat/completions')
+    async def chat_completions(request: Request):
+        body = await request.json()
+        fault = config.injected_fault()
+        if fault == 'rate_limit':
+            count('openai', '429')
+            return openai_error(429, 'Rate limit reached (mock)', 'requests', 'rate_limit_exceeded')
+        if fault == 'server_error':
+            count('openai', '500')
+            return openai_error(500, 'The server had an error (mock)', 'server_error', None)
+        count('openai', 'ok')
+
+        text = '\n'.join(text_of(m.get('content')) for m in body.get('messages', []))
+        content = pick_content(config.rules, text)
+        model = body.get('model', 'mock')
+        completion_id = f'chatcmpl-{uuid.uuid4().hex}'
+        created = int(time.time())
+        usage = {
+            'prompt_tokens': count_tokens(text),
+            'completion_tokens': count_tokens(content),
+        }
+        usage['total_tokens'] = usage['prompt_tokens'] + usage['completion_tokens']
+
+        await asyncio.sleep(config.first_token())
+
+        if not body.get('stream'):
+            if config.tokens_per_s:
+                await asyncio.sleep(usage['completion_tokens'] / config.tokens_per_s)
+            return {
+                'id': completion_id,
+                'object': 'chat.completion',
+                'created': created,
+                'model': model,
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': content},
+                    'finish_reason': 'stop',
+                }],
+                'usage': usage,
+            }
+
+        include_usage = (body.get('stream_options') or {}).get('include_usage', False)
+
+        async def events():
+            base = {'id': completion_id, 'object': 'chat.completion.chunk', 'created': created, 'model': model}
+            yield 'data: ' + json.dumps({**base, 'choices': [
+                {'index': 0, 'delta': {'role': 'assistant', 'content': ''}, 'finish_reason': None}
+            ]}) + '\n\n'
+            async for chunk in paced(split_tokens(content), config.tokens_per_s):
+                yield 'data: ' + json.dumps({**base, 'choices': [
+                    {'index': 0, 'delta': {'content': chunk}, 'finish_reason': None}
+                ]}) + '\n\n'
+            yield 'data: ' + json.dumps({**base, 'choices': [
+                {'index': 0, 'delta': {}, 'finish_reason': 'stop'}
+            ]}) + '\n\n'
+            if include_usage:
+                yield 'data: ' + json.dumps({**base, 'choices': [], 'usage': usage}) + '\n\n'
+            yield 'data: [DONE]\n\n'
+
+        return StreamingResponse(events(), media_type='text/event-stream')
+
+    @app.post('/v1/messages')
+    async def messages(request: Request):
+        body = await request.json()
+        fault = config.injected_fault()
+        if fault == 'rate_limit':
+            count('anthropic', '429')
+            return anthropic_error(429, 'Rate limit reached (mock)', 'rate_limit_error')
+        if fault == 'server_error':
+            count('anthropic', '500')
+            return anthropic_error(500, 'Internal server error (mock)', 'api_error')
+        count('anthropic', 'ok')
+
+        parts = [text_of(body.get('system'))]
+        parts += [text_of(m.get('content')) for m in body.get('messages', [])]
+        text = '\n'.join(parts)
+        content = pick_content(config.rules, text)
+        model = body.get('model', 'mock')
+        message_id = f'msg_{uuid.uuid4().hex}'
+        input_tokens = count_tokens(text)
+        output_tokens = count_tokens(content)
+
+        await asyncio.sleep(config.first_token())
+
+        if not body.get('stream'):
+            if config.tokens_per_s:
+                await asyncio.sleep(output_tokens / config.tokens_per_s)
+            return {
+                'id': message_id,
+                'type': 'message',
+                'role': 'assistant',
+                'model': model,
+                'content': [{'type': 'text', 'text': content}],
+                'stop_reason': 'end_turn',
+                'stop_sequence': None,
+                'usage': {'input_tokens': input_tokens, 'output_tokens': output_tokens},
+            }
+
+        async def events():
+            yield sse({'type': 'message_start', 'message': {
+                'id': message_id, 'type': 'message', 'role': 'assistant', 'model': model,
+                'content': [], 'stop_reason': None, 'stop_sequence': None,
+                'usage': {'input_tokens': input_tokens, 'output_tokens': 1},
+            }}, 'message_start')
+            yield sse({'type': 'content_block_start', 'index': 0,
+                       'content_block': {'type': 'text', 'text': ''}}, 'content_block_start')
+            yield sse({'type': 'ping'}, 'ping')
+            async for chunk in paced(split_tokens(content), config.tokens_per_s):
+                yield sse({'type': 'content_block_delta', 'index': 0,
+                           'delta': {'type': 'text_delta', 'text': chunk}}, 'content_block_delta')
+            yield sse({'type': 'content_block_stop', 'index': 0}, 'content_block_stop')
+            yield sse({'type': 'message_delta', 'delta': {'stop_reason': 'end_turn', 'stop_sequence': None},
+                       'usage': {'output_tokens': output_tokens}}, 'message_delta')
+            yield sse({'type': 'message_stop'}, 'message_stop')
+
+        return StreamingResponse(events(), media_type='text/event-stream')
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mock OpenAI/Anthropic-compatible LLM server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency', default='0', help='time to first token (seconds or distribution spec)')
+    parser.add_argument('--tokens-per-s', type=float, default=0.0, help='output token throughput (0 = instant)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests failing with 500')
+    parser.add_argument('--429-rate', dest='rate_limit_429', type=float, default=0.0,
+                        help='fraction of requests answered with 429')
+    parser.add_argument('--rate-limit-rps', type=float, default=0.0, help='token-bucket limit (0 = none)')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds on 429')
+    parser.add_argument('--responses', default=DEFAULT_RESPONSES, help='response rules JSON ("" for none)')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    config = MockConfig(
+        rules=load_rules(args.responses),
+        latency=args.latency,
+        tokens_per_s=args.tokens_per_s,
+        error_rate=args.error_rate,
+        rate_limit_429=args.rate_limit_429,
+        rate_limit_rps=args.rate_limit_rps,
+        retry_after_s=args.retry_after,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""
+GalaxyCo.ai Load Test - Scenario Runner
+
+Runs a weighted mix of request flows described in a scenario file (JSON, or
+YAML when PyYAML is installed) and gates the result on SLOs.
+
+Arrivals are open-loop, exactly as in load_test.py: each scheduled arrival
+picks a flow by weight and starts it without waiting for earlier ones. A flow
+is one or more steps; between steps a think time is slept, and values can be
+captured from a JSON response for later steps (e.g. submit a workflow, wait,
+then approve it). `check` asserts values in a 2xx response body, for
+endpoints that report failures in the payload.
+
+Scenario format:
+
+    {
+      "name": "mixed",
+      "base_url": "http://127.0.0.1:5001",
+      "variables": {"workspace": "ws_load"},
+      "profile": {"type": "constant", "rate": 20, "duration": 60},
+      "max_in_flight": 500,
+      "timeout": 30,
+      "warmup": 5,
+      "slo": {"success_rate_min": 99, "p95_ms_max": 800, "throughput_rps_min": 18},
+      "flows": [
+        {"name": "health", "weight": 5,
+         "steps": [{"method": "GET", "path": "/health"}],
+         "slo": {"p99_ms_max": 50}},
+        {"name": "submit_and_approve", "weight": 1,
+         "steps": [
+           {"name": "submit", "method": "POST", "path": "/workflows",
+            "body": {"workspace_id": "${workspace}", "user_id": "u", "message": "Send ..."},
+            "expect_status": [202], "capture": {"workflow_id": "workflow_id"}},
+           {"name": "approve", "think_time": "uniform:1,2", "method": "POST",
+            "path": "/approvals/bulk",
+            "body": {"workspace_id": "${workspace}", "workflow_ids": ["${workflow_id}"], "approved": true},
+            "check": {"results.${workflow_id}.success": true}}
+         ]}
+      ]
+    }
+
+Profiles: {"type": "constant", "rate", "duration"} or {"type": "ramp",
+"rate", "end_rate", "duration"}, optionally "poisson": true. Think times are
+seconds or "uniform:a,b" / "exponential:mean". SLO keys: success_rate_min,
+p50_ms_max, p95_ms_max, p99_ms_max, p999_ms_max, throughput_rps_min
+(successful requests per second of the measured arrival window, so draining
+the last flows does not dilute it); at the top level they gate every
+request, inside a flow only that flow's requests. Flows started in the first
+`warmup` seconds run but are not measured. An arrival dropped at
+`max_in_flight` counts as a failed request of the flow it picked.
+
+The report (--report) is machine-readable JSON with every gate's threshold,
+actual value and verdict. --baseline compares throughput and p95 per flow
+against a stored report and fails when throughput drops (or p95 grows) by
+more than --max-regression percent. Exit code 0 means every gate passed.
+
+Examples:
+    python tests/load/scenario.py tests/load/scenarios/mixed.json --report report.json
+    python tests/load/scenario.py tests/load/scenarios/mixed.json --baseline baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from histogram import LatencyHistogram  # noqa: E402
+from load_test import DROPPED, arrival_times, render  # noqa: E402
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - reported at startup
+    httpx = None
+
+SLO_METRICS = {
+    'success_rate_min': ('success_rate', 'min'),
+    'throughput_rps_min': ('throughput_rps', 'min'),
+    'p50_ms_max': ('p50', 'max'),
+    'p95_ms_max': ('p95', 'max'),
+    'p99_ms_max': ('p99', 'max'),
+    'p999_ms_max': ('p99.9', 'max'),
+}
+
+
+# ============================================================================
+# SCENARIO FILE
+# ============================================================================
+
+def load_scenario(path):
+    with open(path) as f:
+        if path.endswith(('.yaml', '.yml')):
+            import yaml
+            scenario = yaml.safe_load(f)
+        else:
+            scenario = json.load(f)
+    validate_scenario(scenario)
+    return scenario
+
+
+def validate_scenario(scenario):
+    """Raise ValueError with a readable message for malformed scenarios"""
+    for key in ('base_url', 'profile', 'flows'):
+        if key not in scenario:
+            raise ValueError(f'scenario is missing "{key}"')
+    profile = scenario['profile']
+    if profile.get('type', 'constant') not in ('constant', 'ramp'):
+        raise ValueError(f'unknown profile type: {profile.get("type")}')
+    if profile.get('type') == 'ramp' and 'end_rate' not in profile:
+        raise ValueError('ramp profile requires "end_rate"')
+    if not scenario['flows']:
+        raise ValueError('scenario has no flows')
+    names = set()
+    for flow in scenario['flows']:
+        if not flow.get('steps'):
+            raise ValueError(f'flow {flow.get("name")!r} has no steps')
+        if flow.get('name') in names:
+            raise ValueError(f'duplicate flow name: {flow.get("name")}')
+        names.add(flow.get('name'))
+        for slo in flow.get('slo', {}):
+            if slo not in SLO_METRICS:
+                raise ValueError(f'unknown SLO "{slo}" in flow {flow["name"]}')
+    for slo in scenario.get('slo', {}):
+        if slo not in SLO_METRICS:
+            raise ValueError(f'unknown SLO "{slo}"')
+
+
+def think_time(spec, rng):
+    if not spec:
+        return 0.0
+    if isinstance(spec, (int, float)):
+        return float(spec)
+    kind, _, params = spec.partition(':')
+    args = [float(p) for p in params.split(',')] if params else []
+    if kind == 'uniform':
+        return rng.uniform(*args)
+    if kind == 'exponential':
+        return rng.expovariate(1.0 / args[0])
+    return float(spec)
+
+
+def extract(document, path):
+    """Dotted-path lookup into a JSON response (list indexes allowed)"""
+    value = document
+    for part in path.split('.'):
+        if isinstance(value, list):
+            value = value[int(part)]
+        else:
+            value = value[part]
+    return value
+
+
+# ============================================================================
+# RUNNER
+# ============================================================================
+
+class Stats:
+    """Latency histogram and outcome counts for one scope (all, flow or step)"""
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.success = 0
+        self.dropped = 0
+        self.errors = {}
+
+    def add(self, latency_s, error):
+        self.latency.record(latency_s * 1e6)
+        if error is None:
+            self.success += 1
+        else:
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+    def drop(self):
+        """An arrival never sent (in-flight cap): a failure with no latency"""
+        self.dropped += 1
+        self.errors[DROPPED] = self.errors.get(DROPPED, 0) + 1
+
+    def report(self, window):
+        sent = self.latency.total_count
+        total = sent + self.dropped
+        summary = self.latency.summary()
+        return {
+            'requests': total,
+            'success': self.success,
+            'dropped': self.dropped,
+            'success_rate': (self.success / total * 100) if total else 0.0,
+            'request_rate_rps': sent / window if window else 0.0,
+            'throughput_rps': self.success / window if window else 0.0,
+            'latency_ms': summary,
+            'errors': self.errors,
+        }
+
+
+class ScenarioRun:
+    def __init__(self, scenario, seed=None):
+        self.scenario = scenario
+        self.rng = random.Random(seed)
+        self.variables = dict(scenario.get('variables', {}))
+        self.overall = Stats()
+        self.flows = {flow['name']: Stats() for flow in scenario['flows']}
+        self.steps = {}
+        self.flows_started = 0
+        self.dropped = 0
+        self.in_flight = 0
+        self.elapsed = 0.0
+        self.weights = [flow.get('weight', 1) for flow in scenario['flows']]
+
+    def pick_flow(self):
+        return self.rng.choices(self.scenario['flows'], weights=self.weights)[0]
+
+    def record(self, flow, step_name, latency_s, error):
+        self.overall.add(latency_s, error)
+        self.flows[flow['name']].add(latency_s, error)
+        key = f"{flow['name']}.{step_name}"
+        self.steps.setdefault(key, Stats()).add(latency_s, error)
+
+    async def run_flow(self, client, flow, seq, scheduled_at, measured=True):
+        """Execute every step; the first step's latency counts from its scheduled time"""
+        variables = dict(self.variables)
+        due = scheduled_at
+        try:
+            for index, step in enumerate(flow['steps']):
+                if index:
+                    pause = think_time(step.get('think_time'), self.rng)
+                    await asyncio.sleep(pause)
+                    due = time.perf_counter()
+                error, document = await self.send(client, step, seq, variables)
+                if measured:
+                    self.record(flow, step.get('name', f'step{index + 1}'), time.perf_counter() - due, error)
+                if error is not None:
+                    return
+                for name, path in step.get('capture', {}).items():
+                    try:
+                        variables[name] = extract(document, path)
+                    except (KeyError, IndexError, TypeError, ValueError):
+                        variables[name] = ''
+        finally:
+            self.in_flight -= 1
+
+    async def send(self, client, step, seq, variables):
+        method = step.get('method', 'GET').upper()
+        url = self.scenario['base_url'].rstrip('/') + render(step.get('path', '/'), seq, variables)
+        body = step.get('body')
+        content = render(json.dumps(body), seq, variables) if body is not None else None
+        headers = dict(self.scenario.get('headers', {}))
+        if content is not None:
+            headers.setdefault('Content-Type', 'application/json')
+        expected = step.get('expect_status')
+
+        try:
+            response = await client.request(method, url, content=content, headers=headers)
+            raw = await response.aread()
+        except httpx.TimeoutException:
+            return 'timeout', None
+        except Exception as e:
+            return type(e).__name__, None
+
+        ok = response.status_code in expected if expected else 200 <= response.status_code < 300
+        if not ok:
+            return f'HTTP {response.status_code}', None
+        try:
+            document = json.loads(raw) if raw else None
+        except ValueError:
+            document = None
+
+        # Body assertions, e.g. {"results.${workflow_id}.success": true}
+        for path, value in step.get('check', {}).items():
+            path = render(path, seq, variables)
+            try:
+                actual = extract(document, path)
+            except (KeyError, IndexError, TypeError, ValueError):
+                actual = None
+            if actual != value:
+                return f'check failed: {path}', document
+        return None, document
+
+    async def run(self):
+        profile = self.scenario['profile']
+        duration = profile['duration']
+        warmup = self.scenario.get('warmup', 0)
+        max_in_flight = self.scenario.get('max_in_flight', 1000)
+        limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+        tasks = set()
+
+        async with httpx.AsyncClient(timeout=self.scenario.get('timeout', 30), limits=limits) as client:
+            started = time.perf_counter()
+            schedule = arrival_times(
+                profile.get('type', 'constant'),
+                profile['rate'],
+                profile.get('end_rate', profile['rate']),
+                duration,
+                profile.get('poisson', False),
+                self.rng.random(),
+            )
+            for seq, offset in enumerate(schedule, start=1):
+                delay = offset - (time.perf_counter() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                flow = self.pick_flow()
+                if self.in_flight >= max_in_flight:
+                    self.dropped += 1
+                    if offset >= warmup:
+                        self.overall.drop()
+                        self.flows[flow['name']].drop()
+                    continue
+                self.in_flight += 1
+                self.flows_started += 1
+                task = asyncio.create_task(self.run_flow(
+                    client, flow, seq, started + offset, measured=offset >= warmup,
+                ))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            if tasks:
+                await asyncio.gather(*tasks)
+            self.elapsed = time.perf_counter() - started
+            # Rates are per second of measured arrivals: the warmup and the
+            # drain after the last arrival are excluded
+            return duration - min(warmup, duration)
+
+
+# ============================================================================
+# GATES AND REPORT
+# ============================================================================
+
+def metric_value(stats_report, metric):
+    if metric in ('success_rate', 'throughput_rps'):
+        return stats_report[metric]
+    return stats_report['latency_ms'][metric]
+
+
+def evaluate_gates(scope, slo, stats_report):
+    gates = []
+    for key, threshold in slo.items():
+        metric, bound = SLO_METRICS[key]
+        actual = metric_value(stats_report, metric)
+        passed = actual >= threshold if bound == 'min' else actual <= threshold
+        gates.append({
+            'scope': scope,
+            'slo': key,
+            'threshold': threshold,
+            'actual': round(actual, 3),
+            'passed': passed,
+        })
+    return gates
+
+
+def compare_baseline(report, baseline, max_regression_pct):
+    """Throughput and p95 per flow (and overall) against a stored report"""
+    gates = []
+    scopes = {'overall': (report['overall'], baseline.get('overall'))}
+    for name, flow in report['flows'].items():
+        scopes[f'flow:{name}'] = (flow, baseline.get('flows', {}).get(name))
+
+    for scope, (current, before) in scopes.items():
+        if not before or not before.get('requests'):
+            continue
+        floor = before['throughput_rps'] * (1 - max_regression_pct / 100)
+        gates.append({
+            'scope': scope,
+            'slo': 'baseline_throughput_rps',
+            'threshold': round(floor, 3),
+            'actual': round(current['throughput_rps'], 3),
+            'passed': current['throughput_rps'] >= floor,
+        })
+        ceiling = before['latency_ms']['p95'] * (1 + max_regression_pct / 100)
+        gates.append({
+            'scope': scope,
+            'slo': 'baseline_p95_ms',
+            'threshold': round(ceiling, 3),
+            'actual': round(current['latency_ms']['p95'], 3),
+            'passed': current['latency_ms']['p95'] <= ceiling,
+        })
+    return gates
+
+
+def build_report(scenario, run, window, baseline=None, max_regression_pct=10.0):
+    report = {
+        'scenario': scenario.get('name', 'scenario'),
+        'base_url': scenario['base_url'],
+        'profile': scenario['profile'],
+        'duration_s': round(run.elapsed, 3),
+        'window_s': round(window, 3),
+        'flows_started': run.flows_started,
+        'dropped': run.dropped,
+        'overall': run.overall.report(window),
+        'flows': {name: stats.report(window) for name, stats in run.flows.items()},
+        'steps': {name: stats.report(window) for name, stats in sorted(run.steps.items())},
+    }
+
+    gates = evaluate_gates('overall', scenario.get('slo', {}), report['overall'])
+    for flow in scenario['flows']:
+        gates += evaluate_gates(f"flow:{flow['name']}", flow.get('slo', {}), report['flows'][flow['name']])
+    if baseline is not None:
+        gates += compare_baseline(report, baseline, max_regression_pct)
+
+    report['gates'] = gates
+    report['passed'] = all(gate['passed'] for gate in gates)
+    return report
+
+
+def print_report(report):
+    print('=' * 60)
+    print(f"SCENARIO RESULTS: {report['scenario']}")
+    print('=' * 60)
+    print()
+    print(f"Duration: {report['duration_s']:.2f}s ({report['window_s']:.2f}s measured)"
+          f"   Flows started: {report['flows_started']}"
+          + (f"   Dropped: {report['dropped']}" if report['dropped'] else ''))
+    print()
+    print(f"{'scope':<32} {'reqs':>7} {'ok %':>7} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9}")
+    rows = [('overall', report['overall'])] + list(report['steps'].items())
+    for name, stats in rows:
+        latency = stats['latency_ms']
+        print(f"{name:<32} {stats['requests']:>7} {stats['success_rate']:>7.2f} {stats['throughput_rps']:>8.2f}"
+              f" {latency['p50']:>9.2f} {latency['p95']:>9.2f} {latency['p99']:>9.2f}")
+    print()
+
+    print('SLO Gates:')
+    for gate in report['gates']:
+        mark = '✓ PASS' if gate['passed'] else '✗ FAIL'
+        print(f"  {mark}: {gate['scope']} {gate['slo']} = {gate['actual']} (threshold {gate['threshold']})")
+    if not report['gates']:
+        print('  (none defined)')
+    print()
+
+    errors = report['overall']['errors']
+    if errors:
+        print('Error Details:')
+        for error, count in errors.items():
+            print(f'  {error}: {count} occurrences')
+        print()
+
+    print('RESULT:', 'PASS' if report['passed'] else 'FAIL')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Scenario-based load test with SLO gates')
+    parser.add_argument('scenario', help='scenario file (.json, or .yaml with PyYAML)')
+    parser.add_argument('--base-url', help='override the scenario base_url')
+    parser.add_argument('--duration', type=float, help='override profile duration (seconds)')
+    parser.add_argument('--rate', type=float, help='override profile rate (arrivals per second)')
+    parser.add_argument('--seed', type=int, help='seed for flow selection, arrivals and think times')
+    parser.add_argument('--report', help='write the machine-readable report here')
+    parser.add_argument('--baseline', help='stored report to compare throughput and p95 against')
+    parser.add_argument('--max-regression', type=float, default=10.0,
+                        help='allowed throughput drop / p95 growth vs. baseline, percent')
+    args = parser.parse_args(argv)
+
+    if httpx is None:
+        raise SystemExit('httpx is required: pip install httpx')
+
+    scenario = load_scenario(args.scenario)
+    if args.base_url:
+        scenario['base_url'] = args.base_url
+    if args.duration:
+        scenario['profile']['duration'] = args.duration
+    if args.rate:
+        scenario['profile']['rate'] = args.rate
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    run = ScenarioRun(scenario, seed=args.seed)
+    window = asyncio.run(run.run())
+    report = build_report(scenario, run, window, baseline, args.max_regression)
+    print_report(report)
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.report}")
+
+    return 0 if report['passed'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
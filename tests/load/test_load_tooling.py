@@ -0,0 +1,180 @@
+"""
+Tests for the load-test tooling (histogram, arrival schedule, reports)
+=======================================================================
+
+Run with: pytest tests/load -v
+"""
+
+import asyncio
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from histogram import LatencyHistogram  # noqa: E402
+from load_test import DROPPED, LoadRun, arrival_times, build_report  # noqa: E402
+from scenario import ScenarioRun  # noqa: E402
+from scenario import build_report as build_scenario_report  # noqa: E402
+
+
+class TestHistogram:
+    """HDR bucketing, percentiles and merging"""
+
+    def test_percentiles_within_precision(self):
+        histogram = LatencyHistogram()
+        values = list(range(1, 100_001))
+        random.Random(0).shuffle(values)
+        for value in values:
+            histogram.record(value)
+
+        for pct in (50, 90, 99, 99.9):
+            exact = pct / 100 * len(values)
+            assert histogram.percentile(pct) == pytest.approx(exact, rel=1e-3)
+        assert (histogram.total_count, histogram.min_value, histogram.max_value) == (100_000, 1, 100_000)
+        assert histogram.mean() == pytest.approx(50_000.5)
+
+    def test_small_values_are_exact(self):
+        histogram = LatencyHistogram()
+        for value in (3, 7, 7, 1999):
+            histogram.record(value)
+
+        assert [histogram.percentile(p) for p in (25, 50, 75, 100)] == [3, 7, 7, 1999]
+
+    def test_values_clamped_to_range(self):
+        histogram = LatencyHistogram(highest=1000)
+        histogram.record(0)
+        histogram.record(5000)
+
+        assert (histogram.min_value, histogram.max_value) == (1, 1000)
+
+    def test_merge(self):
+        left, right, both = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+        for value in range(1, 1001):
+            (left if value % 2 else right).record(value)
+            both.record(value)
+
+        left.merge(right)
+
+        assert left.counts == both.counts
+        assert left.summary() == both.summary()
+
+    def test_corrected_back_fills_stalls(self):
+        histogram = LatencyHistogram()
+        histogram.record_corrected(1000, expected_interval=100)
+
+        assert histogram.total_count == 10
+        assert histogram.min_value == 100
+
+    def test_empty_summary(self):
+        summary = LatencyHistogram().summary()
+
+        assert summary['count'] == 0
+        assert summary['p99'] == summary['max'] == 0
+
+
+class TestArrivalTimes:
+    """Open-loop send schedule"""
+
+    def test_constant_rate(self):
+        times = list(arrival_times('constant', 10, 10, 2))
+
+        assert times == pytest.approx([i / 10 for i in range(1, 20)])
+
+    def test_ramp_from_zero_sends(self):
+        """The count follows the integrated rate: (0 + 10) / 2 * 10s = 50, the 50th due at the end"""
+        times = list(arrival_times('ramp', 0, 10, 10))
+
+        assert len(times) == 49
+        assert times == sorted(times)
+        assert times[0] == pytest.approx(2 ** 0.5)  # 1 arrival due when t**2 / 2 == 1
+
+    def test_ramp_rate_rises(self):
+        times = list(arrival_times('ramp', 5, 100, 60))
+        first_half = sum(t < 30 for t in times)
+
+        assert len(times) == pytest.approx((5 + 100) / 2 * 60, abs=1)
+        assert first_half == pytest.approx((5 + 52.5) / 2 * 30, abs=1)
+
+    def test_ramp_down_to_zero(self):
+        times = list(arrival_times('ramp', 10, 0, 10))
+
+        assert len(times) == pytest.approx(50, abs=1)
+        assert max(times) < 10
+
+    def test_zero_rate_sends_nothing(self):
+        assert list(arrival_times('constant', 0, 0, 10)) == []
+
+    def test_poisson_is_seeded_and_matches_rate(self):
+        times = list(arrival_times('ramp', 0, 20, 100, poisson=True, seed=7))
+
+        assert times == list(arrival_times('ramp', 0, 20, 100, poisson=True, seed=7))
+        assert len(times) == pytest.approx(1000, rel=0.1)
+        assert times == sorted(times)
+
+
+class TestReport:
+    """Dropped arrivals and throughput"""
+
+    def run(self, sent: int, dropped: int) -> LoadRun:
+        run = LoadRun(keep_records=True)
+        for seq in range(1, sent + 1):
+            run.add(seq, scheduled=seq * 0.1, sent=seq * 0.1, finished=seq * 0.1 + 0.05, status=200, error=None)
+        for seq in range(sent + 1, sent + dropped + 1):
+            run.drop(seq, scheduled=seq * 0.1)
+        return run
+
+    def test_dropped_arrivals_fail(self):
+        report = build_report(self.run(sent=90, dropped=10), wall=10.0, config={'duration': 10.0})
+
+        assert (report['total_requests'], report['error_count'], report['dropped']) == (100, 10, 10)
+        assert report['success_rate'] == pytest.approx(90.0)
+        assert report['errors'] == {DROPPED: 10}
+
+    def test_throughput_over_arrival_window(self):
+        """Draining in-flight requests after the last arrival does not dilute throughput"""
+        report = build_report(self.run(sent=100, dropped=0), wall=40.0, config={'duration': 10.0})
+
+        assert report['throughput_rps'] == pytest.approx(10.0)
+        assert report['duration'] == 40.0
+
+
+class TestScenarioReport:
+    """Scenario runner: dropped arrivals fail their flow, rates use the arrival window"""
+
+    def scenario(self, **overrides):
+        scenario = {
+            'base_url': 'http://127.0.0.1:9',
+            'profile': {'type': 'constant', 'rate': 50, 'duration': 0.2},
+            'slo': {'success_rate_min': 99},
+            'flows': [{'name': 'health', 'steps': [{'path': '/health'}]}],
+        }
+        scenario.update(overrides)
+        return scenario
+
+    def test_dropped_arrivals_fail_the_gate(self):
+        scenario = self.scenario(max_in_flight=0)
+        run = ScenarioRun(scenario, seed=1)
+
+        window = asyncio.run(run.run())
+        report = build_scenario_report(scenario, run, window)
+
+        assert window == 0.2
+        assert report['dropped'] == report['overall']['requests'] == report['flows']['health']['dropped'] == 9
+        assert report['overall']['errors'] == {DROPPED: 9}
+        assert report['overall']['success_rate'] == 0.0
+        assert not report['passed']
+
+    def test_throughput_over_arrival_window(self):
+        scenario = self.scenario()
+        run = ScenarioRun(scenario)
+        for _ in range(100):
+            run.record(scenario['flows'][0], 'step1', 0.01, None)
+        run.elapsed = 40.0
+
+        report = build_scenario_report(scenario, run, 10.0)
+
+        assert report['overall']['throughput_rps'] == 10.0
+        assert (report['duration_s'], report['window_s']) == (40.0, 10.0)